@@ -3,21 +3,50 @@ from telegram.ext import ContextTypes
 import asyncio
 import logging
 
-from services.launch_browser import launch_browser
-from services.metamask_connect import metamask_connect
 from services.shadow_connect import shadow_connect
 from services.add_pool import add_pool
-from services.shadow_dashboard import fetch_dashboard_pools, check_pool_status
+from services.batch_add import BATCH_USAGE, batch_add, format_batch_report, parse_batch_args, parse_batch_document, validate_batch
+from services.shadow_dashboard import fetch_dashboard_pools
+from services.dashboard_diff import diff_since_view
 from config import config
 from utils.notifier import notify_admins
+from utils.message_queue import outbox
+from utils.settings import settings
+from utils.profiler import PROFILE_USAGE, parse_profile_args, profiler
+from services.position_analytics import analytics, format_reports
+from services.tracker_supervisor import supervisor
+from services.price_feed import price_feed
+from services.price_alerts import ALERT_USAGE, price_alerts
+from utils.event_bus import bus
 from models.pool import Pool
-from utils.state import load_state, save_state
+from models.pool_table import PoolTable
+from services.price_source import get_pool_reads, last_price, pair_labels, record_pair, record_price
+from services.multicall import read_tracked_pools_within
+from services.rpc_client import pool_address_from_link, position_id_from_link, position_meta
+from utils.cl_math import range_status, format_range_status
+from utils.state import load_state, save_state, load_checkpoints_async, set_pool_table
 from utils.shadow_utils import Shadow
 
+# Playwright and the MetaMask flows (pyperclip) are only needed once a browser is started,
+# so they are imported on first use instead of at bot startup.
+async def launch_browser(*args, **kwargs):
+    from services.launch_browser import launch_browser as _launch_browser
+    return await _launch_browser(*args, **kwargs)
+
+async def metamask_connect(browser):
+    from services.metamask_connect import metamask_connect as _metamask_connect
+    return await _metamask_connect(browser)
+
 class Bot:
     def __init__(self):
         self.browser = None
-        self.pools = []  # simple in-memory list of monitored pools
+        self.pools = PoolTable()  # monitored pools, indexed by link / contract / owner
+        set_pool_table(self.pools)  # trackers look their pools up here
+        self.watchdog = None  # BrowserWatchdog, started with the application
+        self.memory_governor = None  # MemoryGovernor, started with the application
+        self.dashboard_alerts = None  # DashboardAlerts, started with the application
+        self.startup_resume = None  # StartupResume, started with the application
+        supervisor.get_browser = lambda: self.browser  # restarted trackers use the current browser
         
         # Ensure all necessary directories exist before proceeding
         config.ensure_directories()
@@ -29,18 +58,16 @@ class Bot:
         state = load_state()
         for p in state.get("pools", []):
             try:
-                self.pools.append(
-                    Pool(
-                        link=p["link"],
-                        range=p.get("range", ""),
-                        token=p.get("token", ""),
-                        amount=p.get("amount", 0),
-                        upper_range=p.get("upper_range"),
-                        lower_range=p.get("lower_range"),
-                        owner_chat_id=p.get("owner_chat_id"),
-                        last_status=p.get("last_status"),
-                        meta=p.get("meta", {}),
-                    )
+                self.pools.add(
+                    link=p["link"],
+                    range=p.get("range", ""),
+                    token=p.get("token", ""),
+                    amount=p.get("amount", 0),
+                    upper_range=p.get("upper_range"),
+                    lower_range=p.get("lower_range"),
+                    owner_chat_id=p.get("owner_chat_id"),
+                    last_status=p.get("last_status"),
+                    meta=p.get("meta", {}),
                 )
             except Exception:
                 logging.exception("Failed to load pool from state")
@@ -56,12 +83,20 @@ class Bot:
         # Apply settings overrides if any
         try:
             if "REBALANCE_THRESHOLD" in self.settings:
-                config.REBALANCE_THRESHOLD = float(self.settings["REBALANCE_THRESHOLD"])
+                self.settings["threshold"] = float(self.settings.pop("REBALANCE_THRESHOLD"))
             if "BALANCE_TOLERANCE" in self.settings:
-                config.BALANCE_TOLERANCE = float(self.settings["BALANCE_TOLERANCE"])
+                self.settings["balance_tolerance"] = float(self.settings.pop("BALANCE_TOLERANCE"))
+            # Trackers read config on every check; the saved values win over .env at startup
+            config.REBALANCE_THRESHOLD = float(self.settings["threshold"])
+            config.BALANCE_TOLERANCE = float(self.settings["balance_tolerance"])
         except Exception:
             logging.exception("Failed to apply settings overrides")
 
+    def update_setting(self, key: str, value) -> None:
+        """Persist a global setting changed outside a command (e.g. a live .env edit)."""
+        self.settings[key] = value
+        save_state(self.pools, self.settings)
+
     def _load_stored_credentials_on_startup(self):
         """Load stored credentials on bot startup"""
         try:
@@ -83,17 +118,26 @@ class Bot:
             return True
         return user.id in config.ALLOWED_USER_IDS
 
+    def _is_admin(self, update: Update) -> bool:
+        """Authorized and, when ADMIN_CHAT_IDS is set, writing from an admin chat."""
+        if not self._is_authorized(update):
+            return False
+        if not config.ADMIN_CHAT_IDS:
+            return True
+        chat = update.effective_chat
+        return chat is not None and chat.id in config.ADMIN_CHAT_IDS
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
-            await update.message.reply_text("Hello! I'm your liquidity rebalance automation bot")
+            outbox.reply(update, "Hello! I'm your liquidity rebalance automation bot")
 
     async def connect_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             
             args = context.args
@@ -105,28 +149,31 @@ class Bot:
                 
                 # Store credentials in state
                 self._store_credentials(password, seed_phrase)
-                await update.message.reply_text("✅ MetaMask credentials stored successfully.")
+                outbox.reply(update, "✅ MetaMask credentials stored successfully.")
                 
             elif self._has_stored_credentials():
                 # Use previously stored credentials
                 self._load_stored_credentials()
-                await update.message.reply_text("✅ Using previously stored MetaMask credentials.")
+                outbox.reply(update, "✅ Using previously stored MetaMask credentials.")
                 
             else:
-                await update.message.reply_text("❌ No credentials provided and none stored. Please provide password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
+                outbox.reply(update, "❌ No credentials provided and none stored. Please provide password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
                 return
             
             if self.browser is None:
-                await update.message.reply_text("Connecting to Browser...")
+                outbox.reply(update, "Connecting to Browser...")
                 try:
                     self.browser = await launch_browser()
-                    await update.message.reply_text("Browser launched, connecting to MetaMask...")
+                    outbox.reply(update, "Browser launched, connecting to MetaMask...")
                     await metamask_connect(self.browser)
-                    await update.message.reply_text("MetaMask connected, connecting to Shadow.so...")
+                    outbox.reply(update, "MetaMask connected, connecting to Shadow.so...")
                     await shadow_connect(self.browser)
-                    await update.message.reply_text("✅ Browser is connected successfully.")
+                    outbox.reply(update, "✅ Browser is connected successfully.")
+                    resumed = await self._resume_interrupted_rebalances()
+                    if resumed:
+                        outbox.reply(update, f"🔁 Resuming {resumed} interrupted rebalance(s).")
                 except Exception as e:
-                    await update.message.reply_text(f"❌ Connection failed: {str(e)[:100]}...")
+                    outbox.reply(update, f"❌ Connection failed: {str(e)[:100]}...")
                     # Clean up if connection failed
                     if self.browser:
                         try:
@@ -136,7 +183,18 @@ class Bot:
                         self.browser = None
                     raise
             else:
-                await update.message.reply_text("Browser is already connected.")
+                outbox.reply(update, "Browser is already connected.")
+
+    async def _resume_interrupted_rebalances(self) -> int:
+        """Restart tracking for pools whose rebalance was interrupted; the tracker resumes from its checkpoint."""
+        checkpoints = [link for link in await load_checkpoints_async() if not supervisor.find(link)]
+        for link in checkpoints:
+            try:
+                page = await self.browser.new_page()
+                supervisor.start(link, page, self.browser)
+            except Exception:
+                logging.exception("Failed to resume rebalance for %s", link)
+        return len(checkpoints)
 
     def _store_credentials(self, password: str, seed_phrase: str):
         """Store MetaMask credentials in user_profile directory and config"""
@@ -248,14 +306,15 @@ class Bot:
     async def disconnect_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             if self.browser is not None:
+                await supervisor.stop_all()
                 await self.browser.close()
                 self.browser = None
                 # Clear all pools when disconnecting
                 pools_count = len(self.pools)
-                self.pools = []
+                self.pools.clear()
                 # Reset settings to default values
                 self.settings = {
                     "threshold": 90,
@@ -268,20 +327,20 @@ class Bot:
                 self._clear_stored_credentials()
                 # Save the cleared state with default settings
                 save_state(self.pools, self.settings)
-                await update.message.reply_text(f"Browser is disconnected. Cleared {pools_count} pool(s) from monitoring. Settings and credentials reset to defaults.")
+                outbox.reply(update, f"Browser is disconnected. Cleared {pools_count} pool(s) from monitoring. Settings and credentials reset to defaults.")
             else:
-                await update.message.reply_text("Browser is not connected.")
+                outbox.reply(update, "Browser is not connected.")
 
     async def add_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             # Check if MetaMask credentials are available before proceeding
             if not self._has_stored_credentials():
-                await update.message.reply_text(":x: MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
+                outbox.reply(update, ":x: MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
                 return
-            await update.message.reply_text("Starting add flow…")
+            outbox.reply(update, "Starting add flow…")
             args = context.args
             if self.browser is None:
                 # Load stored credentials before launching browser
@@ -301,19 +360,96 @@ class Bot:
                             upper_range=pool_info.get("upper_range"),
                             lower_range=pool_info.get("lower_range"),
                             owner_chat_id=update.effective_chat.id if update.effective_chat else None,
+                            meta=position_meta(pool_info["link"]),
                         )
                         self.pools.append(pool)
                         # Persist only if pools exist, preserve current settings
                         save_state(self.pools, self.settings)
-                        await update.message.reply_text("Pool added and being monitored.")
+                        outbox.reply(update, "Pool added and being monitored.")
                     else:
-                        await update.message.reply_text("Failed to add pool.")
+                        outbox.reply(update, "Failed to add pool.")
                 except Exception as e:
                     logging.exception("/add failed")
-                    await update.message.reply_text(f"Error: {e}")
+                    outbox.reply(update, f"Error: {e}")
                     await notify_admins(context, f"/add error from {update.effective_user.id}: {e}")
             else:
-                await update.message.reply_text("Give Pool Link")
+                outbox.reply(update, "Give Pool Link")
+
+    async def add_batch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Add many pools at once.
+        Usage: /add_batch [pool_link] [range_type] [token] [amount] ; [pool_link] ...
+        """
+        if update.message:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            entries = parse_batch_args(context.args or [])
+            if not entries:
+                outbox.reply(update, BATCH_USAGE)
+                return
+            await self._run_batch_add(update, context, entries)
+
+    async def handle_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Treat an uploaded .csv/.json document as a batch of pools to add."""
+        if update.message and update.message.document:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            document = update.message.document
+            file_name = document.file_name or ""
+            if not file_name.lower().endswith((".csv", ".json")):
+                outbox.reply(update, "Send a .csv or .json document to add pools in bulk.\n" + BATCH_USAGE)
+                return
+            try:
+                file = await document.get_file()
+                data = bytes(await file.download_as_bytearray())
+                entries = parse_batch_document(file_name, data)
+            except Exception as e:
+                outbox.reply(update, f"❌ Could not read {file_name}: {e}")
+                return
+            await self._run_batch_add(update, context, entries)
+
+    async def _run_batch_add(self, update: Update, context: ContextTypes.DEFAULT_TYPE, entries) -> None:
+        # Check if MetaMask credentials are available before proceeding
+        if not self._has_stored_credentials():
+            outbox.reply(update, "❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
+            return
+        # Validate everything before opening a single tab
+        errors = validate_batch(entries)
+        if errors:
+            outbox.reply(update, "❌ Batch rejected, nothing was added. Fix these entries:\n" + "\n".join(errors))
+            return
+        outbox.reply(update, f"Starting batch add of {len(entries)} position(s)…")
+        try:
+            if self.browser is None:
+                self._load_stored_credentials()
+                self.browser = await launch_browser()
+                await metamask_connect(self.browser)
+            results = await batch_add(update, self.browser, entries)
+            owner_chat_id = update.effective_chat.id if update.effective_chat else None
+            for result in results:
+                if result["ok"]:
+                    info = result["pool_info"]
+                    self.pools.append(
+                        Pool(
+                            link=info["link"],
+                            range=info["range"],
+                            token=info["token"],
+                            amount=info["amount"],
+                            upper_range=info.get("upper_range"),
+                            lower_range=info.get("lower_range"),
+                            owner_chat_id=owner_chat_id,
+                            meta=position_meta(info["link"]),
+                        )
+                    )
+            if any(r["ok"] for r in results):
+                save_state(self.pools, self.settings)
+            outbox.reply(update, format_batch_report(results))
+        except Exception as e:
+            logging.exception("/add_batch failed")
+            outbox.reply(update, f"Error: {e}")
+            await notify_admins(context, f"/add_batch error from {update.effective_user.id}: {e}")
 
     async def remove_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
@@ -322,17 +458,17 @@ class Bot:
         """
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             
             # Check if MetaMask credentials are available
             if not self._has_stored_credentials():
-                await update.message.reply_text("❌ MetaMask credentials not found. Please use /connect first.")
+                outbox.reply(update, "❌ MetaMask credentials not found. Please use /connect first.")
                 return
             
             args = context.args
             if not args:
-                await update.message.reply_text("Usage: /remove [pool_link]\nExample: /remove https://www.shadow.so/liquidity/manage/0x324963c267c354c7660ce8ca3f5f167e05649970/1037968")
+                outbox.reply(update, "Usage: /remove [pool_link]\nExample: /remove https://www.shadow.so/liquidity/manage/0x324963c267c354c7660ce8ca3f5f167e05649970/1037968")
                 return
             
             pool_link = args[0]
@@ -341,69 +477,97 @@ class Bot:
             try:
                 pool_id = pool_link.split('/')[-1]
                 if not pool_id.isdigit():
-                    await update.message.reply_text("❌ Invalid pool link format.")
+                    outbox.reply(update, "❌ Invalid pool link format.")
                     return
             except:
-                await update.message.reply_text("❌ Could not extract Pool ID from link.")
+                outbox.reply(update, "❌ Could not extract Pool ID from link.")
                 return
         
             # Ensure browser is connected
             if self.browser is None:
-                await update.message.reply_text("🔄 Connecting to browser...")
+                outbox.reply(update, "🔄 Connecting to browser...")
                 self._load_stored_credentials()
                 self.browser = await launch_browser()
                 await metamask_connect(self.browser)
                 await shadow_connect(self.browser)
             
-            await update.message.reply_text(f"🔄 Starting 100% withdrawal from Pool ID: {pool_id}...")
+            outbox.reply(update, f"🔄 Starting 100% withdrawal from Pool ID: {pool_id}...")
             
             try:
+                # Stop the pool's tracker first so it cannot start a rebalance mid-withdrawal
+                tracked = self._tracked_pool(pool_link)
+                if tracked is not None:
+                    pool_link = tracked.link
+                await supervisor.stop(pool_link)
+
                 # Create Shadow utility instance
                 shadow_utils = Shadow(self.browser)
                 
                 # Navigate to the pool management page
                 page = await self.browser.new_page()
-                await page.goto(pool_link, wait_until="networkidle", timeout=120000)  # 120 seconds timeout
+                await page.goto(args[0], wait_until="networkidle", timeout=120000)  # 120 seconds timeout
                 await asyncio.sleep(5)
                 
                 # Perform the withdrawal using the Shadow utility
                 await shadow_utils.withdraw(update, page, pool_link)
-                await update.message.reply_text(f"Successfully withdrew 100% from Pool ID: {pool_id}")
+                outbox.reply(update, f"Successfully withdrew 100% from Pool ID: {pool_id}")
                 await page.close()
                     
             except Exception as e:
                 logging.exception(f"Error during withdrawal from Pool ID: {pool_id}")
-                await update.message.reply_text(f"❌ Error during withdrawal: {str(e)}")
+                outbox.reply(update, f"❌ Error during withdrawal: {str(e)}")
                 await notify_admins(context, f"/remove error: {e}")
 
+    def _tracked_pool(self, pool_link):
+        """The tracked position a link refers to, matched on contract and position id (/manage links too)."""
+        pool = self.pools.get(pool_link)
+        contract = pool_address_from_link(pool_link)
+        if pool is not None or contract is None:
+            return pool
+        position_id = position_id_from_link(pool_link)
+        return next((p for p in self.pools.by_contract(contract) if position_id_from_link(p.link) == position_id), None)
+
     async def list_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             
             # Check if MetaMask credentials are available before proceeding
             if not self._has_stored_credentials():
-                await update.message.reply_text("❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
+                outbox.reply(update, "❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
                 return
             
             # Ensure browser exists
             if self.browser is None:
-                await update.message.reply_text("Connecting to browser to fetch pool data...")
+                outbox.reply(update, "Connecting to browser to fetch pool data...")
                 # Load stored credentials before launching browser
                 self._load_stored_credentials()
                 self.browser = await launch_browser()
                 await metamask_connect(self.browser)
                 await shadow_connect(self.browser)
             
-            await update.message.reply_text("Fetching pool information from Shadow.so dashboard...")
+            outbox.reply(update, "Fetching pool information from Shadow.so dashboard...")
             
             try:
                 # Fetch pool data from Shadow.so dashboard
                 dashboard_pools = await fetch_dashboard_pools(self.browser)
-                
+                if dashboard_pools is None:
+                    # Leave this chat's snapshot alone so the next view diffs against it
+                    outbox.reply(update, "❌ Could not load the Shadow.so dashboard. Please try again later.")
+                    return
+
+                # Every view is snapshotted per chat; "/list changes" only sends the deltas
+                view = str(update.effective_chat.id) if update.effective_chat else "0"
+                diff, since = await diff_since_view(view, dashboard_pools)
+                if context.args and context.args[0].lower() == "changes":
+                    if diff is not None:
+                        outbox.reply(update, diff.format(since))
+                        return
+                    outbox.reply(update, "No previous view to compare with, showing the full list.")
+
                 if not dashboard_pools:
-                    await update.message.reply_text("No pools found in your Shadow.so dashboard.")
+                    outbox.reply(update, "No pools found in your Shadow.so dashboard.")
                     return
                 
                 lines = [
@@ -438,7 +602,7 @@ class Bot:
                     
                     for line in lines[3:]:
                         if current_length + len(line) + 1 > 4000:
-                            await update.message.reply_text("\n".join(current_message))
+                            outbox.reply(update, "\n".join(current_message))
                             current_message = [line]
                             current_length = len(line)
                         else:
@@ -446,26 +610,32 @@ class Bot:
                             current_length += len(line) + 1
                     
                     if current_message:
-                        await update.message.reply_text("\n".join(current_message))
+                        outbox.reply(update, "\n".join(current_message))
                 else:
-                    await update.message.reply_text(message_text)
+                    outbox.reply(update, message_text)
                     
             except Exception as e:
                 logging.exception("Error fetching dashboard pools")
-                await update.message.reply_text(f"❌ Error fetching pool data: {e}")
+                outbox.reply(update, f"❌ Error fetching pool data: {e}")
                 
                 # NO FAKE FALLBACK DATA - Only show real Shadow.so data
-                await update.message.reply_text("❌ Cannot fetch real pool data from Shadow.so dashboard. Please try again later.")
+                outbox.reply(update, "❌ Cannot fetch real pool data from Shadow.so dashboard. Please try again later.")
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             
+            # This chat's tracked positions: computed locally from the last known price, no page visit
+            owned = self.pools.by_owner(update.effective_chat.id) if update.effective_chat else []
+            if owned:
+                local = [f"{p.link} -> {await check_status(self.browser, p)}" for p in owned]
+                outbox.reply(update, "📍 Tracked positions:\n" + "\n".join(local))
+
             # Check if MetaMask credentials are available before proceeding
             if not self._has_stored_credentials():
-                await update.message.reply_text("❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
+                outbox.reply(update, "❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]")
                 return
                 
             # Ensure browser exists
@@ -476,14 +646,17 @@ class Bot:
                 await metamask_connect(self.browser)
                 await shadow_connect(self.browser)
             
-            await update.message.reply_text("Checking status…")
+            outbox.reply(update, "Checking status…")
             
             try:
                 # Fetch pool data from Shadow.so dashboard
                 dashboard_pools = await fetch_dashboard_pools(self.browser)
+                if dashboard_pools is None:
+                    outbox.reply(update, "❌ Could not load the Shadow.so dashboard. Please try again later.")
+                    return
                 
                 if not dashboard_pools:
-                    await update.message.reply_text("No pools found in your Shadow.so dashboard.")
+                    outbox.reply(update, "No pools found in your Shadow.so dashboard.")
                     return
                 
                 # Check status for each pool in original simple format, but add Pool ID
@@ -495,23 +668,23 @@ class Bot:
                     except Exception as e:
                         results.append(f"Pool ID: {pool['pool_id']} | {pool['pool_link']} -> error: {str(e)[:30]}...")
                 
-                await update.message.reply_text("\n".join(results))
+                outbox.reply(update, "\n".join(results))
                     
             except Exception as e:
                 logging.exception("Error fetching dashboard pool status")
-                await update.message.reply_text(f"❌ Error fetching pool status: {e}")
+                outbox.reply(update, f"❌ Error fetching pool status: {e}")
                 
                 # NO FAKE FALLBACK DATA - Only show real Shadow.so data
-                await update.message.reply_text("❌ Cannot fetch real pool status from Shadow.so dashboard. Please try again later.")
+                outbox.reply(update, "❌ Cannot fetch real pool status from Shadow.so dashboard. Please try again later.")
 
     async def set_threshold_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             args = context.args
             if not args:
-                await update.message.reply_text(f"Current threshold: {self.settings['threshold']}%\nUsage: /set_threshold [percent]")
+                outbox.reply(update, f"Current threshold: {self.settings['threshold']}%\nUsage: /set_threshold [percent]")
                 return
             try:
                 val = float(args[0])
@@ -521,18 +694,18 @@ class Bot:
                 # Also update config for backwards compatibility
                 config.REBALANCE_THRESHOLD = float(val)
                 save_state(self.pools, self.settings)
-                await update.message.reply_text(f"✅ Global threshold set to {val}%.")
+                outbox.reply(update, f"✅ Global threshold set to {val}%.")
             except Exception:
-                await update.message.reply_text("Invalid value. Provide a number 1-100.")
+                outbox.reply(update, "Invalid value. Provide a number 1-100.")
 
     async def set_balance_tolerance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             args = context.args
             if not args:
-                await update.message.reply_text(f"Current tolerance: {self.settings['balance_tolerance']}%\nUsage: /set_balance_tolerance [percent]")
+                outbox.reply(update, f"Current tolerance: {self.settings['balance_tolerance']}%\nUsage: /set_balance_tolerance [percent]")
                 return
             try:
                 val = float(args[0])
@@ -542,30 +715,158 @@ class Bot:
                 # Also update config for backwards compatibility
                 config.BALANCE_TOLERANCE = val
                 save_state(self.pools, self.settings)
-                await update.message.reply_text(f"✅ Global balance tolerance set to {val}%.")
+                outbox.reply(update, f"✅ Global balance tolerance set to {val}%.")
             except Exception:
-                await update.message.reply_text("Invalid value. Provide a number 0-100.")
+                outbox.reply(update, "Invalid value. Provide a number 0-100.")
+
+    async def reload_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if update.message:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            change = settings.check(force=True)
+            outbox.reply(update, change.format())
+
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Capture a Playwright trace and a CPU profile of the next flows.
+        Usage: /profile [flows] | /profile [seconds]s | /profile stop | /profile status
+        """
+        if update.message:
+            if not self._is_admin(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            try:
+                request = parse_profile_args(context.args or [])
+            except ValueError as e:
+                outbox.reply(update, f"Invalid value: {e}\n{PROFILE_USAGE}")
+                return
+            if request["action"] == "status":
+                outbox.reply(update, profiler.status())
+                return
+            if request["action"] == "stop":
+                if await profiler.finish() is None:
+                    outbox.reply(update, "No profile capture running.")
+                return
+
+            chat_id = update.effective_chat.id if update.effective_chat else 0
+
+            async def report(summary):
+                outbox.send(context.bot, chat_id, summary)
+
+            try:
+                await profiler.start(self.browser, flows=request.get("flows"), seconds=request.get("seconds"), report=report)
+            except RuntimeError as e:
+                outbox.reply(update, f"Cannot start profiling: {e}. Use /profile stop first.")
+                return
+            scope = f"the next {request['flows']} flow(s)" if "flows" in request else f"{request['seconds']:g}s"
+            tracing = "Playwright trace + CPU profile" if self.browser is not None else "CPU profile (browser not connected)"
+            outbox.reply(update, f"🔬 Capturing {tracing} for {scope}.")
+
+    async def tasks_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Show supervised trackers (uptime, last check, errors, restarts), price feeds and event queues."""
+        if update.message:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            message = supervisor.format()
+            if price_feed.feeds():
+                message += "\n\n" + price_feed.format()
+            if bus.subscriptions():
+                message += "\n\n" + bus.format()
+            outbox.reply(update, message)
+
+    async def pnl_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Show P&L, impermanent loss, fees and time in range per position.
+        Usage: /pnl [pool_link]
+        """
+        if update.message:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            if config.STATE_BACKEND != "sqlite":
+                outbox.reply(update, "P&L needs the recorded history. Set STATE_BACKEND=sqlite and restart.")
+                return
+            link = context.args[0] if context.args else None
+            try:
+                reports = await asyncio.to_thread(analytics.reports, link)
+            except Exception as e:
+                logging.exception("Error computing P&L")
+                outbox.reply(update, f"❌ Error computing P&L: {e}")
+                return
+            outbox.reply(update, format_reports(reports))
+
+    async def alert_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Price alerts for this chat.
+        Usage: /alert add [pool_link] [price] | /alert list | /alert rm [id]
+        """
+        if update.message:
+            if not self._is_authorized(update):
+                outbox.reply(update, "Unauthorized.")
+                return
+            chat_id = update.effective_chat.id if update.effective_chat else 0
+            args = context.args or []
+            action = args[0].lower() if args else "list"
+            if action == "list" and len(args) <= 1:
+                outbox.reply(update, price_alerts.format(chat_id))
+            elif action == "add" and len(args) == 3:
+                # Ticks are published under the tracked link, so store that one (not a /manage variant)
+                pool = self._tracked_pool(args[1])
+                if pool is None:
+                    outbox.reply(update, f"❌ {args[1]} is not a tracked pool. Add it with /add first.")
+                    return
+                try:
+                    alert = price_alerts.add(chat_id, pool.link, float(args[2].replace(",", "")))
+                except ValueError as e:
+                    outbox.reply(update, f"❌ Could not add alert: {e}")
+                    return
+                current = last_price(alert.link)
+                message = f"✅ Alert #{alert.id} added: {alert.format(current)}"
+                if current is None:
+                    message += "\nℹ️ No price seen for this pool yet; the alert arms with the first tracked price."
+                outbox.reply(update, message)
+            elif action in ("rm", "remove") and len(args) == 2 and args[1].lstrip("#").isdigit():
+                alert_id = int(args[1].lstrip("#"))
+                if price_alerts.remove(chat_id, alert_id):
+                    outbox.reply(update, f"🗑 Alert #{alert_id} removed.")
+                else:
+                    outbox.reply(update, f"❌ No alert #{alert_id} in this chat.")
+            else:
+                outbox.reply(update, ALERT_USAGE)
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if update.message:
             if not self._is_authorized(update):
-                await update.message.reply_text("Unauthorized.")
+                outbox.reply(update, "Unauthorized.")
                 return
             txt = """○ /connect [password] [12-word seed phrase] — Connect browser (credentials required only first time)
 ○ /disconnect — Disconnect browser and clear all data including stored credentials
 ○ /add [pool_link] [range_type] [token] [amount] — Add a pool link to monitor
+○ /add_batch [pool_link] [range_type] [token] [amount] ; ... — Add many pools at once (or upload a .csv/.json file)
 ○ /remove [link] — Remove a pool link
 ○ /list — Fetch and display all pools from Shadow.so dashboard with Pool IDs and contract addresses
+○ /list changes — Only new, closed, out-of-range and liquidity changes since your last /list
 ○ /status — Force status check and update (now includes Pool IDs from Shadow.so dashboard)
 ○ /set_threshold [value] — Set global rebalance trigger threshold (default: 90%)
 ○ /set_balance_tolerance [value] — Set global balance tolerance (default: 2%)
+○ /reload — Re-read .env and apply settings that can change without a restart
+○ /tasks — Running trackers with uptime, last price check, errors and restarts, price feeds and event queues
+○ /pnl [link] — P&L, impermanent loss, fees and time in range per position (needs STATE_BACKEND=sqlite)
+○ /alert add [link] [price] | list | rm [id] — Notify this chat when a tracked pool's price crosses a level
+○ /profile [flows | seconds s | stop | status] — Capture a Playwright trace and CPU profile (admins)
 ○ /help — List available commands
 """
-            await update.message.reply_text(txt)
+            outbox.reply(update, txt)
 
 
     def handle_response(self, text):
-        if "add" in text:
+        if "alert" in text:
+            return "Alert command received"
+        elif "add_batch" in text:
+            return "Add batch command received"
+        elif "add" in text:
             return "Add command received"
         elif "remove" in text:
             return "Remove command received"
@@ -575,6 +876,14 @@ class Bot:
             return "Set threshold command received"
         elif "set_balance_tolerance" in text:
             return "Set balance tolerance command received"
+        elif "reload" in text:
+            return "Reload command received"
+        elif "tasks" in text:
+            return "Tasks command received"
+        elif "pnl" in text:
+            return "P&L command received"
+        elif "profile" in text:
+            return "Profile command received"
         elif "help" in text:
             return "Help command received"
         else:
@@ -586,7 +895,7 @@ class Bot:
                 return
             text = update.message.text
             response = self.handle_response(text)
-            await update.message.reply_text(response)
+            outbox.reply(update, response)
 
     async def error(self, update: object, context: ContextTypes.DEFAULT_TYPE):
         logging.exception("Update error: %s", context.error)
@@ -595,10 +904,25 @@ class Bot:
         except Exception:
             pass
 
+    async def _refresh_onchain_state(self):
+        """Read slot0/liquidity for all tracked pools in one batched call and update their status."""
+        states = await read_tracked_pools_within(get_pool_reads().reader, self.pools, config.MULTICALL_DEADLINE)
+        for pool in self.pools:
+            state = states.get(pool.link)
+            if state and state.get("symbols"):
+                record_pair(pool.link, *state["symbols"])
+            if state and state.get("price"):
+                record_price(pool.link, state["price"])
+                pool.last_status = await check_status(self.browser, pool)
+
     # Background monitor job (placeholder)
     async def monitor_job(self, context: ContextTypes.DEFAULT_TYPE):
         if not self.pools:
             return
+
+        # With an RPC price source, read every tracked pool in one Multicall round-trip
+        if config.PRICE_SOURCE == "rpc" and config.RPC_URL:
+            await self._refresh_onchain_state()
         
         # Check if MetaMask credentials are available before proceeding
         if not self._has_stored_credentials():
@@ -630,12 +954,16 @@ class Bot:
 
 # --- Minimal fallbacks to avoid NameError and keep bot operational ---
 async def check_status(browser, pool: Pool) -> str:
-    """Lightweight status checker placeholder.
+    """Lightweight status checker.
 
-    Returns a simple status string without performing heavy browser actions.
-    This avoids NameError until a full implementation is provided.
+    Computes in-range status, distance to the bounds and the current token split locally
+    from the last known price and the stored range, without visiting the pool page.
     """
     try:
+        price = last_price(pool.link)
+        if price is not None and pool.lower_range and pool.upper_range and pool.upper_range > pool.lower_range:
+            base, quote = pair_labels(pool.link, pool.token)  # ranges are quoted with the deposit token first
+            return format_range_status(range_status(price, pool.lower_range, pool.upper_range), base, quote)
         # If we have last_status, surface it; otherwise provide a generic one
         return pool.last_status or "monitoring"
     except Exception:
@@ -3,6 +3,67 @@ from bot.commands import Bot
 import time
 from config import config
 from utils.logger import setup_logging
+from utils.notifier import notify_admins
+from utils.settings import settings
+from utils.profiler import profiled
+from services.browser_watchdog import BrowserWatchdog
+from services.browser_standby import BrowserStandby
+from services.memory_governor import MemoryGovernor
+from services.dashboard_diff import DashboardAlerts
+from services.startup_resume import StartupResume
+from services.price_alerts import price_alerts
+
+def register_handlers(app, bot):
+    """Register all command, message and error handlers of `bot` on `app`."""
+    app.add_handler(CommandHandler("start", bot.start_command))
+    app.add_handler(CommandHandler("connect", profiled("connect", bot.connect_command)))
+    app.add_handler(CommandHandler("disconnect", bot.disconnect_command))
+
+    app.add_handler(CommandHandler("add", profiled("add", bot.add_command)))
+    app.add_handler(CommandHandler("add_batch", profiled("add_batch", bot.add_batch_command)))
+    app.add_handler(CommandHandler("remove", profiled("remove", bot.remove_command)))
+    app.add_handler(CommandHandler("list", profiled("list", bot.list_command)))
+    app.add_handler(CommandHandler("status", profiled("status", bot.status_command)))
+    app.add_handler(CommandHandler("set_threshold", bot.set_threshold_command))
+    app.add_handler(CommandHandler("set_balance_tolerance", bot.set_balance_tolerance_command))
+    app.add_handler(CommandHandler("reload", bot.reload_command))
+    app.add_handler(CommandHandler("tasks", bot.tasks_command))
+    app.add_handler(CommandHandler("pnl", profiled("pnl", bot.pnl_command)))
+    app.add_handler(CommandHandler("alert", bot.alert_command))
+    app.add_handler(CommandHandler("profile", bot.profile_command))
+    app.add_handler(CommandHandler("help", bot.help_command))
+
+    app.add_handler(MessageHandler(filters.Document.ALL, profiled("add_batch", bot.handle_document)))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_message))
+
+    app.add_error_handler(bot.error)
+
+def make_post_init(bot):
+    """Background services that need the application's running event loop."""
+    async def post_init(app):
+        async def report(change):
+            await notify_admins(app, change.format())
+
+        # .env edits of the threshold/tolerance also go to bot.settings and the saved state
+        settings.on_change('REBALANCE_THRESHOLD', lambda value: bot.update_setting("threshold", value))
+        settings.on_change('BALANCE_TOLERANCE', lambda value: bot.update_setting("balance_tolerance", value))
+        settings.start(report)
+        await price_alerts.start(app.bot)
+        if config.WATCHDOG_INTERVAL > 0:
+            standby = BrowserStandby() if config.STANDBY_ENABLED else None
+            bot.watchdog = BrowserWatchdog(bot, notify_target=app, standby=standby)
+            bot.watchdog.start()
+        if config.MEMORY_CHECK_INTERVAL > 0:
+            bot.memory_governor = MemoryGovernor(bot, notify_target=app)
+            bot.memory_governor.start()
+        if config.DASHBOARD_ALERT_INTERVAL > 0:
+            bot.dashboard_alerts = DashboardAlerts(bot, notify_target=app)
+            bot.dashboard_alerts.start()
+        if config.RESUME_ON_STARTUP:
+            bot.startup_resume = StartupResume(bot, notify_target=app)
+            bot.startup_resume.start()
+
+    return post_init
 
 def telegram_bot():
     # Validate configuration before starting
@@ -19,26 +80,9 @@ def telegram_bot():
     config.print_config()
     
     bot = Bot()
-    app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).build()
 
     print("Starting bot...")
 
-    app.add_handler(CommandHandler("start", bot.start_command))
-    app.add_handler(CommandHandler("connect", bot.connect_command))
-    app.add_handler(CommandHandler("disconnect", bot.disconnect_command))
-
-    app.add_handler(CommandHandler("add", bot.add_command))
-    app.add_handler(CommandHandler("remove", bot.remove_command))
-    app.add_handler(CommandHandler("list", bot.list_command))
-    app.add_handler(CommandHandler("status", bot.status_command))
-    app.add_handler(CommandHandler("set_threshold", bot.set_threshold_command))
-    app.add_handler(CommandHandler("set_balance_tolerance", bot.set_balance_tolerance_command))
-    app.add_handler(CommandHandler("help", bot.help_command))
-
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_message))
-
-    app.add_error_handler(bot.error)
-
     # Schedule monitoring job
     # try:
     #     app.job_queue.run_repeating(bot.monitor_job, interval=config.MONITOR_INTERVAL, first=5)
@@ -61,21 +105,10 @@ def telegram_bot():
                 print("Error: TELEGRAM_BOT_TOKEN is not set")
                 return
                 
-            app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).connect_timeout(120).read_timeout(120).write_timeout(120).build()
+            app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).connect_timeout(120).read_timeout(120).write_timeout(120).post_init(make_post_init(bot)).build()
             
             # Re-add handlers for the new app instance
-            app.add_handler(CommandHandler("start", bot.start_command))
-            app.add_handler(CommandHandler("connect", bot.connect_command))
-            app.add_handler(CommandHandler("disconnect", bot.disconnect_command))
-            app.add_handler(CommandHandler("add", bot.add_command))
-            app.add_handler(CommandHandler("remove", bot.remove_command))
-            app.add_handler(CommandHandler("list", bot.list_command))
-            app.add_handler(CommandHandler("status", bot.status_command))
-            app.add_handler(CommandHandler("set_threshold", bot.set_threshold_command))
-            app.add_handler(CommandHandler("set_balance_tolerance", bot.set_balance_tolerance_command))
-            app.add_handler(CommandHandler("help", bot.help_command))
-            app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_message))
-            app.add_error_handler(bot.error)
+            register_handlers(app, bot)
             
             print(f"Starting bot (attempt {attempt + 1}/{max_retries})...")
             app.run_polling(timeout=120, poll_interval=1)
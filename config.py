@@ -43,10 +43,81 @@ class Config:
     SHADOW_BASE_URL = os.getenv('SHADOW_BASE_URL', 'https://www.shadow.so/liquidity/')
     
     # Monitoring Settings
-    POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', '1'))
+    POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', '5'))  # seconds between price checks of a tracked pool
     REBALANCE_THRESHOLD = float(os.getenv('REBALANCE_THRESHOLD', '90'))
     BALANCE_TOLERANCE = float(os.getenv('BALANCE_TOLERANCE', '2'))
     MONITOR_INTERVAL = int(os.getenv('MONITOR_INTERVAL', '30'))
+    # Batch /add: number of tabs loading, filling and depositing in parallel
+    BATCH_ADD_CONCURRENCY = int(os.getenv('BATCH_ADD_CONCURRENCY', '4'))
+    # Wallet requests: seconds to wait for each MetaMask confirmation, and for its popup to open
+    WALLET_CONFIRM_TIMEOUT = float(os.getenv('WALLET_CONFIRM_TIMEOUT', '120'))
+    WALLET_POPUP_TIMEOUT = float(os.getenv('WALLET_POPUP_TIMEOUT', '15'))
+    # Tracker supervision: trackers warming up at once (0 = no limit), restart backoff bounds in seconds
+    TRACKER_MAX_RUNNING = int(os.getenv('TRACKER_MAX_RUNNING', '0'))
+    TRACKER_BACKOFF_MIN = float(os.getenv('TRACKER_BACKOFF_MIN', '5'))
+    TRACKER_BACKOFF_MAX = float(os.getenv('TRACKER_BACKOFF_MAX', '300'))
+    # Startup: re-attach trackers to all stored pools (launches the browser only if there are any),
+    # opening pages RESUME_STAGGER seconds apart with at most RESUME_CONCURRENCY warming up at once
+    RESUME_ON_STARTUP = os.getenv('RESUME_ON_STARTUP', 'true').lower() == 'true'
+    RESUME_CONCURRENCY = int(os.getenv('RESUME_CONCURRENCY', '3'))
+    RESUME_STAGGER = float(os.getenv('RESUME_STAGGER', '2'))
+    RESUME_WARMUP_TIMEOUT = float(os.getenv('RESUME_WARMUP_TIMEOUT', '60'))  # seconds to wait for a first price check
+    # Positions on the same pool contract share one price page and read (tabs follow unique pools)
+    PRICE_FEED_SHARED = os.getenv('PRICE_FEED_SHARED', 'true').lower() == 'true'
+    # Event bus: events queued per subscriber before its policy drops the oldest (or newest) one
+    EVENT_BUS_QUEUE_SIZE = int(os.getenv('EVENT_BUS_QUEUE_SIZE', '100'))
+    # Price alerts (/alert) each chat may have at once (0 = no limit)
+    ALERTS_MAX_PER_CHAT = int(os.getenv('ALERTS_MAX_PER_CHAT', '50'))
+    # Upper bound (seconds) for all UI waits of a single withdrawal
+    WITHDRAW_DEADLINE = float(os.getenv('WITHDRAW_DEADLINE', '60'))
+
+    # Price source for tracking: 'browser' (scrape the pool page) or 'rpc' (read slot0 over JSON-RPC)
+    PRICE_SOURCE = os.getenv('PRICE_SOURCE', 'browser').lower()
+    RPC_URL = os.getenv('RPC_URL', '')
+    RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '10'))  # seconds per request
+    RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', '10'))  # max pooled keep-alive connections
+    # Multicall batching of on-chain reads (empty address = canonical Multicall3)
+    MULTICALL_ADDRESS = os.getenv('MULTICALL_ADDRESS', '')
+    MULTICALL_BATCH_SIZE = int(os.getenv('MULTICALL_BATCH_SIZE', '200'))  # calls per aggregate3
+    MULTICALL_DEADLINE = float(os.getenv('MULTICALL_DEADLINE', '5'))  # seconds per monitor tick
+    POSITION_MANAGER_ADDRESS = os.getenv('POSITION_MANAGER_ADDRESS', '')
+    # Event-driven tracking: 'off', 'logs' (wake a pool on its Swap logs) or 'heads' (every block)
+    CHAIN_EVENTS = os.getenv('CHAIN_EVENTS', 'off').lower()
+    WS_RPC_URL = os.getenv('WS_RPC_URL', '')
+    CHAIN_EVENT_MAX_IDLE = float(os.getenv('CHAIN_EVENT_MAX_IDLE', '300'))  # re-check an idle pool at least this often
+    CHAIN_EVENT_BACKOFF_MIN = float(os.getenv('CHAIN_EVENT_BACKOFF_MIN', '1'))  # reconnect backoff, seconds
+    CHAIN_EVENT_BACKOFF_MAX = float(os.getenv('CHAIN_EVENT_BACKOFF_MAX', '60'))
+
+    # Browser watchdog: heartbeat every WATCHDOG_INTERVAL seconds (0 disables), relaunch after
+    # WATCHDOG_MAX_FAILURES failed heartbeats in a row
+    WATCHDOG_INTERVAL = float(os.getenv('WATCHDOG_INTERVAL', '15'))
+    WATCHDOG_HEARTBEAT_TIMEOUT = float(os.getenv('WATCHDOG_HEARTBEAT_TIMEOUT', '10'))
+    WATCHDOG_MAX_FAILURES = int(os.getenv('WATCHDOG_MAX_FAILURES', '2'))
+    # Warm standby: a second pre-unlocked context on a cloned profile for instant failover
+    STANDBY_ENABLED = os.getenv('STANDBY_ENABLED', 'false').lower() == 'true'
+    STANDBY_PROFILE_DIR = os.getenv('STANDBY_PROFILE_DIR', '')  # default: <USER_DATA_DIR>_standby_1/_2
+    # Memory governor: sample the Chromium tree every MEMORY_CHECK_INTERVAL seconds (0 disables);
+    # over a limit close leaked tabs, reload bloated tracker pages, then recycle the context
+    MEMORY_CHECK_INTERVAL = float(os.getenv('MEMORY_CHECK_INTERVAL', '60'))
+    MEMORY_TREE_LIMIT_MB = float(os.getenv('MEMORY_TREE_LIMIT_MB', '2048'))
+    MEMORY_RENDERER_LIMIT_MB = float(os.getenv('MEMORY_RENDERER_LIMIT_MB', '512'))
+    MEMORY_PAGE_HEAP_LIMIT_MB = float(os.getenv('MEMORY_PAGE_HEAP_LIMIT_MB', '200'))
+    MEMORY_LEAKED_TAB_AGE = float(os.getenv('MEMORY_LEAKED_TAB_AGE', '900'))  # seconds before an untracked tab counts as leaked
+    MEMORY_RECYCLE_AFTER = int(os.getenv('MEMORY_RECYCLE_AFTER', '3'))  # checks in a row over the tree limit
+    # Dashboard change alerts every DASHBOARD_ALERT_INTERVAL seconds while connected (0 disables)
+    DASHBOARD_ALERT_INTERVAL = float(os.getenv('DASHBOARD_ALERT_INTERVAL', '0'))
+    DASHBOARD_LIQUIDITY_CHANGE_PCT = float(os.getenv('DASHBOARD_LIQUIDITY_CHANGE_PCT', '1'))  # smaller moves are not reported
+    # Persistence: 'json' (data/state.json) or 'sqlite' (WAL database with price/rebalance history;
+    # existing JSON files are imported once on first start)
+    STATE_BACKEND = os.getenv('STATE_BACKEND', 'json').lower()
+    STATE_DB_PATH = os.getenv('STATE_DB_PATH', '')  # default: data/state.db
+    # /pnl: swap fee (percent of the swapped value) charged against rebalancing
+    ANALYTICS_SWAP_FEE_PCT = float(os.getenv('ANALYTICS_SWAP_FEE_PCT', '0.3'))
+
+    # /profile captures (Playwright trace zips and cProfile .prof files)
+    PROFILE_DIR = os.getenv('PROFILE_DIR') or os.path.join(BASE_DIR, 'data', 'profiles')
+    PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '15'))  # functions in the Telegram summary
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '600'))
 
     # Security & Notifications
     # Comma-separated list of Telegram user IDs allowed to use the bot. If empty, allow all.
@@ -58,13 +129,33 @@ class Config:
         int(x) for x in os.getenv('ADMIN_CHAT_IDS', '').split(',') if x.strip().isdigit()
     ]
     ENABLE_NOTIFICATIONS = os.getenv('ENABLE_NOTIFICATIONS', 'true').lower() == 'true'
+    # Identical admin notifications within this many seconds are sent once
+    NOTIFY_DEDUPE_WINDOW = float(os.getenv('NOTIFY_DEDUPE_WINDOW', '300'))
+    # More than NOTIFY_BURST_LIMIT notifications per NOTIFY_DIGEST_INTERVAL seconds are rolled into a digest
+    NOTIFY_BURST_LIMIT = int(os.getenv('NOTIFY_BURST_LIMIT', '5'))
+    NOTIFY_DIGEST_INTERVAL = float(os.getenv('NOTIFY_DIGEST_INTERVAL', '60'))
+
+    # Outbound Telegram message queue (flood limits)
+    TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', '25'))  # messages/second, all chats
+    TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', '1'))  # messages/second, per chat
+    TELEGRAM_CHAT_BURST = int(os.getenv('TELEGRAM_CHAT_BURST', '3'))
+    MESSAGE_COALESCE_WINDOW = float(os.getenv('MESSAGE_COALESCE_WINDOW', '0.3'))  # seconds
 
     # Logging
     LOG_DIR = os.getenv('LOG_DIR', 'logs')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+    # Seconds between checks of .env for live-reloadable settings
+    SETTINGS_RELOAD_INTERVAL = float(os.getenv('SETTINGS_RELOAD_INTERVAL', '5'))
     
+    _directories_ensured = False
+
     @classmethod
     def ensure_directories(cls):
-        """Ensure all required directories exist"""
+        """Ensure all required directories exist (once per process)"""
+        if cls._directories_ensured:
+            return
+        cls._directories_ensured = True
         directories_to_create = [
             cls.USER_DATA_DIR,
             os.path.join(cls.BASE_DIR, 'data'),
@@ -124,8 +215,11 @@ class Config:
         print(f"Monitor Interval: {cls.MONITOR_INTERVAL}s")
         print(f"Rebalance Threshold: {cls.REBALANCE_THRESHOLD}%")
         print(f"Balance Tolerance: {cls.BALANCE_TOLERANCE}%")
+        print(f"Price Source: {cls.PRICE_SOURCE}" + (f" ({cls.RPC_URL})" if cls.PRICE_SOURCE == 'rpc' else ''))
+        print(f"Chain Events: {cls.CHAIN_EVENTS}")
         print(f"Allowed Users: {cls.ALLOWED_USER_IDS if cls.ALLOWED_USER_IDS else 'ALL'}")
         print(f"Admin Chat IDs: {cls.ADMIN_CHAT_IDS}")
+        print(f"Telegram Rate: {cls.TELEGRAM_GLOBAL_RATE}/s global, {cls.TELEGRAM_CHAT_RATE}/s per chat")
         print(f"Log Dir: {cls.LOG_DIR}")
         print("====================")
 
@@ -1,6 +1,3 @@
-import asyncio
-import os
-from services.launch_browser import launch_browser
 from bot.telegram_bot import telegram_bot
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 
-@dataclass
+@dataclass(slots=True)
 class Pool:
     link: str
     range: str
@@ -0,0 +1,295 @@
+import math
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from models.pool import Pool
+
+# Marks "no owner" in the owner column (chat ids can be negative, so 0/-1 are real ids)
+_NO_OWNER = -(2 ** 63)
+_NAN = float("nan")
+
+
+def _contract_of(link: str) -> Optional[str]:
+    """First 0x-address segment of a Shadow link (pool or position manager contract)."""
+    for part in link.split("?")[0].rstrip("/").split("/"):
+        if part.startswith("0x") and len(part) == 42:
+            return part.lower()
+    return None
+
+
+def _opt_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class PoolView:
+    """A `Pool`-compatible view of one row of a PoolTable.
+
+    Reads and writes go straight to the table's columns, so the view costs two slots no
+    matter how many fields a pool has. The row is looked up by link, so views stay valid
+    when other rows are removed.
+    """
+
+    __slots__ = ("_table", "link")
+
+    def __init__(self, table: "PoolTable", link: str):
+        self._table = table
+        self.link = link
+
+    def _row(self) -> int:
+        return self._table._by_link[self.link]
+
+    @property
+    def range(self) -> str:
+        return self._table._ranges[self._row()]
+
+    @range.setter
+    def range(self, value: str) -> None:
+        self._table._ranges[self._row()] = sys.intern(value or "")
+
+    @property
+    def token(self) -> str:
+        return self._table._tokens[self._row()]
+
+    @token.setter
+    def token(self, value: str) -> None:
+        self._table._tokens[self._row()] = sys.intern(value or "")
+
+    @property
+    def amount(self) -> float:
+        return self._table._amounts[self._row()]
+
+    @amount.setter
+    def amount(self, value: float) -> None:
+        self._table._amounts[self._row()] = float(value or 0)
+
+    @property
+    def upper_range(self) -> Optional[float]:
+        return _opt_float(self._table._upper[self._row()])
+
+    @upper_range.setter
+    def upper_range(self, value: Optional[float]) -> None:
+        self._table._upper[self._row()] = _NAN if value is None else float(value)
+
+    @property
+    def lower_range(self) -> Optional[float]:
+        return _opt_float(self._table._lower[self._row()])
+
+    @lower_range.setter
+    def lower_range(self, value: Optional[float]) -> None:
+        self._table._lower[self._row()] = _NAN if value is None else float(value)
+
+    @property
+    def owner_chat_id(self) -> Optional[int]:
+        owner = self._table._owners[self._row()]
+        return None if owner == _NO_OWNER else owner
+
+    @owner_chat_id.setter
+    def owner_chat_id(self, value: Optional[int]) -> None:
+        self._table._set_owner(self._row(), value)
+
+    @property
+    def last_status(self) -> Optional[str]:
+        return self._table._statuses[self._row()]
+
+    @last_status.setter
+    def last_status(self, value: Optional[str]) -> None:
+        self._table._statuses[self._row()] = value
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        row = self._row()
+        meta = self._table._metas[row]
+        if meta is None:  # allocated on first use only
+            meta = self._table._metas[row] = {}
+        return meta
+
+    @meta.setter
+    def meta(self, value: Dict[str, Any]) -> None:
+        self._table._metas[self._row()] = value or None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The pool's row in the state.json format."""
+        return self._table._row_dict(self._row())
+
+    def to_pool(self) -> Pool:
+        return Pool(
+            link=self.link, range=self.range, token=self.token, amount=self.amount,
+            upper_range=self.upper_range, lower_range=self.lower_range,
+            owner_chat_id=self.owner_chat_id, last_status=self.last_status,
+            meta=dict(self._table._metas[self._row()] or {}),
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, (PoolView, Pool)):
+            return self.to_pool() == (other.to_pool() if isinstance(other, PoolView) else other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PoolView({self.to_pool()!r})"
+
+
+class PoolTable:
+    """Column-oriented store of monitored pools with hash indexes.
+
+    Numeric fields live in `array('d')`/`array('q')` columns, token and range-type strings
+    are interned, `meta` dicts are only allocated for pools that use them, and pools are
+    found by link, contract address or owner chat in O(1). Iteration yields `PoolView`s in
+    insertion order; removed rows are tombstoned and compacted once they are half the table.
+    It keeps the list operations the bot uses (append, len, iteration, clear).
+    """
+
+    __slots__ = ("_links", "_ranges", "_tokens", "_amounts", "_upper", "_lower", "_owners",
+                 "_statuses", "_metas", "_by_link", "_by_contract", "_by_owner", "_dead")
+
+    def __init__(self, pools: Iterable[Any] = ()):
+        self.clear()
+        for pool in pools:
+            self.append(pool)
+
+    def clear(self) -> None:
+        self._links: List[Optional[str]] = []
+        self._ranges: List[str] = []
+        self._tokens: List[str] = []
+        self._amounts = array("d")
+        self._upper = array("d")
+        self._lower = array("d")
+        self._owners = array("q")
+        self._statuses: List[Optional[str]] = []
+        self._metas: List[Optional[Dict[str, Any]]] = []
+        self._by_link: Dict[str, int] = {}
+        self._by_contract: Dict[str, Set[int]] = {}
+        self._by_owner: Dict[int, Set[int]] = {}
+        self._dead = 0
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict[str, Any]]) -> "PoolTable":
+        """Build a table from state.json pool dicts (rows without a link are skipped)."""
+        table = cls()
+        for row in rows:
+            if row.get("link"):
+                table.add_dict(row)
+        return table
+
+    def add_dict(self, row: Dict[str, Any]) -> PoolView:
+        """Insert (or overwrite) a pool from a state.json pool dict."""
+        return self.add(**{k: row.get(k) for k in ("link", "range", "token", "amount", "upper_range",
+                                                    "lower_range", "owner_chat_id", "last_status", "meta")})
+
+    def add(self, link: str, range: str = "", token: str = "", amount: float = 0,
+            upper_range: Optional[float] = None, lower_range: Optional[float] = None,
+            owner_chat_id: Optional[int] = None, last_status: Optional[str] = None,
+            meta: Optional[Dict[str, Any]] = None) -> PoolView:
+        """Insert a pool, or overwrite the row with the same link. Returns its view."""
+        row = self._by_link.get(link)
+        if row is None:
+            row = len(self._links)
+            self._links.append(link)
+            self._ranges.append("")
+            self._tokens.append("")
+            self._amounts.append(0.0)
+            self._upper.append(_NAN)
+            self._lower.append(_NAN)
+            self._owners.append(_NO_OWNER)
+            self._statuses.append(None)
+            self._metas.append(None)
+            self._by_link[link] = row
+            contract = _contract_of(link)
+            if contract:
+                self._by_contract.setdefault(contract, set()).add(row)
+        view = PoolView(self, link)
+        view.range = range
+        view.token = token
+        view.amount = amount
+        view.upper_range = upper_range
+        view.lower_range = lower_range
+        view.owner_chat_id = owner_chat_id
+        view.last_status = last_status
+        view.meta = meta
+        return view
+
+    def append(self, pool: Any) -> PoolView:
+        """Add a `Pool` (or any object with Pool's attributes)."""
+        return self.add(pool.link, pool.range, pool.token, pool.amount, pool.upper_range,
+                        pool.lower_range, pool.owner_chat_id, pool.last_status, dict(pool.meta or {}))
+
+    def _set_owner(self, row: int, owner: Optional[int]) -> None:
+        old = self._owners[row]
+        if old != _NO_OWNER:
+            rows = self._by_owner.get(old)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._by_owner[old]
+        new = _NO_OWNER if owner is None else int(owner)
+        self._owners[row] = new
+        if new != _NO_OWNER:
+            self._by_owner.setdefault(new, set()).add(row)
+
+    def remove(self, link: str) -> bool:
+        """Drop the pool with `link`. Returns False when it is not in the table."""
+        row = self._by_link.pop(link, None)
+        if row is None:
+            return False
+        contract = _contract_of(link)
+        if contract and contract in self._by_contract:
+            self._by_contract[contract].discard(row)
+            if not self._by_contract[contract]:
+                del self._by_contract[contract]
+        self._set_owner(row, None)
+        self._links[row] = None
+        self._metas[row] = None
+        self._statuses[row] = None
+        self._dead += 1
+        if self._dead * 2 > len(self._links):
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        rows = [PoolView(self, link).to_pool() for link in self._links if link is not None]
+        self.clear()
+        for pool in rows:
+            self.append(pool)
+
+    def get(self, link: str) -> Optional[PoolView]:
+        return PoolView(self, link) if link in self._by_link else None
+
+    def by_contract(self, address: str) -> List[PoolView]:
+        rows = sorted(self._by_contract.get(address.lower(), ()))
+        return [PoolView(self, self._links[r]) for r in rows]
+
+    def by_owner(self, chat_id: int) -> List[PoolView]:
+        rows = sorted(self._by_owner.get(int(chat_id), ()))
+        return [PoolView(self, self._links[r]) for r in rows]
+
+    def __contains__(self, link: object) -> bool:
+        return link in self._by_link
+
+    def __len__(self) -> int:
+        return len(self._by_link)
+
+    def __iter__(self) -> Iterator[PoolView]:
+        return (PoolView(self, link) for link in list(self._links) if link is not None)
+
+    def __eq__(self, other):
+        if isinstance(other, (PoolTable, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Rows in the state.json format, read straight from the columns."""
+        return [self._row_dict(row) for row, link in enumerate(self._links) if link is not None]
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        owner = self._owners[row]
+        return {
+            "link": self._links[row],
+            "range": self._ranges[row],
+            "token": self._tokens[row],
+            "amount": self._amounts[row],
+            "upper_range": _opt_float(self._upper[row]),
+            "lower_range": _opt_float(self._lower[row]),
+            "owner_chat_id": None if owner == _NO_OWNER else owner,
+            "last_status": self._statuses[row],
+            "meta": self._metas[row] or {},
+        }
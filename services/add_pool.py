@@ -1,13 +1,44 @@
-import asyncio
+from typing import List, Optional
 from utils.shadow_utils import Shadow
 from config import config
+from services.tracker_supervisor import supervisor
+from utils.message_queue import outbox
+
+
+def validate_pool_entry(pool_link: str, range_type: str, token: str, price: str) -> Optional[str]:
+    """Return an error message for an invalid /add entry, or None if it is valid."""
+    if not pool_link.startswith(config.SHADOW_BASE_URL):
+        return "Give a valid pool link."
+    if range_type.lower() not in config.DEFAULT_RANGE_TYPES:
+        return "Give a valid range type."
+    try:
+        if float(price) <= 0:
+            return "Give a valid amount."
+    except ValueError:
+        return "Give a valid amount."
+    return None
+
+
+async def open_pool_page(browser, pool_link: str):
+    """Open the pool's add-liquidity page and return it with the pool's token symbols."""
+    shadow_page = await browser.new_page()
+    try:
+        await shadow_page.goto(pool_link)
+        await shadow_page.wait_for_load_state("networkidle", timeout=0)
+        tokens: List[str] = (await shadow_page.locator('[class="text-3xl font-bold"]').text_content()).split("/")
+    except Exception:
+        await shadow_page.close()
+        raise
+    return shadow_page, tokens
+
 
 async def add_pool(update, browser, args):
     shadow_page = None
     try:
         # Validate we have exactly 4 arguments
         if len(args) != 4:
-            await update.message.reply_text(
+            outbox.reply(
+                update,
                 "❌ Invalid command format.\n\n"
                 "Usage: /add [pool_link] [range_type] [token] [amount]\n"
                 "Example: /add https://www.shadow.so/liquidity/0x123... aggressive USDC 30\n"
@@ -17,28 +48,17 @@ async def add_pool(update, browser, args):
             
         pool_link, range_type, token, price = args
 
-        if not pool_link.startswith(config.SHADOW_BASE_URL):
-            await update.message.reply_text("Give a valid pool link.")
-            return False, None
-
-        elif range_type.lower() not in config.DEFAULT_RANGE_TYPES:
-            await update.message.reply_text("Give a valid range type.")
-            return False, None
-
-        elif float(price) <= 0:
-            await update.message.reply_text("Give a valid amount.")
+        error = validate_pool_entry(pool_link, range_type, token, price)
+        if error:
+            outbox.reply(update, error)
             return False, None
 
-        await update.message.reply_text("Opening pool page…")
+        outbox.reply(update, "Opening pool page…")
         # shadow.so/liquidity/pool_link
-        shadow_page = await browser.new_page()
-        await shadow_page.goto(pool_link)
-        await shadow_page.wait_for_load_state("networkidle", timeout=0)
-
-        tokens = (await shadow_page.locator('[class="text-3xl font-bold"]').text_content()).split("/")
+        shadow_page, tokens = await open_pool_page(browser, pool_link)
 
         if token.upper() not in tokens:
-            await update.message.reply_text("Give a valid token.")
+            outbox.reply(update, "Give a valid token.")
             await shadow_page.close()
             return False, None
 
@@ -46,21 +66,21 @@ async def add_pool(update, browser, args):
         # connect wallet in shadow.so
         btn = shadow_page.locator("button:has-text('Connect Wallet')").first
         if await btn.is_visible():
-            await update.message.reply_text("Connecting wallet…")
+            outbox.reply(update, "Connecting wallet…")
             await shadow.shadow_connect()
 
         range_type_index = config.DEFAULT_RANGE_TYPES.index(range_type.lower())
         token_index = tokens.index(token.upper())
 
-        await update.message.reply_text("Submitting add liquidity transaction…")
-        upper_range, lower_range = await shadow.add_pool_link(update, shadow_page, range_type_index, token_index, price)
+        outbox.reply(update, "Submitting add liquidity transaction…")
+        upper_range, lower_range = await shadow.add_pool_link(update, shadow_page, range_type_index, token_index, price, pool_link=pool_link)
 
         # If add_pool_link failed (returns None, None), close the page
         if upper_range is None and lower_range is None:
             await shadow_page.close()
             return False, None
 
-        asyncio.create_task(shadow.track(update, shadow_page, pool_link))
+        supervisor.start(pool_link, shadow_page, browser, update)
 
         pool_info = {
             "link": pool_link,
@@ -73,7 +93,7 @@ async def add_pool(update, browser, args):
         return True, pool_info
 
     except Exception as e:
-        await update.message.reply_text("❌ Failed to process /add. Please check your inputs and try again.")
+        outbox.reply(update, "❌ Failed to process /add. Please check your inputs and try again.")
         print(e)
         # Close the page if it was created and an error occurred
         if shadow_page is not None:
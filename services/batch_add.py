@@ -0,0 +1,143 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import re
+from typing import Any, Dict, List
+
+from config import config
+from services.add_pool import validate_pool_entry, open_pool_page
+from services.position_analytics import record_deposit
+from services.tracker_supervisor import supervisor
+from utils.shadow_utils import Shadow
+
+BATCH_USAGE = (
+    "Usage: /add_batch [pool_link] [range_type] [token] [amount] ; [pool_link] [range_type] [token] [amount] ...\n"
+    "Or upload a .csv (pool_link,range_type,token,amount per line) or .json document."
+)
+
+# Only one tab connects the wallet; everything else, deposits included, runs in parallel
+# (the confirmation broker matches each deposit's MetaMask popup to its tab)
+_connect_lock = asyncio.Lock()
+
+
+def parse_batch_args(args: List[str]) -> List[List[str]]:
+    """Split /add_batch arguments into entries: groups separated by ';' or newlines, else groups of 4."""
+    text = " ".join(args)
+    if ";" in text or "\n" in text:
+        return [group.split() for group in re.split(r"[;\n]", text) if group.split()]
+    return [args[i:i + 4] for i in range(0, len(args), 4)]
+
+
+def parse_batch_document(filename: str, data: bytes) -> List[List[str]]:
+    """Parse an uploaded CSV or JSON document into entries."""
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        items = json.loads(text)
+        if isinstance(items, dict):
+            items = items.get("pools", [])
+        entries = []
+        for item in items:
+            if isinstance(item, dict):
+                entries.append([
+                    str(item.get("link") or item.get("pool_link") or ""),
+                    str(item.get("range") or item.get("range_type") or ""),
+                    str(item.get("token", "")),
+                    str(item.get("amount", "")),
+                ])
+            else:
+                entries.append([str(v) for v in item])
+        return entries
+
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(c.strip() for c in row)]
+    if rows and not rows[0][0].strip().lower().startswith("http"):
+        rows = rows[1:]  # header line
+    return [[c.strip() for c in row] for row in rows]
+
+
+def validate_batch(entries: List[List[str]]) -> List[str]:
+    """Validate every entry up front. Returns a list of errors (empty when the batch is valid)."""
+    errors = []
+    seen = set()
+    for i, entry in enumerate(entries, 1):
+        if len(entry) != 4:
+            errors.append(f"#{i}: expected 4 fields (pool_link range_type token amount), got {len(entry)}")
+            continue
+        error = validate_pool_entry(*entry)
+        if error:
+            errors.append(f"#{i}: {error}")
+        elif entry[0] in seen:
+            errors.append(f"#{i}: duplicate pool link")
+        seen.add(entry[0])
+    return errors
+
+
+async def _add_one(update, browser, index: int, entry: List[str], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    pool_link, range_type, token, price = entry
+    result: Dict[str, Any] = {"index": index, "link": pool_link, "ok": False, "error": None, "pool_info": None}
+    page = None
+    try:
+        shadow = Shadow(browser)
+        async with semaphore:
+            # Parallel phase: load the page, check the token, fill the form
+            page, tokens = await open_pool_page(browser, pool_link)
+            if token.upper() not in tokens:
+                raise ValueError(f"token {token.upper()} is not part of {'/'.join(tokens)}")
+
+            btn = page.locator("button:has-text('Connect Wallet')").first
+            if await btn.is_visible():
+                async with _connect_lock:
+                    if await btn.is_visible():
+                        await shadow.shadow_connect()
+
+            range_type_index = config.DEFAULT_RANGE_TYPES.index(range_type.lower())
+            token_index = tokens.index(token.upper())
+            upper_range, lower_range = await shadow.fill_pool_form(page, range_type_index, token_index, price)
+
+            if not await shadow.submit_deposit(None, page):
+                raise ValueError("insufficient balance or deposit not confirmed")
+        record_deposit(pool_link, price, token_index, upper_range, lower_range)
+
+        supervisor.start(pool_link, page, browser, update)
+        result["ok"] = True
+        result["pool_info"] = {
+            "link": pool_link,
+            "range": range_type.lower(),
+            "token": token.upper(),
+            "amount": float(price),
+            "upper_range": upper_range,
+            "lower_range": lower_range,
+        }
+    except Exception as e:
+        logging.warning(f"Batch add #{index} ({pool_link}) failed: {e}")
+        result["error"] = str(e)[:100]
+        if page is not None:
+            try:
+                await page.close()
+            except Exception:
+                pass
+    return result
+
+
+async def batch_add(update, browser, entries: List[List[str]]) -> List[Dict[str, Any]]:
+    """Add many positions: parallel page loading/form filling, serialized wallet confirmations.
+
+    `entries` must already be validated with validate_batch(). Returns one result per entry, in order.
+    """
+    semaphore = asyncio.Semaphore(max(1, config.BATCH_ADD_CONCURRENCY))
+    return await asyncio.gather(
+        *(_add_one(update, browser, i, entry, semaphore) for i, entry in enumerate(entries, 1))
+    )
+
+
+def format_batch_report(results: List[Dict[str, Any]]) -> str:
+    ok = sum(1 for r in results if r["ok"])
+    lines = [f"📦 Batch add finished: {ok}/{len(results)} position(s) added"]
+    for r in results:
+        if r["ok"]:
+            info = r["pool_info"]
+            lines.append(f"✅ #{r['index']} {r['link']} ({info['range']}, {info['amount']} {info['token']})")
+        else:
+            lines.append(f"❌ #{r['index']} {r['link']}: {r['error']}")
+    return "\n".join(lines)
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+
+from config import config
+
+# Chromium runtime/lock files and caches that must not (or need not) be copied into a clone
+_PROFILE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "*.lock", "LOCK", "lockfile", "Crashpad", "Cache", "Code Cache", "GPUCache",
+    "ShaderCache", "GrShaderCache", "DawnCache", "Service Worker/CacheStorage",
+)
+
+
+def clone_profile(source: str, target: str) -> None:
+    """Copy a Chromium profile (MetaMask vault included) without lock files and caches."""
+    if os.path.exists(target):
+        shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(source, target, ignore=_PROFILE_IGNORE, symlinks=True)
+
+
+class BrowserStandby:
+    """A second, idle browser context kept launched and unlocked for instant failover.
+
+    The standby runs on a clone of the primary profile (two alternating slots next to
+    USER_DATA_DIR, or STANDBY_PROFILE_DIR), so it never shares a profile lock with the
+    primary. `take()` hands the ready context over and starts preparing the next standby
+    in the background.
+    """
+
+    def __init__(self):
+        base = config.STANDBY_PROFILE_DIR or config.USER_DATA_DIR.rstrip(os.sep) + "_standby"
+        self.slots = [base + "_1", base + "_2"]
+        self.primary_dir = config.USER_DATA_DIR
+        self.browser = None
+        self.profile_dir: Optional[str] = None
+        self.prepare_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.browser is not None
+
+    @property
+    def preparing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _next_slot(self) -> str:
+        return next(slot for slot in self.slots if slot != self.primary_dir)
+
+    async def prepare(self) -> None:
+        """Clone the primary profile, launch on it, unlock MetaMask and connect shadow.so."""
+        from services.launch_browser import launch_browser
+        from services.metamask_connect import metamask_connect
+        from services.shadow_connect import shadow_connect
+
+        started = time.monotonic()
+        target = self._next_slot()
+        browser = None
+        try:
+            await asyncio.to_thread(clone_profile, self.primary_dir, target)
+            browser = await launch_browser(user_data_dir=target)
+            await metamask_connect(browser)
+            await shadow_connect(browser)
+        except Exception:
+            logging.exception("Failed to prepare standby browser")
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            return
+        self.browser = browser
+        self.profile_dir = target
+        self.prepare_seconds = time.monotonic() - started
+        logging.info(f"Standby browser ready on {target} after {self.prepare_seconds:.1f}s")
+
+    def ensure(self) -> None:
+        """Start preparing a standby in the background unless one is ready or on its way."""
+        if not self.ready and not self.preparing:
+            self._task = asyncio.create_task(self.prepare())
+
+    async def discard(self) -> None:
+        """Close a standby that stopped answering; ensure() will build a new one."""
+        browser, self.browser = self.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    def take(self):
+        """Hand over the ready standby as the new primary and start the next one. None if not ready."""
+        if not self.ready:
+            return None
+        browser, self.browser = self.browser, None
+        self.primary_dir = self.profile_dir
+        self.profile_dir = None
+        self.ensure()
+        return browser
+
+    async def stop(self) -> None:
+        if self.preparing:
+            self._task.cancel()
+        await self.discard()
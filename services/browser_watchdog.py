@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from config import config
+from utils.notifier import notify_admins
+from utils.state import load_checkpoints_async, load_state_async
+from services.tracker_supervisor import supervisor
+
+
+class BrowserWatchdog:
+    """Keeps `bot.browser` alive.
+
+    Every WATCHDOG_INTERVAL seconds a cheap heartbeat checks that the persistent context is
+    open, still has pages and that a renderer answers a trivial evaluate(). After
+    WATCHDOG_MAX_FAILURES failed heartbeats in a row the context is relaunched from the same
+    USER_DATA_DIR, MetaMask is unlocked again and every tracked pool gets a fresh tracker.
+    With a BrowserStandby, the pre-unlocked standby context is switched in instead of the
+    cold relaunch. Recovery time is measured and reported to the admins.
+    """
+
+    def __init__(self, bot, notify_target=None, standby=None):
+        self.bot = bot
+        self.notify_target = notify_target  # anything with a .bot (Application or context)
+        self.standby = standby  # optional BrowserStandby for instant failover
+        self.failures = 0
+        self.recoveries: List[float] = []  # seconds per successful recovery
+        self.failed_recoveries = 0
+        self.pending_recovery = False  # last recovery failed; retry on the next check
+        self._closed_browser = None
+        self._watched_browser = None
+        self._task: Optional[asyncio.Task] = None
+        self._recovering = asyncio.Lock()
+
+    def _watch_close_event(self, browser) -> None:
+        if browser is self._watched_browser:
+            return
+        self._watched_browser = browser
+        try:
+            browser.on("close", lambda *_: setattr(self, "_closed_browser", browser))
+        except Exception:
+            pass
+
+    async def heartbeat(self, browser) -> bool:
+        """True when the context is open and a page answers within WATCHDOG_HEARTBEAT_TIMEOUT."""
+        if browser is self._closed_browser:
+            return False
+        try:
+            pages = browser.pages
+            if not pages:
+                return False
+            await asyncio.wait_for(pages[-1].evaluate("1"), timeout=config.WATCHDOG_HEARTBEAT_TIMEOUT)
+            return True
+        except Exception as e:
+            logging.warning(f"Browser heartbeat failed: {e}")
+            return False
+
+    async def tracked_links(self) -> List[str]:
+        """Pools that need a tracker: every stored pool plus any interrupted rebalance."""
+        links = [p.get("link") for p in (await load_state_async()).get("pools", []) if p.get("link")]
+        links.extend((await load_checkpoints_async()).keys())
+        return list(dict.fromkeys(links))
+
+    async def check(self) -> bool:
+        """Run one heartbeat; recover after too many consecutive failures. Returns health."""
+        browser = self.bot.browser
+        if browser is None:
+            if self.pending_recovery:
+                return await self.recover()
+            self.failures = 0  # not connected yet, or deliberately disconnected
+            return True
+        self._watch_close_event(browser)
+        if await self.heartbeat(browser):
+            self.failures = 0
+            await self._check_standby()
+            return True
+        self.failures += 1
+        if self.failures >= config.WATCHDOG_MAX_FAILURES:
+            await self.recover()
+        return False
+
+    async def _check_standby(self) -> None:
+        """Keep a healthy standby around once the primary is up."""
+        if self.standby is None:
+            return
+        if self.standby.ready and not await self.heartbeat(self.standby.browser):
+            logging.warning("Standby browser stopped answering, preparing a new one")
+            await self.standby.discard()
+        self.standby.ensure()
+
+    async def recover(self) -> bool:
+        async with self._recovering:
+            dead = self.bot.browser
+            started = time.monotonic()
+            if dead is not None:
+                try:
+                    await asyncio.wait_for(dead.close(), timeout=10)
+                except Exception:
+                    pass  # already gone
+
+            try:
+                browser = self.standby.take() if self.standby is not None else None
+                if browser is not None:
+                    logging.warning("Browser unhealthy, failing over to standby context")
+                    kind = "failed over to standby"
+                    self.bot.browser = browser
+                else:
+                    logging.warning("Browser unhealthy, relaunching persistent context")
+                    kind = "recovered"
+                    from services.launch_browser import launch_browser
+                    from services.metamask_connect import metamask_connect
+                    from services.shadow_connect import shadow_connect
+
+                    self.bot._load_stored_credentials()
+                    browser = await launch_browser()
+                    self.bot.browser = browser
+                    await metamask_connect(browser)
+                    await shadow_connect(browser)
+                links = await self.tracked_links()
+                for link in links:
+                    page = await browser.new_page()
+                    supervisor.start(link, page, browser)
+            except Exception as e:
+                self.failed_recoveries += 1
+                self.pending_recovery = True
+                self.bot.browser = None
+                logging.exception("Browser recovery failed")
+                await self._notify(f"❌ Browser recovery failed: {str(e)[:100]}")
+                return False
+
+            elapsed = time.monotonic() - started
+            self.recoveries.append(elapsed)
+            self.failures = 0
+            self.pending_recovery = False
+            await self._notify(f"♻️ Browser {kind} in {elapsed:.1f}s, {len(links)} tracker(s) re-attached.")
+            return True
+
+    async def _notify(self, message: str) -> None:
+        print(message)
+        if self.notify_target is not None:
+            await notify_admins(self.notify_target, message)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(config.WATCHDOG_INTERVAL)
+            try:
+                await self.check()
+            except Exception:
+                logging.exception("Browser watchdog check failed")
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from config import config
+
+# Swap(address,address,int256,int256,uint160,uint128,int24) emitted by Shadow's CL pools
+SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+
+MODE_LOGS = "logs"    # Swap logs of the watched pools: only pools that traded are woken
+MODE_HEADS = "heads"  # every new block wakes every watched pool
+
+
+class ChainEventTrigger:
+    """Wakes trackers when their pool trades, from an eth_subscribe websocket feed.
+
+    Trackers call `wait(address)` instead of sleeping a fixed interval. In logs mode only
+    pools that emitted a Swap are woken (idle pools cost nothing); in heads mode every
+    watched pool is woken once per block. The connection is re-established with
+    exponential backoff, and while it is down `wait` falls back to plain polling.
+    Positions on the same pool share its subscription: every tracker calls `watch` once
+    and `unwatch` when it exits, and the pool is dropped when its last watcher leaves.
+    """
+
+    def __init__(self, url: str, mode: str = MODE_LOGS, max_idle: Optional[float] = None):
+        self.url = url
+        self.mode = mode
+        self.max_idle = max_idle if max_idle is not None else config.CHAIN_EVENT_MAX_IDLE
+        self.connected = False
+        self.reconnect_count = 0
+        self.event_count = 0
+        self._events: Dict[str, asyncio.Event] = {}
+        self._watchers: Dict[str, int] = {}
+        self._watch_changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._ids = 0
+
+    # --- watched pools ---
+
+    def watch(self, address: str) -> None:
+        address = address.lower()
+        self._watchers[address] = self._watchers.get(address, 0) + 1
+        if address not in self._events:
+            self._events[address] = asyncio.Event()
+            self._watch_changed.set()
+
+    def unwatch(self, address: str) -> None:
+        address = address.lower()
+        count = self._watchers.get(address, 0) - 1
+        if count > 0:
+            self._watchers[address] = count
+            return
+        self._watchers.pop(address, None)
+        if self._events.pop(address, None) is not None:
+            self._watch_changed.set()
+
+    @property
+    def watched(self) -> Set[str]:
+        return set(self._events)
+
+    async def wait(self, address: str, poll_interval: float = 5) -> bool:
+        """Wait until `address` trades. Returns False when it fell back to polling or max_idle."""
+        address = address.lower()
+        if address not in self._events:
+            self.watch(address)
+        self.start()
+        if not self.connected:
+            await asyncio.sleep(poll_interval)
+            return False
+        event = self._events[address]
+        try:
+            await asyncio.wait_for(event.wait(), timeout=self.max_idle)
+        except asyncio.TimeoutError:
+            return False
+        event.clear()
+        return True
+
+    def _wake(self, address: Optional[str] = None) -> None:
+        if address is None:
+            for event in self._events.values():
+                event.set()
+        else:
+            event = self._events.get(address.lower())
+            if event is not None:
+                event.set()
+
+    # --- connection ---
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def run(self) -> None:
+        """Connect, subscribe and dispatch forever, reconnecting with backoff."""
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import WebSocketException
+
+        backoff = config.CHAIN_EVENT_BACKOFF_MIN
+        while True:
+            try:
+                async with connect(self.url, open_timeout=10) as ws:
+                    backoff = config.CHAIN_EVENT_BACKOFF_MIN
+                    await self._session(ws)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, WebSocketException, ValueError) as e:
+                logging.warning(f"Chain event feed {self.url} disconnected: {e}")
+            self.connected = False
+            self.reconnect_count += 1
+            # Wake every waiter so trackers re-check (and poll) while the feed is down
+            self._wake()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, config.CHAIN_EVENT_BACKOFF_MAX)
+
+    async def _request(self, ws, method: str, params) -> Optional[str]:
+        self._ids += 1
+        request_id = self._ids
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        # Notifications may arrive before the reply; dispatch them while waiting
+        while True:
+            message = json.loads(await ws.recv())
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise ValueError(f"{method} failed: {message['error']}")
+                return message.get("result")
+            self._dispatch(message)
+
+    async def _subscribe(self, ws) -> Optional[str]:
+        if self.mode == MODE_HEADS:
+            return await self._request(ws, "eth_subscribe", ["newHeads"])
+        if not self._events:
+            return None
+        return await self._request(ws, "eth_subscribe", ["logs", {"address": sorted(self._events), "topics": [SWAP_TOPIC]}])
+
+    async def _session(self, ws) -> None:
+        self._watch_changed.clear()
+        subscription = await self._subscribe(ws)
+        self.connected = True
+        logging.info(f"Chain event feed connected ({self.mode}, {len(self._events)} pool(s))")
+        while True:
+            recv = asyncio.ensure_future(ws.recv())
+            changed = asyncio.ensure_future(self._watch_changed.wait())
+            done, _ = await asyncio.wait({recv, changed}, return_when=asyncio.FIRST_COMPLETED)
+            if recv in done:
+                changed.cancel()
+                self._dispatch(json.loads(recv.result()))
+                continue
+            recv.cancel()
+            # Watched pools changed: replace the logs subscription
+            self._watch_changed.clear()
+            if self.mode == MODE_LOGS:
+                if subscription:
+                    await self._request(ws, "eth_unsubscribe", [subscription])
+                subscription = await self._subscribe(ws)
+
+    def _dispatch(self, message) -> None:
+        if message.get("method") != "eth_subscription":
+            return
+        result = message.get("params", {}).get("result") or {}
+        self.event_count += 1
+        if self.mode == MODE_HEADS:
+            self._wake()
+        elif result.get("address"):
+            self._wake(result["address"])
+
+
+_trigger: Optional[ChainEventTrigger] = None
+
+
+def get_chain_trigger() -> Optional[ChainEventTrigger]:
+    """Shared trigger when CHAIN_EVENTS is 'logs' or 'heads' and WS_RPC_URL is set, else None."""
+    global _trigger
+    if config.CHAIN_EVENTS not in (MODE_LOGS, MODE_HEADS) or not config.WS_RPC_URL:
+        return None
+    if _trigger is None:
+        _trigger = ChainEventTrigger(config.WS_RPC_URL, config.CHAIN_EVENTS)
+    return _trigger
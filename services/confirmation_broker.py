@@ -0,0 +1,210 @@
+"""Routes MetaMask popups to the flow that triggered them.
+
+Every flow registers the wallet request it is about to trigger:
+
+    async with broker.expect(page, TRANSACTION, "deposit") as request:
+        await deposit_button.click()
+    confirmed = await request.wait()
+
+MetaMask shows one request at a time, so the broker keeps one active request per browser
+context: a flow's trigger waits until the previous request of that context is finished,
+and the next popup that opens is matched to the active request. Only the buttons that
+fit the request's kind are clicked; popups nobody asked for are left alone. Everything
+else the flows do (loading pages, filling forms, waiting for the chain) runs in parallel.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from config import config
+
+CONNECT = "connect"
+SIGN = "sign"
+NETWORK = "network"
+TRANSACTION = "transaction"
+
+# Buttons clicked for each kind of request, in order of preference
+REQUEST_BUTTONS: Dict[str, Tuple[str, ...]] = {
+    CONNECT: ("Connect",),
+    SIGN: ("Sign", "Confirm"),
+    NETWORK: ("Approve", "Switch network"),
+    TRANSACTION: ("Confirm", "Approve"),  # token approval, then the transaction itself
+}
+
+# A follow-up popup within this many seconds (approval, then the transaction) belongs to the same request
+FOLLOWUP_WINDOW = 3.0
+POLL_INTERVAL = 0.25
+
+
+class WalletRequest:
+    """A wallet request a flow expects; `wait()` resolves once it is confirmed or given up."""
+
+    def __init__(self, kind: str, flow: str = "", context: Any = None):
+        if kind not in REQUEST_BUTTONS:
+            raise ValueError(f"unknown wallet request kind: {kind}")
+        self.kind = kind
+        self.flow = flow or kind
+        self.context = context
+        self.buttons = REQUEST_BUTTONS[kind]
+        self.created = time.monotonic()
+        self.triggered_at: Optional[float] = None
+        self.popup = None
+        self.clicks = 0
+        self.settle_until: Optional[float] = None
+        self.error: Optional[str] = None
+        self._done = asyncio.get_running_loop().create_future()
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    def _resolve(self, confirmed: bool, error: Optional[str] = None) -> None:
+        if not self._done.done():
+            self.error = error
+            self._done.set_result(confirmed)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """True once the request was confirmed in MetaMask, False if it failed or timed out."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._done), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    def __repr__(self):
+        return f"WalletRequest({self.flow!r}, {self.kind!r}, clicks={self.clicks})"
+
+
+class ConfirmationBroker:
+    """Matches MetaMask popups to registered wallet requests and confirms them."""
+
+    def __init__(self):
+        self._popup_urls: Dict[Any, str] = {}  # browser context -> notification.html url
+        self._slots: Dict[Any, asyncio.Lock] = {}  # one active request per context
+        self._active: Dict[Any, WalletRequest] = {}
+        self._ignored = set()  # unsolicited popups already logged
+        self._task: Optional[asyncio.Task] = None
+
+    def attach(self, browser, popup_url: str) -> None:
+        """Route popups of `browser` (a persistent context) through the broker."""
+        self._popup_urls[browser] = popup_url
+        self._slots.setdefault(browser, asyncio.Lock())
+        browser.on("close", lambda _: self.detach(browser))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def detach(self, browser) -> None:
+        request = self._active.get(browser)
+        if request is not None:
+            self._finish(request, False, "browser closed")
+        self._popup_urls.pop(browser, None)
+        self._slots.pop(browser, None)
+
+    @asynccontextmanager
+    async def expect(self, page, kind: str, flow: str = ""):
+        """Register the wallet request that the body of the block triggers on `page`.
+
+        Pages of browsers the broker does not manage get a request that resolves as
+        confirmed right away, so flows behave as before without a broker.
+        """
+        context = getattr(page, "context", None)
+        slot = self._slots.get(context)
+        if slot is None:
+            request = WalletRequest(kind, flow)
+            request._resolve(True)
+            yield request
+            return
+
+        await slot.acquire()
+        request = WalletRequest(kind, flow, context)
+        if context not in self._popup_urls:  # detached while waiting for the slot
+            slot.release()
+            request._resolve(False, "browser closed")
+            yield request
+            return
+        self._active[context] = request
+        try:
+            yield request
+        except BaseException:
+            self._finish(request, False, "trigger failed")
+            raise
+        request.triggered_at = time.monotonic()
+
+    def _finish(self, request: WalletRequest, confirmed: bool, error: Optional[str] = None) -> None:
+        if request.done:
+            return
+        request._resolve(confirmed, error)
+        if error:
+            logging.warning(f"Wallet request for {request.flow} not confirmed: {error}")
+        if self._active.get(request.context) is request:
+            del self._active[request.context]
+            slot = self._slots.get(request.context)
+            if slot is not None and slot.locked():
+                slot.release()
+
+    async def run(self) -> None:
+        while self._popup_urls:
+            for context in list(self._popup_urls):
+                try:
+                    await self.check(context)
+                except Exception:
+                    logging.exception("Confirmation broker check failed")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def _popups(self, context):
+        prefix = self._popup_urls.get(context, "")
+        return [p for p in context.pages if p.url.startswith(prefix) and not p.is_closed()]
+
+    async def check(self, context) -> None:
+        """Advance the active request of `context` by one step."""
+        request = self._active.get(context)
+        popups = self._popups(context)
+        if request is None:
+            for popup in popups:
+                if id(popup) not in self._ignored:
+                    self._ignored.add(id(popup))
+                    logging.warning(f"Ignoring unexpected MetaMask popup: {popup.url}")
+            return
+
+        now = time.monotonic()
+        if now - request.created > config.WALLET_CONFIRM_TIMEOUT:
+            self._finish(request, False, "timed out")
+            return
+        if request.popup is not None and request.popup.is_closed():
+            # Handled; give the dapp a moment to open a follow-up (approval -> transaction)
+            request.popup = None
+            request.settle_until = now + FOLLOWUP_WINDOW
+        if request.popup is None:
+            if popups:
+                request.popup = popups[-1]
+                request.settle_until = None
+            elif request.triggered_at is None:
+                return  # the flow is still triggering it
+            elif request.settle_until is not None:
+                if now >= request.settle_until:
+                    confirmed = request.clicks > 0
+                    self._finish(request, confirmed, None if confirmed else "popup closed without confirmation")
+                return
+            else:
+                if now - request.triggered_at > config.WALLET_POPUP_TIMEOUT:
+                    self._finish(request, False, "no wallet popup opened")
+                return
+
+        for name in request.buttons:
+            button = request.popup.get_by_role("button", name=name)
+            if await button.is_visible():
+                await button.click()
+                request.clicks += 1
+                request.settle_until = None
+                return
+        if request.clicks:
+            # Confirmed, but the window stayed open with nothing left for this request
+            if request.settle_until is None:
+                request.settle_until = now + FOLLOWUP_WINDOW
+            elif now >= request.settle_until and request.triggered_at is not None:
+                self._finish(request, True)
+
+
+broker = ConfirmationBroker()
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+from services.shadow_dashboard import fetch_dashboard_pools
+from utils.notifier import notify_admins
+from utils.state import load_dashboard_snapshot_async, save_dashboard_snapshot
+
+# Snapshot view used by the background change alerts (chats use their chat id)
+ALERTS_VIEW = "alerts"
+
+
+def position_key(pool: Dict[str, Any]) -> str:
+    """Positions are identified by (contract address, pool id)."""
+    return f"{pool.get('contract_address', '').lower()}:{pool.get('pool_id', '')}"
+
+
+def make_snapshot(pools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"taken_at": time.time(), "positions": {position_key(p): p for p in pools}}
+
+
+def _in_range(pool: Dict[str, Any]) -> Optional[bool]:
+    status = (pool.get("status") or "").lower()
+    if "out of range" in status:
+        return False
+    if "in range" in status:
+        return True
+    return None  # the dashboard row did not say
+
+
+def _amount(text: str) -> Optional[float]:
+    number = re.sub(r"[^\d.]", "", text or "")
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def _label(pool: Dict[str, Any]) -> str:
+    tokens = pool.get("tokens") or ""
+    return f"#{pool.get('pool_id')} {tokens}".strip()
+
+
+@dataclass
+class DashboardDiff:
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    closed: List[Dict[str, Any]] = field(default_factory=list)
+    out_of_range: List[Dict[str, Any]] = field(default_factory=list)
+    back_in_range: List[Dict[str, Any]] = field(default_factory=list)
+    liquidity: List[Tuple[Dict[str, Any], str, str]] = field(default_factory=list)  # (pool, old, new)
+    unchanged: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.closed or self.out_of_range or self.back_in_range or self.liquidity)
+
+    def format(self, since: Optional[float] = None) -> str:
+        header = "🔄 Dashboard changes"
+        if since:
+            header += f" since {datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M')}"
+        if not self:
+            return f"{header}: none ({self.unchanged} position(s) unchanged)."
+        lines = [header]
+        for pool in self.added:
+            details = " | ".join(x for x in (pool.get("liquidity"), pool.get("range"), pool.get("status")) if x)
+            lines.append(f"🆕 {_label(pool)} {details} {pool.get('pool_link', '')}".rstrip())
+        lines.extend(f"❌ Closed {_label(pool)}" for pool in self.closed)
+        lines.extend(f"⚠️ Out of range {_label(pool)}" for pool in self.out_of_range)
+        lines.extend(f"✅ Back in range {_label(pool)}" for pool in self.back_in_range)
+        lines.extend(f"💰 {_label(pool)} liquidity {old} → {new}" for pool, old, new in self.liquidity)
+        if self.unchanged:
+            lines.append(f"… {self.unchanged} position(s) unchanged")
+        return "\n".join(lines)
+
+
+def diff_positions(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> DashboardDiff:
+    """Compare two snapshots' positions (keyed by position_key)."""
+    diff = DashboardDiff()
+    for key, pool in new.items():
+        before = old.get(key)
+        if before is None:
+            diff.added.append(pool)
+            continue
+        changed = False
+        was, now = _in_range(before), _in_range(pool)
+        if now is False and was is not False:
+            diff.out_of_range.append(pool)
+            changed = True
+        elif now is True and was is False:
+            diff.back_in_range.append(pool)
+            changed = True
+        old_liq, new_liq = before.get("liquidity") or "", pool.get("liquidity") or ""
+        if old_liq != new_liq:
+            a, b = _amount(old_liq), _amount(new_liq)
+            significant = a is None or b is None or a == 0 or abs(b - a) / a * 100 >= config.DASHBOARD_LIQUIDITY_CHANGE_PCT
+            if significant:
+                diff.liquidity.append((pool, old_liq or "?", new_liq or "?"))
+                changed = True
+        if not changed:
+            diff.unchanged += 1
+    diff.closed = [pool for key, pool in old.items() if key not in new]
+    return diff
+
+
+async def diff_since_view(view: str, pools: List[Dict[str, Any]]) -> Tuple[Optional[DashboardDiff], Optional[float]]:
+    """Diff `pools` against the last snapshot of `view` and store the new one.
+
+    Returns (None, None) when `view` has no previous snapshot.
+    """
+    previous = await load_dashboard_snapshot_async(view)
+    snapshot = make_snapshot(pools)
+    save_dashboard_snapshot(view, snapshot)
+    if previous is None:
+        return None, None
+    return diff_positions(previous.get("positions", {}), snapshot["positions"]), previous.get("taken_at")
+
+
+class DashboardAlerts:
+    """Background dashboard check that notifies the admins about changes only.
+
+    Every DASHBOARD_ALERT_INTERVAL seconds, and only while the browser is connected, the
+    dashboard is fetched and diffed against the previous alert snapshot; nothing is sent
+    when no position changed.
+    """
+
+    def __init__(self, bot, notify_target=None):
+        self.bot = bot
+        self.notify_target = notify_target  # anything with a .bot (Application or context)
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> Optional[DashboardDiff]:
+        if self.bot.browser is None:
+            return None
+        pools = await fetch_dashboard_pools(self.bot.browser)
+        if pools is None:
+            # A failed fetch is not an empty dashboard; keep the previous snapshot
+            return None
+        diff, since = await diff_since_view(ALERTS_VIEW, pools)
+        if diff and self.notify_target is not None:
+            await notify_admins(self.notify_target, diff.format(since))
+        return diff
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(config.DASHBOARD_ALERT_INTERVAL)
+            try:
+                await self.check()
+            except Exception:
+                logging.exception("Dashboard change check failed")
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
@@ -5,28 +5,11 @@ from services.metamask_connect import metamask_connect
 from services.shadow_connect import shadow_connect
 from utils.shadow_utils import Shadow
 from services.metamask_popup import MetamaskPopup
+from services.confirmation_broker import broker
 from config import config
 
-async def metamask_confirmation(browser, popup_url):
-    while True:
-        if not browser.pages:
-            break
-        try:
-            if (browser.pages[-1].url).startswith(popup_url) :
-                    confirm_page = browser.pages[-1]
-                    buttons = ["Connect", "Confirm", "Approve", "Sign"]
-                    for button in buttons:
-                        btn = confirm_page.get_by_role("button", name=button)
-                        if await btn.is_visible():
-                            await btn.click()
-                            break
-                    
-        except Exception as e:
-            print(f"Error occurred: {e}")
-
-        await asyncio.sleep(1)
-
-async def launch_browser():
+async def launch_browser(user_data_dir=None):
+    """Launch the persistent Chromium context with MetaMask (profile: USER_DATA_DIR unless given)."""
     p = await async_playwright().start()
     
     # Build browser args
@@ -39,7 +22,7 @@ async def launch_browser():
         args.append("--start-maximized")
     
     browser = await p.chromium.launch_persistent_context(
-            user_data_dir=config.USER_DATA_DIR,
+            user_data_dir=user_data_dir or config.USER_DATA_DIR,
             headless=config.HEADLESS,
             args=args,
             no_viewport=True,
@@ -64,7 +47,8 @@ async def launch_browser():
     extension_id = service_worker.url.split("/")[2]
     popup_url = f"chrome-extension://{extension_id}/notification.html"
 
-    asyncio.create_task(metamask_confirmation(browser, popup_url))
+    # MetaMask popups are confirmed only for the flow that registered them
+    broker.attach(browser, popup_url)
 
     # add pool link
     #await add_pool_link(browser, POOL_LINK)
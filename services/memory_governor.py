@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import psutil
+
+from config import config
+from utils.notifier import notify_admins
+from utils.shadow_utils import pages_to_reload, tracker_pages
+from utils.state import load_checkpoints_async
+
+MB = 1024 * 1024
+
+# Chromium executables as Playwright launches them (chrome, chromium, headless_shell, ...)
+_CHROMIUM_NAMES = ("chrom", "headless_shell")
+
+
+@dataclass
+class MemorySample:
+    tree_rss: int = 0  # bytes, browser process and all its children
+    renderers: Dict[int, int] = field(default_factory=dict)  # renderer pid -> RSS bytes
+
+    @property
+    def largest_renderer(self) -> int:
+        return max(self.renderers.values(), default=0)
+
+    def format(self) -> str:
+        return (f"Chromium {self.tree_rss / MB:.0f} MB in total, {len(self.renderers)} renderer(s), "
+                f"largest {self.largest_renderer / MB:.0f} MB")
+
+
+def _is_chromium(proc: psutil.Process) -> bool:
+    try:
+        name = proc.name().lower()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+    return any(n in name for n in _CHROMIUM_NAMES)
+
+
+def find_browser_process(user_data_dir: str, root: Optional[psutil.Process] = None) -> Optional[psutil.Process]:
+    """The Chromium browser process (not a helper) launched by us on `user_data_dir`."""
+    root = root or psutil.Process()
+    for proc in root.children(recursive=True):
+        if not _is_chromium(proc):
+            continue
+        try:
+            cmdline = proc.cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if any(arg.startswith("--type=") for arg in cmdline):
+            continue  # renderer, GPU, utility ...
+        if any(arg.startswith("--user-data-dir=") and arg.split("=", 1)[1].rstrip("/\\") == user_data_dir.rstrip("/\\")
+               for arg in cmdline):
+            return proc
+    return None
+
+
+def sample_tree(browser_proc: psutil.Process) -> MemorySample:
+    """RSS of the whole Chromium tree and of each renderer."""
+    sample = MemorySample()
+    for proc in [browser_proc] + browser_proc.children(recursive=True):
+        try:
+            rss = proc.memory_info().rss
+            cmdline = proc.cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue  # exited between listing and sampling
+        sample.tree_rss += rss
+        if "--type=renderer" in cmdline:
+            sample.renderers[proc.pid] = rss
+    return sample
+
+
+class MemoryGovernor:
+    """Keeps the Chromium process tree of `bot.browser` within memory limits.
+
+    Every MEMORY_CHECK_INTERVAL seconds the browser tree and each renderer are sampled.
+    When MEMORY_TREE_LIMIT_MB or MEMORY_RENDERER_LIMIT_MB is crossed the governor escalates:
+    1. close leaked tabs (not owned by a tracker, open longer than MEMORY_LEAKED_TAB_AGE),
+    2. ask trackers to reload pages whose JS heap exceeds MEMORY_PAGE_HEAP_LIMIT_MB
+       (or the biggest one when a renderer is over its limit),
+    3. after MEMORY_RECYCLE_AFTER checks in a row still over the tree limit, recycle the
+       whole context through the browser watchdog (relaunch + trackers re-attached).
+    """
+
+    def __init__(self, bot, notify_target=None):
+        self.bot = bot
+        self.notify_target = notify_target  # anything with a .bot (Application or context)
+        self.over_limit_checks = 0
+        self.last_sample: Optional[MemorySample] = None
+        self.closed_tabs = 0
+        self.reloaded_pages = 0
+        self.recycles = 0
+        self._first_seen: Dict[object, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _profile_dir(self) -> str:
+        watchdog = getattr(self.bot, "watchdog", None)
+        standby = getattr(watchdog, "standby", None)
+        return standby.primary_dir if standby is not None else config.USER_DATA_DIR
+
+    def sample(self) -> Optional[MemorySample]:
+        proc = find_browser_process(self._profile_dir())
+        if proc is None:
+            return None
+        try:
+            return sample_tree(proc)
+        except psutil.NoSuchProcess:
+            return None
+
+    def _over_limit(self, sample: MemorySample) -> bool:
+        return (sample.tree_rss > config.MEMORY_TREE_LIMIT_MB * MB
+                or sample.largest_renderer > config.MEMORY_RENDERER_LIMIT_MB * MB)
+
+    def _note_pages(self, browser) -> None:
+        """Remember when each open tab was first seen (tabs are aged across checks)."""
+        now = time.monotonic()
+        self._first_seen = {p: self._first_seen.get(p, now) for p in browser.pages}
+
+    async def close_leaked_tabs(self, browser) -> int:
+        """Close tabs no tracker owns that have been open longer than MEMORY_LEAKED_TAB_AGE."""
+        now = time.monotonic()
+        self._note_pages(browser)
+        pages = list(browser.pages)
+        closed = 0
+        for page in pages[1:]:  # the first tab keeps the context (and the heartbeat) alive
+            if page in tracker_pages or page.url.startswith("chrome-extension://"):
+                continue
+            if now - self._first_seen[page] < config.MEMORY_LEAKED_TAB_AGE:
+                continue  # probably a flow that is still running
+            try:
+                await page.close()
+                closed += 1
+            except Exception as e:
+                logging.warning(f"Failed to close leaked tab {page.url}: {e}")
+            self._first_seen.pop(page, None)
+        self.closed_tabs += closed
+        return closed
+
+    async def page_heaps(self) -> Dict[object, int]:
+        """JS heap in use per tracker page (bytes)."""
+        heaps = {}
+        for page in list(tracker_pages):
+            try:
+                heaps[page] = int(await asyncio.wait_for(
+                    page.evaluate("performance.memory.usedJSHeapSize"), timeout=5))
+            except Exception:
+                continue  # closed or busy navigating
+        return heaps
+
+    async def reload_bloated_pages(self, sample: MemorySample) -> int:
+        """Ask trackers to reload pages over the heap limit (never mid-rebalance)."""
+        heaps = await self.page_heaps()
+        rebalancing = set(await load_checkpoints_async())
+        heaps = {p: h for p, h in heaps.items() if tracker_pages.get(p) not in rebalancing}
+        bloated = [p for p, h in heaps.items() if h > config.MEMORY_PAGE_HEAP_LIMIT_MB * MB]
+        if not bloated and heaps and sample.largest_renderer > config.MEMORY_RENDERER_LIMIT_MB * MB:
+            bloated = [max(heaps, key=heaps.get)]
+        pages_to_reload.update(bloated)
+        self.reloaded_pages += len(bloated)
+        return len(bloated)
+
+    async def check(self) -> Optional[MemorySample]:
+        """Sample once and apply the next escalation step if over a limit."""
+        browser = self.bot.browser
+        if browser is None:
+            return None
+        self._note_pages(browser)
+        sample = self.sample()
+        self.last_sample = sample
+        if sample is None:
+            return None
+        if not self._over_limit(sample):
+            self.over_limit_checks = 0
+            return sample
+
+        self.over_limit_checks += 1
+        logging.warning(f"Memory over limit ({self.over_limit_checks}x): {sample.format()}")
+        closed = await self.close_leaked_tabs(browser)
+        reloads = await self.reload_bloated_pages(sample)
+        if closed or reloads:
+            logging.info(f"Memory governor closed {closed} leaked tab(s), queued {reloads} page reload(s)")
+
+        if sample.tree_rss > config.MEMORY_TREE_LIMIT_MB * MB and self.over_limit_checks >= config.MEMORY_RECYCLE_AFTER:
+            await self.recycle(sample)
+        return sample
+
+    async def recycle(self, sample: MemorySample) -> bool:
+        """Controlled context recycle through the watchdog's relaunch path."""
+        watchdog = getattr(self.bot, "watchdog", None)
+        if watchdog is None:
+            logging.warning("Memory still over limit but no browser watchdog to recycle the context")
+            return False
+        await self._notify(f"🧹 Recycling browser context: {sample.format()}")
+        ok = await watchdog.recover()
+        if ok:
+            self.recycles += 1
+            self.over_limit_checks = 0
+            self._first_seen.clear()
+        return ok
+
+    async def _notify(self, message: str) -> None:
+        print(message)
+        if self.notify_target is not None:
+            await notify_admins(self.notify_target, message)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(config.MEMORY_CHECK_INTERVAL)
+            try:
+                await self.check()
+            except Exception:
+                logging.exception("Memory governor check failed")
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import config
+from services.rpc_client import (
+    RpcError,
+    SELECTOR_SLOT0,
+    decode_int,
+    decode_words,
+    get_rpc_client,
+    pool_address_from_link,
+    position_id_from_link,
+)
+from utils.cl_math import sqrt_price_x96_to_price
+
+# Multicall3 is deployed at the same address on every EVM chain (including Sonic)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+SELECTOR_AGGREGATE3 = "0x82ad56cb"  # aggregate3((address,bool,bytes)[])
+SELECTOR_LIQUIDITY = "0x1a686502"   # liquidity()
+SELECTOR_POSITIONS = "0x99fbab88"   # positions(uint256)
+
+# Shadow's NonfungiblePositionManager.positions() layout:
+# (token0, token1, tickSpacing, tickLower, tickUpper, liquidity, feeGrowth0, feeGrowth1, owed0, owed1)
+POSITION_TICK_LOWER = 3
+POSITION_TICK_UPPER = 4
+POSITION_LIQUIDITY = 5
+
+# Seconds BatchedPoolReads waits for the other trackers' reads of the same tick
+BATCH_WINDOW = 0.25
+
+
+def _word(value: int) -> bytes:
+    return (value % (1 << 256)).to_bytes(32, "big")
+
+
+def _hex_bytes(data: str) -> bytes:
+    return bytes.fromhex(data[2:] if data.startswith("0x") else data)
+
+
+def encode_aggregate3(calls: List[Tuple[str, str]], allow_failure: bool = True) -> str:
+    """ABI-encode aggregate3 calldata for [(target, calldata), ...]."""
+    tuples = []
+    for target, data in calls:
+        payload = _hex_bytes(data)
+        padded = payload + b"\x00" * (-len(payload) % 32)
+        tuples.append(
+            _word(int(target, 16)) + _word(1 if allow_failure else 0) + _word(0x60)
+            + _word(len(payload)) + padded
+        )
+    # Array body: length, one offset per element (relative to the first offset), then the elements
+    offsets, position = [], 32 * len(tuples)
+    for encoded in tuples:
+        offsets.append(_word(position))
+        position += len(encoded)
+    body = _word(len(tuples)) + b"".join(offsets) + b"".join(tuples)
+    return SELECTOR_AGGREGATE3 + (_word(0x20) + body).hex()
+
+
+def decode_aggregate3(result: str) -> List[Tuple[bool, str]]:
+    """Decode aggregate3's (bool success, bytes returnData)[] into [(success, '0x...'), ...]."""
+    raw = _hex_bytes(result)
+    if len(raw) < 64:
+        raise RpcError("Malformed aggregate3 response")
+    array_start = int.from_bytes(raw[0:32], "big")
+    count = int.from_bytes(raw[array_start:array_start + 32], "big")
+    base = array_start + 32
+    decoded = []
+    for i in range(count):
+        start = base + int.from_bytes(raw[base + 32 * i:base + 32 * (i + 1)], "big")
+        success = int.from_bytes(raw[start:start + 32], "big") != 0
+        data_start = start + int.from_bytes(raw[start + 32:start + 64], "big")
+        length = int.from_bytes(raw[data_start:data_start + 32], "big")
+        decoded.append((success, "0x" + raw[data_start + 32:data_start + 32 + length].hex()))
+    return decoded
+
+
+class MulticallReader:
+    """Reads slot0, liquidity and position data for many pools in one round-trip per tick.
+
+    All calls are packed into Multicall3.aggregate3; when there are more than
+    MULTICALL_BATCH_SIZE calls the chunks go out together as one JSON-RPC batch, so a tick
+    is still a single HTTP request regardless of how many positions are tracked.
+    """
+
+    def __init__(self, client=None, price_source=None, batch_size: Optional[int] = None):
+        self._client = client
+        self.price_source = price_source  # RpcPriceSource, for cached decimals/symbols
+        self.batch_size = batch_size or config.MULTICALL_BATCH_SIZE
+        self.address = config.MULTICALL_ADDRESS or MULTICALL3_ADDRESS
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_rpc_client()
+        return self._client
+
+    async def aggregate(self, calls: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+        """Execute [(target, calldata), ...] and return [(success, returnData), ...] in order."""
+        if not calls:
+            return []
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        requests = [
+            ("eth_call", [{"to": self.address, "data": encode_aggregate3(chunk)}, "latest"])
+            for chunk in chunks
+        ]
+        if len(requests) == 1:
+            raw_results = [await self.client.call(*requests[0])]
+        else:
+            raw_results = await self.client.batch(requests)
+        results = []
+        for raw in raw_results:
+            results.extend(decode_aggregate3(raw))
+        return results
+
+    async def read_pools(
+        self,
+        pool_addresses: Iterable[str],
+        positions: Optional[Dict[int, str]] = None,
+        position_manager: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Read slot0 + liquidity for every pool, and positions(tokenId) where given.
+
+        `positions` maps NFT position id -> pool address, so several positions on one pool
+        are all read. Returns, per pool address: sqrt_price_x96, tick, liquidity and, under
+        'positions', position id -> tick_lower/tick_upper/position_liquidity. Pools whose
+        calls failed are reported with an 'error' key.
+        """
+        pool_addresses = list(dict.fromkeys(a.lower() for a in pool_addresses))
+        positions = positions or {}
+        position_manager = position_manager or config.POSITION_MANAGER_ADDRESS
+
+        calls: List[Tuple[str, str]] = []
+        layout: List[Tuple[str, str, Optional[int]]] = []
+        for address in pool_addresses:
+            calls.append((address, SELECTOR_SLOT0))
+            layout.append((address, "slot0", None))
+            calls.append((address, SELECTOR_LIQUIDITY))
+            layout.append((address, "liquidity", None))
+        if position_manager:
+            for token_id, address in positions.items():
+                address = address.lower()
+                if address not in pool_addresses:
+                    continue
+                calls.append((position_manager, SELECTOR_POSITIONS + _word(int(token_id)).hex()))
+                layout.append((address, "position", int(token_id)))
+
+        results = await self.aggregate(calls)
+        states: Dict[str, Dict[str, Any]] = {address: {} for address in pool_addresses}
+        for (address, kind, token_id), (success, data) in zip(layout, results):
+            state = states[address]
+            words = decode_words(data) if success else []
+            if not words:
+                state.setdefault("error", f"{kind} call failed")
+                continue
+            if kind == "slot0":
+                state["sqrt_price_x96"] = words[0]
+                state["tick"] = decode_int(words[1], 24)
+            elif kind == "liquidity":
+                state["liquidity"] = words[0]
+            elif len(words) > POSITION_LIQUIDITY:
+                state.setdefault("positions", {})[token_id] = {
+                    "tick_lower": decode_int(words[POSITION_TICK_LOWER], 24),
+                    "tick_upper": decode_int(words[POSITION_TICK_UPPER], 24),
+                    "position_liquidity": words[POSITION_LIQUIDITY],
+                }
+        return states
+
+    async def read_tracked_pools(self, pools) -> Dict[str, Dict[str, Any]]:
+        """Read every tracked Pool in one round-trip and add human prices.
+
+        Returns pool link -> state. Prices are of the pool's deposit token (pool.token) in the
+        other token, matching how the tracker shows the pool. A pool's own position (its
+        meta 'position_id', or the id at the end of its link) is merged into its state.
+        """
+        by_address: Dict[str, List[Any]] = {}
+        positions: Dict[int, str] = {}
+        for pool in pools:
+            address = pool_address_from_link(pool.link)
+            if not address:
+                continue
+            by_address.setdefault(address, []).append(pool)
+            position_id = _position_id(pool)
+            if position_id is not None:
+                positions[position_id] = address
+
+        states = await self.read_pools(by_address.keys(), positions)
+        metas: Dict[str, Dict[str, Any]] = {}
+        if self.price_source is not None:
+            priced = [address for address, state in states.items() if "sqrt_price_x96" in state]
+            try:
+                metas = await self.price_source.pool_metas(priced)
+            except (RpcError, IndexError, ValueError) as e:
+                logging.warning(f"Could not load token metadata for {len(priced)} pool(s): {e}")
+        tracked: Dict[str, Dict[str, Any]] = {}
+        for address, state in states.items():
+            meta = metas.get(address)
+            if meta is not None:
+                state["price0"] = sqrt_price_x96_to_price(state["sqrt_price_x96"], meta["decimals0"], meta["decimals1"])
+                state["symbols"] = (meta["symbol0"], meta["symbol1"])
+            pool_positions = state.pop("positions", {})
+            for pool in by_address[address]:
+                pool_state = dict(state)
+                pool_state.update(pool_positions.get(_position_id(pool), {}))
+                price0 = state.get("price0")
+                if price0:
+                    symbols = state.get("symbols", ("", ""))
+                    invert = pool.token.upper() == symbols[1].upper()
+                    pool_state["price"] = 1 / price0 if invert else price0
+                tracked[pool.link] = pool_state
+        return tracked
+
+
+def _position_id(pool) -> Optional[int]:
+    position_id = (pool.meta or {}).get("position_id")
+    if position_id is None:
+        return position_id_from_link(pool.link)
+    return int(position_id)
+
+
+async def read_tracked_pools_within(reader: MulticallReader, pools, deadline: float) -> Dict[str, Dict[str, Any]]:
+    """read_tracked_pools bounded by `deadline` seconds; returns {} when it does not finish in time."""
+    try:
+        return await asyncio.wait_for(reader.read_tracked_pools(pools), timeout=deadline)
+    except asyncio.TimeoutError:
+        logging.warning(f"Multicall read of {len(pools)} pools exceeded {deadline}s")
+    except RpcError as e:
+        logging.warning(f"Multicall read failed: {e}")
+    return {}
+
+
+class BatchedPoolReads:
+    """Coalesces the price reads of all trackers in one tick into a single Multicall read.
+
+    Every tracker (or shared price feed) asks for its own pool with `read(pool)`; the
+    first request of a tick waits BATCH_WINDOW seconds for the others, then one
+    read_tracked_pools call answers all of them. Since every tracker waits the same time
+    between checks, their reads keep landing in the same window.
+    """
+
+    def __init__(self, reader: MulticallReader, window: float = BATCH_WINDOW):
+        self.reader = reader
+        self.window = window
+        self.batches = 0
+        self._pending: Dict[str, Tuple[Any, asyncio.Future]] = {}  # pool link -> (pool, result)
+        self._collecting = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def read(self, pool) -> Dict[str, Any]:
+        """The pool's state from the next batched read ({} when the read failed)."""
+        entry = self._pending.get(pool.link)
+        if entry is None:
+            entry = self._pending[pool.link] = (pool, asyncio.get_running_loop().create_future())
+        if not self._collecting:
+            self._collecting = True
+            task = asyncio.create_task(self._read_batch())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(entry[1])
+
+    async def _read_batch(self) -> None:
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, {}
+        self._collecting = False  # requests from now on go into the next batch
+        try:
+            states = await read_tracked_pools_within(
+                self.reader, [pool for pool, _ in pending.values()], config.MULTICALL_DEADLINE)
+        except Exception as e:
+            logging.warning(f"Batched pool read failed: {e}")
+            states = {}
+        self.batches += 1
+        for link, (_, result) in pending.items():
+            if not result.done():
+                result.set_result(states.get(link, {}))
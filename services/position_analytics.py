@@ -0,0 +1,337 @@
+"""Per-position P&L, impermanent loss and time-in-range from the recorded history.
+
+Works on what the SQLite state backend keeps: price ticks (`price_ticks`) and position
+events (`rebalance_events` with stage "deposit", "withdraw" or "swap"). Each deposit opens
+a segment that the next withdrawal (or deposit) closes; the segment is modelled as a
+concentrated-liquidity position sized from the deposit, and compared against holding the
+deposited tokens. Prices are the tracked pool price (the deposit token priced in the other
+token), so values are in the other (quote) token.
+
+Ticks are cached per link as NumPy arrays and only new rows are read on later calls, so a
+report over months of history costs one indexed query for the tail plus array arithmetic.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import config
+from services.price_source import last_price
+from utils.cl_math import amounts_for_liquidity
+from utils.state import get_backend, record_rebalance_event
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+EVENT_DEPOSIT = "deposit"
+EVENT_WITHDRAW = "withdraw"
+EVENT_SWAP = "swap"
+POSITION_EVENTS = (EVENT_DEPOSIT, EVENT_WITHDRAW, EVENT_SWAP)
+
+
+def record_deposit(pool_link: str, amount: float, token_index: int,
+                   upper: Optional[float], lower: Optional[float]) -> None:
+    """Record a submitted deposit of `amount` of the pool's token `token_index` into [lower, upper]."""
+    if not pool_link or upper is None or lower is None:
+        return
+    price = last_price(pool_link) or math.sqrt(upper * lower)
+    record_rebalance_event(pool_link, EVENT_DEPOSIT, {
+        "amount": float(amount), "token_index": token_index, "upper": upper, "lower": lower, "price": price,
+    })
+
+
+def record_withdraw(pool_link: str, value: Optional[float] = None) -> None:
+    """Record a full withdrawal; `value` is the withdrawn value in the quote token, when known."""
+    data: Dict[str, Any] = {"price": last_price(pool_link)}
+    if value is not None:
+        data["value"] = value
+    record_rebalance_event(pool_link, EVENT_WITHDRAW, data)
+
+
+def record_swap(pool_link: str, tokens: List[str], amount: Any) -> None:
+    """Record the rebalancing swap of `amount` of tokens[0] into tokens[1]."""
+    try:
+        amount = float(str(amount).replace(",", "").strip())
+    except ValueError:
+        return
+    record_rebalance_event(pool_link, EVENT_SWAP, {
+        "tokens": list(tokens), "amount": amount, "price": last_price(pool_link),
+    })
+
+
+@dataclass
+class Segment:
+    """One deposit-to-withdrawal stretch of a position."""
+    start: float
+    lower: float
+    upper: float
+    liquidity: float
+    amount0: float  # tokens held at the deposit price (the HODL baseline)
+    amount1: float
+    deposit_value: float
+    end: Optional[float] = None
+    end_price: Optional[float] = None
+    withdrawn_value: Optional[float] = None
+
+
+@dataclass
+class PositionReport:
+    link: str
+    segments: int
+    open: bool
+    ticks: int
+    deposited: float = 0.0  # largest single deposit (capital at work)
+    value: float = 0.0  # LP value of the last segment, now (open) or at its withdrawal
+    hodl_value: float = 0.0
+    impermanent_loss: float = 0.0
+    worst_il_pct: float = 0.0
+    fees: Optional[float] = None  # only known when withdrawals recorded their value
+    swap_costs: float = 0.0
+    time_in_range_pct: Optional[float] = None
+    net_pnl: float = 0.0
+    swaps: int = 0
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def net_pct(self) -> float:
+        return self.net_pnl / self.deposited * 100 if self.deposited else 0.0
+
+    def format(self) -> str:
+        state = "open" if self.open else "closed"
+        in_range = "n/a" if self.time_in_range_pct is None else f"{self.time_in_range_pct:.1f}%"
+        fees = "n/a" if self.fees is None else f"{self.fees:+.4g}"
+        lines = [
+            f"📈 {self.link} ({state}, {self.segments} deposit(s), {self.swaps} swap(s))",
+            f"   Net P&L {self.net_pnl:+.4g} ({self.net_pct:+.2f}%) on {self.deposited:.4g} deposited",
+            f"   IL {self.impermanent_loss:+.4g} (worst {self.worst_il_pct:.2f}%) | fees {fees}"
+            f" | swap costs -{self.swap_costs:.4g}",
+            f"   Time in range {in_range} over {self.ticks} tick(s)",
+        ]
+        lines += [f"   ⚠️ {note}" for note in self.notes]
+        return "\n".join(lines)
+
+
+def _build_segment(ts: float, data: Dict[str, Any]) -> Optional[Segment]:
+    try:
+        lower, upper, price = float(data["lower"]), float(data["upper"]), float(data["price"])
+        amount = float(data["amount"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not 0 < lower < upper or price <= 0 or amount <= 0:
+        return None
+    # A base-token deposit is worth amount * price, a quote-token deposit its amount
+    value = amount * price if data.get("token_index", 0) == 0 else amount
+    unit0, unit1 = amounts_for_liquidity(price, lower, upper, 1.0)
+    liquidity = value / (unit0 * price + unit1)
+    amount0, amount1 = amounts_for_liquidity(price, lower, upper, liquidity)
+    return Segment(ts, lower, upper, liquidity, amount0, amount1, value)
+
+
+def build_segments(events: Iterable[Dict[str, Any]]) -> Tuple[List[Segment], List[Dict[str, Any]]]:
+    """Split a link's events (ordered by time) into deposit segments; also returns its swaps."""
+    segments: List[Segment] = []
+    swaps: List[Dict[str, Any]] = []
+    current: Optional[Segment] = None
+    for event in events:
+        stage, data, ts = event["stage"], event.get("data") or {}, event["ts"]
+        if stage == EVENT_DEPOSIT:
+            segment = _build_segment(ts, data)
+            if segment is None:
+                continue
+            if current is not None and current.end is None:
+                current.end = ts
+            segments.append(segment)
+            current = segment
+        elif stage == EVENT_WITHDRAW and current is not None and current.end is None:
+            current.end = ts
+            current.end_price = data.get("price")
+            current.withdrawn_value = data.get("value")
+        elif stage == EVENT_SWAP:
+            swaps.append({"ts": ts, **data})
+    return segments, swaps
+
+
+def lp_values(prices, lower: float, upper: float, liquidity: float):
+    """Value (in the quote token) of `liquidity` in [lower, upper] at each price."""
+    sa, sb = math.sqrt(lower), math.sqrt(upper)
+    if np is not None:
+        p = np.asarray(prices, dtype=float)
+        sp = np.clip(np.sqrt(p), sa, sb)
+        return liquidity * (sb - sp) / (sp * sb) * p + liquidity * (sp - sa)
+    values = []
+    for price in prices:
+        a0, a1 = amounts_for_liquidity(price, lower, upper, liquidity)
+        values.append(a0 * price + a1)
+    return values
+
+
+def segment_stats(ts, prices, segment: Segment, now: float) -> Dict[str, float]:
+    """Time in range and IL series of one segment over the ticks inside it.
+
+    Each tick is weighted by how long it held (until the next tick or the segment end).
+    """
+    end = segment.end if segment.end is not None else now
+    if np is not None:
+        ts, prices = np.asarray(ts, dtype=float), np.asarray(prices, dtype=float)
+        lo, hi = np.searchsorted(ts, segment.start, "left"), np.searchsorted(ts, end, "right")
+        t, p = ts[lo:hi], prices[lo:hi]
+        if not len(t):
+            return {"ticks": 0, "in_range_s": 0.0, "total_s": 0.0, "worst_il_pct": 0.0, "last_price": None}
+        weights = np.diff(np.append(t, end))
+        in_range = (p >= segment.lower) & (p < segment.upper)
+        lp = lp_values(p, segment.lower, segment.upper, segment.liquidity)
+        hodl = segment.amount0 * p + segment.amount1
+        return {
+            "ticks": int(len(t)),
+            "in_range_s": float(weights[in_range].sum()),
+            "total_s": float(weights.sum()),
+            "worst_il_pct": float(((lp - hodl) / hodl).min() * 100),
+            "last_price": float(p[-1]),
+        }
+    points = [(t, p) for t, p in zip(ts, prices) if segment.start <= t <= end]
+    if not points:
+        return {"ticks": 0, "in_range_s": 0.0, "total_s": 0.0, "worst_il_pct": 0.0, "last_price": None}
+    in_range_s = total_s = 0.0
+    worst = 0.0
+    lp = lp_values([p for _, p in points], segment.lower, segment.upper, segment.liquidity)
+    for i, (t, p) in enumerate(points):
+        weight = (points[i + 1][0] if i + 1 < len(points) else end) - t
+        total_s += weight
+        if segment.lower <= p < segment.upper:
+            in_range_s += weight
+        hodl = segment.amount0 * p + segment.amount1
+        worst = min(worst, (lp[i] - hodl) / hodl * 100)
+    return {"ticks": len(points), "in_range_s": in_range_s, "total_s": total_s,
+            "worst_il_pct": worst, "last_price": points[-1][1]}
+
+
+def position_report(link: str, events: List[Dict[str, Any]], ts, prices,
+                    now: Optional[float] = None, swap_fee_pct: Optional[float] = None) -> Optional[PositionReport]:
+    """P&L of one position from its events and price ticks (None without a usable deposit)."""
+    now = time.time() if now is None else now
+    swap_fee_pct = config.ANALYTICS_SWAP_FEE_PCT if swap_fee_pct is None else swap_fee_pct
+    segments, swaps = build_segments(events)
+    if not segments:
+        return None
+    report = PositionReport(link=link, segments=len(segments), open=segments[-1].end is None,
+                            ticks=0, swaps=len(swaps))
+    in_range_s = total_s = 0.0
+    fees = 0.0
+    fees_known = True
+    gain = 0.0
+    for segment in segments:
+        stats = segment_stats(ts, prices, segment, now)
+        report.ticks += stats["ticks"]
+        in_range_s += stats["in_range_s"]
+        total_s += stats["total_s"]
+        report.worst_il_pct = min(report.worst_il_pct, stats["worst_il_pct"])
+
+        price = segment.end_price or stats["last_price"]
+        if price is None:
+            price = math.sqrt(segment.lower * segment.upper)
+            report.notes.append("no price recorded for a segment, valued at its range midpoint")
+        lp_value = float(lp_values([price], segment.lower, segment.upper, segment.liquidity)[0])
+        hodl_value = segment.amount0 * price + segment.amount1
+        report.deposited = max(report.deposited, segment.deposit_value)
+        gain += lp_value - segment.deposit_value
+        report.value = lp_value
+        report.hodl_value = hodl_value
+        report.impermanent_loss += lp_value - hodl_value
+        if segment.withdrawn_value is not None:
+            fees += max(0.0, float(segment.withdrawn_value) - lp_value)
+        else:
+            fees_known = False
+
+    for swap in swaps:
+        price = swap.get("price") or 1.0
+        report.swap_costs += float(swap.get("amount") or 0) * price * swap_fee_pct / 100
+    report.fees = fees if fees_known else None
+    report.time_in_range_pct = in_range_s / total_s * 100 if total_s else None
+    # Every rebalance redeposits the configured amount, so gains add up per segment
+    report.net_pnl = gain + (report.fees or 0.0) - report.swap_costs
+    return report
+
+
+class PositionAnalytics:
+    """Incrementally cached history and P&L reports for all positions with events.
+
+    The first report for a link loads its ticks once; later reports only read rows newer
+    than the cached tail, so repeated /pnl calls stay fast however long the history is.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._ticks: Dict[str, Tuple[Any, Any]] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._seen = set()
+        self._events_since = 0.0
+
+    @property
+    def backend(self):
+        return self._backend or get_backend()
+
+    def _sync_events(self) -> None:
+        events = self.backend.rebalance_events(since=self._events_since)
+        for event in events:
+            key = (event["link"], event["ts"], event["stage"])
+            if event["stage"] not in POSITION_EVENTS or key in self._seen:
+                continue
+            self._seen.add(key)
+            self._events.setdefault(event["link"], []).append(event)
+        if events:
+            # Re-read the last timestamp next time, events there may still be arriving
+            self._events_since = events[-1]["ts"]
+
+    def _sync_ticks(self, link: str) -> Tuple[Any, Any]:
+        ts, prices = self._ticks.get(link, ([], []))
+        since = float(ts[-1]) if len(ts) else 0.0
+        rows = [r for r in self.backend.price_history(link, since=since) if r["ts"] > since]
+        if rows:
+            new_ts = [r["ts"] for r in rows]
+            new_prices = [r["price"] for r in rows]
+            if np is not None:
+                ts = np.concatenate([np.asarray(ts, dtype=float), np.asarray(new_ts, dtype=float)])
+                prices = np.concatenate([np.asarray(prices, dtype=float), np.asarray(new_prices, dtype=float)])
+            else:
+                ts, prices = list(ts) + new_ts, list(prices) + new_prices
+        elif np is not None and not len(ts):
+            ts, prices = np.empty(0), np.empty(0)
+        self._ticks[link] = (ts, prices)
+        return ts, prices
+
+    def reports(self, link: Optional[str] = None, now: Optional[float] = None) -> List[PositionReport]:
+        """Reports for `link` (or every position with a recorded deposit), newest activity first."""
+        with self._lock:
+            self._sync_events()
+            links = [link] if link else list(self._events)
+            reports = []
+            for item in links:
+                events = self._events.get(item)
+                if not events:
+                    continue
+                ts, prices = self._sync_ticks(item)
+                report = position_report(item, events, ts, prices, now=now)
+                if report is not None:
+                    reports.append(report)
+            last_event = {item: self._events[item][-1]["ts"] for item in links if self._events.get(item)}
+            reports.sort(key=lambda r: last_event.get(r.link, 0), reverse=True)
+            return reports
+
+
+analytics = PositionAnalytics()
+
+
+def format_reports(reports: List[PositionReport]) -> str:
+    if not reports:
+        return "No deposits recorded yet. P&L starts with the next /add or rebalance."
+    total = sum(r.net_pnl for r in reports)
+    deposited = sum(r.deposited for r in reports)
+    pct = total / deposited * 100 if deposited else 0.0
+    lines = [r.format() for r in reports]
+    lines.append(f"Σ Net P&L {total:+.4g} ({pct:+.2f}%) across {len(reports)} position(s)")
+    return "\n\n".join(lines)
@@ -0,0 +1,174 @@
+"""User-defined price alerts: "tell me when this pool crosses 0.82".
+
+Alerts are kept per pool in a list sorted by trigger price, and per chat for /alert list
+and /alert rm. Each price tick (from the event bus) looks up the alerts between the
+previous and the current price of its pool, so a tick costs O(log n + k) for k crossed
+alerts no matter how many alerts exist. An alert fires once and is then removed.
+"""
+
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sortedcontainers import SortedKeyList
+
+from config import config
+from utils.event_bus import POLICY_LATEST, PriceTick, bus
+from utils.message_queue import outbox
+from utils.state import delete_alert, load_alerts, load_alerts_async, save_alert
+from services.price_source import last_price
+
+ALERT_USAGE = ("Usage:\n"
+               "/alert add [pool_link] [price] — notify when a tracked pool's price crosses it\n"
+               "/alert list — your alerts\n"
+               "/alert rm [id] — remove an alert")
+
+
+@dataclass
+class PriceAlert:
+    id: int
+    chat_id: int
+    link: str
+    price: float
+    created_at: float = field(default_factory=time.time)
+
+    def format(self, current: Optional[float] = None) -> str:
+        line = f"#{self.id} {self.link} crosses {self.price:g}"
+        if current is not None:
+            line += f" (now {current:.6g})"
+        return line
+
+
+class AlertBook:
+    """Alerts indexed by pool (sorted by price) and by chat."""
+
+    def __init__(self):
+        self._by_pool: Dict[str, SortedKeyList] = {}
+        self._by_chat: Dict[int, Dict[int, PriceAlert]] = {}
+        self._last: Dict[str, float] = {}  # last price seen per pool, the start of the next crossing
+
+    def __len__(self) -> int:
+        return sum(len(alerts) for alerts in self._by_chat.values())
+
+    def add(self, alert: PriceAlert) -> None:
+        self._by_pool.setdefault(alert.link, SortedKeyList(key=lambda a: a.price)).add(alert)
+        self._by_chat.setdefault(alert.chat_id, {})[alert.id] = alert
+
+    def remove(self, alert: PriceAlert) -> None:
+        alerts = self._by_pool.get(alert.link)
+        if alerts is not None:
+            alerts.discard(alert)
+            if not alerts:
+                del self._by_pool[alert.link]
+        chat = self._by_chat.get(alert.chat_id, {})
+        chat.pop(alert.id, None)
+        if not chat:
+            self._by_chat.pop(alert.chat_id, None)
+
+    def get(self, chat_id: int, alert_id: int) -> Optional[PriceAlert]:
+        return self._by_chat.get(chat_id, {}).get(alert_id)
+
+    def for_chat(self, chat_id: int) -> List[PriceAlert]:
+        return sorted(self._by_chat.get(chat_id, {}).values(), key=lambda a: a.id)
+
+    def seen(self, link: str, price: float) -> None:
+        """Set the reference price of `link` without firing anything."""
+        self._last.setdefault(link, price)
+
+    def crossed(self, link: str, price: float) -> List[PriceAlert]:
+        """Alerts of `link` whose price lies between the previous tick and `price` (removed)."""
+        previous = self._last.get(link)
+        self._last[link] = price
+        alerts = self._by_pool.get(link)
+        if previous is None or alerts is None or previous == price:
+            return []
+        if price > previous:  # moved up: previous < alert <= price
+            hits = list(alerts.irange_key(previous, price, inclusive=(False, True)))
+        else:  # moved down: price <= alert < previous
+            hits = list(alerts.irange_key(price, previous, inclusive=(True, False)))
+        for alert in hits:
+            self.remove(alert)
+        return hits
+
+
+class PriceAlerts:
+    """The alerts of all chats, persisted through utils.state and fed by PriceTick events."""
+
+    def __init__(self):
+        self.book = AlertBook()
+        self.bot = None
+        self.fired = 0
+        self._next_id = 1
+        self._subscription = None
+
+    def load(self) -> int:
+        return self._restore(load_alerts())
+
+    async def load_async(self) -> int:
+        """load for code on the event loop: never blocks it on the database."""
+        return self._restore(await load_alerts_async())
+
+    def _restore(self, rows: List[Dict[str, Any]]) -> int:
+        self.book = AlertBook()
+        for row in rows:
+            try:
+                alert = PriceAlert(**row)
+            except TypeError:
+                logging.warning(f"Skipping malformed price alert: {row}")
+                continue
+            self.book.add(alert)
+            self._next_id = max(self._next_id, alert.id + 1)
+        return len(self.book)
+
+    async def start(self, bot) -> None:
+        """Load the stored alerts and start checking price ticks; `bot` sends the notifications."""
+        self.bot = bot
+        await self.load_async()
+        if self._subscription is None or self._subscription.closed:
+            self._subscription = bus.consume(self.on_tick, PriceTick, name="price alerts", policy=POLICY_LATEST)
+
+    def add(self, chat_id: int, link: str, price: float) -> PriceAlert:
+        """Add an alert; raises ValueError for a bad price or a full chat."""
+        if price <= 0:
+            raise ValueError("price must be positive")
+        if config.ALERTS_MAX_PER_CHAT > 0 and len(self.book.for_chat(chat_id)) >= config.ALERTS_MAX_PER_CHAT:
+            raise ValueError(f"at most {config.ALERTS_MAX_PER_CHAT} alerts per chat")
+        alert = PriceAlert(id=self._next_id, chat_id=chat_id, link=link, price=price)
+        self._next_id += 1
+        current = last_price(link)
+        if current is not None:
+            self.book.seen(link, current)
+        self.book.add(alert)
+        save_alert(asdict(alert))
+        return alert
+
+    def remove(self, chat_id: int, alert_id: int) -> bool:
+        alert = self.book.get(chat_id, alert_id)
+        if alert is None:
+            return False
+        self.book.remove(alert)
+        delete_alert(alert.id)
+        return True
+
+    def list(self, chat_id: int) -> List[PriceAlert]:
+        return self.book.for_chat(chat_id)
+
+    def on_tick(self, event: PriceTick) -> None:
+        for alert in self.book.crossed(event.link, event.price):
+            self.fired += 1
+            delete_alert(alert.id)
+            if self.bot is not None:
+                outbox.send(self.bot, alert.chat_id,
+                            f"🔔 Price alert #{alert.id}: {event.price:.6g} crossed {alert.price:g}\n{alert.link}")
+
+    def format(self, chat_id: int) -> str:
+        alerts = self.list(chat_id)
+        if not alerts:
+            return "No price alerts. Add one with /alert add [pool_link] [price]."
+        lines = [f"🔔 Price alerts ({len(alerts)}):"]
+        lines += [alert.format(last_price(alert.link)) for alert in alerts]
+        return "\n".join(lines)
+
+
+price_alerts = PriceAlerts()
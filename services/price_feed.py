@@ -0,0 +1,196 @@
+"""One price reader per pool contract, shared by every position on that pool.
+
+Each tracker subscribes with its pool link and the token its page shows first:
+
+    subscription = price_feed.subscribe(pool_link, token, base_symbol, reader, page)
+    price = await subscription.next()
+
+Positions on the same contract (different ranges or owners) share one feed: a single
+page and a single price read per check, fanned out to all subscribers. The first
+subscriber donates its already-open manage page; later subscribers close theirs, so
+the number of tracker tabs follows the number of unique pools. The feed reads through
+the `reader` of its oldest subscriber (a `Shadow`: open_price_page, read_price,
+close_price_page, _wait_for_next_check) and moves on to the next one when it leaves.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from config import config
+from services.price_source import record_price
+from services.rpc_client import pool_address_from_link
+
+# Seconds before a failed read (closed page, navigation error) is retried on a fresh page
+RETRY_DELAY = 5.0
+
+
+def feed_key(link: str, token: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Feeds are per contract and displayed token (the page shows the price in either direction)."""
+    contract = pool_address_from_link(link)
+    if contract is None:
+        return None
+    return (contract, (token or "").upper())
+
+
+class PriceSubscription:
+    """A position's view of its pool's feed: `next()` waits for the next price."""
+
+    def __init__(self, feed: "PairFeed", link: str, reader: Any):
+        self.feed = feed
+        self.link = link
+        self.reader = reader
+        self._seen = feed.seq
+
+    @property
+    def page(self):
+        """The feed's reader page (never close it; the feed owns it)."""
+        return self.feed.page
+
+    @property
+    def price(self) -> Optional[float]:
+        return self.feed.price
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[float]:
+        """The first price published after the previous call; None on timeout or a failed read."""
+        async with self.feed.updated:
+            try:
+                await asyncio.wait_for(self.feed.updated.wait_for(lambda: self.feed.seq != self._seen), timeout)
+            except asyncio.TimeoutError:
+                return None
+            self._seen = self.feed.seq
+            return self.feed.price
+
+
+class PairFeed:
+    """The shared reader of one (contract, displayed token)."""
+
+    def __init__(self, key: Tuple[str, str], token: Optional[str], base_symbol: Optional[str]):
+        self.key = key
+        self.token = token
+        self.base_symbol = base_symbol
+        self.subscribers: Dict[str, PriceSubscription] = {}  # pool link -> subscription, oldest first
+        self.page = None
+        self.price: Optional[float] = None
+        self.seq = 0
+        self.reads = 0
+        self.updated = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def leader(self) -> Optional[PriceSubscription]:
+        return next(iter(self.subscribers.values()), None)
+
+    async def _publish(self, price: Optional[float]) -> None:
+        if price is not None:
+            for link in list(self.subscribers):
+                record_price(link, price)
+        async with self.updated:
+            self.price = price
+            self.seq += 1
+            self.updated.notify_all()
+
+    async def _ensure_page(self, leader: PriceSubscription):
+        if self.page is None or self.page.is_closed():
+            self.page = await leader.reader.open_price_page(leader.link, self.token)
+        return self.page
+
+    async def _close_page(self, leader: Optional[PriceSubscription]) -> None:
+        page, self.page = self.page, None
+        if page is None:
+            return
+        try:
+            if leader is not None:
+                await leader.reader.close_price_page(page)
+            else:
+                await page.close()
+        except Exception:
+            pass
+
+    async def run(self) -> None:
+        while self.subscribers:
+            leader = self.leader
+            try:
+                page = await self._ensure_page(leader)
+                price = await leader.reader.read_price(page, leader.link, self.token, self.base_symbol)
+                self.reads += 1
+                await self._publish(price)
+                await leader.reader._wait_for_next_check(leader.link)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Shared price read for {self.key[0]} failed: {str(e)[:100]}")
+                await self._close_page(leader)
+                await self._publish(None)
+                await asyncio.sleep(RETRY_DELAY)
+
+
+class PriceFeed:
+    """Registry of the shared pool feeds."""
+
+    def __init__(self):
+        self._feeds: Dict[Tuple[str, str], PairFeed] = {}
+
+    def subscribe(self, link: str, token: Optional[str], base_symbol: Optional[str], reader: Any,
+                  page=None) -> Optional[PriceSubscription]:
+        """Subscribe `link` to its pool's feed; None when it cannot be shared (no contract in the link).
+
+        `page` is the tracker's open manage page: the feed adopts it when it has no page of
+        its own, otherwise the caller should close it (see `owns`).
+        """
+        if not config.PRICE_FEED_SHARED:
+            return None
+        key = feed_key(link, token)
+        if key is None:
+            return None
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = PairFeed(key, token, base_symbol)
+        subscription = PriceSubscription(feed, link, reader)
+        feed.subscribers.pop(link, None)  # a restarted tracker replaces its old subscription
+        feed.subscribers[link] = subscription
+        if feed.page is None and page is not None and not page.is_closed():
+            feed.page = page
+        if feed.task is None or feed.task.done():
+            feed.task = asyncio.create_task(feed.run())
+        return subscription
+
+    def owns(self, page) -> bool:
+        return page is not None and any(feed.page is page for feed in self._feeds.values())
+
+    async def unsubscribe(self, subscription: Optional[PriceSubscription]) -> None:
+        """Leave the feed; the last subscriber to leave stops it and closes its page."""
+        if subscription is None:
+            return
+        feed = subscription.feed
+        if feed.subscribers.get(subscription.link) is not subscription:
+            return
+        del feed.subscribers[subscription.link]
+        if feed.subscribers:
+            return
+        if self._feeds.get(feed.key) is feed:
+            del self._feeds[feed.key]
+        if feed.task is not None and feed.task is not asyncio.current_task() and not feed.task.done():
+            feed.task.cancel()
+            try:
+                await feed.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await feed._close_page(subscription)
+
+    def feeds(self):
+        return list(self._feeds.values())
+
+    def format(self) -> str:
+        if not self._feeds:
+            return "No shared price feeds."
+        positions = sum(len(feed.subscribers) for feed in self._feeds.values())
+        lines = [f"📡 Price feeds: {len(self._feeds)} pool(s) for {positions} position(s)"]
+        for feed in self._feeds.values():
+            price = f"{feed.price:.6g}" if feed.price is not None else "-"
+            lines.append(f"   {feed.key[0]} ({feed.key[1] or '?'}): {len(feed.subscribers)} position(s), "
+                         f"price {price}, {feed.reads} read(s)")
+        return "\n".join(lines)
+
+
+price_feed = PriceFeed()
@@ -0,0 +1,188 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import config
+from models.pool import Pool
+from services.multicall import BatchedPoolReads, MulticallReader
+from services.rpc_client import (
+    RpcError,
+    SELECTOR_DECIMALS,
+    SELECTOR_SLOT0,
+    SELECTOR_SYMBOL,
+    SELECTOR_TOKEN0,
+    SELECTOR_TOKEN1,
+    decode_address,
+    decode_string,
+    decode_words,
+    get_rpc_client,
+    pool_address_from_link,
+)
+from utils.cl_math import sqrt_price_x96_to_price
+from utils.event_bus import PriceTick, bus
+from utils.state import record_price_tick
+
+PRICE_BADGE_SELECTOR = '[class="absolute left-0 top-1/2 flex -translate-y-1/2 touch-none items-center rounded-full px-3 py-1 text-xs max-md:rounded-l-none max-md:pl-1.5 md:-translate-x-1/2 md:text-base  bg-muted"]'
+
+
+class PriceSource:
+    """Common interface behind Shadow.current_price_monitor."""
+
+    name = "base"
+
+    async def get_price(self, page, pool_link: Optional[str] = None, base_symbol: Optional[str] = None) -> Optional[float]:
+        """Return the pool's current price (of `base_symbol` in the other token), or None."""
+        raise NotImplementedError
+
+
+class BrowserPriceSource(PriceSource):
+    """Scrapes the current-price badge from the open pool page."""
+
+    name = "browser"
+
+    async def get_price(self, page, pool_link=None, base_symbol=None):
+        try:
+            current_price_text = await page.locator(PRICE_BADGE_SELECTOR).text_content()
+            return float(current_price_text.replace('$', '').replace(',', '').strip())
+        except (ValueError, AttributeError):
+            return None
+        except Exception:
+            return None
+
+
+class RpcPriceSource(PriceSource):
+    """Reads slot0() of the pool contract over JSON-RPC.
+
+    Token addresses, decimals and symbols are fetched once per pool (one batch request) and
+    cached; after that every read is a single eth_call on the shared keep-alive session.
+    Falls back to `fallback` (normally the browser badge) when the link has no pool address
+    or the RPC call fails. With a `batch` reader, the reads of all trackers in the same
+    tick go out together as one Multicall request instead.
+    """
+
+    name = "rpc"
+
+    def __init__(self, client=None, fallback: Optional[PriceSource] = None, batch=None):
+        self._client = client
+        self.fallback = fallback
+        self.batch = batch  # BatchedPoolReads: one Multicall read per tick for all trackers
+        self._pool_meta: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_rpc_client()
+        return self._client
+
+    async def pool_meta(self, pool_address: str) -> Dict[str, Any]:
+        return (await self.pool_metas([pool_address]))[pool_address]
+
+    async def pool_metas(self, pool_addresses: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Token metadata of every pool; the ones not cached yet are fetched in two batch requests together."""
+        missing = [a for a in dict.fromkeys(pool_addresses) if a not in self._pool_meta]
+        if missing:
+            token_raw = await self.client.batch([
+                ("eth_call", [{"to": address, "data": selector}, "latest"])
+                for address in missing for selector in (SELECTOR_TOKEN0, SELECTOR_TOKEN1)
+            ])
+            tokens = [decode_address(decode_words(raw)[0]) for raw in token_raw]
+            info_raw = await self.client.batch([
+                ("eth_call", [{"to": token, "data": selector}, "latest"])
+                for token in tokens for selector in (SELECTOR_DECIMALS, SELECTOR_SYMBOL)
+            ])
+            for i, address in enumerate(missing):
+                dec0, sym0, dec1, sym1 = info_raw[4 * i:4 * i + 4]
+                self._pool_meta[address] = {
+                    "token0": tokens[2 * i],
+                    "token1": tokens[2 * i + 1],
+                    "decimals0": decode_words(dec0)[0],
+                    "decimals1": decode_words(dec1)[0],
+                    "symbol0": decode_string(sym0),
+                    "symbol1": decode_string(sym1),
+                }
+        return {address: self._pool_meta[address] for address in pool_addresses}
+
+    async def read_price(self, pool_address: str, base_symbol: Optional[str] = None) -> float:
+        """Price of token0 in token1 (or of `base_symbol` when it is token1). Raises RpcError."""
+        meta = await self.pool_meta(pool_address)
+        words = decode_words(await self.client.eth_call(pool_address, SELECTOR_SLOT0))
+        if not words:
+            raise RpcError(f"Empty slot0 response for {pool_address}")
+        price = sqrt_price_x96_to_price(words[0], meta["decimals0"], meta["decimals1"])
+        if base_symbol and base_symbol.upper() == meta["symbol1"].upper() and price > 0:
+            price = 1 / price
+        return price
+
+    async def get_price(self, page, pool_link=None, base_symbol=None):
+        pool_address = pool_address_from_link(pool_link) if pool_link else None
+        if pool_address and self.batch is not None:
+            state = await self.batch.read(Pool(link=pool_link, range="", token=base_symbol or "", amount=0))
+            if state.get("symbols"):
+                record_pair(pool_link, *state["symbols"])
+            if state.get("price"):
+                return state["price"]
+        elif pool_address:
+            try:
+                return await self.read_price(pool_address, base_symbol)
+            except (RpcError, IndexError, ValueError) as e:
+                logging.warning(f"RPC price read failed for {pool_address}: {e}")
+        if self.fallback is not None:
+            return await self.fallback.get_price(page, pool_link, base_symbol)
+        return None
+
+
+# Last price seen per pool link, so status can be computed without visiting the page
+_last_prices: Dict[str, Tuple[float, float]] = {}
+
+
+def record_price(pool_link: str, price: float) -> None:
+    now = time.time()
+    _last_prices[pool_link] = (price, now)
+    record_price_tick(pool_link, price)
+    bus.publish(PriceTick(pool_link, price, now))
+
+
+def last_price(pool_link: str, max_age: Optional[float] = None) -> Optional[float]:
+    """Most recent price recorded for `pool_link`, or None if unknown (or older than max_age seconds)."""
+    entry = _last_prices.get(pool_link)
+    if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+        return None
+    return entry[0]
+
+
+# Token symbols of each pool's pair, as shown on its page or read on-chain
+_pairs: Dict[str, Tuple[str, str]] = {}
+
+
+def record_pair(pool_link: str, token0: str, token1: str) -> None:
+    _pairs[pool_link] = (token0, token1)
+
+
+def pair_labels(pool_link: str, base: Optional[str] = None) -> Tuple[str, str]:
+    """(base, quote) symbols of `pool_link`: `base` first, the other token of the pair second."""
+    pair = _pairs.get(pool_link)
+    if pair is None:
+        return (base or "token0", "token1")
+    if base and base.upper() in (pair[0].upper(), pair[1].upper()):
+        quote = pair[1] if pair[0].upper() == base.upper() else pair[0]
+        return (base, quote)
+    return pair
+
+
+# One batched reader for every tracker, so a tick costs one Multicall request in total
+_pool_reads: Optional[BatchedPoolReads] = None
+
+
+def get_pool_reads() -> BatchedPoolReads:
+    global _pool_reads
+    if _pool_reads is None:
+        _pool_reads = BatchedPoolReads(MulticallReader(price_source=RpcPriceSource()))
+    return _pool_reads
+
+
+def get_price_source() -> PriceSource:
+    """Build the price source selected by config.PRICE_SOURCE ('browser' or 'rpc')."""
+    browser_source = BrowserPriceSource()
+    if config.PRICE_SOURCE == "rpc" and config.RPC_URL:
+        return RpcPriceSource(fallback=browser_source, batch=get_pool_reads())
+    return browser_source
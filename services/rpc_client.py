@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from config import config
+
+if TYPE_CHECKING:
+    import aiohttp  # imported on first request; keeps bot startup fast
+
+# Function selectors used by the price/position readers
+SELECTOR_SLOT0 = "0x3850c7bd"      # slot0()
+SELECTOR_TOKEN0 = "0x0dfe1681"     # token0()
+SELECTOR_TOKEN1 = "0xd21220a7"     # token1()
+SELECTOR_DECIMALS = "0x313ce567"   # decimals()
+SELECTOR_SYMBOL = "0x95d89b41"     # symbol()
+
+
+class RpcError(Exception):
+    """Raised when the RPC endpoint returns an error or an unusable response."""
+
+
+class RpcClient:
+    """Minimal async JSON-RPC client over one shared, keep-alive aiohttp session.
+
+    The session (and its connection pool) is created lazily on first use and reused
+    for every call, so a price read costs a single pooled HTTP round-trip.
+    """
+
+    def __init__(self, url: str, timeout: Optional[float] = None, pool_size: Optional[int] = None):
+        self.url = url
+        self.timeout = timeout if timeout is not None else config.RPC_TIMEOUT
+        self.pool_size = pool_size if pool_size is not None else config.RPC_POOL_SIZE
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._ids = itertools.count(1)
+        self.request_count = 0
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Content-Type": "application/json"},
+            )
+        return self._session
+
+    async def _post(self, payload: Any) -> Any:
+        import aiohttp
+
+        session = await self._get_session()
+        self.request_count += 1
+        try:
+            async with session.post(self.url, json=payload) as resp:
+                if resp.status != 200:
+                    raise RpcError(f"HTTP {resp.status} from {self.url}")
+                return await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise RpcError(f"RPC request failed: {e}") from e
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        """Send one JSON-RPC request and return its result."""
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+        data = await self._post(payload)
+        if "error" in data:
+            raise RpcError(f"{method} failed: {data['error']}")
+        return data.get("result")
+
+    async def batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """Send several requests in one JSON-RPC batch. Results are returned in call order."""
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        data = await self._post(payload)
+        if not isinstance(data, list):
+            raise RpcError(f"Batch request failed: {data}")
+        by_id: Dict[int, Any] = {item.get("id"): item for item in data}
+        results = []
+        for request in payload:
+            item = by_id.get(request["id"])
+            if item is None or "error" in item:
+                raise RpcError(f"{request['method']} failed: {item.get('error') if item else 'no response'}")
+            results.append(item.get("result"))
+        return results
+
+    async def eth_call(self, to: str, data: str, block: str = "latest") -> str:
+        return await self.call("eth_call", [{"to": to, "data": data}, block])
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def decode_words(result: str) -> List[int]:
+    """Split ABI-encoded return data into 32-byte words (as unsigned ints)."""
+    raw = result[2:] if result.startswith("0x") else result
+    return [int(raw[i:i + 64], 16) for i in range(0, len(raw) - len(raw) % 64, 64)]
+
+
+def decode_int(word: int, bits: int = 256) -> int:
+    """Interpret an ABI word as a signed intN."""
+    word &= (1 << bits) - 1
+    return word - (1 << bits) if word >> (bits - 1) else word
+
+
+def decode_address(word: int) -> str:
+    return "0x" + format(word & ((1 << 160) - 1), "040x")
+
+
+def decode_string(result: str) -> str:
+    """Decode an ABI string return value (falls back to bytes32 for old tokens)."""
+    raw = bytes.fromhex(result[2:] if result.startswith("0x") else result)
+    if len(raw) >= 64:
+        offset = int.from_bytes(raw[:32], "big")
+        if offset + 32 <= len(raw):
+            length = int.from_bytes(raw[offset:offset + 32], "big")
+            return raw[offset + 32:offset + 32 + length].decode("utf-8", "replace")
+    return raw.rstrip(b"\x00").decode("utf-8", "replace")
+
+
+def pool_address_from_link(pool_link: str) -> Optional[str]:
+    """Return the pool contract address in a Shadow pool link (.../0x<pool>/<position id>), if there is one."""
+    for part in pool_link.split("?")[0].rstrip("/").split("/"):
+        if part.startswith("0x") and len(part) == 42:
+            try:
+                int(part, 16)
+                return part.lower()
+            except ValueError:
+                return None
+    return None
+
+
+def position_id_from_link(pool_link: str) -> Optional[int]:
+    """Return the NFT position id at the end of a Shadow pool link, if there is one."""
+    tail = pool_link.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def position_meta(pool_link: str) -> Dict[str, Any]:
+    """Initial Pool.meta of a new position: its NFT id, when the link has one."""
+    position_id = position_id_from_link(pool_link)
+    return {} if position_id is None else {"position_id": position_id}
+
+
+_clients: Dict[str, RpcClient] = {}
+
+
+def get_rpc_client(url: Optional[str] = None) -> RpcClient:
+    """Return the shared client for `url` (default: config.RPC_URL)."""
+    url = url or config.RPC_URL
+    if not url:
+        raise RpcError("RPC_URL is not configured")
+    client = _clients.get(url)
+    if client is None:
+        client = _clients[url] = RpcClient(url)
+        logging.info(f"RPC client created for {url}")
+    return client
+
+
+async def close_rpc_clients() -> None:
+    for client in list(_clients.values()):
+        await client.close()
+    _clients.clear()
@@ -2,11 +2,13 @@ import asyncio
 import logging
 from typing import List, Dict, Optional
 import re
+from utils.cl_math import range_status
 
-async def fetch_dashboard_pools(browser) -> List[Dict]:
+async def fetch_dashboard_pools(browser) -> Optional[List[Dict]]:
     """
     Fetch pool information from Shadow.so dashboard.
-    Returns a list of dictionaries containing pool data with Pool ID and contract address.
+    Returns a list of dictionaries containing pool data with Pool ID and contract address,
+    or None when the dashboard could not be loaded (an empty list means no positions).
     """
     try:
         # Navigate to the dashboard
@@ -389,7 +391,7 @@ async def fetch_dashboard_pools(browser) -> List[Dict]:
                 await dashboard_page.close()
             except:
                 pass
-        return []
+        return None
 
 async def get_pool_details(browser, contract_address: str, pool_id: str) -> Optional[Dict]:
     """
@@ -463,6 +465,15 @@ async def get_pool_details(browser, contract_address: str, pool_id: str) -> Opti
                 pass
         return None
 
+def _parse_numbers(text: str) -> List[float]:
+    values = []
+    for match in re.findall(r'\d[\d,]*\.?\d*', text or ''):
+        try:
+            values.append(float(match.replace(',', '')))
+        except ValueError:
+            pass
+    return values
+
 async def check_pool_status(browser, contract_address: str, pool_id: str) -> Optional[Dict]:
     """
     Check the detailed status of a specific pool by navigating to its manage page.
@@ -513,13 +524,22 @@ async def check_pool_status(browser, contract_address: str, pool_id: str) -> Opt
         if liquidity_matches:
             status_info['liquidity_amount'] = liquidity_matches[0]
         
-        # Check if position is in range (look for "Out of Range" text)
+        # What the page says wins; decide locally from the parsed price and bounds only without it
+        price_values = _parse_numbers(status_info['current_price'])
+        range_values = _parse_numbers(status_info['range_info'])
         if 'out of range' in page_text.lower():
             status_info['in_range'] = False
             status_info['status'] = 'Out of Range'
         elif 'in range' in page_text.lower():
             status_info['in_range'] = True
             status_info['status'] = 'In Range'
+        elif price_values and len(range_values) >= 2 and 0 < range_values[-2] < range_values[-1]:
+            lower, upper = range_values[-2], range_values[-1]
+            local = range_status(price_values[-1], lower, upper)
+            status_info['in_range'] = local['in_range']
+            status_info['status'] = 'In Range' if local['in_range'] else 'Out of Range'
+            status_info['to_lower_pct'] = local['to_lower_pct']
+            status_info['to_upper_pct'] = local['to_upper_pct']
         
         # Look for any warning or error messages
         if 'error' in page_text.lower() or 'failed' in page_text.lower():
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from config import config
+from utils.notifier import notify_admins
+from utils.state import load_checkpoints_async
+from services.tracker_supervisor import STATE_QUEUED, STATE_RUNNING, supervisor
+
+
+class StartupResume:
+    """Re-attaches a tracker to every persisted pool after the bot (re)starts.
+
+    Runs in the background once the application is up, so polling starts immediately. The
+    browser is only launched when there is something to track. Tracker pages are opened
+    RESUME_STAGGER seconds apart, and at most RESUME_CONCURRENCY of them may be warming up
+    (loading until their first price check) at once. Progress goes to the admins.
+    """
+
+    def __init__(self, bot, notify_target=None):
+        self.bot = bot
+        self.notify_target = notify_target  # anything with a .bot (Application or context)
+        self.started = 0
+        self.warmed = 0
+        self.failed: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def links(self) -> List[str]:
+        """Stored pools plus interrupted rebalances (their pool is no longer stored)."""
+        links = [pool.link for pool in self.bot.pools]
+        links += [link for link in await load_checkpoints_async() if link not in links]
+        return [link for link in links if not supervisor.find(link)]
+
+    async def _notify(self, message: str) -> None:
+        print(message)
+        if self.notify_target is not None:
+            await notify_admins(self.notify_target, message)
+
+    async def _ensure_browser(self):
+        if self.bot.browser is not None:
+            return self.bot.browser
+        from services.launch_browser import launch_browser
+        from services.metamask_connect import metamask_connect
+        from services.shadow_connect import shadow_connect
+
+        self.bot._load_stored_credentials()
+        browser = await launch_browser()
+        self.bot.browser = browser
+        await metamask_connect(browser)
+        await shadow_connect(browser)
+        return browser
+
+    async def _warm_up(self, browser, link: str, budget: asyncio.Semaphore) -> None:
+        """Open the tracker page and hold a budget slot until its first price check."""
+        try:
+            page = await browser.new_page()
+            info = supervisor.start(link, page, browser)
+            self.started += 1
+            deadline = time.monotonic() + config.RESUME_WARMUP_TIMEOUT
+            while info.last_tick is None and info.state in (STATE_QUEUED, STATE_RUNNING):
+                if time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(0.5)
+            if info.last_tick is not None:
+                self.warmed += 1
+            else:
+                self.failed.append(link)
+        except Exception as e:
+            logging.exception("Failed to resume tracking for %s", link)
+            self.failed.append(f"{link} ({str(e)[:60]})")
+        finally:
+            budget.release()
+
+    async def run(self) -> int:
+        """Resume every pool; returns the number of trackers started."""
+        links = await self.links()
+        if not links:
+            return 0
+        if self.bot.browser is None and not self.bot._has_stored_credentials():
+            await self._notify(f"⚠️ {len(links)} pool(s) not resumed: no stored MetaMask credentials, use /connect.")
+            return 0
+
+        started = time.monotonic()
+        await self._notify(f"🔁 Resuming tracking for {len(links)} pool(s)…")
+        try:
+            browser = await self._ensure_browser()
+        except Exception as e:
+            logging.exception("Browser launch for startup resume failed")
+            self.bot.browser = None
+            await self._notify(f"❌ Resume failed, browser did not start: {str(e)[:100]}")
+            return 0
+
+        budget = asyncio.Semaphore(max(1, config.RESUME_CONCURRENCY))
+        step = max(5, len(links) // 4)  # progress every quarter (at least every 5 pools)
+        tasks = []
+        for i, link in enumerate(links, 1):
+            await budget.acquire()
+            tasks.append(asyncio.create_task(self._warm_up(browser, link, budget)))
+            if i % step == 0 and i < len(links):
+                await self._notify(f"🔁 Resume progress: {i}/{len(links)} tracker page(s) opened.")
+            if i < len(links):
+                await asyncio.sleep(config.RESUME_STAGGER)
+        await asyncio.gather(*tasks)
+
+        elapsed = time.monotonic() - started
+        message = f"✅ Resumed {self.warmed}/{len(links)} tracker(s) in {elapsed:.1f}s."
+        if self.failed:
+            message += f"\n⚠️ Not warmed up ({len(self.failed)}): " + ", ".join(self.failed[:5])
+            if len(self.failed) > 5:
+                message += ", …"
+        await self._notify(message)
+        return self.started
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+from services.price_feed import price_feed
+from services.rpc_client import pool_address_from_link, position_id_from_link
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_BACKOFF = "backoff"
+STATE_FINISHED = "finished"
+
+
+def _position_key(link: str):
+    """(contract, position id) of a Shadow link, so pool and manage links of one position match."""
+    return (pool_address_from_link(link), position_id_from_link(link))
+
+
+@dataclass
+class TrackerInfo:
+    link: str
+    update: Any = None
+    page: Any = None
+    browser: Any = None
+    task: Optional[asyncio.Task] = None
+    state: str = STATE_QUEUED
+    created_at: float = field(default_factory=time.time)
+    running_since: Optional[float] = None
+    last_tick: Optional[float] = None
+    restarts: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    last_error: Optional[str] = None
+    holds_slot: bool = False  # still warming up (page load until the first price check)
+
+    def format(self, now: Optional[float] = None) -> str:
+        now = time.time() if now is None else now
+        uptime = _ago(now - self.running_since) if self.running_since else "-"
+        tick = f"{_ago(now - self.last_tick)} ago" if self.last_tick else "never"
+        line = (f"{self.state:<8} {self.link}\n"
+                f"   up {uptime} | last tick {tick} | errors {self.errors} | restarts {self.restarts}")
+        if self.last_error:
+            line += f"\n   last error: {self.last_error}"
+        return line
+
+
+def _ago(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class TrackerSupervisor:
+    """Owns every `Shadow.track` task, keyed by pool link.
+
+    A tracker that raises is restarted on a fresh page after an exponential backoff
+    (TRACKER_BACKOFF_MIN doubling up to TRACKER_BACKOFF_MAX); one that returns (pool gone,
+    browser closed) is finished. At most TRACKER_MAX_RUNNING trackers warm up at once (0 = no
+    limit), the rest wait in the queue; a tracker gives its slot back on its first price
+    check, so the limit only spreads page loads and never caps how many positions are
+    monitored. `stop()` cancels a tracker and closes its page.
+    """
+
+    def __init__(self, get_browser: Optional[Callable[[], Any]] = None):
+        self.get_browser = get_browser  # current browser for restarts (set by the bot)
+        self._trackers: Dict[str, TrackerInfo] = {}
+        self._running = 0
+        self._slots = asyncio.Condition()
+        self._releases: set = set()
+
+    def start(self, link: str, page, browser=None, update=None) -> TrackerInfo:
+        """Supervise a tracker for `link` on `page`, replacing any tracker of the same link."""
+        old = self._trackers.pop(link, None)
+        if old is not None and old.task is not None and not old.task.done():
+            old.task.cancel()
+        info = TrackerInfo(link=link, update=update, page=page, browser=browser)
+        info.task = asyncio.create_task(self._supervise(info))
+        self._trackers[link] = info
+        return info
+
+    def tick(self, link: str) -> None:
+        """Called by the tracker on every price check."""
+        info = self._trackers.get(link)
+        if info is not None:
+            info.last_tick = time.time()
+            info.consecutive_errors = 0
+            if info.holds_slot:
+                task = asyncio.create_task(self._release(info))
+                self._releases.add(task)
+                task.add_done_callback(self._releases.discard)
+
+    def find(self, link: str) -> List[TrackerInfo]:
+        """Trackers of `link`, also matching a pool link against its manage link."""
+        if link in self._trackers:
+            return [self._trackers[link]]
+        key = _position_key(link)
+        return [info for l, info in self._trackers.items() if key[0] and _position_key(l) == key]
+
+    async def stop(self, link: str) -> int:
+        """Cancel the tracker(s) of `link` and close their pages. Returns how many were stopped."""
+        stopped = 0
+        for info in self.find(link):
+            self._trackers.pop(info.link, None)
+            await self._cancel(info)
+            stopped += 1
+        return stopped
+
+    async def stop_all(self) -> int:
+        trackers = list(self._trackers.values())
+        self._trackers.clear()
+        for info in trackers:
+            await self._cancel(info)
+        return len(trackers)
+
+    async def _cancel(self, info: TrackerInfo) -> None:
+        if info.task is not None and not info.task.done():
+            info.task.cancel()
+            try:
+                await info.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if info.page is not None and not price_feed.owns(info.page):  # other positions still read from it
+            try:
+                await info.page.close()
+            except Exception:
+                pass
+
+    def trackers(self) -> List[TrackerInfo]:
+        return list(self._trackers.values())
+
+    def __len__(self) -> int:
+        return len(self._trackers)
+
+    async def _acquire(self, info: TrackerInfo) -> None:
+        async with self._slots:
+            await self._slots.wait_for(
+                lambda: config.TRACKER_MAX_RUNNING <= 0 or self._running < config.TRACKER_MAX_RUNNING)
+            self._running += 1
+            info.holds_slot = True
+
+    async def _release(self, info: TrackerInfo) -> None:
+        if not info.holds_slot:  # already given back on the first tick
+            return
+        info.holds_slot = False
+        async with self._slots:
+            self._running -= 1
+            self._slots.notify_all()
+
+    async def _fresh_page(self, info: TrackerInfo):
+        browser = (self.get_browser() if self.get_browser else None) or info.browser
+        if browser is None:
+            raise RuntimeError("browser is not connected")
+        if (browser is not info.browser or info.page is None or info.page.is_closed()
+                or price_feed.owns(info.page)):
+            info.browser = browser
+            info.page = await browser.new_page()
+        return info.page
+
+    async def _run_once(self, info: TrackerInfo) -> None:
+        from utils.shadow_utils import Shadow
+
+        await self._acquire(info)
+        try:
+            info.state = STATE_RUNNING
+            info.running_since = time.time()
+            page = info.page if info.restarts == 0 and info.page is not None else await self._fresh_page(info)
+            await Shadow(info.browser).track(info.update, page, info.link)
+        finally:
+            await self._release(info)
+
+    async def _supervise(self, info: TrackerInfo) -> None:
+        while True:
+            try:
+                await self._run_once(info)
+                info.state = STATE_FINISHED
+                info.running_since = None
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                info.errors += 1
+                info.consecutive_errors += 1
+                info.last_error = str(e)[:100]
+                delay = min(config.TRACKER_BACKOFF_MAX,
+                            config.TRACKER_BACKOFF_MIN * 2 ** (info.consecutive_errors - 1))
+                logging.exception(f"Tracker for {info.link} crashed, restarting in {delay:.0f}s")
+                info.state = STATE_BACKOFF
+                info.running_since = None
+                await asyncio.sleep(delay)
+                info.restarts += 1
+
+    def format(self) -> str:
+        if not self._trackers:
+            return "No trackers running."
+        now = time.time()
+        running = sum(1 for info in self._trackers.values() if info.state == STATE_RUNNING)
+        warming = ""
+        if config.TRACKER_MAX_RUNNING > 0:
+            held = sum(1 for info in self._trackers.values() if info.holds_slot)
+            warming = f", {held}/{config.TRACKER_MAX_RUNNING} warming up"
+        lines = [f"🧵 Trackers: {running} running{warming}, {len(self._trackers)} supervised"]
+        lines += [info.format(now) for info in self._trackers.values()]
+        return "\n".join(lines)
+
+
+supervisor = TrackerSupervisor()
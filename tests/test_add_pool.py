@@ -0,0 +1,84 @@
+"""
+Test file for single-position /add (services/add_pool.py)
+
+Covers:
+- Rejecting malformed arguments
+- Successful deposit handing the page to the tracker supervisor
+- Closing the page when the deposit fails
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.add_pool import add_pool
+
+LINK = "https://www.shadow.so/liquidity/0x1111111111111111111111111111111111111111"
+
+
+def _page():
+    page = MagicMock()
+    page.close = AsyncMock()
+    page.locator.return_value.first.is_visible = AsyncMock(return_value=False)
+    return page
+
+
+class TestAddPool:
+    """Test class for the /add flow"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments_rejected(self):
+        """Wrong argument count replies with usage and never opens a page"""
+        with patch('services.add_pool.outbox') as mock_outbox:
+            with patch('services.add_pool.open_pool_page', new_callable=AsyncMock) as mock_open:
+                ok, info = await add_pool(MagicMock(), MagicMock(), [LINK, "wide"])
+
+        assert (ok, info) == (False, None)
+        mock_open.assert_not_called()
+        assert "Invalid command format" in mock_outbox.reply.call_args[0][1]
+
+    @pytest.mark.asyncio
+    async def test_successful_add_starts_tracker(self):
+        """A confirmed deposit hands the page to the supervisor and returns the pool info"""
+        page = _page()
+        shadow = MagicMock()
+        shadow.add_pool_link = AsyncMock(return_value=(2.0, 1.0))
+        update = MagicMock()
+        browser = MagicMock()
+
+        with patch('services.add_pool.outbox'):
+            with patch('services.add_pool.open_pool_page', AsyncMock(return_value=(page, ["S", "USDC"]))):
+                with patch('services.add_pool.Shadow', return_value=shadow):
+                    with patch('services.add_pool.supervisor') as mock_supervisor:
+                        ok, info = await add_pool(update, browser, [LINK, "wide", "usdc", "10"])
+
+        assert ok is True
+        assert info == {
+            "link": LINK,
+            "range": "wide",
+            "token": "USDC",
+            "amount": 10.0,
+            "upper_range": 2.0,
+            "lower_range": 1.0,
+        }
+        mock_supervisor.start.assert_called_once_with(LINK, page, browser, update)
+        page.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_deposit_closes_page(self):
+        """No range back from the deposit closes the page and starts no tracker"""
+        page = _page()
+        shadow = MagicMock()
+        shadow.add_pool_link = AsyncMock(return_value=(None, None))
+
+        with patch('services.add_pool.outbox'):
+            with patch('services.add_pool.open_pool_page', AsyncMock(return_value=(page, ["S", "USDC"]))):
+                with patch('services.add_pool.Shadow', return_value=shadow):
+                    with patch('services.add_pool.supervisor') as mock_supervisor:
+                        ok, info = await add_pool(MagicMock(), MagicMock(), [LINK, "wide", "S", "10"])
+
+        assert (ok, info) == (False, None)
+        mock_supervisor.start.assert_not_called()
+        page.close.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+"""
+Test file for batch /add (services/batch_add.py)
+
+Covers:
+- Parsing argument groups and uploaded CSV/JSON documents
+- Up-front validation of every entry
+- Parallel form filling and deposits
+- Per-position results
+"""
+
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.batch_add import (
+    batch_add,
+    format_batch_report,
+    parse_batch_args,
+    parse_batch_document,
+    validate_batch,
+)
+
+LINK_1 = "https://www.shadow.so/liquidity/0x1111111111111111111111111111111111111111"
+LINK_2 = "https://www.shadow.so/liquidity/0x2222222222222222222222222222222222222222"
+LINK_3 = "https://www.shadow.so/liquidity/0x3333333333333333333333333333333333333333"
+
+
+class TestBatchParsing:
+    """Test class for batch parsing and validation"""
+
+    def test_parse_args_separated_by_semicolons(self):
+        args = [LINK_1, "wide", "USDC", "10", ";", LINK_2, "narrow", "S", "5"]
+        assert parse_batch_args(args) == [[LINK_1, "wide", "USDC", "10"], [LINK_2, "narrow", "S", "5"]]
+
+    def test_parse_args_in_groups_of_four(self):
+        args = [LINK_1, "wide", "USDC", "10", LINK_2, "narrow", "S", "5"]
+        assert parse_batch_args(args) == [[LINK_1, "wide", "USDC", "10"], [LINK_2, "narrow", "S", "5"]]
+
+    def test_parse_csv_with_header(self):
+        data = f"pool_link,range_type,token,amount\n{LINK_1},wide,USDC,10\n\n{LINK_2}, narrow ,S,5\n".encode()
+        assert parse_batch_document("pools.csv", data) == [[LINK_1, "wide", "USDC", "10"], [LINK_2, "narrow", "S", "5"]]
+
+    def test_parse_json_objects(self):
+        data = json.dumps([{"link": LINK_1, "range": "wide", "token": "USDC", "amount": 10}]).encode()
+        assert parse_batch_document("pools.json", data) == [[LINK_1, "wide", "USDC", "10"]]
+
+    def test_validate_reports_every_invalid_entry(self):
+        entries = [
+            [LINK_1, "wide", "USDC", "10"],
+            ["https://example.com/pool", "wide", "USDC", "10"],
+            [LINK_2, "huge", "S", "5"],
+            [LINK_1, "wide", "USDC", "10"],
+            [LINK_3, "wide", "S"],
+        ]
+        errors = validate_batch(entries)
+        assert len(errors) == 4
+        assert errors[0].startswith("#2")
+        assert "duplicate" in errors[2]
+
+
+class TestBatchAdd:
+    """Test class for the parallel batch add flow"""
+
+    @pytest.mark.asyncio
+    async def test_tabs_run_in_parallel_and_results_reported(self):
+        """Form filling and deposits overlap across tabs (the broker routes each confirmation)"""
+        active = {"fill": 0, "deposit": 0, "max_fill": 0, "max_deposit": 0}
+
+        async def fill_pool_form(page, range_type_index, token_index, price):
+            active["fill"] += 1
+            active["max_fill"] = max(active["max_fill"], active["fill"])
+            await asyncio.sleep(0.01)
+            active["fill"] -= 1
+            return 2.0, 1.0
+
+        async def submit_deposit(update, page):
+            active["deposit"] += 1
+            active["max_deposit"] = max(active["max_deposit"], active["deposit"])
+            await asyncio.sleep(0.01)
+            active["deposit"] -= 1
+            return page.link != LINK_3  # third position has insufficient balance
+
+        async def open_pool_page(browser, link):
+            page = MagicMock()
+            page.link = link
+            page.close = AsyncMock()
+            page.locator.return_value.first.is_visible = AsyncMock(return_value=False)
+            return page, ["S", "USDC"]
+
+        shadow = MagicMock()
+        shadow.fill_pool_form = fill_pool_form
+        shadow.submit_deposit = submit_deposit
+        shadow.track = AsyncMock()
+
+        entries = [[LINK_1, "wide", "USDC", "10"], [LINK_2, "narrow", "S", "5"], [LINK_3, "wide", "S", "1"]]
+        with patch('services.batch_add.open_pool_page', side_effect=open_pool_page):
+            with patch('services.batch_add.Shadow', return_value=shadow):
+                results = await batch_add(None, MagicMock(), entries)
+
+        assert active["max_fill"] > 1
+        assert active["max_deposit"] > 1
+        assert [r["ok"] for r in results] == [True, True, False]
+        assert results[0]["pool_info"]["upper_range"] == 2.0
+        assert results[2]["error"] == "insufficient balance or deposit not confirmed"
+
+        report = format_batch_report(results)
+        assert "2/3 position(s) added" in report
+        assert f"❌ #3 {LINK_3}: insufficient balance or deposit not confirmed" in report
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
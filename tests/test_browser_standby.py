@@ -0,0 +1,149 @@
+"""
+Test file for the warm-standby browser context (services/browser_standby.py)
+
+Covers:
+- Cloning a profile without Chromium lock files and caches
+- Preparing a standby on the slot not used by the primary
+- Handing the standby over and replenishing it
+- Watchdog failover to the standby instead of a cold relaunch
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.browser_standby import BrowserStandby, clone_profile
+from services.browser_watchdog import BrowserWatchdog
+
+
+@pytest.fixture
+def standby_config(tmp_path):
+    primary = tmp_path / "user_data"
+    (primary / "Default" / "Local Extension Settings").mkdir(parents=True)
+    (primary / "Default" / "Local Extension Settings" / "vault.ldb").write_text("vault")
+    (primary / "Default" / "Cache").mkdir()
+    (primary / "Default" / "Cache" / "blob").write_text("x")
+    (primary / "SingletonLock").write_text("host-123")
+    with patch('services.browser_standby.config') as cfg, \
+         patch('services.browser_watchdog.config') as watchdog_cfg:
+        cfg.USER_DATA_DIR = str(primary)
+        cfg.STANDBY_PROFILE_DIR = ""
+        watchdog_cfg.WATCHDOG_HEARTBEAT_TIMEOUT = 0.05
+        watchdog_cfg.WATCHDOG_MAX_FAILURES = 1
+        yield cfg
+
+
+def make_browser(pages=1):
+    browser = MagicMock()
+    browser.close = AsyncMock()
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value=1)
+    browser.pages = [page] * pages
+    browser.new_page = AsyncMock(return_value=MagicMock())
+    return browser
+
+
+@pytest.fixture
+def stack():
+    """Patch the browser stack used to prepare a standby or relaunch"""
+    browsers = [make_browser(), make_browser(), make_browser()]
+    with patch('services.launch_browser.launch_browser', new=AsyncMock(side_effect=browsers)) as launch, \
+         patch('services.metamask_connect.metamask_connect', new=AsyncMock()) as unlock, \
+         patch('services.shadow_connect.shadow_connect', new=AsyncMock()), \
+         patch('services.browser_watchdog.supervisor'), \
+         patch('services.browser_watchdog.notify_admins', new=AsyncMock()) as notify:
+        yield {"browsers": browsers, "launch": launch, "unlock": unlock, "notify": notify}
+
+
+class TestCloneProfile:
+    """Test class for profile cloning"""
+
+    def test_skips_locks_and_caches(self, standby_config, tmp_path):
+        target = tmp_path / "clone"
+        clone_profile(standby_config.USER_DATA_DIR, str(target))
+
+        assert (target / "Default" / "Local Extension Settings" / "vault.ldb").read_text() == "vault"
+        assert not (target / "SingletonLock").exists()
+        assert not (target / "Default" / "Cache").exists()
+
+
+class TestBrowserStandby:
+    """Test class for BrowserStandby"""
+
+    @pytest.mark.asyncio
+    async def test_prepare_launches_on_cloned_slot(self, standby_config, stack):
+        standby = BrowserStandby()
+        await standby.prepare()
+
+        assert standby.ready
+        assert standby.profile_dir == standby.slots[0]
+        stack["launch"].assert_called_once_with(user_data_dir=standby.slots[0])
+        stack["unlock"].assert_called_once_with(stack["browsers"][0])
+
+    @pytest.mark.asyncio
+    async def test_failed_prepare_leaves_no_standby(self, standby_config, stack):
+        stack["unlock"].side_effect = RuntimeError("wrong password")
+        standby = BrowserStandby()
+        await standby.prepare()
+
+        assert not standby.ready
+        stack["browsers"][0].close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_take_alternates_slots_and_replenishes(self, standby_config, stack):
+        standby = BrowserStandby()
+        await standby.prepare()
+
+        taken = standby.take()
+        assert taken is stack["browsers"][0]
+        assert standby.primary_dir == standby.slots[0]
+        await standby._task
+
+        assert standby.browser is stack["browsers"][1]
+        assert standby.profile_dir == standby.slots[1]
+        assert standby.take() is not None
+        await standby._task
+        assert standby.profile_dir == standby.slots[0]
+
+    def test_take_without_standby(self, standby_config):
+        assert BrowserStandby().take() is None
+
+
+class TestWatchdogFailover:
+    """Test class for watchdog failover"""
+
+    @pytest.mark.asyncio
+    async def test_fails_over_to_standby(self, standby_config, stack):
+        standby = BrowserStandby()
+        await standby.prepare()
+        ready = standby.browser
+        stack["launch"].reset_mock()
+        stack["unlock"].reset_mock()
+
+        bot = MagicMock()
+        bot.browser = make_browser(pages=0)
+        watchdog = BrowserWatchdog(bot, notify_target=MagicMock(), standby=standby)
+        with patch.object(watchdog, 'tracked_links', return_value=["https://www.shadow.so/liquidity/pool-a"]):
+            await watchdog.check()
+
+        assert bot.browser is ready
+        stack["unlock"].assert_not_called()
+        bot._load_stored_credentials.assert_not_called()
+        assert ready.new_page.call_count == 1
+        assert "failed over to standby" in stack["notify"].call_args.args[1]
+        await standby._task  # replenished in the background
+        assert standby.ready
+
+    @pytest.mark.asyncio
+    async def test_healthy_primary_prepares_standby(self, standby_config, stack):
+        standby = BrowserStandby()
+        bot = MagicMock()
+        bot.browser = make_browser()
+        watchdog = BrowserWatchdog(bot, standby=standby)
+
+        assert await watchdog.check() is True
+        await standby._task
+        assert standby.ready
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
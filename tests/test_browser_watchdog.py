@@ -0,0 +1,129 @@
+"""
+Test file for the browser health watchdog (services/browser_watchdog.py)
+
+Covers:
+- Heartbeats on a healthy, closed or hung browser context
+- Relaunch, MetaMask unlock and tracker re-attachment after repeated failures
+- Recovery time reported to admins
+- Retrying a failed recovery
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.browser_watchdog import BrowserWatchdog
+
+LINKS = ["https://www.shadow.so/liquidity/pool-a", "https://www.shadow.so/liquidity/pool-b"]
+
+
+@pytest.fixture
+def watchdog_config():
+    with patch('services.browser_watchdog.config') as cfg:
+        cfg.WATCHDOG_HEARTBEAT_TIMEOUT = 0.05
+        cfg.WATCHDOG_MAX_FAILURES = 2
+        cfg.WATCHDOG_INTERVAL = 15
+        yield cfg
+
+
+def make_browser(evaluate=None, pages=1):
+    browser = MagicMock()
+    browser.close = AsyncMock()
+    page = MagicMock()
+    page.evaluate = evaluate or AsyncMock(return_value=1)
+    browser.pages = [page] * pages
+    browser.new_page = AsyncMock(return_value=MagicMock())
+    return browser
+
+
+@pytest.fixture
+def bot():
+    bot = MagicMock()
+    bot.browser = make_browser()
+    return bot
+
+
+@pytest.fixture
+def relaunch():
+    """Patch the browser stack used for recovery"""
+    new_browser = make_browser()
+    with patch('services.launch_browser.launch_browser', new=AsyncMock(return_value=new_browser)) as launch, \
+         patch('services.metamask_connect.metamask_connect', new=AsyncMock()) as unlock, \
+         patch('services.shadow_connect.shadow_connect', new=AsyncMock()), \
+         patch('services.browser_watchdog.supervisor') as supervisor, \
+         patch('services.browser_watchdog.notify_admins', new=AsyncMock()) as notify:
+        yield {"browser": new_browser, "launch": launch, "unlock": unlock, "supervisor": supervisor, "notify": notify}
+
+
+class TestHeartbeat:
+    """Test class for heartbeats"""
+
+    @pytest.mark.asyncio
+    async def test_healthy_browser(self, watchdog_config, bot):
+        watchdog = BrowserWatchdog(bot)
+        assert await watchdog.check() is True
+        assert watchdog.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_closed_context_fails(self, watchdog_config, bot):
+        bot.browser = make_browser(pages=0)
+        assert await BrowserWatchdog(bot).heartbeat(bot.browser) is False
+
+    @pytest.mark.asyncio
+    async def test_hung_renderer_fails(self, watchdog_config, bot):
+        async def hang(*args):
+            await asyncio.sleep(10)
+
+        bot.browser = make_browser(evaluate=hang)
+        assert await BrowserWatchdog(bot).heartbeat(bot.browser) is False
+
+    @pytest.mark.asyncio
+    async def test_disconnected_bot_is_not_recovered(self, watchdog_config, bot, relaunch):
+        bot.browser = None
+        assert await BrowserWatchdog(bot).check() is True
+        relaunch["launch"].assert_not_called()
+
+
+class TestRecovery:
+    """Test class for recovery"""
+
+    @pytest.mark.asyncio
+    async def test_recovers_after_repeated_failures(self, watchdog_config, bot, relaunch):
+        dead = make_browser(pages=0)
+        bot.browser = dead
+        watchdog = BrowserWatchdog(bot, notify_target=MagicMock())
+
+        with patch.object(watchdog, 'tracked_links', return_value=LINKS):
+            assert await watchdog.check() is False
+            relaunch["launch"].assert_not_called()  # one failure is tolerated
+            await watchdog.check()
+
+        dead.close.assert_called_once()
+        relaunch["launch"].assert_called_once()
+        relaunch["unlock"].assert_called_once_with(relaunch["browser"])
+        assert bot.browser is relaunch["browser"]
+        assert relaunch["browser"].new_page.call_count == len(LINKS)
+        tracked = [c.args[0] for c in relaunch["supervisor"].start.call_args_list]
+        assert tracked == LINKS
+        assert len(watchdog.recoveries) == 1
+        message = relaunch["notify"].call_args.args[1]
+        assert "Browser recovered in" in message and "2 tracker(s)" in message
+
+    @pytest.mark.asyncio
+    async def test_failed_recovery_is_retried(self, watchdog_config, bot, relaunch):
+        bot.browser = make_browser(pages=0)
+        relaunch["launch"].side_effect = [RuntimeError("profile locked"), relaunch["browser"]]
+        watchdog = BrowserWatchdog(bot)
+
+        with patch.object(watchdog, 'tracked_links', return_value=[]):
+            assert await watchdog.recover() is False
+            assert bot.browser is None and watchdog.pending_recovery
+
+            assert await watchdog.check() is True
+
+        assert bot.browser is relaunch["browser"]
+        assert watchdog.failed_recoveries == 1
+        assert not watchdog.pending_recovery
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,163 @@
+"""
+Test file for the block/log subscription trigger (services/chain_events.py)
+
+Covers:
+- Waking only the pools that emitted a Swap log
+- Re-subscribing when the watched pools change
+- Shared pools kept watched until their last tracker exits
+- Reconnecting with backoff after the feed drops
+- Falling back to polling while disconnected
+"""
+
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from websockets.asyncio.server import serve
+from services.chain_events import ChainEventTrigger, MODE_HEADS, SWAP_TOPIC
+
+POOL_A = "0x" + "aa" * 20
+POOL_B = "0x" + "bb" * 20
+
+
+class StandIn:
+    """Local eth_subscribe websocket stand-in"""
+
+    def __init__(self):
+        self.requests = asyncio.Queue()
+        self.connections = []
+        self.subscriptions = 0
+
+    async def handler(self, ws):
+        self.connections.append(ws)
+        async for raw in ws:
+            request = json.loads(raw)
+            await self.requests.put(request)
+            if request["method"] == "eth_subscribe":
+                self.subscriptions += 1
+                result = f"0xsub{self.subscriptions}"
+            else:
+                result = True
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}))
+
+    async def notify(self, result):
+        message = {"jsonrpc": "2.0", "method": "eth_subscription",
+                   "params": {"subscription": f"0xsub{self.subscriptions}", "result": result}}
+        await self.connections[-1].send(json.dumps(message))
+
+    async def next_request(self):
+        return await asyncio.wait_for(self.requests.get(), timeout=2)
+
+
+@pytest_asyncio.fixture
+async def stand_in():
+    server = StandIn()
+    async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        with patch('services.chain_events.config') as cfg:
+            cfg.CHAIN_EVENT_BACKOFF_MIN = 0.01
+            cfg.CHAIN_EVENT_BACKOFF_MAX = 0.05
+            yield server, f"ws://127.0.0.1:{port}"
+
+
+async def wait_connected(trigger):
+    for _ in range(200):
+        if trigger.connected:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("trigger did not connect")
+
+
+class TestChainEventTrigger:
+    """Test class for ChainEventTrigger"""
+
+    @pytest.mark.asyncio
+    async def test_only_traded_pool_is_woken(self, stand_in):
+        server, url = stand_in
+        trigger = ChainEventTrigger(url, max_idle=5)
+        trigger.watch(POOL_A)
+        trigger.watch(POOL_B)
+        trigger.start()
+        await wait_connected(trigger)
+
+        subscribe = await server.next_request()
+        assert subscribe["params"] == ["logs", {"address": [POOL_A, POOL_B], "topics": [SWAP_TOPIC]}]
+
+        waiter_a = asyncio.create_task(trigger.wait(POOL_A))
+        waiter_b = asyncio.create_task(trigger.wait(POOL_B))
+        await asyncio.sleep(0.05)
+        await server.notify({"address": POOL_A, "topics": [SWAP_TOPIC]})
+
+        assert await asyncio.wait_for(waiter_a, timeout=2) is True
+        assert not waiter_b.done()
+        waiter_b.cancel()
+        await trigger.stop()
+
+    @pytest.mark.asyncio
+    async def test_resubscribes_when_watch_list_changes(self, stand_in):
+        server, url = stand_in
+        trigger = ChainEventTrigger(url, max_idle=5)
+        trigger.watch(POOL_A)
+        trigger.start()
+        await wait_connected(trigger)
+        await server.next_request()
+
+        trigger.watch(POOL_B)
+
+        unsubscribe = await server.next_request()
+        assert unsubscribe["method"] == "eth_unsubscribe"
+        resubscribe = await server.next_request()
+        assert resubscribe["params"][1]["address"] == [POOL_A, POOL_B]
+        await trigger.stop()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect(self, stand_in):
+        server, url = stand_in
+        trigger = ChainEventTrigger(url, mode=MODE_HEADS, max_idle=5)
+        trigger.watch(POOL_A)
+        trigger.start()
+        await wait_connected(trigger)
+        assert (await server.next_request())["params"] == ["newHeads"]
+
+        waiter = asyncio.create_task(trigger.wait(POOL_A))
+        await asyncio.sleep(0.05)
+        await server.connections[-1].close()
+
+        # Waiters are released when the feed drops, then the trigger reconnects
+        await asyncio.wait_for(waiter, timeout=2)
+        assert (await server.next_request())["params"] == ["newHeads"]
+        await wait_connected(trigger)
+        assert trigger.reconnect_count >= 1
+
+        waiter = asyncio.create_task(trigger.wait(POOL_A))
+        await asyncio.sleep(0.05)
+        await server.notify({"number": "0x10"})
+        assert await asyncio.wait_for(waiter, timeout=2) is True
+        await trigger.stop()
+
+    def test_pool_kept_until_last_watcher_leaves(self):
+        trigger = ChainEventTrigger("ws://127.0.0.1:9", max_idle=5)
+        trigger.watch(POOL_A)
+        trigger.watch(POOL_A.upper().replace("0X", "0x"))  # a second position on the same pool
+        trigger._watch_changed.clear()
+
+        trigger.unwatch(POOL_A)
+        assert trigger.watched == {POOL_A} and not trigger._watch_changed.is_set()
+        trigger.unwatch(POOL_A)
+        assert trigger.watched == set() and trigger._watch_changed.is_set()
+        trigger.unwatch(POOL_A)  # extra unwatch is harmless
+        assert trigger.watched == set()
+
+    @pytest.mark.asyncio
+    async def test_polls_while_disconnected(self):
+        with patch('services.chain_events.config') as cfg:
+            cfg.CHAIN_EVENT_BACKOFF_MIN = 10
+            cfg.CHAIN_EVENT_BACKOFF_MAX = 10
+            trigger = ChainEventTrigger("ws://127.0.0.1:9", max_idle=5)
+            assert await trigger.wait(POOL_A, poll_interval=0.01) is False
+            await trigger.stop()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
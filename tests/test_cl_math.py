@@ -0,0 +1,139 @@
+"""
+Test file for concentrated-liquidity math (utils/cl_math.py)
+
+Covers:
+- tick <-> price and sqrtPrice conversions
+- Liquidity <-> token amounts for a position
+- Local in-range status, distance to bounds and token split
+- Status computed from the last known price in /status, labelled with the pair's symbols
+- Dashboard status: the page's range text wins over the parsed numbers
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import utils.cl_math as cl_math
+from utils.cl_math import (
+    amounts_for_liquidity,
+    liquidity_for_amounts,
+    nearest_usable_tick,
+    price_to_sqrt_price_x96,
+    price_to_tick,
+    range_status,
+    range_status_many,
+    sqrt_price_x96_to_price,
+    tick_to_price,
+    token_split,
+)
+from models.pool import Pool
+from bot.commands import check_status
+from services.price_source import record_pair, record_price
+from services.shadow_dashboard import check_pool_status
+
+
+class TestTickMath:
+    """Test class for tick and sqrtPrice conversions"""
+
+    def test_tick_price_round_trip(self):
+        for tick in (-50000, -1, 0, 1, 12345, 200000):
+            assert price_to_tick(tick_to_price(tick)) == tick
+
+    def test_decimals_are_applied(self):
+        # 1 WS (18 decimals) = 0.5 USDC (6 decimals)
+        tick = price_to_tick(0.5, 18, 6)
+        assert tick_to_price(tick, 18, 6) == pytest.approx(0.5, rel=1e-4)
+
+    def test_sqrt_price_round_trip(self):
+        sqrt_x96 = price_to_sqrt_price_x96(2.5, 18, 6)
+        assert sqrt_price_x96_to_price(sqrt_x96, 18, 6) == pytest.approx(2.5, rel=1e-9)
+
+    def test_nearest_usable_tick(self):
+        assert nearest_usable_tick(123, 50) == 100
+        assert nearest_usable_tick(-126, 50) == -150
+
+
+class TestPositionMath:
+    """Test class for position composition"""
+
+    def test_amounts_round_trip_through_liquidity(self):
+        liquidity = liquidity_for_amounts(1.0, 0.8, 1.25, 100, 100)
+        amount0, amount1 = amounts_for_liquidity(1.0, 0.8, 1.25, liquidity)
+        # The binding side is fully used, the other one is not exceeded
+        assert amount0 <= 100 + 1e-9 and amount1 <= 100 + 1e-9
+        assert max(amount0, amount1) == pytest.approx(100)
+
+    def test_out_of_range_is_single_sided(self):
+        assert amounts_for_liquidity(0.5, 0.8, 1.25, 1000)[1] == 0
+        assert amounts_for_liquidity(2.0, 0.8, 1.25, 1000)[0] == 0
+
+    def test_symmetric_range_is_balanced(self):
+        share0, share1 = token_split(1.0, 1 / 1.21, 1.21)
+        assert share0 == pytest.approx(0.5)
+        assert share1 == pytest.approx(0.5)
+
+
+class TestRangeStatus:
+    """Test class for local range status"""
+
+    def test_in_range_status(self):
+        status = range_status(1.0, 0.5, 1.5)
+        assert status["in_range"] is True
+        assert status["position_pct"] == pytest.approx(50)
+        assert status["to_lower_pct"] == pytest.approx(50)
+        assert status["to_upper_pct"] == pytest.approx(50)
+
+    def test_out_of_range_status(self):
+        status = range_status(2.0, 0.5, 1.5)
+        assert status["in_range"] is False
+        assert status["token0_share"] == 0
+        assert status["token1_share"] == pytest.approx(1)
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            range_status(1.0, 1.5, 0.5)
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_many_prices(self, use_numpy):
+        np = cl_math.np if use_numpy else None
+        if use_numpy and np is None:
+            pytest.skip("numpy not installed")
+        with patch.object(cl_math, "np", np):
+            assert range_status_many([0.4, 1.0, 1.5], 0.5, 1.5) == [False, True, False]
+
+    @pytest.mark.asyncio
+    async def test_check_status_uses_last_price(self):
+        pool = Pool(link="https://www.shadow.so/liquidity/local-status", range="wide", token="S",
+                    amount=10, upper_range=1.5, lower_range=0.5, last_status="monitoring")
+        assert await check_status(None, pool) == "monitoring"
+
+        record_price(pool.link, 1.0)
+        status = await check_status(None, pool)
+        assert status.startswith("in range (50% of range)")
+        assert "to lower 50.00%, to upper 50.00%" in status
+        assert status.endswith("39% S / 61% token1")
+
+        record_pair(pool.link, "SHADOW", "S")
+        assert (await check_status(None, pool)).endswith("39% S / 61% SHADOW")
+
+
+    @pytest.mark.asyncio
+    async def test_page_range_text_wins_over_parsed_numbers(self):
+        async def status_for(text):
+            page = MagicMock()
+            page.goto = AsyncMock()
+            page.close = AsyncMock()
+            page.locator.return_value.text_content = AsyncMock(return_value=text)
+            browser = MagicMock()
+            browser.new_page = AsyncMock(return_value=page)
+            with patch('services.shadow_dashboard.asyncio.sleep', new=AsyncMock()):
+                return await check_pool_status(browser, "0xabc", "1")
+
+        # The numbers say in range, the page says otherwise
+        status = await status_for("Current Price: $1.00 Range: $0.50 - $1.50 Out of Range")
+        assert status["status"] == "Out of Range" and status["in_range"] is False
+        assert "to_lower_pct" not in status
+        status = await status_for("Current Price: $1.00 Range: $0.50 - $1.50")
+        assert status["status"] == "In Range" and status["to_lower_pct"] == pytest.approx(50)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,150 @@
+"""
+Test file for MetaMask confirmation routing (services/confirmation_broker.py)
+
+Covers:
+- Each popup confirmed for the flow that registered it, concurrent flows included
+- Only the buttons of the expected request kind are clicked
+- Unexpected popups are left alone
+- Timeouts when no popup opens, and pages of unmanaged browsers
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from services.confirmation_broker import CONNECT, TRANSACTION, ConfirmationBroker
+
+POPUP_URL = "chrome-extension://abc/notification.html"
+
+
+class FakeButton:
+    def __init__(self, popup, name):
+        self.popup, self.name = popup, name
+
+    async def is_visible(self):
+        return self.name in self.popup.buttons and not self.popup.closed
+
+    async def click(self):
+        self.popup.clicked.append(self.name)
+        self.popup.closed = True
+
+
+class FakePopup:
+    def __init__(self, label, buttons=("Confirm",)):
+        self.label, self.buttons = label, buttons
+        self.url = POPUP_URL + "#confirm"
+        self.clicked = []
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def get_by_role(self, role, name):
+        return FakeButton(self, name)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    def on(self, event, callback):
+        pass
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+
+@pytest.fixture
+def broker_config():
+    with patch('services.confirmation_broker.config') as cfg, \
+         patch('services.confirmation_broker.FOLLOWUP_WINDOW', 0):
+        cfg.WALLET_CONFIRM_TIMEOUT = 5
+        cfg.WALLET_POPUP_TIMEOUT = 0.2
+        yield cfg
+
+
+async def pump(broker, context, until, steps=200):
+    for _ in range(steps):
+        await broker.check(context)
+        if until():
+            return
+        await asyncio.sleep(0.01)
+
+
+class TestConfirmationBroker:
+    """Test class for ConfirmationBroker"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flows_get_their_own_popup(self, broker_config):
+        broker, context = ConfirmationBroker(), FakeContext()
+        broker._popup_urls[context] = POPUP_URL
+        broker._slots[context] = asyncio.Lock()
+        requests, popups, pending_at_trigger = {}, {}, []
+
+        async def flow(name):
+            async with broker.expect(FakePage(context), TRANSACTION, name) as request:
+                requests[name] = request
+                pending_at_trigger.append([n for n, r in requests.items() if not r.done])
+                popups[name] = FakePopup(name)
+                context.pages.append(popups[name])
+            return await request.wait()
+
+        tasks = [asyncio.create_task(flow("remove")), asyncio.create_task(flow("rebalance"))]
+        await pump(broker, context, lambda: all(t.done() for t in tasks))
+        assert [t.result() for t in tasks] == [True, True]
+        # The second trigger waits until the first request is finished, so popups never mix
+        assert pending_at_trigger == [["remove"], ["rebalance"]]
+        assert popups["remove"].clicked == ["Confirm"] and popups["rebalance"].clicked == ["Confirm"]
+
+    @pytest.mark.asyncio
+    async def test_only_matching_buttons_are_clicked(self, broker_config):
+        broker_config.WALLET_CONFIRM_TIMEOUT = 0.2
+        broker, context = ConfirmationBroker(), FakeContext()
+        broker._popup_urls[context] = POPUP_URL
+        broker._slots[context] = asyncio.Lock()
+        popup = FakePopup("connect", buttons=("Connect",))
+
+        async with broker.expect(FakePage(context), TRANSACTION, "deposit") as request:
+            context.pages.append(popup)
+        await pump(broker, context, lambda: request.done)
+        assert await request.wait() is False and request.error == "timed out"
+        assert popup.clicked == []
+
+        async with broker.expect(FakePage(context), CONNECT, "connect") as request:
+            pass
+        await pump(broker, context, lambda: request.done)
+        assert await request.wait() is True and popup.clicked == ["Connect"]
+
+    @pytest.mark.asyncio
+    async def test_unexpected_popups_are_left_alone(self, broker_config):
+        broker, context = ConfirmationBroker(), FakeContext()
+        broker._popup_urls[context] = POPUP_URL
+        broker._slots[context] = asyncio.Lock()
+        popup = FakePopup("phishing")
+        context.pages.append(popup)
+        for _ in range(3):
+            await broker.check(context)
+        assert popup.clicked == []
+
+    @pytest.mark.asyncio
+    async def test_no_popup_times_out_and_frees_the_slot(self, broker_config):
+        broker, context = ConfirmationBroker(), FakeContext()
+        broker._popup_urls[context] = POPUP_URL
+        broker._slots[context] = asyncio.Lock()
+
+        async with broker.expect(FakePage(context), TRANSACTION, "swap") as request:
+            pass
+        await pump(broker, context, lambda: request.done)
+        assert await request.wait() is False and request.error == "no wallet popup opened"
+        assert not broker._slots[context].locked()
+
+    @pytest.mark.asyncio
+    async def test_unmanaged_pages_pass_through(self):
+        async with ConfirmationBroker().expect(FakePage(FakeContext()), TRANSACTION) as request:
+            pass
+        assert await request.wait() is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
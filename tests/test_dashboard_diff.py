@@ -0,0 +1,144 @@
+"""
+Test file for incremental dashboard diffing (services/dashboard_diff.py)
+
+Covers:
+- New, closed, out-of-range and back-in-range positions keyed by (contract, pool id)
+- Liquidity changes above the reporting threshold
+- Per-view snapshots ("changes since last view")
+- Background alerts only sent when something changed
+- Failed dashboard fetches leaving the snapshot untouched
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.dashboard_diff import DashboardAlerts, diff_positions, diff_since_view, position_key
+
+
+def make_pool(pool_id, contract="0xABC", liquidity="$1,000.00", status="In Range", tokens="S/USDC"):
+    return {
+        "pool_id": pool_id,
+        "contract_address": contract,
+        "pool_link": f"https://www.shadow.so/liquidity/manage/{contract}/{pool_id}",
+        "tokens": tokens,
+        "liquidity": liquidity,
+        "range": "",
+        "status": status,
+    }
+
+
+def keyed(*pools):
+    return {position_key(p): p for p in pools}
+
+
+@pytest.fixture(autouse=True)
+def snapshot_file(tmp_path):
+    with patch('utils.state.DASHBOARD_FILE', str(tmp_path / "dashboard_snapshots.json")), \
+         patch('utils.state.STATE_DIR', str(tmp_path)):
+        yield
+
+
+@pytest.fixture
+def diff_config():
+    with patch('services.dashboard_diff.config') as cfg:
+        cfg.DASHBOARD_LIQUIDITY_CHANGE_PCT = 1
+        yield cfg
+
+
+class TestDiffPositions:
+    """Test class for diff_positions"""
+
+    def test_new_and_closed(self, diff_config):
+        diff = diff_positions(keyed(make_pool("1"), make_pool("2")), keyed(make_pool("2"), make_pool("3")))
+        assert [p["pool_id"] for p in diff.added] == ["3"]
+        assert [p["pool_id"] for p in diff.closed] == ["1"]
+        assert diff.unchanged == 1
+
+    def test_same_id_on_other_contract_is_a_new_position(self, diff_config):
+        diff = diff_positions(keyed(make_pool("1", contract="0xAAA")), keyed(make_pool("1", contract="0xBBB")))
+        assert len(diff.added) == 1 and len(diff.closed) == 1
+
+    def test_range_transitions(self, diff_config):
+        old = keyed(make_pool("1"), make_pool("2", status="Out of Range"))
+        new = keyed(make_pool("1", status="Out of Range"), make_pool("2"))
+        diff = diff_positions(old, new)
+        assert [p["pool_id"] for p in diff.out_of_range] == ["1"]
+        assert [p["pool_id"] for p in diff.back_in_range] == ["2"]
+
+    def test_liquidity_threshold(self, diff_config):
+        old = keyed(make_pool("1", liquidity="$1,000.00"), make_pool("2", liquidity="$1,000.00"))
+        new = keyed(make_pool("1", liquidity="$1,005.00"), make_pool("2", liquidity="$1,200.00"))
+        diff = diff_positions(old, new)
+        assert [(p["pool_id"], a, b) for p, a, b in diff.liquidity] == [("2", "$1,000.00", "$1,200.00")]
+        assert "💰 #2 S/USDC liquidity $1,000.00 → $1,200.00" in diff.format()
+
+    def test_no_changes_is_compact(self, diff_config):
+        pools = keyed(make_pool("1"), make_pool("2"))
+        diff = diff_positions(pools, pools)
+        assert not diff
+        assert diff.format() == "🔄 Dashboard changes: none (2 position(s) unchanged)."
+
+
+class TestViews:
+    """Test class for per-view snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_first_view_has_no_diff(self, diff_config):
+        assert await diff_since_view("42", [make_pool("1")]) == (None, None)
+
+    @pytest.mark.asyncio
+    async def test_changes_since_last_view_per_chat(self, diff_config):
+        await diff_since_view("42", [make_pool("1")])
+        await diff_since_view("7", [make_pool("1")])
+        diff, since = await diff_since_view("42", [make_pool("1"), make_pool("2")])
+        assert [p["pool_id"] for p in diff.added] == ["2"] and since is not None
+
+        diff, _ = await diff_since_view("42", [make_pool("1"), make_pool("2")])
+        assert not diff
+        diff, _ = await diff_since_view("7", [make_pool("1"), make_pool("2")])
+        assert len(diff.added) == 1
+
+
+class TestDashboardAlerts:
+    """Test class for background change alerts"""
+
+    @pytest.mark.asyncio
+    async def test_alerts_only_on_change(self, diff_config):
+        bot = MagicMock()
+        fetch = AsyncMock(side_effect=[[make_pool("1")], [make_pool("1")], [make_pool("1", status="Out of Range")]])
+        with patch('services.dashboard_diff.fetch_dashboard_pools', fetch), \
+             patch('services.dashboard_diff.notify_admins', new=AsyncMock()) as notify:
+            alerts = DashboardAlerts(bot, notify_target=MagicMock())
+            await alerts.check()
+            await alerts.check()
+            notify.assert_not_called()
+            await alerts.check()
+
+        notify.assert_called_once()
+        assert "⚠️ Out of range #1" in notify.call_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_keeps_previous_snapshot(self, diff_config):
+        """A failed fetch neither reports every position as closed nor replaces the snapshot"""
+        bot = MagicMock()
+        fetch = AsyncMock(side_effect=[[make_pool("1")], None, [make_pool("1")]])
+        with patch('services.dashboard_diff.fetch_dashboard_pools', fetch), \
+             patch('services.dashboard_diff.notify_admins', new=AsyncMock()) as notify:
+            alerts = DashboardAlerts(bot, notify_target=MagicMock())
+            await alerts.check()
+            assert await alerts.check() is None
+            diff = await alerts.check()
+
+        notify.assert_not_called()
+        assert not diff and diff.unchanged == 1
+
+    @pytest.mark.asyncio
+    async def test_skipped_while_disconnected(self, diff_config):
+        bot = MagicMock()
+        bot.browser = None
+        with patch('services.dashboard_diff.fetch_dashboard_pools', new=AsyncMock()) as fetch:
+            assert await DashboardAlerts(bot).check() is None
+        fetch.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
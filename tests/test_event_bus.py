@@ -0,0 +1,123 @@
+"""
+Test file for the in-process event bus (utils/event_bus.py)
+
+Covers:
+- Typed events delivered only to subscribers of their type
+- Bounded queues with the latest/drop policies and backpressure counters
+- Background consumers (sync and async handlers, failing handlers)
+- Publishing from a worker thread
+- Producers: record_price and rebalance stages publish events
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from utils.event_bus import (
+    POLICY_DROP, POLICY_LATEST, EventBus, FlowStageCompleted, PriceTick, TriggerFired,
+)
+
+LINK = "https://www.shadow.so/liquidity/pool-a"
+
+
+class TestEventBus:
+    """Test class for EventBus"""
+
+    @pytest.mark.asyncio
+    async def test_events_routed_by_type(self):
+        bus = EventBus()
+        ticks = bus.subscribe(PriceTick, maxsize=10)
+        flows = bus.subscribe(TriggerFired, FlowStageCompleted, maxsize=10)
+        bus.publish(PriceTick(LINK, 1.5))
+        bus.publish(FlowStageCompleted(LINK, "rebalance", "withdrawn"))
+
+        assert (await ticks.get(timeout=1)).price == 1.5
+        assert await ticks.get(timeout=0.01) is None
+        assert (await flows.get(timeout=1)).stage == "withdrawn"
+        assert bus.published == {"PriceTick": 1, "FlowStageCompleted": 1}
+
+    @pytest.mark.asyncio
+    async def test_queue_policies(self):
+        bus = EventBus()
+        latest = bus.subscribe(PriceTick, name="latest", maxsize=2, policy=POLICY_LATEST)
+        drop = bus.subscribe(PriceTick, name="drop", maxsize=2, policy=POLICY_DROP)
+        for price in (1.0, 2.0, 3.0, 4.0):
+            bus.publish(PriceTick(LINK, price))
+
+        assert [(await latest.get()).price for _ in range(2)] == [3.0, 4.0]
+        assert [(await drop.get()).price for _ in range(2)] == [1.0, 2.0]
+        assert latest.dropped == drop.dropped == 2
+        assert latest.max_depth == 2 and latest.delivered == 2
+        assert "latest: queue 0/2 (max 2, latest), delivered 2, dropped 2" in bus.format()
+        with pytest.raises(ValueError):
+            bus.subscribe(PriceTick, policy="block")
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_ends_iteration(self):
+        bus = EventBus()
+        subscription = bus.subscribe(PriceTick)
+        bus.publish(PriceTick(LINK, 1.0))
+        subscription.close()
+        bus.publish(PriceTick(LINK, 2.0))
+        assert [event.price async for event in subscription] == [1.0]
+        assert bus.subscriptions() == []
+        assert bus.format() == "No event subscribers."
+
+    @pytest.mark.asyncio
+    async def test_consumers(self):
+        bus = EventBus()
+        seen = []
+
+        async def record(event):
+            seen.append(event.price)
+
+        def failing(event):
+            raise RuntimeError("broken consumer")
+
+        recorder = bus.consume(record, PriceTick)
+        broken = bus.consume(failing, PriceTick)
+        bus.publish(PriceTick(LINK, 1.0))
+        bus.publish(PriceTick(LINK, 2.0))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert seen == [1.0, 2.0]
+        assert broken.delivered == 2  # errors are logged, the consumer keeps going
+        recorder.close()
+        broken.close()
+
+    @pytest.mark.asyncio
+    async def test_publish_from_thread(self):
+        bus = EventBus()
+        subscription = bus.subscribe(PriceTick)
+        await asyncio.to_thread(bus.publish, PriceTick(LINK, 3.0))
+        assert (await subscription.get(timeout=1)).price == 3.0
+
+
+class TestProducers:
+    """Test class for the events published by the tracking code"""
+
+    @pytest.mark.asyncio
+    async def test_record_price_publishes_tick(self):
+        from services import price_source
+        bus = EventBus()
+        subscription = bus.subscribe(PriceTick)
+        with patch('services.price_source.bus', bus), patch('services.price_source.record_price_tick'):
+            price_source.record_price(LINK, 1.25)
+        event = await subscription.get(timeout=1)
+        assert (event.link, event.price) == (LINK, 1.25)
+
+    @pytest.mark.asyncio
+    async def test_pipeline_stage_publishes_event(self):
+        from utils.rebalance_pipeline import STAGE_WITHDRAWN, RebalancePipeline
+        bus = EventBus()
+        subscription = bus.subscribe(FlowStageCompleted)
+        pipeline = RebalancePipeline(None, None, None, LINK, {"token": "SHADOW"}, ["SHADOW", "1", "SOL"])
+        with patch('utils.rebalance_pipeline.bus', bus), \
+                patch('utils.rebalance_pipeline.save_checkpoint'), \
+                patch('utils.rebalance_pipeline.record_rebalance_event'):
+            pipeline._advance(pipeline.new_checkpoint(), STAGE_WITHDRAWN)
+        event = await subscription.get(timeout=1)
+        assert (event.flow, event.stage) == ("rebalance", STAGE_WITHDRAWN)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,157 @@
+"""
+Test file for the Chromium memory governor (services/memory_governor.py)
+
+Covers:
+- Finding our browser process by profile and sampling renderer/tree RSS
+- Leaked tab cleanup (tracker, extension and young tabs are kept)
+- Reload requests for bloated tracker pages, skipped mid-rebalance
+- Context recycle through the watchdog after repeated over-limit checks
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.memory_governor import MB, MemoryGovernor, MemorySample, find_browser_process, sample_tree
+from utils.shadow_utils import pages_to_reload, tracker_pages
+
+
+def make_proc(pid, name, cmdline, rss=0, children=()):
+    proc = MagicMock()
+    proc.pid = pid
+    proc.name.return_value = name
+    proc.cmdline.return_value = cmdline
+    proc.memory_info.return_value.rss = rss
+    proc.children.return_value = list(children)
+    return proc
+
+
+def make_page(url="https://www.shadow.so/liquidity", heap=10 * MB):
+    page = MagicMock()
+    page.url = url
+    page.close = AsyncMock()
+    page.evaluate = AsyncMock(return_value=heap)
+    return page
+
+
+@pytest.fixture
+def memory_config():
+    with patch('services.memory_governor.config') as cfg:
+        cfg.USER_DATA_DIR = "/profiles/main"
+        cfg.MEMORY_TREE_LIMIT_MB = 1000
+        cfg.MEMORY_RENDERER_LIMIT_MB = 300
+        cfg.MEMORY_PAGE_HEAP_LIMIT_MB = 100
+        cfg.MEMORY_LEAKED_TAB_AGE = 0
+        cfg.MEMORY_RECYCLE_AFTER = 2
+        yield cfg
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    yield
+    tracker_pages.clear()
+    pages_to_reload.clear()
+
+
+@pytest.fixture
+def governor(memory_config):
+    bot = MagicMock()
+    bot.watchdog = None
+    bot.browser = MagicMock()
+    governor = MemoryGovernor(bot)
+    with patch('services.memory_governor.load_checkpoints_async', return_value={}):
+        yield governor
+
+
+class TestSampling:
+    """Test class for process discovery and sampling"""
+
+    def test_finds_browser_for_profile(self):
+        renderer = make_proc(11, "chrome", ["chrome", "--type=renderer"])
+        other = make_proc(20, "chrome", ["chrome", "--user-data-dir=/profiles/main_standby_1"])
+        ours = make_proc(10, "chrome", ["chrome", "--user-data-dir=/profiles/main/"])
+        node = make_proc(5, "node", ["node", "cli.js"])
+        root = make_proc(1, "python", [], children=[node, renderer, other, ours])
+
+        assert find_browser_process("/profiles/main", root=root) is ours
+        assert find_browser_process("/profiles/missing", root=root) is None
+
+    def test_sample_tree(self):
+        renderers = [make_proc(11, "chrome", ["--type=renderer"], rss=200 * MB),
+                     make_proc(12, "chrome", ["--type=renderer"], rss=50 * MB)]
+        gpu = make_proc(13, "chrome", ["--type=gpu-process"], rss=30 * MB)
+        browser = make_proc(10, "chrome", [], rss=100 * MB, children=renderers + [gpu])
+
+        sample = sample_tree(browser)
+        assert sample.tree_rss == 380 * MB
+        assert sample.renderers == {11: 200 * MB, 12: 50 * MB}
+        assert sample.largest_renderer == 200 * MB
+
+
+class TestGovernor:
+    """Test class for MemoryGovernor escalation"""
+
+    @pytest.mark.asyncio
+    async def test_under_limit_does_nothing(self, governor):
+        leaked = make_page()
+        governor.bot.browser.pages = [make_page(), leaked]
+        with patch.object(governor, 'sample', return_value=MemorySample(tree_rss=500 * MB)):
+            await governor.check()
+        leaked.close.assert_not_called()
+        assert governor.over_limit_checks == 0
+
+    @pytest.mark.asyncio
+    async def test_closes_only_leaked_tabs(self, governor, memory_config):
+        first, tracked, extension, leaked = make_page(), make_page(), make_page("chrome-extension://abc/home.html"), make_page()
+        tracker_pages[tracked] = "https://www.shadow.so/liquidity/pool-a"
+        governor.bot.browser.pages = [first, tracked, extension, leaked]
+        with patch.object(governor, 'sample', return_value=MemorySample(tree_rss=1500 * MB)):
+            await governor.check()
+
+        leaked.close.assert_called_once()
+        for page in (first, tracked, extension):
+            page.close.assert_not_called()
+
+        memory_config.MEMORY_LEAKED_TAB_AGE = 3600
+        young = make_page()
+        governor.bot.browser.pages = [first, young]
+        with patch.object(governor, 'sample', return_value=MemorySample(tree_rss=1500 * MB)):
+            await governor.check()
+        young.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reloads_bloated_tracker_pages(self, governor):
+        small, big = make_page(heap=20 * MB), make_page(heap=150 * MB)
+        rebalancing = make_page(heap=500 * MB)
+        tracker_pages.update({small: "pool-a", big: "pool-b", rebalancing: "pool-c"})
+        governor.bot.browser.pages = [small, big, rebalancing]
+        with patch('services.memory_governor.load_checkpoints_async', return_value={"pool-c": {}}), \
+             patch.object(governor, 'sample', return_value=MemorySample(tree_rss=1500 * MB)):
+            await governor.check()
+        assert pages_to_reload == {big}
+
+    @pytest.mark.asyncio
+    async def test_renderer_over_limit_reloads_largest_page(self, governor):
+        small, big = make_page(heap=20 * MB), make_page(heap=60 * MB)
+        tracker_pages.update({small: "pool-a", big: "pool-b"})
+        governor.bot.browser.pages = [small, big]
+        sample = MemorySample(tree_rss=500 * MB, renderers={11: 400 * MB})
+        with patch.object(governor, 'sample', return_value=sample):
+            await governor.check()
+        assert pages_to_reload == {big}
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_repeated_over_limit(self, governor):
+        governor.bot.watchdog = MagicMock()
+        governor.bot.watchdog.standby = None
+        governor.bot.watchdog.recover = AsyncMock(return_value=True)
+        governor.bot.browser.pages = [make_page()]
+        with patch.object(governor, 'sample', return_value=MemorySample(tree_rss=1500 * MB)):
+            await governor.check()
+            governor.bot.watchdog.recover.assert_not_called()
+            await governor.check()
+
+        governor.bot.watchdog.recover.assert_called_once()
+        assert governor.recycles == 1 and governor.over_limit_checks == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""
+Test file for the outbound Telegram message queue (utils/message_queue.py)
+
+Covers:
+- Token bucket refill and delay calculation
+- Coalescing of small messages to the same chat
+- Honoring RetryAfter from Telegram, per chat or globally for chat-less sends
+- Replies that carry no message are ignored
+"""
+
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from telegram.error import RetryAfter
+from utils.message_queue import MessageQueue, TokenBucket, COALESCE_MAX_CHARS
+
+
+@pytest.fixture
+def fast_config():
+    """Use short windows so tests do not wait on real flood limits"""
+    with patch('utils.message_queue.config') as cfg:
+        cfg.TELEGRAM_GLOBAL_RATE = 100
+        cfg.TELEGRAM_CHAT_RATE = 100
+        cfg.TELEGRAM_CHAT_BURST = 100
+        cfg.MESSAGE_COALESCE_WINDOW = 0.05
+        yield cfg
+
+
+def make_update(chat_id=1):
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    update.effective_chat.id = chat_id
+    return update
+
+
+class TestTokenBucket:
+    """Test class for the token bucket"""
+
+    def test_bucket_allows_burst_then_delays(self):
+        """Capacity tokens are available at once, then the refill rate applies"""
+        bucket = TokenBucket(rate=2, capacity=2)
+        now = bucket.updated
+        bucket.consume(now)
+        bucket.consume(now)
+        assert bucket.delay(now) == pytest.approx(0.5)
+        assert bucket.delay(now + 0.5) == 0.0
+
+
+class TestMessageQueue:
+    """Test class for the message queue"""
+
+    @pytest.mark.asyncio
+    async def test_small_messages_are_coalesced(self, fast_config):
+        """A burst of small messages to one chat is delivered as a single message"""
+        queue = MessageQueue()
+        update = make_update()
+        queue.reply(update, "Opening pool page…")
+        queue.reply(update, "Connecting wallet…")
+        queue.reply(update, "Submitting…")
+        assert await queue.drain(timeout=2)
+
+        update.message.reply_text.assert_called_once_with(
+            "Opening pool page…\nConnecting wallet…\nSubmitting…"
+        )
+        assert queue.merged_count == 2
+
+    @pytest.mark.asyncio
+    async def test_large_messages_are_not_merged(self, fast_config):
+        """Chunks above the coalescing size are sent one by one, in order"""
+        queue = MessageQueue()
+        update = make_update()
+        chunks = ["a" * (COALESCE_MAX_CHARS + 1), "b" * (COALESCE_MAX_CHARS + 1)]
+        for chunk in chunks:
+            queue.reply(update, chunk)
+        assert await queue.drain(timeout=2)
+
+        sent = [c.args[0] for c in update.message.reply_text.call_args_list]
+        assert sent == chunks
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honored(self, fast_config):
+        """A RetryAfter error requeues the message and delays the chat"""
+        queue = MessageQueue()
+        update = make_update()
+        update.message.reply_text.side_effect = [RetryAfter(1), None]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        queue.reply(update, "hello")
+        assert await queue.drain(timeout=5)
+
+        assert update.message.reply_text.call_count == 2
+        assert loop.time() - started >= 1
+        assert queue.retry_after_count == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_without_chat_blocks_every_chat(self, fast_config):
+        """A flood wait on a send with no chat scope holds back the other chats too"""
+        queue = MessageQueue()
+        chatless = make_update()
+        chatless.effective_chat = None
+        chatless.message.reply_text.side_effect = [RetryAfter(1), None]
+        other = make_update(chat_id=2)
+        loop = asyncio.get_running_loop()
+        sent_at = []
+        other.message.reply_text.side_effect = lambda text: sent_at.append(loop.time())
+
+        started = loop.time()
+        queue.reply(chatless, "hello")
+        await asyncio.sleep(0.2)
+        queue.reply(other, "world")
+        assert await queue.drain(timeout=5)
+
+        assert len(sent_at) == 1 and sent_at[0] - started >= 1
+        assert queue._global_blocked_until > 0 and not queue._chat_blocked_until
+
+    @pytest.mark.asyncio
+    async def test_reply_without_message_is_ignored(self, fast_config):
+        """Updates without a message (e.g. tracker without a chat) enqueue nothing"""
+        queue = MessageQueue()
+        queue.reply(None, "hello")
+        update = MagicMock()
+        update.message = None
+        queue.reply(update, "hello")
+        assert queue.pending_count() == 0
+        assert await queue.drain(timeout=1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,214 @@
+"""
+Test file for Multicall batching (services/multicall.py)
+
+Covers:
+- aggregate3 calldata encoding / result decoding
+- Reading slot0, liquidity and positions for many pools in a single HTTP request
+- Per-call failures reported per pool
+- Human prices for tracked pools, oriented on the deposit token
+- Several positions on one pool, keyed by position id
+- Reads of concurrent trackers coalesced into one batched read
+"""
+
+import asyncio
+import math
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import AsyncMock, MagicMock, patch
+from models.pool import Pool
+from services.multicall import (
+    MULTICALL3_ADDRESS,
+    SELECTOR_LIQUIDITY,
+    SELECTOR_POSITIONS,
+    BatchedPoolReads,
+    MulticallReader,
+    decode_aggregate3,
+    encode_aggregate3,
+)
+from services.rpc_client import RpcClient
+
+POSITION_MANAGER = "0x" + "cc" * 20
+POOL_COUNT = 50
+
+
+def word(value: int) -> str:
+    return format(value % (1 << 256), "064x")
+
+
+def pool_address(i: int) -> str:
+    return "0x" + format(i + 1, "040x")
+
+
+def decode_calls(calldata: str):
+    """Stand-in side: decode aggregate3((address,bool,bytes)[]) calldata."""
+    raw = bytes.fromhex(calldata[10:])
+    array_start = int.from_bytes(raw[0:32], "big")
+    count = int.from_bytes(raw[array_start:array_start + 32], "big")
+    base = array_start + 32
+    calls = []
+    for i in range(count):
+        start = base + int.from_bytes(raw[base + 32 * i:base + 32 * (i + 1)], "big")
+        target = "0x" + raw[start + 12:start + 32].hex()
+        data_start = start + int.from_bytes(raw[start + 64:start + 96], "big")
+        length = int.from_bytes(raw[data_start:data_start + 32], "big")
+        calls.append((target, "0x" + raw[data_start + 32:data_start + 32 + length].hex()))
+    return calls
+
+
+def encode_results(results):
+    """Stand-in side: encode (bool,bytes)[] return data."""
+    tuples = []
+    for success, data in results:
+        payload = bytes.fromhex(data[2:])
+        padded = payload + b"\x00" * (-len(payload) % 32)
+        tuples.append(bytes.fromhex(word(1 if success else 0) + word(0x40) + word(len(payload))) + padded)
+    offsets, position = [], 32 * len(tuples)
+    for t in tuples:
+        offsets.append(bytes.fromhex(word(position)))
+        position += len(t)
+    return "0x" + word(0x20) + word(len(tuples)) + b"".join(offsets).hex() + b"".join(tuples).hex()
+
+
+def answer_call(target, data):
+    if target == "0x" + "ff" * 20:
+        return False, "0x"
+    if target == POSITION_MANAGER:
+        token_id = int(data[10:], 16)
+        fields = [0, 0, 50, -1000 - token_id, 1000 + token_id, 777, 0, 0, 0, 0]
+        return True, "0x" + "".join(word(f) for f in fields)
+    index = int(target, 16)
+    if data == "0x3850c7bd":
+        return True, "0x" + word(2 ** 96 * index) + word(-index) + word(0) * 5
+    if data == SELECTOR_LIQUIDITY:
+        return True, "0x" + word(index * 1000)
+    return False, "0x"
+
+
+@pytest_asyncio.fixture
+async def rpc_server():
+    """Local JSON-RPC stand-in executing aggregate3 against a fixed table"""
+    stats = {"requests": 0, "aggregates": 0}
+
+    def answer(request):
+        call = request["params"][0]
+        assert call["to"] == MULTICALL3_ADDRESS
+        stats["aggregates"] += 1
+        results = [answer_call(t, d) for t, d in decode_calls(call["data"])]
+        return {"jsonrpc": "2.0", "id": request["id"], "result": encode_results(results)}
+
+    async def handler(http_request):
+        stats["requests"] += 1
+        body = await http_request.json()
+        if isinstance(body, list):
+            return web.json_response([answer(r) for r in body])
+        return web.json_response(answer(body))
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = RpcClient(f"http://127.0.0.1:{port}/", timeout=5, pool_size=2)
+    yield client, stats
+    await client.close()
+    await runner.cleanup()
+
+
+class TestAggregate3Codec:
+    """Test class for aggregate3 encoding"""
+
+    def test_calldata_round_trip(self):
+        calls = [(pool_address(1), "0x3850c7bd"), (POSITION_MANAGER, SELECTOR_POSITIONS + word(7))]
+        decoded = decode_calls(encode_aggregate3(calls))
+        assert decoded == calls
+
+    def test_result_round_trip(self):
+        results = [(True, "0x" + word(5)), (False, "0x"), (True, "0x" + word(1) + word(2))]
+        assert decode_aggregate3(encode_results(results)) == results
+
+
+class TestMulticallReader:
+    """Test class for MulticallReader against the local stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_all_pools_in_one_request(self, rpc_server):
+        client, stats = rpc_server
+        reader = MulticallReader(client=client, batch_size=16)
+        addresses = [pool_address(i) for i in range(POOL_COUNT)]
+        positions = {3: addresses[0], 4: addresses[0]}
+
+        states = await reader.read_pools(addresses, positions, POSITION_MANAGER)
+
+        assert stats["requests"] == 1
+        assert stats["aggregates"] == math.ceil((2 * POOL_COUNT + 2) / 16)
+        assert states[addresses[9]]["sqrt_price_x96"] == 2 ** 96 * 10
+        assert states[addresses[9]]["tick"] == -10
+        assert states[addresses[9]]["liquidity"] == 10000
+        assert states[addresses[0]]["positions"][3] == {"tick_lower": -1003, "tick_upper": 1003, "position_liquidity": 777}
+        assert states[addresses[0]]["positions"][4]["tick_lower"] == -1004
+
+    @pytest.mark.asyncio
+    async def test_failed_calls_are_reported_per_pool(self, rpc_server):
+        client, _ = rpc_server
+        reader = MulticallReader(client=client)
+        bad = "0x" + "ff" * 20
+
+        states = await reader.read_pools([pool_address(0), bad])
+
+        assert "error" not in states[pool_address(0)]
+        assert states[bad]["error"] == "slot0 call failed"
+
+    @pytest.mark.asyncio
+    async def test_tracked_pool_prices(self, rpc_server):
+        client, stats = rpc_server
+        price_source = MagicMock()
+        price_source.pool_metas = AsyncMock(side_effect=lambda addresses: {a: {
+            "decimals0": 18, "decimals1": 18, "symbol0": "WS", "symbol1": "USDC",
+        } for a in addresses})
+        reader = MulticallReader(client=client, price_source=price_source)
+        pools = [
+            Pool(link=f"https://www.shadow.so/liquidity/{pool_address(1)}/7", range="wide", token="WS", amount=1,
+                 meta={"position_id": 7}),
+            Pool(link=f"https://www.shadow.so/liquidity/{pool_address(1)}/8", range="narrow", token="WS", amount=1),
+            Pool(link=f"https://www.shadow.so/liquidity/{pool_address(3)}", range="wide", token="USDC", amount=1),
+            Pool(link="https://www.shadow.so/liquidity/test-pool-1", range="wide", token="S", amount=1),
+        ]
+
+        with patch('services.multicall.config') as cfg:
+            cfg.POSITION_MANAGER_ADDRESS = POSITION_MANAGER
+            tracked = await reader.read_tracked_pools(pools)
+
+        assert stats["requests"] == 1
+        price_source.pool_metas.assert_awaited_once()
+        assert sorted(price_source.pool_metas.call_args.args[0]) == [pool_address(1), pool_address(3)]
+        assert tracked[pools[0].link]["price"] == pytest.approx(4.0)       # (2 * 2^96 / 2^96)^2
+        assert tracked[pools[2].link]["price"] == pytest.approx(1 / 16.0)  # inverted to USDC
+        assert tracked[pools[0].link]["tick_lower"] == -1007
+        assert tracked[pools[1].link]["tick_lower"] == -1008  # id taken from the link
+        assert "tick_lower" not in tracked[pools[2].link]
+        assert pools[3].link not in tracked
+
+
+class TestBatchedPoolReads:
+    """Test class for BatchedPoolReads"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_request(self, rpc_server):
+        client, stats = rpc_server
+        reads = BatchedPoolReads(MulticallReader(client=client), window=0.01)
+        pools = [Pool(link=f"https://www.shadow.so/liquidity/{pool_address(i)}", range="wide", token="WS", amount=1)
+                 for i in range(10)]
+
+        states = await asyncio.gather(*(reads.read(pool) for pool in pools))
+
+        assert stats["requests"] == 1 and reads.batches == 1
+        assert [state["tick"] for state in states] == [-(i + 1) for i in range(10)]
+        assert await reads.read(Pool(link="https://www.shadow.so/liquidity/test-pool-1", range="wide",
+                                     token="WS", amount=1)) == {}
+        assert reads.batches == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+"""
+Test file for admin notifications (utils/notifier.py)
+
+Covers:
+- Fan-out to every admin chat through the outbox, without waiting for delivery
+- Outbox retries of network errors, failure counting
+- Deduplication of identical messages
+- Rolling bursts into a digest
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from telegram.error import NetworkError
+from utils.message_queue import MessageQueue
+from utils.notifier import AdminNotifier
+
+
+@pytest.fixture
+def notify_config():
+    with patch('utils.notifier.config') as cfg:
+        cfg.ENABLE_NOTIFICATIONS = True
+        cfg.ADMIN_CHAT_IDS = [1, 2, 3]
+        cfg.NOTIFY_DEDUPE_WINDOW = 300
+        cfg.NOTIFY_BURST_LIMIT = 2
+        cfg.NOTIFY_DIGEST_INTERVAL = 60
+        yield cfg
+
+
+@pytest.fixture
+def outbox():
+    """A private outbox without rate limits or coalescing delay"""
+    with patch('utils.message_queue.config') as cfg:
+        cfg.TELEGRAM_GLOBAL_RATE = 1000
+        cfg.TELEGRAM_CHAT_RATE = 1000
+        cfg.TELEGRAM_CHAT_BURST = 1000
+        cfg.MESSAGE_COALESCE_WINDOW = 0
+        queue = MessageQueue()
+        with patch('utils.notifier.outbox', queue):
+            yield queue
+
+
+def sent_texts(context):
+    return "\n".join(c.kwargs["text"] for c in context.bot.send_message.call_args_list)
+
+
+@pytest.fixture
+def context():
+    context = MagicMock()
+    context.bot.send_message = AsyncMock()
+    return context
+
+
+class TestAdminNotifier:
+    """Test class for AdminNotifier"""
+
+    @pytest.mark.asyncio
+    async def test_sends_to_all_admins(self, notify_config, outbox, context):
+        """Every admin chat receives the message; notify() returns before delivery"""
+        notifier = AdminNotifier()
+        await notifier.notify(context, "Monitor error")
+        assert not context.bot.send_message.called
+        assert outbox.pending_count() == 3
+        assert await outbox.drain(timeout=5)
+
+        chat_ids = sorted(c.kwargs["chat_id"] for c in context.bot.send_message.call_args_list)
+        assert chat_ids == [1, 2, 3]
+        assert notifier.sent_count == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_failed_sends(self, notify_config, outbox, context):
+        """A network error is retried by the outbox"""
+        notify_config.ADMIN_CHAT_IDS = [1]
+        context.bot.send_message.side_effect = [NetworkError("boom"), None]
+        notifier = AdminNotifier()
+
+        await notifier.notify(context, "Monitor error")
+        assert await outbox.drain(timeout=5)
+
+        assert context.bot.send_message.call_count == 2
+        assert notifier.sent_count == 1
+        assert notifier.failed_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted_not_raised(self, notify_config, outbox, context):
+        """Persistent failures are counted instead of raised"""
+        notify_config.ADMIN_CHAT_IDS = [1]
+        context.bot.send_message.side_effect = Exception("boom")
+        notifier = AdminNotifier()
+
+        await notifier.notify(context, "Monitor error")
+        assert await outbox.drain(timeout=5)
+
+        assert context.bot.send_message.call_count == 1
+        assert notifier.sent_count == 0
+        assert notifier.failed_count == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_messages_are_deduplicated(self, notify_config, outbox, context):
+        """The same message inside the window is only sent once"""
+        notify_config.ADMIN_CHAT_IDS = [1]
+        notifier = AdminNotifier()
+        await notifier.notify(context, "Monitor error")
+        await notifier.notify(context, "Monitor error")
+        assert await outbox.drain(timeout=5)
+
+        assert sent_texts(context) == "Monitor error"
+        assert notifier.deduped_count == 1
+
+    @pytest.mark.asyncio
+    async def test_bursts_are_rolled_into_digest(self, notify_config, outbox, context):
+        """Messages beyond the burst limit are sent as one digest"""
+        notify_config.ADMIN_CHAT_IDS = [1]
+        notifier = AdminNotifier()
+        for i in range(5):
+            await notifier.notify(context, f"Monitor error for pool {i}")
+        assert await outbox.drain(timeout=5)
+
+        assert sent_texts(context) == "Monitor error for pool 0\nMonitor error for pool 1"
+        notifier._digest_task.cancel()
+        await notifier.flush_digest()
+        assert await outbox.drain(timeout=5)
+
+        digest = context.bot.send_message.call_args.kwargs["text"]
+        assert "3 notification(s)" in digest
+        assert "pool 4" in digest
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
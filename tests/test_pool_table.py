@@ -0,0 +1,160 @@
+"""
+Test file for the column-oriented pool table (models/pool_table.py)
+
+Covers:
+- Pool-compatible views (reads, writes, meta allocated on demand)
+- Indexes by link, contract and owner chat, kept up to date on change and removal
+- Insertion order and compaction after removals
+- Round trip through the state.json format
+- Lookups of the running bot: Shadow by link, /remove by contract and position id
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from models.pool import Pool
+from models.pool_table import PoolTable
+
+CONTRACT_A = "0x1234567890abcdef1234567890abcdef12345678"
+CONTRACT_B = "0xabcdef1234567890abcdef1234567890abcdef12"
+
+
+def make_pool(i, contract=CONTRACT_A, owner=12345, **kwargs):
+    return Pool(
+        link=f"https://www.shadow.so/liquidity/manage/{contract}/{i}",
+        range=kwargs.get("range", "wide"),
+        token=kwargs.get("token", "SHADOW"),
+        amount=kwargs.get("amount", 100),
+        upper_range=kwargs.get("upper_range", 1.5),
+        lower_range=kwargs.get("lower_range", 0.5),
+        owner_chat_id=owner,
+        last_status=kwargs.get("last_status"),
+        meta=kwargs.get("meta", {}),
+    )
+
+
+class TestPoolView:
+    """Test class for PoolView"""
+
+    def test_view_matches_pool(self):
+        pool = make_pool(1, meta={"position_id": 7}, last_status="active")
+        table = PoolTable([pool])
+        view = table.get(pool.link)
+
+        assert view == pool
+        assert view.to_pool() == pool
+        assert (view.range, view.token, view.amount) == ("wide", "SHADOW", 100.0)
+        assert view.meta == {"position_id": 7}
+
+    def test_missing_values_stay_none(self):
+        table = PoolTable()
+        view = table.add("https://www.shadow.so/liquidity/x", owner_chat_id=None)
+        assert view.upper_range is None and view.lower_range is None and view.owner_chat_id is None
+        assert table.to_dicts()[0]["meta"] == {}
+        view.meta["position_id"] = 3  # allocated on first use and kept
+        assert table.get(view.link).meta == {"position_id": 3}
+
+    def test_writes_go_to_columns(self):
+        table = PoolTable([make_pool(1)])
+        view = next(iter(table))
+        view.last_status = "out of range"
+        view.upper_range = 2.5
+        assert table.to_dicts()[0]["last_status"] == "out of range"
+        assert table.get(view.link).upper_range == 2.5
+
+    def test_strings_are_interned(self):
+        table = PoolTable([make_pool(1, token="".join(["SHA", "DOW"])), make_pool(2)])
+        first, second = list(table)
+        assert first.token is second.token
+
+
+class TestIndexes:
+    """Test class for PoolTable indexes"""
+
+    def test_lookup_by_contract_and_owner(self):
+        table = PoolTable([make_pool(1), make_pool(2, contract=CONTRACT_B, owner=-100), make_pool(3)])
+        assert [p.link.rsplit("/", 1)[1] for p in table.by_contract(CONTRACT_A.upper())] == ["1", "3"]
+        assert [p.link.rsplit("/", 1)[1] for p in table.by_owner(-100)] == ["2"]
+        assert table.by_owner(999) == []
+
+    def test_owner_change_moves_index(self):
+        table = PoolTable([make_pool(1)])
+        view = next(iter(table))
+        view.owner_chat_id = 42
+        assert table.by_owner(12345) == [] and len(table.by_owner(42)) == 1
+
+    def test_remove_keeps_order_and_indexes(self):
+        pools = [make_pool(i) for i in range(6)]
+        table = PoolTable(pools)
+        kept = table.get(pools[5].link)
+        for pool in pools[:4]:
+            assert table.remove(pool.link)
+        assert not table.remove(pools[0].link)
+
+        assert len(table) == 2 and pools[0].link not in table
+        assert [p.link for p in table] == [pools[4].link, pools[5].link]
+        assert [p.link for p in table.by_contract(CONTRACT_A)] == [pools[4].link, pools[5].link]
+        assert kept.amount == 100.0  # view survives compaction
+
+    def test_same_link_overwrites(self):
+        table = PoolTable([make_pool(1)])
+        table.append(make_pool(1, amount=5))
+        assert len(table) == 1 and table.get(make_pool(1).link).amount == 5.0
+
+    def test_scales_to_many_positions(self):
+        table = PoolTable.from_dicts(
+            {"link": f"https://www.shadow.so/liquidity/manage/{CONTRACT_A}/{i}", "owner_chat_id": i % 10, "amount": i}
+            for i in range(20000)
+        )
+        assert len(table) == 20000
+        assert table.get(f"https://www.shadow.so/liquidity/manage/{CONTRACT_A}/19999").amount == 19999.0
+        assert len(table.by_owner(3)) == 2000
+
+
+class TestStateFormat:
+    """Test class for the state.json round trip"""
+
+    def test_round_trip(self):
+        pools = [make_pool(1, meta={"position_id": 1}), make_pool(2, owner=None, upper_range=None)]
+        table = PoolTable.from_dicts(PoolTable(pools).to_dicts())
+        assert table == pools
+        assert table.to_dicts()[1]["owner_chat_id"] is None
+
+    def test_clear(self):
+        table = PoolTable([make_pool(1)])
+        table.clear()
+        assert len(table) == 0 and table == [] and table.by_contract(CONTRACT_A) == []
+
+    def test_view_to_dict(self):
+        table = PoolTable([make_pool(1), make_pool(2, amount=7)])
+        assert table.get(make_pool(2).link).to_dict() == table.to_dicts()[1]
+
+
+class TestRegisteredTable:
+    """Test class for lookups through the running bot's table"""
+
+    @pytest.fixture
+    def registered(self):
+        import utils.state as state
+        table = PoolTable([make_pool(1), make_pool(2, contract=CONTRACT_B, token="S")])
+        with patch.object(state, "_pool_table", table):
+            yield table
+
+    @pytest.mark.asyncio
+    async def test_shadow_reads_the_table(self, registered):
+        from utils.shadow_utils import Shadow
+        with patch('utils.shadow_utils.load_state_async') as load_state:
+            data = await Shadow(MagicMock()).get_pool_data_by_link(make_pool(2, contract=CONTRACT_B).link)
+        assert data["token"] == "S"
+        assert not load_state.called
+
+    def test_remove_link_resolves_tracked_position(self, registered):
+        from bot.commands import Bot
+        bot = Bot.__new__(Bot)
+        bot.pools = registered
+        link = f"https://www.shadow.so/liquidity/{CONTRACT_A}/1"
+        assert bot._tracked_pool(link).link == make_pool(1).link
+        assert bot._tracked_pool(f"https://www.shadow.so/liquidity/{CONTRACT_A}/9") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+"""
+Test file for position P&L analytics (services/position_analytics.py)
+
+Covers:
+- Deposit/withdraw/swap events split into segments
+- LP value vs. holding (impermanent loss) and duration-weighted time in range
+- Fees from recorded withdrawal values, swap cost estimates, net P&L
+- Incremental tick/event caching on top of the SQLite backend
+"""
+
+import math
+import pytest
+from unittest.mock import patch
+import services.position_analytics as position_analytics
+from services.position_analytics import (
+    PositionAnalytics, build_segments, format_reports, lp_values, position_report,
+)
+from utils.state_backend import SqliteStateBackend
+
+LINK = "https://www.shadow.so/liquidity/pool-a"
+
+
+def deposit(ts, price=1.0, amount=100.0, lower=0.8, upper=1.25, token_index=1):
+    return {"link": LINK, "ts": ts, "stage": "deposit",
+            "data": {"amount": amount, "token_index": token_index, "lower": lower, "upper": upper, "price": price}}
+
+
+def withdraw(ts, price, value=None):
+    data = {"price": price}
+    if value is not None:
+        data["value"] = value
+    return {"link": LINK, "ts": ts, "stage": "withdraw", "data": data}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SqliteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+
+class TestSegments:
+    """Test class for build_segments and lp_values"""
+
+    def test_deposits_and_withdrawals(self):
+        events = [deposit(100), withdraw(200, 1.1), {"link": LINK, "ts": 201, "stage": "swap", "data": {"amount": 5}},
+                  deposit(202, price=1.1), deposit(300, price=1.2)]
+        segments, swaps = build_segments(events)
+        assert [(s.start, s.end) for s in segments] == [(100, 200), (202, 300), (300, None)]
+        assert segments[0].end_price == 1.1 and len(swaps) == 1
+
+    def test_deposit_value_matches_position(self):
+        segment = build_segments([deposit(0, token_index=0, amount=10, price=2.0, lower=1.5, upper=3.0)])[0][0]
+        assert segment.deposit_value == pytest.approx(20.0)
+        assert float(lp_values([2.0], 1.5, 3.0, segment.liquidity)[0]) == pytest.approx(20.0)
+
+    def test_unusable_deposits_are_skipped(self):
+        assert build_segments([deposit(0, lower=2.0, upper=1.0)])[0] == []
+
+
+class TestPositionReport:
+    """Test class for position_report"""
+
+    def test_unchanged_price(self):
+        report = position_report(LINK, [deposit(0)], [0.0, 50.0], [1.0, 1.0], now=100, swap_fee_pct=0)
+        assert report.open and report.ticks == 2
+        assert report.net_pnl == pytest.approx(0.0, abs=1e-9)
+        assert report.impermanent_loss == pytest.approx(0.0, abs=1e-9)
+        assert report.time_in_range_pct == pytest.approx(100.0)
+        assert report.fees is None
+
+    def test_impermanent_loss_and_time_in_range(self):
+        # In range for 60s, then above the range for the remaining 40s
+        report = position_report(LINK, [deposit(0)], [0.0, 60.0], [1.0, 1.5], now=100, swap_fee_pct=0)
+        assert report.time_in_range_pct == pytest.approx(60.0)
+        assert report.impermanent_loss < 0 and report.worst_il_pct < 0
+        assert report.value == pytest.approx(report.hodl_value + report.impermanent_loss)
+
+    def test_fees_and_swap_costs(self):
+        events = [deposit(0), withdraw(100, 1.0, value=103.0),
+                  {"link": LINK, "ts": 101, "stage": "swap", "data": {"amount": 50, "price": 1.0}}]
+        report = position_report(LINK, events, [0.0], [1.0], now=500, swap_fee_pct=0.3)
+        assert not report.open
+        assert report.fees == pytest.approx(3.0)
+        assert report.swap_costs == pytest.approx(0.15)
+        assert report.net_pnl == pytest.approx(2.85)
+        assert report.net_pct == pytest.approx(2.85)
+
+    def test_vectorised_matches_python(self):
+        np = position_analytics.np
+        if np is None:
+            pytest.skip("numpy not installed")
+        ts = [float(i) for i in range(200)]
+        prices = [1.0 + 0.4 * math.sin(i / 10) for i in range(200)]
+        events = [deposit(0), withdraw(120, prices[120]), deposit(121, price=prices[121])]
+        fast = position_report(LINK, events, np.asarray(ts), np.asarray(prices), now=300, swap_fee_pct=0)
+        with patch('services.position_analytics.np', None):
+            slow = position_report(LINK, events, ts, prices, now=300, swap_fee_pct=0)
+        for attr in ("net_pnl", "impermanent_loss", "worst_il_pct", "time_in_range_pct"):
+            assert getattr(fast, attr) == pytest.approx(getattr(slow, attr))
+        assert fast.ticks == slow.ticks
+
+
+class TestPositionAnalytics:
+    """Test class for the cached analytics over the SQLite backend"""
+
+    def test_reports_and_incremental_ticks(self, backend):
+        backend.record_rebalance_event(LINK, "deposit", deposit(10)["data"], ts=10)
+        backend.record_rebalance_event(LINK, "withdrawn", {"swap_amount": "1"}, ts=11)  # pipeline stage, ignored
+        for i in range(5):
+            backend.record_price(LINK, 1.0, ts=10 + i)
+        analytics = PositionAnalytics(backend)
+        with patch('services.position_analytics.config') as cfg:
+            cfg.ANALYTICS_SWAP_FEE_PCT = 0.3
+            first = analytics.reports(now=20)
+            assert [r.ticks for r in first] == [5]
+
+            backend.record_price(LINK, 2.0, ts=20)
+            with patch.object(backend, "price_history", wraps=backend.price_history) as history:
+                second = analytics.reports(now=30)
+            assert history.call_args.kwargs["since"] == 14.0
+            assert second[0].ticks == 6 and second[0].time_in_range_pct == pytest.approx(50.0)
+        assert "Net P&L" in format_reports(second)
+
+    def test_no_history(self, backend):
+        assert PositionAnalytics(backend).reports() == []
+        assert format_reports([]).startswith("No deposits recorded yet")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,196 @@
+"""
+Test file for user-defined price alerts (services/price_alerts.py)
+
+Covers:
+- Crossing lookup between consecutive ticks, upwards and downwards, one-shot firing
+- Per-chat listing and removal, per-chat limit
+- Persistence through the JSON and SQLite state backends
+- Notifications sent from PriceTick events
+- /alert add|list|rm command, storing the tracked pool's link
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from services.price_alerts import AlertBook, PriceAlert, PriceAlerts
+from utils.event_bus import PriceTick
+from utils.state_backend import SqliteStateBackend
+
+LINK = "https://www.shadow.so/liquidity/pool-a"
+CONTRACT = "0x324963c267c354c7660ce8ca3f5f167e05649970"
+TRACKED = f"https://www.shadow.so/liquidity/{CONTRACT}/1037968"
+OTHER = "https://www.shadow.so/liquidity/pool-b"
+
+
+def alert(alert_id, price, chat_id=1, link=LINK):
+    return PriceAlert(id=alert_id, chat_id=chat_id, link=link, price=price)
+
+
+@pytest.fixture
+def alerts_config():
+    with patch('services.price_alerts.config') as cfg:
+        cfg.ALERTS_MAX_PER_CHAT = 3
+        yield cfg
+
+
+@pytest.fixture
+def json_alerts(tmp_path, monkeypatch):
+    import utils.state as state
+    monkeypatch.setattr(state, "ALERTS_FILE", str(tmp_path / "alerts.json"))
+    with patch('utils.state.config') as cfg:
+        cfg.STATE_BACKEND = "json"
+        yield state
+
+
+class TestAlertBook:
+    """Test class for AlertBook"""
+
+    def test_crossings(self):
+        book = AlertBook()
+        for a in (alert(1, 0.80), alert(2, 0.82), alert(3, 0.90), alert(4, 0.82, link=OTHER)):
+            book.add(a)
+        assert book.crossed(LINK, 0.81) == []  # first tick only sets the reference
+        assert [a.id for a in book.crossed(LINK, 0.85)] == [2]
+        assert book.crossed(LINK, 0.85) == []
+        assert [a.id for a in book.crossed(LINK, 0.80)] == [1]  # down to exactly the level
+        assert [a.id for a in book.crossed(LINK, 0.95)] == [3]
+        assert book.crossed(LINK, 0.70) == []  # fired alerts are gone
+        assert len(book) == 1 and [a.id for a in book.for_chat(1)] == [4]
+
+    def test_seen_sets_reference_once(self):
+        book = AlertBook()
+        book.add(alert(1, 1.0))
+        book.seen(LINK, 0.9)
+        book.seen(LINK, 1.2)
+        assert [a.id for a in book.crossed(LINK, 1.1)] == [1]
+
+    def test_many_alerts(self):
+        book = AlertBook()
+        for i in range(5000):
+            book.add(alert(i, 1 + i / 1000, chat_id=i % 7))
+        book.crossed(LINK, 0.99)
+        hits = book.crossed(LINK, 1.0105)
+        assert [a.id for a in hits] == list(range(11))
+        assert len(book) == 4989
+
+
+class TestPriceAlerts:
+    """Test class for PriceAlerts"""
+
+    def test_add_list_remove_and_persist(self, alerts_config, json_alerts):
+        engine = PriceAlerts()
+        first = engine.add(10, LINK, 0.82)
+        engine.add(10, OTHER, 1.5)
+        engine.add(20, LINK, 0.9)
+        assert [a.id for a in engine.list(10)] == [1, 2]
+        assert "#1 " + LINK + " crosses 0.82" in engine.format(10)
+        assert engine.format(30).startswith("No price alerts")
+
+        assert engine.remove(10, 2)
+        assert not engine.remove(20, first.id)  # another chat's alert
+        restored = PriceAlerts()
+        assert restored.load() == 2
+        assert restored.add(10, LINK, 2.0).id == 4
+
+    @pytest.mark.asyncio
+    async def test_start_loads_without_blocking(self, alerts_config, json_alerts):
+        PriceAlerts().add(10, LINK, 0.82)
+        engine = PriceAlerts()
+        with patch('services.price_alerts.bus') as bus:
+            await engine.start(MagicMock())
+        assert [a.id for a in engine.list(10)] == [1]
+        bus.consume.assert_called_once()
+
+    def test_limits(self, alerts_config, json_alerts):
+        engine = PriceAlerts()
+        with pytest.raises(ValueError):
+            engine.add(10, LINK, 0)
+        for price in (1, 2, 3):
+            engine.add(10, LINK, price)
+        with pytest.raises(ValueError):
+            engine.add(10, LINK, 4)
+
+    def test_tick_fires_and_notifies(self, alerts_config, json_alerts):
+        engine = PriceAlerts()
+        engine.bot = MagicMock()
+        with patch('services.price_alerts.last_price', return_value=0.8):
+            engine.add(10, LINK, 0.82)
+        with patch('services.price_alerts.outbox') as outbox:
+            engine.on_tick(PriceTick(LINK, 0.81))
+            assert not outbox.send.called
+            engine.on_tick(PriceTick(LINK, 0.83))
+            outbox.send.assert_called_once()
+            assert outbox.send.call_args.args[1] == 10
+            assert "crossed 0.82" in outbox.send.call_args.args[2]
+        assert engine.fired == 1
+        assert PriceAlerts().load() == 0  # fired alerts are deleted
+
+    def test_sqlite_backend(self, tmp_path):
+        backend = SqliteStateBackend(str(tmp_path / "state.db"))
+        backend.save_alert({"id": 1, "chat_id": 10, "link": LINK, "price": 0.82, "created_at": 1.0})
+        backend.save_alert({"id": 2, "chat_id": 11, "link": LINK, "price": 0.9, "created_at": 2.0})
+        backend.delete_alert(1)
+        assert [a["id"] for a in backend.load_alerts()] == [2]
+        backend.close()
+
+
+class TestAlertCommand:
+    """Test class for /alert"""
+
+    @pytest.fixture
+    def bot(self):
+        from bot.commands import Bot
+        bot = Bot()
+        bot._is_authorized = MagicMock(return_value=True)
+        return bot
+
+    def make_update(self):
+        update = MagicMock()
+        update.effective_chat.id = 10
+        return update
+
+    @pytest.mark.asyncio
+    async def test_add_list_rm(self, bot, alerts_config, json_alerts):
+        engine = PriceAlerts()
+        bot.pools.add(LINK, "wide", "S", 10)
+        with patch('bot.commands.price_alerts', engine), patch('bot.commands.outbox') as outbox:
+            update, context = self.make_update(), MagicMock()
+            context.args = ["add", LINK, "0.82"]
+            await bot.alert_command(update, context)
+            assert "Alert #1 added" in outbox.reply.call_args.args[1]
+
+            context.args = ["list"]
+            await bot.alert_command(update, context)
+            assert "crosses 0.82" in outbox.reply.call_args.args[1]
+
+            context.args = ["rm", "#1"]
+            await bot.alert_command(update, context)
+            assert "removed" in outbox.reply.call_args.args[1]
+
+            context.args = ["add", LINK, "abc"]
+            await bot.alert_command(update, context)
+            assert "Could not add alert" in outbox.reply.call_args.args[1]
+
+            context.args = ["bogus"]
+            await bot.alert_command(update, context)
+            assert outbox.reply.call_args.args[1].startswith("Usage:")
+
+    @pytest.mark.asyncio
+    async def test_add_stores_tracked_link(self, bot, alerts_config, json_alerts):
+        """A /manage link of a tracked position is stored under the tracked link; unknown links are rejected"""
+        engine = PriceAlerts()
+        bot.pools.add(TRACKED, "wide", "S", 10)
+        with patch('bot.commands.price_alerts', engine), patch('bot.commands.outbox') as outbox:
+            update, context = self.make_update(), MagicMock()
+            context.args = ["add", f"https://www.shadow.so/liquidity/manage/{CONTRACT}/1037968", "0.82"]
+            await bot.alert_command(update, context)
+            assert "Alert #1 added" in outbox.reply.call_args.args[1]
+
+            context.args = ["add", f"https://www.shadow.so/liquidity/manage/{CONTRACT}/1", "0.82"]
+            await bot.alert_command(update, context)
+            assert "not a tracked pool" in outbox.reply.call_args.args[1]
+
+        assert [a.link for a in engine.list(10)] == [TRACKED]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
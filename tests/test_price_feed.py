@@ -0,0 +1,168 @@
+"""
+Test file for shared per-pool price feeds (services/price_feed.py)
+
+Covers:
+- One page and one read per check for all positions on a pool contract
+- Separate feeds per contract and displayed token; links without a contract are not shared
+- Page adoption, hand-over when the reading position leaves, and closing with the last one
+- Failed reads retried on a fresh page
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.price_feed import PriceFeed, feed_key
+
+CONTRACT = "0x324963c267c354c7660ce8ca3f5f167e05649970"
+OTHER = "0x1111111111111111111111111111111111111111"
+LINK_A = f"https://www.shadow.so/liquidity/{CONTRACT}/1037968"
+LINK_B = f"https://www.shadow.so/liquidity/{CONTRACT}/1037969"
+
+
+def make_page():
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.close = AsyncMock(side_effect=lambda: setattr(page.is_closed, "return_value", True))
+    return page
+
+
+class FakeReader:
+    """Stands in for Shadow: each check waits until the test releases it"""
+
+    def __init__(self, prices):
+        self.prices = list(prices)
+        self.reads = []
+        self.opened = []
+        self.closed = []
+        self.gate = asyncio.Event()
+
+    async def open_price_page(self, link, token):
+        page = make_page()
+        self.opened.append((link, token))
+        return page
+
+    async def read_price(self, page, link, token, base_symbol):
+        self.reads.append((page, link))
+        price = self.prices.pop(0)
+        if isinstance(price, Exception):
+            raise price
+        return price
+
+    async def close_price_page(self, page):
+        self.closed.append(page)
+        await page.close()
+
+    async def _wait_for_next_check(self, link):
+        await self.gate.wait()
+        self.gate.clear()
+
+
+@pytest.fixture
+def feed_config():
+    with patch('services.price_feed.config') as cfg:
+        cfg.PRICE_FEED_SHARED = True
+        yield cfg
+
+
+@pytest.fixture
+def recorded():
+    with patch('services.price_feed.record_price') as record:
+        yield record
+
+
+class TestFeedKey:
+    """Test class for feed_key"""
+
+    def test_keys(self):
+        assert feed_key(LINK_A, "shadow") == feed_key(LINK_B, "SHADOW") == (CONTRACT, "SHADOW")
+        assert feed_key(LINK_A, "S") != feed_key(LINK_A, "SHADOW")
+        assert feed_key("https://www.shadow.so/liquidity/test-pool-1", "SHADOW") is None
+
+
+class TestPriceFeed:
+    """Test class for PriceFeed"""
+
+    @pytest.mark.asyncio
+    async def test_positions_on_one_pool_share_a_read(self, feed_config, recorded):
+        feed = PriceFeed()
+        reader = FakeReader([1.5, 1.6])
+        page_a, page_b = make_page(), make_page()
+        sub_a = feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader, page_a)
+        sub_b = feed.subscribe(LINK_B, "SHADOW", "SHADOW", reader, page_b)
+
+        assert sub_a.page is page_a and sub_b.page is page_a
+        assert feed.owns(page_a) and not feed.owns(page_b)
+        assert len(feed.feeds()) == 1
+        assert await sub_a.next(timeout=1) == 1.5
+        assert await sub_b.next(timeout=1) == 1.5
+        assert len(reader.reads) == 1 and reader.opened == []
+        recorded.assert_any_call(LINK_A, 1.5)
+        recorded.assert_any_call(LINK_B, 1.5)
+
+        reader.gate.set()
+        assert await sub_b.next(timeout=1) == 1.6
+        assert len(reader.reads) == 2
+        assert "1 pool(s) for 2 position(s)" in feed.format()
+
+        await feed.unsubscribe(sub_a)
+        await feed.unsubscribe(sub_b)
+        page_a.close.assert_awaited_once()
+        assert feed.feeds() == []
+
+    @pytest.mark.asyncio
+    async def test_separate_feeds_and_unshared_links(self, feed_config, recorded):
+        feed = PriceFeed()
+        reader = FakeReader([1.0, 2.0, 3.0])
+        subs = [feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader, make_page()),
+                feed.subscribe(f"https://www.shadow.so/liquidity/{OTHER}/5", "SHADOW", "SHADOW", reader, make_page()),
+                feed.subscribe(LINK_B, "S", "SHADOW", reader, make_page())]
+        assert len(feed.feeds()) == 3
+        assert feed.subscribe("https://www.shadow.so/liquidity/test-pool-1", "SHADOW", "SHADOW", reader) is None
+        feed_config.PRICE_FEED_SHARED = False
+        assert feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader) is None
+        for sub in subs:
+            await feed.unsubscribe(sub)
+        assert feed.feeds() == []
+
+    @pytest.mark.asyncio
+    async def test_reading_position_leaves(self, feed_config, recorded):
+        feed = PriceFeed()
+        reader_a, reader_b = FakeReader([1.0]), FakeReader([2.0])
+        page_a = make_page()
+        sub_a = feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader_a, page_a)
+        sub_b = feed.subscribe(LINK_B, "SHADOW", "SHADOW", reader_b, make_page())
+        assert await sub_b.next(timeout=1) == 1.0
+
+        await feed.unsubscribe(sub_a)
+        assert not page_a.close.called  # still read by the other position
+        reader_a.gate.set()
+        assert await sub_b.next(timeout=1) == 2.0
+        assert reader_b.reads == [(page_a, LINK_B)]
+        await feed.unsubscribe(sub_b)
+        assert reader_b.closed == [page_a]
+
+    @pytest.mark.asyncio
+    async def test_failed_read_reopens_page(self, feed_config, recorded):
+        feed = PriceFeed()
+        reader = FakeReader([RuntimeError("Target closed"), 1.2])
+        page = make_page()
+        sub = feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader, page)
+        with patch('services.price_feed.RETRY_DELAY', 0):
+            assert await sub.next(timeout=1) is None
+            assert await sub.next(timeout=1) == 1.2
+        assert reader.closed == [page]
+        assert reader.opened == [(LINK_A, "SHADOW")]
+        await feed.unsubscribe(sub)
+
+    @pytest.mark.asyncio
+    async def test_next_times_out(self, feed_config, recorded):
+        feed = PriceFeed()
+        reader = FakeReader([1.0])
+        sub = feed.subscribe(LINK_A, "SHADOW", "SHADOW", reader, make_page())
+        assert await sub.next(timeout=1) == 1.0
+        assert await sub.next(timeout=0.05) is None
+        await feed.unsubscribe(sub)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,166 @@
+"""
+Test file for the direct JSON-RPC price source (services/rpc_client.py, services/price_source.py)
+
+Covers:
+- Reading slot0 from a local JSON-RPC stand-in
+- Decimal scaling and base-token inversion
+- Reuse of one pooled session with cached pool metadata
+- Falling back to the browser badge when RPC is unavailable
+- Metadata of several pools fetched in the same two batch requests
+"""
+
+import math
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import AsyncMock, MagicMock
+from services.rpc_client import RpcClient, RpcError, decode_int, pool_address_from_link, position_id_from_link
+from services.price_source import RpcPriceSource, BrowserPriceSource
+from utils.cl_math import sqrt_price_x96_to_price
+
+POOL = "0x" + "aa" * 20
+TOKEN0 = "0x" + "01" * 20  # 18 decimals, "WS"
+TOKEN1 = "0x" + "02" * 20  # 6 decimals, "USDC"
+POOL_LINK = f"https://www.shadow.so/liquidity/{POOL}"
+
+
+def word(value: int) -> str:
+    return format(value % (1 << 256), "064x")
+
+
+def encode_string(text: str) -> str:
+    data = text.encode().hex()
+    return "0x" + word(32) + word(len(text)) + data.ljust(64, "0")
+
+
+SQRT_PRICE_X96 = int(math.sqrt(0.5 * 10 ** (6 - 18)) * 2 ** 96)  # 1 WS = 0.5 USDC
+
+
+def make_responses():
+    return {
+        (POOL, "0x0dfe1681"): "0x" + word(int(TOKEN0, 16)),
+        (POOL, "0xd21220a7"): "0x" + word(int(TOKEN1, 16)),
+        (TOKEN0, "0x313ce567"): "0x" + word(18),
+        (TOKEN1, "0x313ce567"): "0x" + word(6),
+        (TOKEN0, "0x95d89b41"): encode_string("WS"),
+        (TOKEN1, "0x95d89b41"): encode_string("USDC"),
+        (POOL, "0x3850c7bd"): "0x" + word(SQRT_PRICE_X96) + word(-276000) + word(0) * 5,
+    }
+
+
+@pytest_asyncio.fixture
+async def rpc_server():
+    """Local JSON-RPC stand-in answering eth_call from a fixed table"""
+    responses = make_responses()
+    stats = {"requests": 0, "calls": 0}
+
+    def answer(request):
+        stats["calls"] += 1
+        call = request["params"][0]
+        result = responses.get((call["to"].lower(), call["data"]))
+        if result is None:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "execution reverted"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handler(http_request):
+        stats["requests"] += 1
+        body = await http_request.json()
+        if isinstance(body, list):
+            return web.json_response([answer(r) for r in body])
+        return web.json_response(answer(body))
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = RpcClient(f"http://127.0.0.1:{port}/", timeout=5, pool_size=2)
+    yield client, stats
+    await client.close()
+    await runner.cleanup()
+
+
+class TestRpcHelpers:
+    """Test class for ABI/link helpers"""
+
+    def test_pool_address_from_link(self):
+        assert pool_address_from_link(POOL_LINK) == POOL
+        assert pool_address_from_link("https://www.shadow.so/liquidity/test-pool-1") is None
+        assert pool_address_from_link(f"{POOL_LINK}/1037968") == POOL
+        assert position_id_from_link(f"{POOL_LINK}/1037968") == 1037968
+        assert position_id_from_link(POOL_LINK) is None
+
+    def test_decode_signed_int(self):
+        assert decode_int(int(word(-276000), 16), 24) == -276000
+
+    def test_sqrt_price_conversion(self):
+        assert sqrt_price_x96_to_price(2 ** 96, 18, 18) == pytest.approx(1.0)
+
+
+class TestRpcPriceSource:
+    """Test class for RpcPriceSource against the local stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_reads_price_from_slot0(self, rpc_server):
+        client, _ = rpc_server
+        source = RpcPriceSource(client=client)
+
+        price = await source.get_price(None, POOL_LINK, "WS")
+        assert price == pytest.approx(0.5, rel=1e-6)
+
+        inverted = await source.get_price(None, POOL_LINK, "USDC")
+        assert inverted == pytest.approx(2.0, rel=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_metadata_is_cached_and_session_reused(self, rpc_server):
+        client, stats = rpc_server
+        source = RpcPriceSource(client=client)
+
+        await source.get_price(None, POOL_LINK)
+        session = client._session
+        requests_after_first = stats["requests"]
+        for _ in range(3):
+            await source.get_price(None, POOL_LINK)
+
+        # Each later read is exactly one HTTP request over the same session
+        assert stats["requests"] == requests_after_first + 3
+        assert client._session is session
+
+    @pytest.mark.asyncio
+    async def test_metadata_of_many_pools_in_two_requests(self, rpc_server):
+        client, stats = rpc_server
+        source = RpcPriceSource(client=client)
+        other = "0x" + "bb" * 20
+        source._pool_meta[other] = {"symbol0": "X"}  # cached pools are not fetched again
+
+        metas = await source.pool_metas([POOL, other])
+
+        assert stats["requests"] == 2
+        assert metas[POOL]["symbol1"] == "USDC" and metas[POOL]["decimals1"] == 6
+        assert metas[other] == {"symbol0": "X"}
+
+    @pytest.mark.asyncio
+    async def test_rpc_error_is_raised(self, rpc_server):
+        client, _ = rpc_server
+        with pytest.raises(RpcError):
+            await client.eth_call("0x" + "ff" * 20, "0x3850c7bd")
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_browser(self, rpc_server):
+        client, _ = rpc_server
+        fallback = MagicMock(spec=BrowserPriceSource)
+        fallback.get_price = AsyncMock(return_value=1.23)
+        source = RpcPriceSource(client=client, fallback=fallback)
+
+        # Link without a pool address -> browser badge
+        assert await source.get_price(MagicMock(), "https://www.shadow.so/liquidity/test-pool-1") == 1.23
+
+        # Unknown pool -> RPC error -> browser badge
+        assert await source.get_price(MagicMock(), "https://www.shadow.so/liquidity/0x" + "ff" * 20) == 1.23
+        assert fallback.get_price.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+"""
+Test file for on-demand profiling (utils/profiler.py)
+
+Covers:
+- Parsing /profile arguments
+- Capturing the next N flows (trace + CPU profile saved, summary reported)
+- Timed captures and stopping early
+- No bookkeeping while no capture is running
+"""
+
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from utils.profiler import ProfileCapture, parse_profile_args, profiled
+
+
+@pytest.fixture
+def profile_config(tmp_path):
+    with patch('utils.profiler.config') as cfg:
+        cfg.PROFILE_DIR = str(tmp_path)
+        cfg.PROFILE_TOP_N = 5
+        cfg.PROFILE_MAX_SECONDS = 600
+        yield cfg
+
+
+def make_browser():
+    browser = MagicMock()
+    browser.tracing.start = AsyncMock()
+
+    async def stop(path):
+        open(path, "wb").close()
+
+    browser.tracing.stop = AsyncMock(side_effect=stop)
+    return browser
+
+
+def busy():
+    return sum(i * i for i in range(20000))
+
+
+class TestParseProfileArgs:
+    """Test class for /profile arguments"""
+
+    def test_defaults_to_one_flow(self, profile_config):
+        assert parse_profile_args([]) == {"action": "start", "flows": 1}
+
+    def test_flows_seconds_and_actions(self, profile_config):
+        assert parse_profile_args(["3"]) == {"action": "start", "flows": 3}
+        assert parse_profile_args(["90s"]) == {"action": "start", "seconds": 90.0}
+        assert parse_profile_args(["STOP"]) == {"action": "stop"}
+
+    @pytest.mark.parametrize("args", [["0"], ["-2"], ["lots"], ["0s"], ["9999s"]])
+    def test_invalid(self, profile_config, args):
+        with pytest.raises(ValueError):
+            parse_profile_args(args)
+
+
+class TestProfileCapture:
+    """Test class for ProfileCapture"""
+
+    @pytest.mark.asyncio
+    async def test_captures_next_flows(self, profile_config, tmp_path):
+        capture = ProfileCapture()
+        browser = make_browser()
+        report = AsyncMock()
+
+        await capture.start(browser, flows=2, report=report)
+        browser.tracing.start.assert_called_once_with(screenshots=True, snapshots=True, sources=False)
+        for name in ("add", "status"):
+            async with capture.flow(name):
+                busy()
+
+        assert not capture.active
+        files = sorted(os.listdir(tmp_path))
+        assert [f.split("_")[0] for f in files] == ["profile", "trace"]
+        summary = report.call_args.args[0]
+        assert "flows: add, status" in summary
+        assert "busy" in summary or "genexpr" in summary
+
+    @pytest.mark.asyncio
+    async def test_flows_ignored_while_idle(self, profile_config):
+        capture = ProfileCapture()
+        handler = AsyncMock(return_value="done")
+        with patch('utils.profiler.profiler', capture):
+            assert await profiled("add", handler)("update", "context") == "done"
+        assert capture.flow_names == [] and not capture.active
+
+    @pytest.mark.asyncio
+    async def test_timed_capture_and_early_stop(self, profile_config):
+        capture = ProfileCapture()
+        report = AsyncMock()
+        await capture.start(None, seconds=0.05, report=report)
+        assert "left" in capture.status()
+        await asyncio.sleep(0.2)
+        assert not capture.active
+        report.assert_called_once()
+
+        await capture.start(None, seconds=60)
+        summary = await capture.finish()
+        assert "Saved: profile_" in summary and "trace_" not in summary
+        assert await capture.finish() is None
+
+    @pytest.mark.asyncio
+    async def test_one_capture_at_a_time(self, profile_config):
+        capture = ProfileCapture()
+        await capture.start(None, flows=1)
+        with pytest.raises(RuntimeError):
+            await capture.start(None, flows=1)
+        await capture.finish()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Test file for the checkpointed rebalance pipeline (utils/rebalance_pipeline.py)
+
+Covers:
+- Full withdraw -> swap -> deposit run with checkpoint cleanup
+- Resuming from the last completed stage
+- Checkpoints surviving a failure mid-way
+- Re-opened pool stored with its new range before the checkpoint is cleared
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call
+import utils.state as state
+from models.pool_table import PoolTable
+from utils.rebalance_pipeline import RebalancePipeline, STAGE_WITHDRAWN, STAGE_SWAPPED
+
+POOL_LINK = "https://www.shadow.so/liquidity/test-pool-1"
+
+
+@pytest.fixture(autouse=True)
+def temp_checkpoints(tmp_path, monkeypatch):
+    """Keep state and checkpoints in a temporary directory"""
+    monkeypatch.setattr(state, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(state, "STATE_FILE", str(tmp_path / "state.json"))
+    monkeypatch.setattr(state, "CHECKPOINT_FILE", str(tmp_path / "checkpoints.json"))
+    monkeypatch.setattr(state, "_pool_table", None)
+
+
+@pytest.fixture
+def pool_data():
+    return {
+        "link": POOL_LINK,
+        "range": "wide",
+        "token": "SHADOW",
+        "amount": 100,
+        "upper_range": 1.5,
+        "lower_range": 0.5,
+    }
+
+
+@pytest.fixture
+def mock_shadow():
+    shadow = MagicMock()
+    shadow.withdraw = AsyncMock()
+    shadow.rebalance = AsyncMock()
+    shadow.add_pool_link = AsyncMock(return_value=(1.6, 0.6))
+    return shadow
+
+
+@pytest.fixture
+def mock_page():
+    page = MagicMock()
+    page.goto = AsyncMock()
+    page.locator.return_value.nth.return_value.text_content = AsyncMock(return_value="Balance: 42.5")
+    return page
+
+
+def make_pipeline(mock_shadow, mock_page, pool_data):
+    return RebalancePipeline(mock_shadow, None, mock_page, POOL_LINK, pool_data, ["SHADOW", "100", "S"])
+
+
+class TestRebalancePipeline:
+    """Test class for RebalancePipeline"""
+
+    @pytest.mark.asyncio
+    async def test_full_run_executes_all_stages(self, mock_shadow, mock_page, pool_data):
+        """A fresh run withdraws, swaps, deposits and clears its checkpoint"""
+        pipeline = make_pipeline(mock_shadow, mock_page, pool_data)
+
+        result = await pipeline.run()
+
+        assert result == (1.6, 0.6)
+        mock_shadow.withdraw.assert_called_once_with(None, mock_page, POOL_LINK)
+        mock_shadow.rebalance.assert_called_once_with(mock_page, ["SHADOW", "S"], " 42.5", pool_link=POOL_LINK)
+        mock_shadow.add_pool_link.assert_called_once_with(None, mock_page, 1, 0, "100", pool_link=POOL_LINK)
+        assert state.load_checkpoints() == {}
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_stages(self, mock_shadow, mock_page, pool_data):
+        """Resuming after the withdrawal does not withdraw again"""
+        pipeline = make_pipeline(mock_shadow, mock_page, pool_data)
+        checkpoint = pipeline.new_checkpoint()
+        checkpoint["stage"] = STAGE_WITHDRAWN
+        checkpoint["swap_amount"] = "10"
+        state.save_checkpoint(checkpoint)
+
+        await pipeline.run()
+
+        mock_shadow.withdraw.assert_not_called()
+        mock_shadow.rebalance.assert_called_once_with(mock_page, ["SHADOW", "S"], "10", pool_link=POOL_LINK)
+        mock_shadow.add_pool_link.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_last_completed_stage(self, mock_shadow, mock_page, pool_data):
+        """A crash during the swap leaves a checkpoint at the withdrawn stage"""
+        mock_shadow.rebalance.side_effect = RuntimeError("swap timed out")
+        pipeline = make_pipeline(mock_shadow, mock_page, pool_data)
+
+        with pytest.raises(RuntimeError):
+            await pipeline.run()
+
+        checkpoint = state.load_checkpoints()[POOL_LINK]
+        assert checkpoint["stage"] == STAGE_WITHDRAWN
+        assert checkpoint["swap_amount"] == " 42.5"
+        assert checkpoint["pool"] == pool_data
+
+    @pytest.mark.asyncio
+    async def test_failed_deposit_is_retried(self, mock_shadow, mock_page, pool_data):
+        """A deposit that could not be submitted is retried on the next run"""
+        mock_shadow.add_pool_link.side_effect = [(None, None), (1.6, 0.6)]
+        pipeline = make_pipeline(mock_shadow, mock_page, pool_data)
+
+        assert await pipeline.run() == (None, None)
+        assert state.load_checkpoints()[POOL_LINK]["stage"] == STAGE_SWAPPED
+
+        assert await pipeline.run() == (1.6, 0.6)
+        assert mock_shadow.withdraw.call_count == 1
+        assert mock_shadow.rebalance.call_count == 1
+        assert state.load_checkpoints() == {}
+
+
+    @pytest.mark.asyncio
+    async def test_reopened_pool_stored_with_new_range(self, mock_shadow, mock_page, pool_data):
+        """After the withdrawal dropped it, the pool is back in the table and state with the new range"""
+        pools = PoolTable.from_dicts([pool_data])
+        state.set_pool_table(pools)
+
+        async def withdraw(update, page, link):
+            pools.remove(link)
+            state.save_state(pools, {"threshold": 10})
+        mock_shadow.withdraw.side_effect = withdraw
+        pipeline = make_pipeline(mock_shadow, mock_page, pool_data)
+
+        await pipeline.run()
+
+        stored = pools.get(POOL_LINK)
+        assert (stored.upper_range, stored.lower_range) == (1.6, 0.6)
+        assert stored.token == "SHADOW" and stored.amount == 100
+        saved = state.load_state()
+        assert [(p["link"], p["upper_range"], p["lower_range"]) for p in saved["pools"]] == [(POOL_LINK, 1.6, 0.6)]
+        assert saved["settings"] == {"threshold": 10}
+        assert state.load_checkpoints() == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
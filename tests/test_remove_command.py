@@ -18,6 +18,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from bot.commands import Bot
 from models.pool import Pool
 from utils.state import save_state, load_state
+from utils.message_queue import outbox
 
 
 class TestRemoveCommand:
@@ -121,6 +122,7 @@ class TestRemoveCommand:
         # Mock unauthorized user
         with patch.object(bot_instance, '_is_authorized', return_value=False):
             await bot_instance.remove_command(mock_update, mock_context)
+            await outbox.drain()
             mock_update.message.reply_text.assert_called_with("Unauthorized.")
     
     @pytest.mark.asyncio
@@ -128,6 +130,7 @@ class TestRemoveCommand:
         """Test that missing arguments are handled"""
         with patch.object(bot_instance, '_is_authorized', return_value=True):
             await bot_instance.remove_command(mock_update, mock_context)
+            await outbox.drain()
             expected_message = "Usage: /remove [pool link]\nExample: /remove https://www.shadow.so/liquidity/manage/0x1234.../123"
             mock_update.message.reply_text.assert_called_with(expected_message)
     
@@ -138,6 +141,7 @@ class TestRemoveCommand:
         
         with patch.object(bot_instance, '_is_authorized', return_value=True):
             await bot_instance.remove_command(mock_update, mock_context)
+            await outbox.drain()
             expected_message = "❌ Invalid pool link format. Expected: https://www.shadow.so/liquidity/manage/[Contract address]/[Pool ID]"
             mock_update.message.reply_text.assert_called_with(expected_message)
     
@@ -149,6 +153,7 @@ class TestRemoveCommand:
         with patch.object(bot_instance, '_is_authorized', return_value=True):
             with patch.object(bot_instance, '_has_stored_credentials', return_value=False):
                 await bot_instance.remove_command(mock_update, mock_context)
+                await outbox.drain()
                 expected_message = "❌ MetaMask credentials not found. Please use /connect first with your password and 12-word seed phrase.\nUsage: /connect [password] [word1] [word2] ... [word12]"
                 mock_update.message.reply_text.assert_called_with(expected_message)
     
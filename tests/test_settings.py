@@ -0,0 +1,136 @@
+"""
+Test file for hot-reloadable settings (utils/settings.py)
+
+Covers:
+- Applying live-safe changes from .env without a restart
+- Reporting settings that need a restart
+- Keeping the current value on invalid input
+- Listeners (log level, Telegram rate limits)
+- Threshold/tolerance: saved values applied at startup, live .env edits saved back
+"""
+
+import logging
+import os
+import pytest
+from unittest.mock import patch
+from config import Config, config
+from utils.message_queue import outbox
+from utils.settings import SettingsWatcher, settings as shared_settings
+
+TOUCHED = ["POLL_INTERVAL", "ADMIN_CHAT_IDS", "NOTIFY_BURST_LIMIT", "LOG_LEVEL", "TELEGRAM_CHAT_RATE", "HEADLESS"]
+
+
+@pytest.fixture(autouse=True)
+def restore_config(monkeypatch):
+    """Every setting a test may change is restored afterwards"""
+    for key in TOUCHED:
+        monkeypatch.setattr(Config, key, getattr(Config, key))
+    monkeypatch.setattr(outbox._global_bucket, "rate", outbox._global_bucket.rate)
+    monkeypatch.setattr(outbox._global_bucket, "capacity", outbox._global_bucket.capacity)
+    root = logging.getLogger()
+    levels = [(root, root.level)] + [(h, h.level) for h in root.handlers]
+    yield
+    for target, level in levels:
+        target.setLevel(level)
+
+
+def write_env(path, lines, tick=[0]):
+    path.write_text("\n".join(lines) + "\n")
+    # Make sure the modification time moves even on coarse filesystems
+    tick[0] += 1
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + tick[0] * 1_000_000_000))
+
+
+class TestSettingsWatcher:
+    """Test class for SettingsWatcher"""
+
+    def test_live_settings_are_applied(self, tmp_path):
+        env = tmp_path / ".env"
+        write_env(env, ["POLL_INTERVAL=30", "HEADLESS=false"])
+        watcher = SettingsWatcher(str(env))
+
+        write_env(env, ["POLL_INTERVAL=12", "ADMIN_CHAT_IDS=1,2", "HEADLESS=false"])
+        change = watcher.check()
+
+        assert config.POLL_INTERVAL == 12
+        assert config.ADMIN_CHAT_IDS == [1, 2]
+        assert change.applied["POLL_INTERVAL"][1] == 12
+        assert change.restart_required == []
+
+    def test_restart_settings_are_reported_not_applied(self, tmp_path):
+        env = tmp_path / ".env"
+        write_env(env, ["HEADLESS=false"])
+        watcher = SettingsWatcher(str(env))
+        before = config.HEADLESS
+
+        write_env(env, ["HEADLESS=true"])
+        change = watcher.check()
+
+        assert config.HEADLESS == before
+        assert change.restart_required == ["HEADLESS"]
+        assert "HEADLESS changed — restart required" in change.format()
+
+    def test_invalid_value_keeps_current(self, tmp_path):
+        env = tmp_path / ".env"
+        write_env(env, ["NOTIFY_BURST_LIMIT=5"])
+        watcher = SettingsWatcher(str(env))
+        before = config.NOTIFY_BURST_LIMIT
+
+        write_env(env, ["NOTIFY_BURST_LIMIT=lots"])
+        change = watcher.check()
+
+        assert config.NOTIFY_BURST_LIMIT == before
+        assert "NOTIFY_BURST_LIMIT" in change.errors
+
+    def test_unchanged_file_is_not_reread(self, tmp_path):
+        env = tmp_path / ".env"
+        write_env(env, ["POLL_INTERVAL=30"])
+        watcher = SettingsWatcher(str(env))
+
+        assert not watcher.check()
+        assert watcher.check(force=True).format() == "⚙️ Settings unchanged."
+
+    def test_listeners_apply_log_level_and_rates(self, tmp_path, monkeypatch):
+        env = tmp_path / ".env"
+        write_env(env, ["LOG_LEVEL=INFO", "TELEGRAM_CHAT_RATE=1"])
+        monkeypatch.setattr(shared_settings, "env_path", str(env))
+        monkeypatch.setattr(shared_settings, "_mtime", shared_settings._stat())
+        monkeypatch.setattr(shared_settings, "_values", shared_settings._read())
+
+        write_env(env, ["LOG_LEVEL=DEBUG", "TELEGRAM_CHAT_RATE=0.5"])
+        bucket = outbox._chat_bucket(424242)
+        shared_settings.check()
+
+        assert logging.getLogger().level == logging.DEBUG
+        assert bucket.rate == 0.5
+        outbox._chat_buckets.pop(424242, None)
+
+
+class TestThresholdSettings:
+    """Test class for REBALANCE_THRESHOLD / BALANCE_TOLERANCE and the bot's saved settings"""
+
+    def test_saved_values_win_and_live_edits_are_saved(self, tmp_path, monkeypatch):
+        from bot.commands import Bot
+        monkeypatch.setattr(config, "REBALANCE_THRESHOLD", config.REBALANCE_THRESHOLD)
+        monkeypatch.setattr(config, "BALANCE_TOLERANCE", config.BALANCE_TOLERANCE)
+        monkeypatch.setattr(Config, "REBALANCE_THRESHOLD", Config.REBALANCE_THRESHOLD)
+        with patch('bot.commands.load_state', return_value={"pools": [], "settings": {"threshold": 80, "balance_tolerance": 3}}):
+            bot = Bot()
+        assert (config.REBALANCE_THRESHOLD, config.BALANCE_TOLERANCE) == (80, 3)
+
+        env = tmp_path / ".env"
+        write_env(env, ["REBALANCE_THRESHOLD=80"])
+        watcher = SettingsWatcher(str(env))
+        watcher.on_change('REBALANCE_THRESHOLD', lambda value: bot.update_setting("threshold", value))
+        write_env(env, ["REBALANCE_THRESHOLD=70"])
+        with patch('bot.commands.save_state') as save_state:
+            watcher.check()
+
+        assert config.REBALANCE_THRESHOLD == 70
+        assert bot.settings["threshold"] == 70
+        assert save_state.call_args.args[1]["threshold"] == 70
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -30,7 +30,7 @@ async def test_withdraw_basic():
     withdraw_page.get_by_role = MagicMock(return_value=AsyncMock())
     
     # Mock state functions
-    with patch('utils.shadow_utils.load_state', return_value={"pools": [], "settings": {}}):
+    with patch('utils.shadow_utils.load_state_async', return_value={"pools": [], "settings": {}}):
         with patch('utils.shadow_utils.save_state'):
             try:
                 await shadow.withdraw(None, withdraw_page, "test-pool-link")
@@ -100,7 +100,7 @@ async def test_track_basic():
         "settings": {"threshold": 90, "balance_tolerance": 2}
     }
     
-    with patch('utils.shadow_utils.load_state', return_value=state_data):
+    with patch('utils.shadow_utils.load_state_async', return_value=state_data):
         with patch.object(shadow, 'get_pool_data_by_link', return_value=pool_data):
             try:
                 await shadow.track(None, shadow_page, "test-pool-link")
@@ -131,8 +131,9 @@ def test_get_pool_data_by_link():
         "settings": {}
     }
     
-    with patch('utils.shadow_utils.load_state', return_value=state_data):
-        result = shadow.get_pool_data_by_link("test-pool-link")
+    with patch('utils.shadow_utils.load_state_async', return_value=state_data), \
+            patch('utils.shadow_utils.registered_pool_table', return_value=None):
+        result = asyncio.run(shadow.get_pool_data_by_link("test-pool-link"))
         
         if result and result.get("link") == "test-pool-link":
             print("✅ get_pool_data_by_link function working correctly")
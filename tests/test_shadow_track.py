@@ -4,7 +4,7 @@ Test file for the track function from shadow_utils.py
 This test file covers the track functionality including:
 - Pool data retrieval from JSON state
 - Settings loading and application
-- Price monitoring and threshold detection
+- Price monitoring and threshold detection (settings read on every check)
 - Automatic rebalancing workflow
 - Continuous tracking loop
 """
@@ -23,6 +23,12 @@ from utils.state import save_state, load_state
 class TestTrack:
     """Test class for the track function"""
     
+    @pytest.fixture(autouse=True)
+    def temp_checkpoints(self, tmp_path, monkeypatch):
+        """Keep rebalance checkpoints written by track out of the real data directory"""
+        import utils.state as state
+        monkeypatch.setattr(state, "CHECKPOINT_FILE", str(tmp_path / "checkpoints.json"))
+    
     @pytest.fixture
     def mock_browser(self):
         """Create a mock browser for testing"""
@@ -98,7 +104,7 @@ class TestTrack:
         """Test that track function loads pool data from JSON state"""
         pool_link = "https://www.shadow.so/liquidity/test-pool-1"
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]) as mock_get_pool:
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.0):
                     with patch.object(shadow_instance, 'monitor', return_value=False):
@@ -112,23 +118,31 @@ class TestTrack:
                 mock_get_pool.assert_called_once_with(pool_link)
     
     @pytest.mark.asyncio
-    async def test_track_loads_settings_from_state(self, shadow_instance, mock_shadow_page, sample_state):
-        """Test that track function loads settings from JSON state"""
+    async def test_track_reads_settings_on_every_check(self, shadow_instance, mock_shadow_page, sample_state):
+        """Test that track function reads threshold and tolerance from config on every check"""
         pool_link = "https://www.shadow.so/liquidity/test-pool-1"
-        
-        with patch('utils.shadow_utils.load_state', return_value=sample_state) as mock_load:
+        waits = []
+
+        async def next_check(seconds):
+            waits.append(seconds)
+            if len(waits) > 1:
+                raise KeyboardInterrupt
+            cfg.REBALANCE_THRESHOLD, cfg.BALANCE_TOLERANCE = 80, 5  # e.g. /set_threshold or a .env edit
+
+        with patch('utils.shadow_utils.config') as cfg:
+            cfg.REBALANCE_THRESHOLD, cfg.BALANCE_TOLERANCE, cfg.POLL_INTERVAL = 90, 2, 7
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.0):
-                    with patch.object(shadow_instance, 'monitor', return_value=False):
-                        with patch('asyncio.sleep', side_effect=KeyboardInterrupt):
+                    with patch.object(shadow_instance, 'monitor', return_value=False) as mock_monitor:
+                        with patch('asyncio.sleep', side_effect=next_check):
                             try:
                                 await shadow_instance.track(None, mock_shadow_page, pool_link)
                             except KeyboardInterrupt:
                                 pass
-                
-                # Verify state was loaded for settings
-                mock_load.assert_called()
-    
+
+        assert waits == [7, 7]
+        assert [(c.args[4], c.args[6]) for c in mock_monitor.call_args_list] == [(90, 2), (80, 5)]
+
     @pytest.mark.asyncio
     async def test_track_handles_missing_pool_data(self, shadow_instance, mock_shadow_page, capsys):
         """Test track function handles missing pool data gracefully"""
@@ -147,7 +161,7 @@ class TestTrack:
         pool_link = "https://www.shadow.so/liquidity/test-pool-1"
         expected_manage_url = "https://www.shadow.so/liquidity/manage/test-pool-1"
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.0):
                     with patch.object(shadow_instance, 'monitor', return_value=False):
@@ -169,7 +183,7 @@ class TestTrack:
         different_token_content = "SOL\u2002100\u2002USDC"
         mock_shadow_page.locator.return_value.text_content.return_value = different_token_content
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.0):
                     with patch.object(shadow_instance, 'monitor', return_value=False):
@@ -187,7 +201,7 @@ class TestTrack:
         """Test track function triggers withdrawal when monitor returns True"""
         pool_link = "https://www.shadow.so/liquidity/test-pool-1"
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.4):  # Near threshold
                     with patch.object(shadow_instance, 'monitor', return_value=True):  # Trigger withdrawal
@@ -211,7 +225,7 @@ class TestTrack:
         # Mock available amount display
         mock_shadow_page.locator.return_value.nth.return_value.text_content.return_value = "Available: 75.25"
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.4):
                     with patch.object(shadow_instance, 'monitor', return_value=True):
@@ -242,7 +256,7 @@ class TestTrack:
                 raise KeyboardInterrupt
             return False
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.0):
                     with patch.object(shadow_instance, 'monitor', side_effect=side_effect):
@@ -264,7 +278,7 @@ class TestTrack:
         # Mock browser with no pages
         shadow_instance.browser.pages = []
         
-        with patch('utils.shadow_utils.load_state', return_value=sample_state):
+        with patch('utils.shadow_utils.load_state_async', return_value=sample_state):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=sample_state["pools"][0]):
                 with patch.object(shadow_instance, 'current_price_monitor') as mock_price_monitor:
                     # Function should exit immediately, so price monitor shouldn't be called
@@ -291,7 +305,7 @@ class TestTrack:
             "settings": {}  # Empty settings
         }
         
-        with patch('utils.shadow_utils.load_state', return_value=state_without_settings):
+        with patch('utils.shadow_utils.load_state_async', return_value=state_without_settings):
             with patch.object(shadow_instance, 'get_pool_data_by_link', return_value=pool_data):
                 with patch.object(shadow_instance, 'current_price_monitor', return_value=1.5):
                     with patch.object(shadow_instance, 'monitor') as mock_monitor:
@@ -12,8 +12,9 @@ import asyncio
 import json
 import os
 import tempfile
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
-from utils.shadow_utils import Shadow
+from utils.shadow_utils import WITHDRAW_STEP_FACTOR, Shadow
 from models.pool import Pool
 from utils.state import save_state, load_state
 
@@ -115,7 +116,7 @@ class TestWithdraw:
             ("button", "Withdraw"): withdraw_button
         }.get((role, name), AsyncMock())
         
-        with patch('utils.shadow_utils.load_state', return_value={"pools": [], "settings": {}}):
+        with patch('utils.shadow_utils.load_state_async', return_value={"pools": [], "settings": {}}):
             with patch('utils.shadow_utils.save_state'):
                 await shadow_instance.withdraw(None, mock_withdraw_page, pool_link)
         
@@ -184,7 +185,7 @@ class TestWithdraw:
         
         mock_withdraw_page.get_by_role.return_value = AsyncMock()
         
-        with patch('utils.shadow_utils.load_state', side_effect=Exception("State load error")):
+        with patch('utils.shadow_utils.load_state_async', side_effect=Exception("State load error")):
             # Should not raise exception
             await shadow_instance.withdraw(None, mock_withdraw_page, pool_link)
             
@@ -199,13 +200,95 @@ class TestWithdraw:
         
         mock_withdraw_page.get_by_role.return_value = AsyncMock()
         
-        with patch('utils.shadow_utils.load_state', return_value={}):
+        with patch('utils.shadow_utils.load_state_async', return_value={}):
             with patch('utils.shadow_utils.save_state') as mock_save:
                 await shadow_instance.withdraw(None, mock_withdraw_page, pool_link)
                 
                 # Should still call save_state with empty pools
                 mock_save.assert_called_once_with([], {})
 
+    @pytest.mark.asyncio
+    async def test_withdraw_waits_on_ui_conditions(self, shadow_instance):
+        """Test withdraw waits on UI conditions instead of fixed sleeps and records time saved"""
+        pool_link = "https://www.shadow.so/liquidity/test-pool-1"
+        
+        button = MagicMock()
+        button.click = AsyncMock()
+        button.wait_for = AsyncMock()
+        locator = MagicMock()
+        locator.count = AsyncMock(return_value=0)
+        locator.all = AsyncMock(return_value=[])
+        locator.first.wait_for = AsyncMock()
+        page = MagicMock()
+        page.get_by_role.return_value = button
+        page.locator.return_value = locator
+        page.wait_for_function = AsyncMock()
+        
+        with patch('utils.shadow_utils.load_state_async', return_value={"pools": [], "settings": {}}):
+            with patch('utils.shadow_utils.save_state'):
+                with patch('asyncio.sleep', new=AsyncMock()) as mock_sleep:
+                    await shadow_instance.withdraw(None, page, pool_link)
+        
+        mock_sleep.assert_not_called()
+        locator.first.wait_for.assert_called_once()
+        button.wait_for.assert_called_once()
+        page.wait_for_function.assert_called()
+        timing = shadow_instance.withdraw_timings[-1]
+        assert timing["link"] == pool_link
+        assert timing["fixed"] == 8
+        assert timing["saved"] > 7
+
+    @pytest.mark.asyncio
+    async def test_each_wait_has_its_own_timeout(self, shadow_instance):
+        """A condition that never holds only costs its own step timeout, not the whole deadline"""
+        waits = []
+
+        async def never(timeout):
+            waits.append(timeout)
+            raise TimeoutError("condition never held")
+
+        deadline = time.monotonic() + 60
+        assert not await shadow_instance._wait_until("slider", never, 1, deadline)
+        assert not await shadow_instance._wait_until("button", never, 3, deadline)
+        assert not await shadow_instance._wait_until("late step", never, 3, time.monotonic() + 0.5)
+        assert waits[0] == 1000 * WITHDRAW_STEP_FACTOR
+        assert waits[1] == 3000 * WITHDRAW_STEP_FACTOR
+        assert waits[2] <= 500
+
+    @pytest.mark.asyncio
+    async def test_wallet_slot_only_held_for_the_click(self, shadow_instance, mock_withdraw_page):
+        """Waiting for the Withdraw button to enable happens before the broker slot is taken"""
+        from contextlib import asynccontextmanager
+        events = []
+
+        @asynccontextmanager
+        async def expect(page, kind, flow=""):
+            events.append("slot taken")
+            request = MagicMock()
+            request.wait = AsyncMock(return_value=True)
+            yield request
+            events.append("slot released")
+
+        async def wait_until(description, condition, fixed_sleep, deadline):
+            events.append(description)
+            return True
+
+        withdraw_button = AsyncMock()
+        withdraw_button.click.side_effect = lambda: events.append("click")
+        mock_withdraw_page.get_by_role = MagicMock(
+            side_effect=lambda role, name: withdraw_button if name == "Withdraw" else AsyncMock())
+        with patch('utils.shadow_utils.broker.expect', expect), \
+                patch.object(shadow_instance, '_wait_until', side_effect=wait_until), \
+                patch.object(shadow_instance, '_set_to_100_percent', AsyncMock()), \
+                patch('utils.shadow_utils.load_state_async', return_value={"pools": [], "settings": {}}), \
+                patch('utils.shadow_utils.registered_pool_table', return_value=None), \
+                patch('utils.shadow_utils.save_state'), \
+                patch('utils.shadow_utils.record_withdraw'):
+            await shadow_instance.withdraw(None, mock_withdraw_page, "https://www.shadow.so/liquidity/test-pool-1")
+
+        assert events[events.index("slot taken") - 1] == "Withdraw button to enable"
+        assert events[events.index("slot taken"):] == ["slot taken", "click", "slot released", "withdrawal submission"]
+
 
 if __name__ == "__main__":
     # Run tests
@@ -0,0 +1,62 @@
+"""
+Test file for process startup cost (main.py / bot.telegram_bot)
+
+Covers:
+- Heavy modules (Playwright, aiohttp, websockets, pyperclip) are not imported at startup
+- Import time of the bot entry point stays within budget (measured with -X importtime)
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only (browser launch, RPC reads, chain event feed, MetaMask import)
+LAZY_MODULES = ["playwright", "aiohttp", "websockets", "pyperclip"]
+
+# Generous upper bound for slow CI machines; the entry point currently imports in ~0.3s
+STARTUP_BUDGET_US = 1_500_000
+
+
+def import_times(module: str):
+    """Run `python -X importtime -c "import <module>"` and return {module: cumulative_us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def times():
+    return import_times("bot.telegram_bot")
+
+
+class TestStartup:
+    """Test class for startup import cost"""
+
+    def test_heavy_modules_are_lazy(self, times):
+        loaded = [m for m in LAZY_MODULES if any(name == m or name.startswith(m + ".") for name in times)]
+        assert loaded == []
+
+    def test_entry_point_within_budget(self, times):
+        assert times["bot.telegram_bot"] < STARTUP_BUDGET_US
+
+    def test_main_does_not_import_browser_stack(self):
+        times = import_times("main")
+        assert "services.launch_browser" not in times
+        assert "services.metamask_connect" not in times
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
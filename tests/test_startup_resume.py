@@ -0,0 +1,123 @@
+"""
+Test file for resuming trackers on startup (services/startup_resume.py)
+
+Covers:
+- Trackers started for every stored pool and interrupted rebalance
+- No browser launched when nothing is stored, or without credentials
+- Page opens staggered under the warm-up concurrency budget
+- Progress and summary reported to admins
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from models.pool_table import PoolTable
+from services.startup_resume import StartupResume
+
+LINKS = [f"https://www.shadow.so/liquidity/0x324963c267c354c7660ce8ca3f5f167e0564997{i}/100{i}" for i in range(6)]
+
+
+@pytest.fixture
+def resume_config():
+    with patch('services.startup_resume.config') as cfg:
+        cfg.RESUME_CONCURRENCY = 2
+        cfg.RESUME_STAGGER = 0
+        cfg.RESUME_WARMUP_TIMEOUT = 1
+        yield cfg
+
+
+def make_bot(links, browser=None, credentials=True):
+    bot = MagicMock()
+    bot.pools = PoolTable.from_dicts({"link": link} for link in links)
+    bot.browser = browser
+    bot._has_stored_credentials.return_value = credentials
+    return bot
+
+
+def make_browser():
+    browser = MagicMock()
+    browser.new_page = AsyncMock(side_effect=lambda: MagicMock())
+    return browser
+
+
+@pytest.fixture
+def fake_supervisor():
+    """Trackers tick after a short load time; records how many were loading at once"""
+    loading = {"now": 0, "max": 0}
+    started = []
+
+    def start(link, page, browser):
+        info = MagicMock(last_tick=None, state="running")
+        started.append(link)
+        loading["now"] += 1
+        loading["max"] = max(loading["max"], loading["now"])
+
+        async def first_tick():
+            await asyncio.sleep(0.02)
+            info.last_tick = 1.0
+            loading["now"] -= 1
+
+        asyncio.get_running_loop().create_task(first_tick())
+        return info
+
+    supervisor = MagicMock()
+    supervisor.find.return_value = []
+    supervisor.start.side_effect = start
+    with patch('services.startup_resume.supervisor', supervisor), \
+         patch('services.startup_resume.load_checkpoints_async', return_value={}):
+        yield {"supervisor": supervisor, "loading": loading, "started": started}
+
+
+class TestStartupResume:
+    """Test class for StartupResume"""
+
+    @pytest.mark.asyncio
+    async def test_resumes_all_pools_within_budget(self, resume_config, fake_supervisor):
+        browser = make_browser()
+        bot = make_bot(LINKS)
+        with patch('services.launch_browser.launch_browser', new=AsyncMock(return_value=browser)) as launch, \
+             patch('services.metamask_connect.metamask_connect', new=AsyncMock()), \
+             patch('services.shadow_connect.shadow_connect', new=AsyncMock()), \
+             patch('services.startup_resume.notify_admins', new=AsyncMock()) as notify:
+            assert await StartupResume(bot, notify_target=MagicMock()).run() == len(LINKS)
+
+        launch.assert_awaited_once()
+        assert bot.browser is browser
+        assert fake_supervisor["started"] == LINKS
+        assert fake_supervisor["loading"]["max"] == 2
+        messages = [c.args[1] for c in notify.call_args_list]
+        assert messages[0] == f"🔁 Resuming tracking for {len(LINKS)} pool(s)…"
+        assert "Resume progress: 5/6" in messages[1]
+        assert messages[-1].startswith(f"✅ Resumed {len(LINKS)}/{len(LINKS)} tracker(s)")
+
+    @pytest.mark.asyncio
+    async def test_interrupted_rebalances_included(self, resume_config, fake_supervisor):
+        bot = make_bot(LINKS[:1], browser=make_browser())
+        with patch('services.startup_resume.load_checkpoints_async', return_value={LINKS[0]: {}, LINKS[1]: {}}):
+            assert await StartupResume(bot).links() == LINKS[:2]
+
+    @pytest.mark.asyncio
+    async def test_nothing_stored_launches_no_browser(self, resume_config, fake_supervisor):
+        with patch('services.launch_browser.launch_browser', new=AsyncMock()) as launch:
+            assert await StartupResume(make_bot([])).run() == 0
+        launch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials_reported(self, resume_config, fake_supervisor):
+        with patch('services.launch_browser.launch_browser', new=AsyncMock()) as launch, \
+             patch('services.startup_resume.notify_admins', new=AsyncMock()) as notify:
+            assert await StartupResume(make_bot(LINKS, credentials=False), notify_target=MagicMock()).run() == 0
+        launch.assert_not_called()
+        assert "no stored MetaMask credentials" in notify.call_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_tracker_without_first_tick_is_reported(self, resume_config, fake_supervisor):
+        resume_config.RESUME_WARMUP_TIMEOUT = 0
+        fake_supervisor["supervisor"].start.side_effect = lambda *a: MagicMock(last_tick=None, state="running")
+        resume = StartupResume(make_bot(LINKS[:1], browser=make_browser()))
+        assert await resume.run() == 1
+        assert resume.warmed == 0 and resume.failed == LINKS[:1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,179 @@
+"""
+Test file for the persistence backends (utils/state_backend.py, utils/state.py)
+
+Covers:
+- SQLite backend: WAL mode, pools/settings round trip, incremental pool updates
+- Checkpoints, dashboard snapshots, price ticks and rebalance events
+- Writes queued on the executor thread, awaitable access from the event loop
+- Reads awaited from the event loop without blocking it
+- One-shot migration of existing JSON files (including price alerts)
+- utils.state dispatching to the configured backend
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
+import utils.state as state
+from models.pool import Pool
+from utils.state_backend import SqliteStateBackend, migrate_json_state
+
+POOLS = [
+    {"link": "https://www.shadow.so/liquidity/pool-a", "range": "wide", "token": "S", "amount": 10.0,
+     "upper_range": 1.5, "lower_range": 0.5, "owner_chat_id": 1, "last_status": None, "meta": {"position_id": 7}},
+    {"link": "https://www.shadow.so/liquidity/pool-b", "range": "narrow", "token": "USDC", "amount": 5.0,
+     "upper_range": None, "lower_range": None, "owner_chat_id": None, "last_status": "active", "meta": {}},
+]
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SqliteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+
+class TestSqliteBackend:
+    """Test class for SqliteStateBackend"""
+
+    def test_wal_mode(self, backend):
+        backend.flush()
+        conn = sqlite3.connect(backend.path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_defaults_when_empty(self, backend):
+        assert backend.load_state() == {"pools": [], "settings": {"threshold": 90, "balance_tolerance": 2}}
+
+    def test_state_round_trip_and_updates(self, backend):
+        backend.save_state(POOLS, {"threshold": 80, "balance_tolerance": 2.5})
+        assert backend.load_state() == {"pools": POOLS, "settings": {"threshold": 80, "balance_tolerance": 2.5}}
+
+        updated = [dict(POOLS[1], last_status="out of range")]
+        backend.save_state(updated, {"threshold": 80})
+        loaded = backend.load_state()
+        assert loaded["pools"] == updated
+        assert loaded["settings"] == {"threshold": 80}
+
+    def test_checkpoints_and_snapshots(self, backend):
+        backend.save_checkpoint({"link": "pool-a", "stage": "withdrawn"})
+        backend.save_checkpoint({"link": "pool-a", "stage": "swapped"})
+        backend.save_checkpoint({"link": "pool-b", "stage": "triggered"})
+        backend.clear_checkpoint("pool-b")
+        assert backend.load_checkpoints() == {"pool-a": {"link": "pool-a", "stage": "swapped"}}
+
+        backend.save_dashboard_snapshot("42", {"taken_at": 1.0, "positions": {}})
+        assert backend.load_dashboard_snapshot("42") == {"taken_at": 1.0, "positions": {}}
+        assert backend.load_dashboard_snapshot("7") is None
+
+    def test_history(self, backend):
+        for i, price in enumerate([1.0, 1.1, 1.2]):
+            backend.record_price("pool-a", price, ts=100 + i)
+        backend.record_price("pool-b", 9.0, ts=101)
+        backend.record_rebalance_event("pool-a", "withdrawn", {"swap_amount": "3"}, ts=105)
+        backend.record_rebalance_event("pool-a", "swapped", ts=106)
+
+        assert [t["price"] for t in backend.price_history("pool-a", since=101)] == [1.1, 1.2]
+        events = backend.rebalance_events("pool-a")
+        assert [e["stage"] for e in events] == ["withdrawn", "swapped"]
+        assert events[0]["data"] == {"swap_amount": "3"}
+
+    def test_statements_run_on_one_thread(self, backend):
+        threads = set()
+        original = backend._transaction
+
+        def spy(fn, *args):
+            threads.add(threading.current_thread().name)
+            return original(fn, *args)
+
+        with patch.object(backend, "_transaction", spy):
+            backend.save_state(POOLS, {})
+            backend.record_price("pool-a", 1.0)
+            backend.flush()
+        assert len(threads) == 1 and threads.pop().startswith("state-db")
+
+    @pytest.mark.asyncio
+    async def test_awaitable_calls(self, backend):
+        backend.save_state(POOLS, {})
+        loaded = await backend.call("load_state")
+        assert len(loaded["pools"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_reads_do_not_block_the_loop(self, backend):
+        backend.save_state(POOLS, {})
+        backend.save_checkpoint({"link": "pool-a", "stage": "withdrawn"})
+        release = threading.Event()
+        backend._submit(release.wait, 5)  # the database thread is busy
+        read = asyncio.ensure_future(backend.load_state_async())
+        await asyncio.sleep(0.05)
+        assert not read.done()  # still queued, and the loop kept running meanwhile
+        release.set()
+        assert len((await read)["pools"]) == 2
+        assert (await backend.load_checkpoints_async())["pool-a"]["stage"] == "withdrawn"
+
+    @pytest.mark.asyncio
+    async def test_async_variants_of_every_read(self, backend):
+        backend.save_dashboard_snapshot("42", {"taken_at": 1.0, "positions": {}})
+        backend.save_alert({"id": 1, "chat_id": 10, "link": "pool-a", "price": 0.8})
+        backend.record_price("pool-a", 1.0, ts=100)
+        backend.record_rebalance_event("pool-a", "withdrawn", ts=105)
+        backend.set_meta("json_migrated", "1")
+
+        assert await backend.load_dashboard_snapshot_async("42") == {"taken_at": 1.0, "positions": {}}
+        assert await backend.load_dashboard_snapshot_async("7") is None
+        assert [a["id"] for a in await backend.load_alerts_async()] == [1]
+        assert [t["price"] for t in await backend.price_history_async("pool-a")] == [1.0]
+        assert [e["stage"] for e in await backend.rebalance_events_async("pool-a", since=100)] == ["withdrawn"]
+        assert await backend.get_meta_async("json_migrated") == "1"
+
+
+class TestMigration:
+    """Test class for the JSON migration"""
+
+    def test_imports_json_once(self, backend, tmp_path):
+        state_file = tmp_path / "state.json"
+        state_file.write_text(json.dumps({"pools": POOLS, "settings": {"threshold": 70}}))
+        checkpoint_file = tmp_path / "checkpoints.json"
+        checkpoint_file.write_text(json.dumps({"pool-a": {"link": "pool-a", "stage": "withdrawn"}}))
+
+        alerts_file = tmp_path / "alerts.json"
+        alerts_file.write_text(json.dumps({"1": {"id": 1, "chat_id": 10, "link": "pool-a", "price": 0.8, "created_at": 1.0}}))
+
+        counts = migrate_json_state(backend, str(state_file), str(checkpoint_file), str(tmp_path / "missing.json"),
+                                    str(alerts_file))
+        assert counts == {"pools": 2, "checkpoints": 1, "snapshots": 0, "alerts": 1}
+        assert [a["price"] for a in backend.load_alerts()] == [0.8]
+        assert backend.load_state()["settings"] == {"threshold": 70}
+
+        backend.save_state([], {"threshold": 70})
+        assert migrate_json_state(backend, str(state_file)) == {"pools": 0, "checkpoints": 0, "snapshots": 0, "alerts": 0}
+        assert backend.load_state()["pools"] == []
+
+
+class TestStateDispatch:
+    """Test class for utils.state with STATE_BACKEND=sqlite"""
+
+    def test_sqlite_backend_selected_and_migrated(self, tmp_path):
+        (tmp_path / "state.json").write_text(json.dumps({"pools": POOLS[:1], "settings": {"threshold": 60}}))
+        with patch('utils.state.config') as cfg, \
+             patch('utils.state.STATE_DIR', str(tmp_path)), \
+             patch('utils.state.STATE_FILE', str(tmp_path / "state.json")), \
+             patch('utils.state.CHECKPOINT_FILE', str(tmp_path / "checkpoints.json")), \
+             patch('utils.state.DASHBOARD_FILE', str(tmp_path / "dashboard_snapshots.json")), \
+             patch('utils.state._sqlite_backend', None):
+            cfg.STATE_BACKEND = "sqlite"
+            cfg.STATE_DB_PATH = ""
+            try:
+                assert state.load_state()["pools"][0]["link"] == POOLS[0]["link"]
+                state.save_state([Pool(link="https://www.shadow.so/liquidity/pool-c", range="wide", token="S", amount=1)],
+                                 {"threshold": 60})
+                assert [p["link"] for p in state.load_state()["pools"]] == ["https://www.shadow.so/liquidity/pool-c"]
+                assert (tmp_path / "state.db").exists()
+            finally:
+                state._sqlite_backend.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
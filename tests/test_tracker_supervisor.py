@@ -0,0 +1,160 @@
+"""
+Test file for tracker supervision (services/tracker_supervisor.py)
+
+Covers:
+- Crashed trackers restarted on a fresh page with exponential backoff
+- Finished trackers are not restarted
+- Cancellation by link (pool and manage links of one position) and stop_all
+- Limit on concurrently warming-up trackers, released on the first tick
+- /tasks view with uptime, last tick and error counts
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.tracker_supervisor import TrackerSupervisor
+
+CONTRACT = "0x324963c267c354c7660ce8ca3f5f167e05649970"
+LINK_A = f"https://www.shadow.so/liquidity/{CONTRACT}/1037968"
+LINK_B = f"https://www.shadow.so/liquidity/{CONTRACT}/1037969"
+
+
+def make_page():
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.close = AsyncMock()
+    return page
+
+
+def make_browser():
+    browser = MagicMock()
+    browser.new_page = AsyncMock(side_effect=lambda: make_page())
+    return browser
+
+
+@pytest.fixture
+def supervisor_config():
+    with patch('services.tracker_supervisor.config') as cfg:
+        cfg.TRACKER_MAX_RUNNING = 0
+        cfg.TRACKER_BACKOFF_MIN = 0.01
+        cfg.TRACKER_BACKOFF_MAX = 0.02
+        yield cfg
+
+
+def patch_track(track):
+    shadow = MagicMock()
+    shadow.return_value.track = track
+    return patch('utils.shadow_utils.Shadow', shadow)
+
+
+class TestTrackerSupervisor:
+    """Test class for TrackerSupervisor"""
+
+    @pytest.mark.asyncio
+    async def test_crashed_tracker_is_restarted(self, supervisor_config):
+        track = AsyncMock(side_effect=[RuntimeError("page crashed"), RuntimeError("again"), None])
+        browser = make_browser()
+        supervisor = TrackerSupervisor(get_browser=lambda: browser)
+        first_page = make_page()
+        first_page.is_closed.return_value = True
+        with patch_track(track):
+            info = supervisor.start(LINK_A, first_page, browser)
+            await asyncio.wait_for(info.task, 1)
+
+        assert info.state == "finished"
+        assert (info.errors, info.restarts, info.last_error) == (2, 2, "again")
+        assert track.call_args_list[0].args[1] is first_page
+        assert browser.new_page.await_count == 1  # closed page replaced, then reused
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_and_closes_page(self, supervisor_config):
+        started = asyncio.Event()
+
+        async def track(update, page, link):
+            started.set()
+            await asyncio.sleep(60)
+
+        supervisor = TrackerSupervisor()
+        page = make_page()
+        with patch_track(track):
+            info = supervisor.start(LINK_A, page, make_browser())
+            await started.wait()
+            # /remove gets the manage link of the same position
+            assert await supervisor.stop(f"https://www.shadow.so/liquidity/manage/{CONTRACT}/1037968") == 1
+
+        assert info.task.cancelled()
+        page.close.assert_awaited_once()
+        assert len(supervisor) == 0
+        assert await supervisor.stop(LINK_B) == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_up_limit(self, supervisor_config):
+        supervisor_config.TRACKER_MAX_RUNNING = 1
+        warm = {LINK_A: asyncio.Event(), LINK_B: asyncio.Event()}
+        release = asyncio.Event()
+        running = []
+
+        async def track(update, page, link):
+            running.append(link)
+            await warm[link].wait()
+            supervisor.tick(link)
+            await release.wait()
+
+        supervisor = TrackerSupervisor()
+        with patch_track(track):
+            a = supervisor.start(LINK_A, make_page(), make_browser())
+            b = supervisor.start(LINK_B, make_page(), make_browser())
+            await asyncio.sleep(0.05)
+            assert running == [LINK_A] and b.state == "queued"
+            assert "1 running, 1/1 warming up, 2 supervised" in supervisor.format()
+            # the first price check frees the slot while A keeps monitoring
+            warm[LINK_A].set()
+            await asyncio.sleep(0.05)
+            assert running == [LINK_A, LINK_B] and a.state == b.state == "running"
+            warm[LINK_B].set()
+            await asyncio.sleep(0.05)
+            assert "2 running, 0/1 warming up, 2 supervised" in supervisor.format()
+            release.set()
+            await asyncio.wait_for(asyncio.gather(a.task, b.task), 1)
+        assert supervisor._running == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_warming_frees_slot(self, supervisor_config):
+        supervisor_config.TRACKER_MAX_RUNNING = 1
+        running = []
+
+        async def track(update, page, link):
+            running.append(link)
+            await asyncio.sleep(60)
+
+        supervisor = TrackerSupervisor()
+        with patch_track(track):
+            a = supervisor.start(LINK_A, make_page(), make_browser())
+            b = supervisor.start(LINK_B, make_page(), make_browser())
+            await asyncio.sleep(0.05)
+            assert running == [LINK_A] and b.state == "queued"
+            await supervisor.stop(LINK_A)
+            await asyncio.sleep(0.05)
+            assert running == [LINK_A, LINK_B] and b.state == "running"
+            await supervisor.stop_all()
+        assert a.task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_tasks_view(self, supervisor_config):
+        async def track(update, page, link):
+            supervisor.tick(link)
+            await asyncio.sleep(60)
+
+        supervisor = TrackerSupervisor()
+        assert supervisor.format() == "No trackers running."
+        with patch_track(track):
+            info = supervisor.start(LINK_A, make_page(), make_browser())
+            await asyncio.sleep(0.02)
+            info.errors, info.last_error = 1, "boom"
+            text = supervisor.format()
+            assert await supervisor.stop_all() == 1
+        assert LINK_A in text and "last tick 0s ago" in text and "errors 1" in text and "last error: boom" in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""Concentrated-liquidity (Uniswap v3 style) math used by Shadow pools.
+
+Prices are "human" prices of token0 expressed in token1 unless noted otherwise; pass the
+token decimals to convert to/from raw on-chain values. Everything is plain Python floats;
+the `*_many` helpers use NumPy when it is installed and fall back to lists otherwise.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+TICK_BASE = 1.0001
+Q96 = 2 ** 96
+MIN_TICK = -887272
+MAX_TICK = 887272
+
+_LOG_TICK_BASE = math.log(TICK_BASE)
+
+
+# --- tick <-> price ---
+
+def tick_to_price(tick: int, decimals0: int = 0, decimals1: int = 0) -> float:
+    return TICK_BASE ** tick * 10 ** (decimals0 - decimals1)
+
+
+def price_to_tick(price: float, decimals0: int = 0, decimals1: int = 0) -> int:
+    """Largest tick whose price is <= `price`."""
+    if price <= 0:
+        raise ValueError("price must be positive")
+    raw = price / 10 ** (decimals0 - decimals1)
+    tick = math.floor(math.log(raw) / _LOG_TICK_BASE)
+    # Guard against float rounding just below an exact tick boundary
+    if TICK_BASE ** (tick + 1) <= raw:
+        tick += 1
+    return max(MIN_TICK, min(MAX_TICK, tick))
+
+
+def nearest_usable_tick(tick: int, tick_spacing: int) -> int:
+    rounded = round(tick / tick_spacing) * tick_spacing
+    if rounded < MIN_TICK:
+        rounded += tick_spacing
+    elif rounded > MAX_TICK:
+        rounded -= tick_spacing
+    return rounded
+
+
+def ticks_to_prices_many(ticks: Iterable[int], decimals0: int = 0, decimals1: int = 0):
+    """Vectorised tick_to_price (NumPy array if available, else a list)."""
+    scale = 10 ** (decimals0 - decimals1)
+    if np is not None:
+        return np.power(TICK_BASE, np.asarray(list(ticks), dtype=float)) * scale
+    return [TICK_BASE ** t * scale for t in ticks]
+
+
+# --- sqrtPrice ---
+
+def tick_to_sqrt_price(tick: int) -> float:
+    """sqrt of the raw price at `tick` (not X96-scaled)."""
+    return math.sqrt(TICK_BASE) ** tick
+
+
+def sqrt_price_x96_to_price(sqrt_price_x96: int, decimals0: int = 0, decimals1: int = 0) -> float:
+    """Human price of token0 expressed in token1."""
+    return (sqrt_price_x96 / Q96) ** 2 * 10 ** (decimals0 - decimals1)
+
+
+def price_to_sqrt_price_x96(price: float, decimals0: int = 0, decimals1: int = 0) -> int:
+    return int(math.sqrt(price / 10 ** (decimals0 - decimals1)) * Q96)
+
+
+# --- liquidity <-> amounts ---
+
+def liquidity_for_amounts(price: float, lower: float, upper: float, amount0: float, amount1: float) -> float:
+    """Largest liquidity that `amount0`/`amount1` can fund in [lower, upper] at `price`.
+
+    Amounts and prices must use the same units (both raw or both human).
+    """
+    sp, sa, sb = _sqrt_bounds(price, lower, upper)
+    if sp <= sa:
+        return amount0 * sa * sb / (sb - sa)
+    if sp >= sb:
+        return amount1 / (sb - sa)
+    l0 = amount0 * sp * sb / (sb - sp)
+    l1 = amount1 / (sp - sa)
+    return min(l0, l1)
+
+
+def amounts_for_liquidity(price: float, lower: float, upper: float, liquidity: float) -> Tuple[float, float]:
+    """(amount0, amount1) held by `liquidity` in [lower, upper] at `price`."""
+    sp, sa, sb = _sqrt_bounds(price, lower, upper)
+    sp = min(max(sp, sa), sb)
+    amount0 = liquidity * (sb - sp) / (sp * sb)
+    amount1 = liquidity * (sp - sa)
+    return amount0, amount1
+
+
+def _sqrt_bounds(price: float, lower: float, upper: float) -> Tuple[float, float, float]:
+    if lower <= 0 or upper <= lower:
+        raise ValueError("invalid range: need 0 < lower < upper")
+    return math.sqrt(price), math.sqrt(lower), math.sqrt(upper)
+
+
+def token_split(price: float, lower: float, upper: float) -> Tuple[float, float]:
+    """Share of the position's value (in token1) held as token0 and token1, each in [0, 1]."""
+    amount0, amount1 = amounts_for_liquidity(price, lower, upper, 1.0)
+    value0 = amount0 * price
+    total = value0 + amount1
+    if total <= 0:
+        return 0.0, 0.0
+    return value0 / total, amount1 / total
+
+
+# --- position status ---
+
+def is_in_range(price: float, lower: float, upper: float) -> bool:
+    return lower <= price < upper
+
+
+def range_status(price: float, lower: float, upper: float) -> Dict[str, Any]:
+    """In-range status of a position, computed locally from a price and the stored range.
+
+    Returns in_range, position_pct (0 = lower bound, 100 = upper bound), the distance from
+    the price to each bound in percent of the price, and the current token0/token1 split.
+    """
+    share0, share1 = token_split(price, lower, upper)
+    return {
+        "in_range": is_in_range(price, lower, upper),
+        "position_pct": (price - lower) / (upper - lower) * 100,
+        "to_lower_pct": (price - lower) / price * 100,
+        "to_upper_pct": (upper - price) / price * 100,
+        "token0_share": share0,
+        "token1_share": share1,
+    }
+
+
+def format_range_status(status: Dict[str, Any], token0: str = "token0", token1: str = "token1") -> str:
+    if status["in_range"]:
+        state = f"in range ({status['position_pct']:.0f}% of range)"
+    elif status["to_lower_pct"] < 0:
+        state = f"out of range, {-status['to_lower_pct']:.2f}% below lower"
+    else:
+        state = f"out of range, {-status['to_upper_pct']:.2f}% above upper"
+    return (
+        f"{state} | to lower {status['to_lower_pct']:.2f}%, to upper {status['to_upper_pct']:.2f}%"
+        f" | {status['token0_share'] * 100:.0f}% {token0} / {status['token1_share'] * 100:.0f}% {token1}"
+    )
+
+
+def range_status_many(prices: List[float], lower: float, upper: float) -> List[bool]:
+    """In-range flags for a series of prices (NumPy-vectorised when available)."""
+    if np is not None:
+        arr = np.asarray(prices, dtype=float)
+        return ((arr >= lower) & (arr < upper)).tolist()
+    return [is_in_range(p, lower, upper) for p in prices]
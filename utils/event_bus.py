@@ -0,0 +1,206 @@
+"""In-process publish/subscribe for price ticks and flow events.
+
+Producers (price reads, the tracker's trigger check, the rebalance pipeline) publish
+typed events and never wait for consumers:
+
+    bus.publish(PriceTick(link, price))
+
+Consumers attach without touching the producers, each with its own bounded queue:
+
+    bus.consume(handler, PriceTick, TriggerFired, name="history")
+
+When a consumer falls behind, its queue policy decides what is lost: POLICY_LATEST drops
+the oldest queued event (keep the newest state), POLICY_DROP drops the incoming one (keep
+what is queued). Published, delivered and dropped counts and the deepest queue seen are
+kept per subscriber (`bus.format()`).
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+from config import config
+
+POLICY_LATEST = "latest"
+POLICY_DROP = "drop"
+
+
+@dataclass(frozen=True)
+class PriceTick:
+    link: str
+    price: float
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class TriggerFired:
+    """The tracker decided to rebalance (price near a range bound or off-center)."""
+    link: str
+    price: float
+    upper_range: float
+    lower_range: float
+    ts: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class FlowStageCompleted:
+    link: str
+    flow: str
+    stage: str
+    ts: float = field(default_factory=time.time)
+
+
+class Subscription:
+    """A bounded queue of the events one consumer asked for."""
+
+    def __init__(self, bus: "EventBus", types: Tuple[Type, ...], name: str, maxsize: int, policy: str):
+        if policy not in (POLICY_LATEST, POLICY_DROP):
+            raise ValueError(f"unknown queue policy: {policy}")
+        self.bus = bus
+        self.types = types
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.delivered = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._queue: Deque[Any] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _offer(self, event) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, event)  # published from a worker thread
+
+    def _put(self, event) -> None:
+        if self.closed:
+            return
+        if len(self._queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == POLICY_DROP:
+                return
+            self._queue.popleft()
+        self._queue.append(event)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None):
+        """The next event, or None on timeout or once the subscription is closed."""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self.delivered += 1
+        return self._queue.popleft()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def format(self) -> str:
+        return (f"   {self.name}: queue {len(self._queue)}/{self.maxsize} (max {self.max_depth}, {self.policy}), "
+                f"delivered {self.delivered}, dropped {self.dropped}")
+
+
+class EventBus:
+    """Fans published events out to the subscribers of their type."""
+
+    def __init__(self):
+        self._subscribers: Dict[Type, List[Subscription]] = {}
+        self.published: Counter = Counter()  # event type name -> count
+        self._consumers: Dict[Subscription, asyncio.Task] = {}
+
+    def subscribe(self, *types: Type, name: str = "", maxsize: Optional[int] = None,
+                  policy: str = POLICY_LATEST) -> Subscription:
+        """Queue every future event of `types` for the caller (needs a running event loop)."""
+        if not types:
+            raise ValueError("subscribe to at least one event type")
+        maxsize = config.EVENT_BUS_QUEUE_SIZE if maxsize is None else maxsize
+        subscription = Subscription(self, types, name or ",".join(t.__name__ for t in types), maxsize, policy)
+        for event_type in types:
+            self._subscribers.setdefault(event_type, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        subscription._ready.set()
+        for event_type in subscription.types:
+            subscribers = self._subscribers.get(event_type, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(event_type, None)
+        task = self._consumers.pop(subscription, None)
+        if task is not None and task is not asyncio.current_task() and not task.done():
+            task.cancel()
+
+    def publish(self, event) -> None:
+        """Queue `event` for its subscribers. Never blocks and never raises."""
+        self.published[type(event).__name__] += 1
+        for subscription in self._subscribers.get(type(event), ()):
+            try:
+                subscription._offer(event)
+            except Exception:
+                logging.exception(f"Event bus delivery to {subscription.name} failed")
+
+    def consume(self, handler: Callable[[Any], Any], *types: Type, name: str = "",
+                maxsize: Optional[int] = None, policy: str = POLICY_LATEST) -> Subscription:
+        """Run `handler` (sync or async) for every event of `types` in a background task."""
+        subscription = self.subscribe(*types, name=name or getattr(handler, "__name__", ""),
+                                      maxsize=maxsize, policy=policy)
+
+        async def _run():
+            async for event in subscription:
+                try:
+                    result = handler(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception:
+                    logging.exception(f"Event consumer {subscription.name} failed on {type(event).__name__}")
+
+        self._consumers[subscription] = asyncio.create_task(_run())
+        return subscription
+
+    def subscriptions(self) -> List[Subscription]:
+        seen: Dict[int, Subscription] = {}
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                seen.setdefault(id(subscription), subscription)
+        return list(seen.values())
+
+    def format(self) -> str:
+        subscriptions = self.subscriptions()
+        if not subscriptions:
+            return "No event subscribers."
+        published = ", ".join(f"{name} {count}" for name, count in sorted(self.published.items())) or "nothing"
+        lines = [f"📨 Event bus: {len(subscriptions)} subscriber(s), published {published}"]
+        lines += [subscription.format() for subscription in subscriptions]
+        return "\n".join(lines)
+
+
+bus = EventBus()
@@ -15,17 +15,17 @@ def setup_logging():
     )
 
     root = logging.getLogger()
-    root.setLevel(logging.INFO)
+    root.setLevel(config.LOG_LEVEL)
 
     # Console handler
     ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
+    ch.setLevel(config.LOG_LEVEL)
     ch.setFormatter(formatter)
     root.addHandler(ch)
 
     # File handler
     fh = logging.FileHandler(log_path)
-    fh.setLevel(logging.INFO)
+    fh.setLevel(config.LOG_LEVEL)
     fh.setFormatter(formatter)
     root.addHandler(fh)
 
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+from config import config
+
+# Telegram rejects messages longer than 4096 characters
+MAX_MESSAGE_LENGTH = 4096
+# Messages at or below this size may be merged with their neighbours
+COALESCE_MAX_CHARS = 1000
+MAX_SEND_ATTEMPTS = 3
+# Queue key of replies whose update carries no chat; their flood waits block every chat
+NO_CHAT = 0
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class _Outgoing:
+    chat_id: int
+    text: str
+    send: Callable[[str], Awaitable]
+    enqueued_at: float
+    attempts: int = 0
+
+
+class MessageQueue:
+    """Central outbound queue for Telegram messages.
+
+    Handlers enqueue text with `reply()` / `send()` and return immediately; a single
+    worker task delivers messages under a global and a per-chat token bucket, merges
+    bursts of small messages to the same chat into one and honors RetryAfter (for that
+    chat, or for every chat when the message had no chat to scope it to).
+    """
+
+    def __init__(self):
+        self._pending: "OrderedDict[int, Deque[_Outgoing]]" = OrderedDict()
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._chat_blocked_until: Dict[int, float] = {}
+        self._global_bucket = TokenBucket(config.TELEGRAM_GLOBAL_RATE, config.TELEGRAM_GLOBAL_RATE)
+        self._global_blocked_until = 0.0
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.sent_count = 0
+        self.merged_count = 0
+        self.retry_after_count = 0
+
+    # --- public API -------------------------------------------------------
+
+    def reply(self, update, text: str) -> None:
+        """Queue a reply to the chat of `update`. No-op when there is nothing to reply to."""
+        if update is None or getattr(update, "message", None) is None:
+            return
+        chat = getattr(update, "effective_chat", None)
+        chat_id = chat.id if chat is not None else NO_CHAT
+        self.enqueue(chat_id, text, update.message.reply_text)
+
+    def send(self, bot, chat_id: int, text: str) -> None:
+        """Queue a message to an arbitrary chat through `bot.send_message`."""
+        async def _send(body: str):
+            return await bot.send_message(chat_id=chat_id, text=body)
+        self.enqueue(chat_id, text, _send)
+
+    def enqueue(self, chat_id: int, text: str, send: Callable[[str], Awaitable]) -> None:
+        if not text:
+            return
+        self._ensure_worker()
+        item = _Outgoing(chat_id=chat_id, text=str(text), send=send, enqueued_at=time.monotonic())
+        self._pending.setdefault(chat_id, deque()).append(item)
+        self._idle.clear()
+        self._wakeup.set()
+
+    def pending_count(self) -> int:
+        return sum(len(q) for q in self._pending.values())
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message was delivered (or dropped). Returns False on timeout."""
+        if self._idle is None or self._idle.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # --- worker -----------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. after a restart of the application): start over
+            self._loop = loop
+            self._pending.clear()
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._idle.set()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    def apply_rates(self) -> None:
+        """Re-read the rate limits from config (after a live settings reload)."""
+        self._global_bucket.rate = self._global_bucket.capacity = config.TELEGRAM_GLOBAL_RATE
+        for bucket in self._chat_buckets.values():
+            bucket.rate = config.TELEGRAM_CHAT_RATE
+            bucket.capacity = config.TELEGRAM_CHAT_BURST
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(config.TELEGRAM_CHAT_RATE, config.TELEGRAM_CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            picked = None
+            wait = None
+            for chat_id, pending in self._pending.items():
+                delay = max(
+                    pending[0].enqueued_at + config.MESSAGE_COALESCE_WINDOW - now,
+                    self._chat_bucket(chat_id).delay(now),
+                    self._chat_blocked_until.get(chat_id, 0.0) - now,
+                )
+                if delay <= 0:
+                    picked = chat_id
+                    break
+                wait = delay if wait is None else min(wait, delay)
+
+            if picked is not None:
+                global_delay = max(self._global_bucket.delay(now), self._global_blocked_until - now)
+                if global_delay > 0:
+                    await asyncio.sleep(global_delay)
+                    continue
+                await self._send_next(picked)
+                continue
+
+            if not self._pending:
+                self._idle.set()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _take_batch(self, chat_id: int) -> _Outgoing:
+        """Pop the next message for `chat_id`, merging following small messages into it."""
+        pending = self._pending[chat_id]
+        first = pending.popleft()
+        if len(first.text) <= COALESCE_MAX_CHARS:
+            parts = [first.text]
+            length = len(first.text)
+            while pending:
+                nxt = pending[0]
+                if len(nxt.text) > COALESCE_MAX_CHARS or length + 1 + len(nxt.text) > MAX_MESSAGE_LENGTH:
+                    break
+                pending.popleft()
+                parts.append(nxt.text)
+                length += 1 + len(nxt.text)
+            if len(parts) > 1:
+                self.merged_count += len(parts) - 1
+                first.text = "\n".join(parts)
+        if not pending:
+            del self._pending[chat_id]
+        else:
+            # Round-robin between chats
+            self._pending.move_to_end(chat_id)
+        return first
+
+    def _requeue(self, item: _Outgoing) -> None:
+        self._pending.setdefault(item.chat_id, deque()).appendleft(item)
+
+    async def _send_next(self, chat_id: int) -> None:
+        item = self._take_batch(chat_id)
+        now = time.monotonic()
+        self._chat_bucket(chat_id).consume(now)
+        self._global_bucket.consume(now)
+        item.attempts += 1
+        try:
+            await item.send(item.text)
+            self.sent_count += 1
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            self.retry_after_count += 1
+            logging.warning("Telegram flood limit for chat %s, retrying in %ss", chat_id, retry_after)
+            blocked_until = time.monotonic() + float(retry_after)
+            if chat_id == NO_CHAT:
+                self._global_blocked_until = max(self._global_blocked_until, blocked_until)
+            else:
+                self._chat_blocked_until[chat_id] = blocked_until
+            item.attempts -= 1  # flood waits do not count as failed attempts
+            self._requeue(item)
+        except (TimedOut, NetworkError) as e:
+            if item.attempts < MAX_SEND_ATTEMPTS:
+                logging.warning("Telegram send to chat %s failed (%s), retrying", chat_id, e)
+                self._chat_blocked_until[chat_id] = time.monotonic() + item.attempts
+                self._requeue(item)
+            else:
+                logging.error("Dropping message to chat %s after %d attempts: %s", chat_id, item.attempts, e)
+        except Exception:
+            logging.exception("Failed to send message to chat %s", chat_id)
+
+
+# Shared outbound queue used by all handlers and flows
+outbox = MessageQueue()
@@ -1,5 +1,115 @@
-from typing import Iterable
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
 from config import config
+from utils.message_queue import outbox
+
+DIGEST_MAX_LENGTH = 4000
+
+
+class AdminNotifier:
+    """Fan out admin notifications through the outbox, with dedupe and digests.
+
+    `notify()` only queues the messages: delivery, retries and Telegram rate limits are
+    handled by the shared outbox worker, so callers (error handlers, watchdog, memory
+    governor) never wait for Telegram.
+
+    Identical messages within NOTIFY_DEDUPE_WINDOW seconds are sent once. When more
+    than NOTIFY_BURST_LIMIT distinct messages arrive within NOTIFY_DIGEST_INTERVAL
+    seconds, further messages are collected and sent as one periodic digest.
+    """
+
+    def __init__(self):
+        self._last_sent: Dict[str, float] = {}
+        self._recent: Deque[float] = deque()
+        self._digest: "OrderedDict[str, int]" = OrderedDict()
+        self._digest_task: Optional[asyncio.Task] = None
+        self._bot = None
+        self.sent_count = 0
+        self.failed_count = 0
+        self.deduped_count = 0
+        self.digested_count = 0
+
+    async def notify(self, context, message: str) -> None:
+        if not config.ENABLE_NOTIFICATIONS:
+            return
+        if not config.ADMIN_CHAT_IDS:
+            return
+        self._bot = context.bot
+        now = time.monotonic()
+
+        # Drop identical messages inside the dedupe window
+        self._prune(now)
+        if message in self._last_sent:
+            self.deduped_count += 1
+            if message in self._digest:
+                self._digest[message] += 1
+            return
+        self._last_sent[message] = now
+
+        # Roll bursts into a digest
+        while self._recent and now - self._recent[0] > config.NOTIFY_DIGEST_INTERVAL:
+            self._recent.popleft()
+        if len(self._recent) >= config.NOTIFY_BURST_LIMIT:
+            self.digested_count += 1
+            self._digest[message] = self._digest.get(message, 0) + 1
+            if self._digest_task is None or self._digest_task.done():
+                self._digest_task = asyncio.create_task(self._flush_digest_later())
+            return
+        self._recent.append(now)
+
+        await self._fan_out(message)
+
+    def _prune(self, now: float) -> None:
+        expired = [m for m, t in self._last_sent.items() if now - t >= config.NOTIFY_DEDUPE_WINDOW]
+        for m in expired:
+            del self._last_sent[m]
+
+    async def _fan_out(self, message: str) -> None:
+        """Queue `message` for every admin chat; the outbox delivers it under its rate limits."""
+        for chat_id in config.ADMIN_CHAT_IDS:
+            outbox.enqueue(chat_id, message, self._sender(chat_id))
+
+    def _sender(self, chat_id: int):
+        bot = self._bot
+
+        async def _send(text: str):
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+            except Exception:
+                self.failed_count += 1  # failed attempt; the outbox retries flood and network errors
+                raise
+            self.sent_count += 1
+        return _send
+
+    async def _flush_digest_later(self) -> None:
+        await asyncio.sleep(config.NOTIFY_DIGEST_INTERVAL)
+        await self.flush_digest()
+
+    async def flush_digest(self) -> None:
+        """Send all collected messages as one digest."""
+        if not self._digest or self._bot is None:
+            return
+        items = list(self._digest.items())
+        self._digest.clear()
+        total = sum(count for _, count in items)
+        lines = [f"📋 Digest: {total} notification(s) in the last {int(config.NOTIFY_DIGEST_INTERVAL)}s"]
+        length = len(lines[0])
+        for i, (message, count) in enumerate(items):
+            line = f"• {message}" + (f" (x{count})" if count > 1 else "")
+            if length + len(line) + 1 > DIGEST_MAX_LENGTH:
+                lines.append(f"… and {len(items) - i} more")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        self._recent.append(time.monotonic())
+        await self._fan_out("\n".join(lines))
+
+
+notifier = AdminNotifier()
+
 
 async def notify_admins(context, message: str):
     """Send a message to all admin chat IDs if notifications are enabled.
@@ -7,13 +117,8 @@ async def notify_admins(context, message: str):
     context: telegram.ext.CallbackContext or Application context within handlers
     message: text to send
     """
-    if not config.ENABLE_NOTIFICATIONS:
-        return
-    if not config.ADMIN_CHAT_IDS:
-        return
-    for chat_id in config.ADMIN_CHAT_IDS:
-        try:
-            await context.bot.send_message(chat_id=chat_id, text=message)
-        except Exception:
-            # Avoid raising in notifier
-            pass
+    try:
+        await notifier.notify(context, message)
+    except Exception:
+        # Avoid raising in notifier
+        logging.exception("Admin notification failed")
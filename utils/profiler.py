@@ -0,0 +1,171 @@
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import config
+
+PROFILE_USAGE = (
+    "Usage: /profile [flows] — capture the next N flows (default 1)\n"
+    "/profile [seconds]s — capture for M seconds, e.g. /profile 60s\n"
+    "/profile stop — finish the running capture now\n"
+    "/profile status — show the running capture"
+)
+
+
+def parse_profile_args(args: List[str]) -> Dict[str, Any]:
+    """Turn /profile arguments into {'action': ..., 'flows': N | 'seconds': M}. Raises ValueError."""
+    if not args:
+        return {"action": "start", "flows": 1}
+    arg = args[0].strip().lower()
+    if arg in ("stop", "status"):
+        return {"action": arg}
+    if arg.endswith("s"):
+        seconds = float(arg[:-1])
+        if not 0 < seconds <= config.PROFILE_MAX_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {config.PROFILE_MAX_SECONDS:g}")
+        return {"action": "start", "seconds": seconds}
+    flows = int(arg)
+    if flows < 1:
+        raise ValueError("flows must be at least 1")
+    return {"action": "start", "flows": flows}
+
+
+def summarize_profile(profile: cProfile.Profile, top_n: int) -> str:
+    """Top-N functions by cumulative time, one short line each."""
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append((cumulative, own, calls, f"{os.path.basename(filename)}:{line}({name})"))
+    rows.sort(reverse=True)
+    lines = [f"{cum:7.3f}s {own:7.3f}s {calls:>7} {where}" for cum, own, calls, where in rows[:top_n]]
+    return "\n".join(["   cum     own   calls function"] + lines)
+
+
+class ProfileCapture:
+    """On-demand Playwright trace + cProfile session.
+
+    Nothing is hooked while idle: `flow()` only counts when a capture is running, tracing
+    is started on the browser context and the profiler is enabled only between `start()`
+    and the end of the capture (after N flows or M seconds). The trace zip and the .prof
+    file are written to PROFILE_DIR and the top functions are reported through `report`.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.flows_left: Optional[int] = None
+        self.deadline: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.flow_names: List[str] = []
+        self._browser = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._report: Optional[Callable[[str], Awaitable]] = None
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, browser, flows: Optional[int] = None, seconds: Optional[float] = None,
+                    report: Optional[Callable[[str], Awaitable]] = None) -> None:
+        """Begin a capture; `browser` may be None (CPU profile only)."""
+        async with self._lock:
+            if self.active:
+                raise RuntimeError("a capture is already running")
+            self._browser = browser
+            if browser is not None:
+                try:
+                    await browser.tracing.start(screenshots=True, snapshots=True, sources=False)
+                except Exception as e:
+                    logging.warning(f"Playwright tracing unavailable, CPU profile only: {e}")
+                    self._browser = None
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            self.active = True
+            self.flows_left = flows if seconds is None else None
+            self.deadline = time.monotonic() + seconds if seconds is not None else None
+            self.started_at = time.monotonic()
+            self.flow_names = []
+            self._report = report
+            if seconds is not None:
+                self._timer = asyncio.create_task(self._stop_later(seconds))
+
+    async def _stop_later(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        await self.finish()
+
+    @asynccontextmanager
+    async def flow(self, name: str):
+        """Mark one user-visible flow; the capture ends after the requested number of them."""
+        try:
+            yield
+        finally:
+            if self.active and self.flows_left is not None:
+                self.flow_names.append(name)
+                self.flows_left -= 1
+                if self.flows_left <= 0:
+                    await self.finish()
+
+    def status(self) -> str:
+        if not self.active:
+            return "No profile capture running."
+        elapsed = time.monotonic() - self.started_at
+        if self.flows_left is not None:
+            return f"🔬 Capturing: {self.flows_left} flow(s) left, running {elapsed:.0f}s."
+        return f"🔬 Capturing: {max(0.0, self.deadline - time.monotonic()):.0f}s left."
+
+    async def finish(self) -> Optional[str]:
+        """End the running capture, save the files and report the summary. None if idle."""
+        async with self._lock:
+            if not self.active:
+                return None
+            self.active = False
+            self._profile.disable()
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            prof_path = os.path.join(config.PROFILE_DIR, f"profile_{stamp}.prof")
+            self._profile.dump_stats(prof_path)
+            files = [prof_path]
+            if self._browser is not None:
+                trace_path = os.path.join(config.PROFILE_DIR, f"trace_{stamp}.zip")
+                try:
+                    await self._browser.tracing.stop(path=trace_path)
+                    files.append(trace_path)
+                except Exception as e:
+                    logging.warning(f"Failed to save Playwright trace: {e}")
+
+            elapsed = time.monotonic() - self.started_at
+            flows = ", ".join(self.flow_names) or "none"
+            summary = (
+                f"🔬 Profile finished after {elapsed:.1f}s (flows: {flows})\n"
+                f"Saved: {', '.join(os.path.basename(f) for f in files)}\n\n"
+                f"{summarize_profile(self._profile, config.PROFILE_TOP_N)}"
+            )
+            self._profile = None
+            self._browser = None
+            report, self._report = self._report, None
+        logging.info(summary)
+        if report is not None:
+            try:
+                await report(summary)
+            except Exception:
+                logging.exception("Failed to report profile summary")
+        return summary
+
+
+profiler = ProfileCapture()
+
+
+def profiled(name: str, handler: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Wrap a Telegram handler so each call counts as one flow for the running capture."""
+    async def wrapper(*args, **kwargs):
+        async with profiler.flow(name):
+            return await handler(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,120 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import config
+from models.pool_table import PoolTable
+from utils.state import (load_checkpoints_async, save_checkpoint, clear_checkpoint, record_rebalance_event,
+                         load_state_async, save_state, registered_pool_table)
+from utils.event_bus import FlowStageCompleted, bus
+
+# Rebalance stages, in order. The checkpoint records the last *completed* stage.
+STAGE_TRIGGERED = "triggered"   # trigger fired, nothing executed yet
+STAGE_WITHDRAWN = "withdrawn"   # liquidity removed, swap amount recorded
+STAGE_SWAPPED = "swapped"       # tokens swapped back into the deposit token
+STAGE_DEPOSITED = "deposited"   # new position opened and stored, checkpoint cleared
+
+STAGES = [STAGE_TRIGGERED, STAGE_WITHDRAWN, STAGE_SWAPPED, STAGE_DEPOSITED]
+
+
+class RebalancePipeline:
+    """Withdraw -> swap -> deposit as an explicit state machine.
+
+    A checkpoint is written to data/checkpoints.json after every completed stage, so a
+    rebalance interrupted by a crash or timeout resumes from the last completed step
+    instead of re-running (and re-confirming) the whole flow.
+    """
+
+    def __init__(self, shadow, update, page, pool_link: str, pool_data: Dict[str, Any], tokens: List[str]):
+        self.shadow = shadow
+        self.update = update
+        self.page = page
+        self.pool_link = pool_link
+        self.pool_data = pool_data
+        self.tokens = tokens
+
+    def new_checkpoint(self) -> Dict[str, Any]:
+        token = self.pool_data.get("token", "")
+        if self.tokens[0] != token:
+            reb_order = [self.tokens[2], self.tokens[0]]
+            token_index = 1
+        else:
+            reb_order = [self.tokens[0], self.tokens[2]]
+            token_index = 0
+        now = time.time()
+        return {
+            "link": self.pool_link,
+            "stage": STAGE_TRIGGERED,
+            "pool": self.pool_data,
+            "reb_order": reb_order,
+            "token_index": token_index,
+            "swap_amount": None,
+            "started_at": now,
+            "updated_at": now,
+        }
+
+    def _advance(self, checkpoint: Dict[str, Any], stage: str) -> None:
+        checkpoint["stage"] = stage
+        checkpoint["updated_at"] = time.time()
+        if stage == STAGE_DEPOSITED:
+            clear_checkpoint(self.pool_link)
+        else:
+            save_checkpoint(checkpoint)
+        record_rebalance_event(self.pool_link, stage, checkpoint)
+        bus.publish(FlowStageCompleted(self.pool_link, "rebalance", stage))
+        print(f"Rebalance {self.pool_link}: stage '{stage}' completed")
+
+    async def _store_reopened_pool(self, pool: Dict[str, Any], upper_range: float, lower_range: float) -> None:
+        """Put the re-opened position back in the pool table and state with its new range.
+
+        The withdrawal dropped the pool; without this a restarted tracker would find no pool data.
+        """
+        try:
+            state = await load_state_async()
+            pools = registered_pool_table()
+            if pools is None:
+                pools = PoolTable.from_dicts(state.get("pools", []))
+            pools.add_dict(dict(pool, link=self.pool_link, upper_range=upper_range, lower_range=lower_range))
+            save_state(pools, state.get("settings", {}))
+        except Exception as e:
+            # The deposit went through; keep going rather than re-depositing on a retry
+            print(f"Rebalance {self.pool_link}: error storing the re-opened pool: {e}")
+
+    async def run(self, checkpoint: Optional[Dict[str, Any]] = None) -> Tuple[Optional[float], Optional[float]]:
+        """Run (or resume) the rebalance. Returns the new (upper_range, lower_range)."""
+        if checkpoint is None:
+            checkpoint = (await load_checkpoints_async()).get(self.pool_link)
+        if checkpoint is None:
+            checkpoint = self.new_checkpoint()
+            save_checkpoint(checkpoint)
+        stage = checkpoint.get("stage", STAGE_TRIGGERED)
+
+        if stage == STAGE_TRIGGERED:
+            await self.shadow.withdraw(None, self.page, self.pool_link)
+            amount_text = await self.page.locator('[class="flex items-center"]').nth(0).text_content()
+            checkpoint["swap_amount"] = amount_text.split(":")[1]
+            self._advance(checkpoint, STAGE_WITHDRAWN)
+            stage = STAGE_WITHDRAWN
+
+        if stage == STAGE_WITHDRAWN:
+            await self.shadow.rebalance(self.page, checkpoint["reb_order"], checkpoint["swap_amount"],
+                                      pool_link=self.pool_link)
+            self._advance(checkpoint, STAGE_SWAPPED)
+            stage = STAGE_SWAPPED
+
+        upper_range = lower_range = None
+        if stage == STAGE_SWAPPED:
+            pool = checkpoint["pool"]
+            # The swap leaves the page on /trade; deposit from the pool page
+            await self.page.goto(self.pool_link)
+            range_type_index = config.DEFAULT_RANGE_TYPES.index(pool.get("range", "").lower())
+            upper_range, lower_range = await self.shadow.add_pool_link(
+                self.update, self.page, range_type_index, checkpoint["token_index"], str(pool.get("amount", 0)),
+                pool_link=self.pool_link,
+            )
+            if upper_range is None and lower_range is None:
+                # Deposit was not submitted; keep the checkpoint so the next attempt retries it
+                print(f"Rebalance {self.pool_link}: deposit failed, will retry from stage '{stage}'")
+                return None, None
+            await self._store_reopened_pool(pool, upper_range, lower_range)
+            self._advance(checkpoint, STAGE_DEPOSITED)
+
+        return upper_range, lower_range
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import dotenv_values
+
+from config import Config, config
+from utils.message_queue import outbox
+
+
+def _bool(value: str) -> bool:
+    return value.strip().lower() == 'true'
+
+
+def _id_list(value: str) -> List[int]:
+    return [int(x) for x in value.split(',') if x.strip().isdigit()]
+
+
+def _str_list(value: str) -> List[str]:
+    return value.split(',')
+
+
+def _log_level(value: str) -> str:
+    level = value.strip().upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"unknown log level {value!r}")
+    return level
+
+
+# Settings that can be changed while the bot runs, with their parser (same as in config.py)
+LIVE_SETTINGS: Dict[str, Callable[[str], Any]] = {
+    'POLL_INTERVAL': int,
+    'REBALANCE_THRESHOLD': float,
+    'BALANCE_TOLERANCE': float,
+    'DEFAULT_RANGE_TYPES': _str_list,
+    'BATCH_ADD_CONCURRENCY': int,
+    'WALLET_CONFIRM_TIMEOUT': float,
+    'WALLET_POPUP_TIMEOUT': float,
+    'TRACKER_MAX_RUNNING': int,
+    'TRACKER_BACKOFF_MIN': float,
+    'TRACKER_BACKOFF_MAX': float,
+    'RESUME_CONCURRENCY': int,
+    'RESUME_STAGGER': float,
+    'RESUME_WARMUP_TIMEOUT': float,
+    'PRICE_FEED_SHARED': _bool,
+    'EVENT_BUS_QUEUE_SIZE': int,
+    'ALERTS_MAX_PER_CHAT': int,
+    'WITHDRAW_DEADLINE': float,
+    'MULTICALL_BATCH_SIZE': int,
+    'MULTICALL_DEADLINE': float,
+    'CHAIN_EVENT_MAX_IDLE': float,
+    'WATCHDOG_HEARTBEAT_TIMEOUT': float,
+    'WATCHDOG_MAX_FAILURES': int,
+    'MEMORY_TREE_LIMIT_MB': float,
+    'MEMORY_RENDERER_LIMIT_MB': float,
+    'MEMORY_PAGE_HEAP_LIMIT_MB': float,
+    'MEMORY_LEAKED_TAB_AGE': float,
+    'MEMORY_RECYCLE_AFTER': int,
+    'DASHBOARD_LIQUIDITY_CHANGE_PCT': float,
+    'ANALYTICS_SWAP_FEE_PCT': float,
+    'PROFILE_TOP_N': int,
+    'PROFILE_MAX_SECONDS': float,
+    'ALLOWED_USER_IDS': _id_list,
+    'ADMIN_CHAT_IDS': _id_list,
+    'ENABLE_NOTIFICATIONS': _bool,
+    'NOTIFY_DEDUPE_WINDOW': float,
+    'NOTIFY_BURST_LIMIT': int,
+    'NOTIFY_DIGEST_INTERVAL': float,
+    'TELEGRAM_GLOBAL_RATE': float,
+    'TELEGRAM_CHAT_RATE': float,
+    'TELEGRAM_CHAT_BURST': int,
+    'MESSAGE_COALESCE_WINDOW': float,
+    'LOG_LEVEL': _log_level,
+}
+
+# Settings only read when the browser, bot or feeds start: reported, never applied live
+RESTART_SETTINGS = [
+    'TELEGRAM_BOT_TOKEN', 'MONITOR_INTERVAL', 'EXTENSION_PATH', 'USER_DATA_DIR', 'HEADLESS', 'START_MAXIMIZED',
+    'COLOR_SCHEME', 'SHADOW_BASE_URL', 'LOG_DIR', 'PRICE_SOURCE', 'RPC_URL', 'RPC_TIMEOUT',
+    'RPC_POOL_SIZE', 'MULTICALL_ADDRESS', 'POSITION_MANAGER_ADDRESS', 'CHAIN_EVENTS', 'WS_RPC_URL',
+    'CHAIN_EVENT_BACKOFF_MIN', 'CHAIN_EVENT_BACKOFF_MAX', 'WATCHDOG_INTERVAL',
+    'RESUME_ON_STARTUP', 'STANDBY_ENABLED', 'STANDBY_PROFILE_DIR', 'MEMORY_CHECK_INTERVAL',
+    'DASHBOARD_ALERT_INTERVAL', 'STATE_BACKEND', 'STATE_DB_PATH', 'PROFILE_DIR',
+]
+
+
+@dataclass
+class SettingsChange:
+    applied: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+    restart_required: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.applied or self.restart_required or self.errors)
+
+    def format(self) -> str:
+        if not self:
+            return "⚙️ Settings unchanged."
+        lines = ["⚙️ Settings reloaded from .env"]
+        for key, (old, new) in self.applied.items():
+            lines.append(f"✅ {key}: {old} → {new}")
+        for key in self.restart_required:
+            lines.append(f"🔁 {key} changed — restart required to take effect")
+        for key, error in self.errors.items():
+            lines.append(f"❌ {key}: {error} (kept current value)")
+        return "\n".join(lines)
+
+
+class SettingsWatcher:
+    """Settings layer over config.Config that follows edits to the .env file.
+
+    Only keys whose value in the file changed since the last check are considered, so
+    values coming from the real environment are never clobbered. Live-safe keys are
+    applied to `config` immediately (and their listeners called); restart-only keys are
+    reported back so the caller can tell the admins.
+    """
+
+    def __init__(self, env_path: Optional[str] = None):
+        self.env_path = env_path or os.path.join(Config.BASE_DIR, '.env')
+        self._mtime = self._stat()
+        self._values = self._read()
+        self._listeners: Dict[str, List[Callable[[Any], None]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.env_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self) -> Dict[str, Optional[str]]:
+        if not os.path.exists(self.env_path):
+            return {}
+        return dict(dotenv_values(self.env_path))
+
+    def on_change(self, key: str, listener: Callable[[Any], None]) -> None:
+        """Call `listener(new_value)` after `key` has been changed live."""
+        self._listeners.setdefault(key, []).append(listener)
+
+    def check(self, force: bool = False) -> SettingsChange:
+        """Re-read the .env file if it changed (or when forced) and apply the differences."""
+        mtime = self._stat()
+        if not force and mtime == self._mtime:
+            return SettingsChange()
+        self._mtime = mtime
+        values = self._read()
+        changed = [k for k in values.keys() | self._values.keys() if values.get(k) != self._values.get(k)]
+        self._values = values
+
+        change = SettingsChange()
+        for key in sorted(changed):
+            raw = values.get(key)
+            if key in LIVE_SETTINGS:
+                if raw is None:
+                    continue  # removed from the file: keep the running value
+                try:
+                    value = LIVE_SETTINGS[key](raw)
+                except ValueError as e:
+                    change.errors[key] = str(e)
+                    continue
+                old = getattr(config, key, None)
+                if value == old:
+                    continue
+                self._apply(key, value)
+                change.applied[key] = (old, value)
+            elif key in RESTART_SETTINGS:
+                change.restart_required.append(key)
+        if change:
+            logging.info(change.format())
+        return change
+
+    def _apply(self, key: str, value: Any) -> None:
+        setattr(Config, key, value)
+        if key in vars(config):  # instance override (e.g. from persisted bot settings)
+            setattr(config, key, value)
+        for listener in self._listeners.get(key, []):
+            try:
+                listener(value)
+            except Exception:
+                logging.exception(f"Settings listener for {key} failed")
+
+    async def watch(self, on_change: Optional[Callable[[SettingsChange], Any]] = None, interval: Optional[float] = None) -> None:
+        """Poll the file forever; `on_change` (sync or async) receives every non-empty change."""
+        while True:
+            await asyncio.sleep(interval or config.SETTINGS_RELOAD_INTERVAL)
+            change = self.check()
+            if change and on_change is not None:
+                result = on_change(change)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    def start(self, on_change=None) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.watch(on_change))
+        return self._task
+
+
+def _apply_log_level(level: str) -> None:
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers:
+        handler.setLevel(level)
+
+
+def _apply_telegram_rates(_value) -> None:
+    outbox.apply_rates()
+
+
+settings = SettingsWatcher()
+settings.on_change('LOG_LEVEL', _apply_log_level)
+for _key in ('TELEGRAM_GLOBAL_RATE', 'TELEGRAM_CHAT_RATE', 'TELEGRAM_CHAT_BURST'):
+    settings.on_change(_key, _apply_telegram_rates)
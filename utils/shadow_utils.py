@@ -1,17 +1,60 @@
 import asyncio
+import time
 from config import config
 from utils.check_for_url import check_for_url
-from utils.state import load_state, save_state
-from models.pool import Pool
+from utils.state import load_state_async, save_state, load_checkpoints_async, registered_pool_table
+from models.pool_table import PoolTable
+from utils.message_queue import outbox
+from utils.rebalance_pipeline import RebalancePipeline
+from utils.profiler import profiler
+from utils.event_bus import TriggerFired, bus
+from services.price_source import get_price_source, record_pair, record_price
+from services.chain_events import get_chain_trigger
+from services.rpc_client import pool_address_from_link
+from services.position_analytics import record_deposit, record_swap, record_withdraw
+from services.confirmation_broker import CONNECT, NETWORK, SIGN, TRANSACTION, broker
+from services.tracker_supervisor import supervisor
+from services.price_feed import price_feed
+
+# Pages owned by running trackers (page -> pool link); the memory governor never closes these
+tracker_pages = {}
+# Tracker pages the memory governor asked to reload; the tracker reloads them between checks
+pages_to_reload = set()
+
+# Seconds a tracker on a shared price feed waits for a price before checking in anyway
+SHARED_PRICE_TIMEOUT = 30
+
+# Each withdrawal UI wait may take this many times its former fixed sleep (within WITHDRAW_DEADLINE)
+WITHDRAW_STEP_FACTOR = 3
+
+# UI conditions used instead of fixed sleeps during withdrawal
+WITHDRAW_MODAL_SELECTOR = 'input[type="range"], div[class*="btn"]:has-text("100")'
+SLIDER_AT_MAX_JS = """() => {
+    const el = document.querySelector('input[type="range"]');
+    return !!el && Number(el.value) >= Number(el.max || 100);
+}"""
+WITHDRAW_ENABLED_JS = """() => {
+    const btn = [...document.querySelectorAll('button')].find(b => b.textContent.trim() === 'Withdraw');
+    return !!btn && !btn.disabled;
+}"""
+
 
 class Shadow:
     def __init__(self, browser):
         self.browser = browser
+        self.withdraw_timings = []  # per-withdrawal wait statistics
+        self._timing = None
+        self.price_source = get_price_source()  # browser badge or direct RPC (PRICE_SOURCE)
+        self.chain_trigger = get_chain_trigger()  # wake on Swap logs / new heads (CHAIN_EVENTS)
 
-    def get_pool_data_by_link(self, pool_link):
-        """Get pool data from JSON state by pool link"""
+    async def get_pool_data_by_link(self, pool_link):
+        """Get pool data by pool link from the bot's pool table (the JSON state without a bot)"""
+        pools = registered_pool_table()
+        if pools is not None:
+            pool = pools.get(pool_link)
+            return pool.to_dict() if pool is not None else None
         try:
-            state = load_state()
+            state = await load_state_async()
             pools = state.get("pools", [])
             for pool in pools:
                 if pool.get("link") == pool_link:
@@ -27,22 +70,31 @@ class Shadow:
             raise RuntimeError("Failed to connect to https://www.shadow.so/, self.shadow is None.")
 
         await shadow.get_by_role("button", name="Connect Wallet").nth(0).click()
-        await shadow.click("data-testid=rk-wallet-option-io.metamask")
-        await asyncio.sleep(1)
-        # metamask confirmation
-        #await self.browser.pages[3].get_by_role("button", name="Connect").click()
+        async with broker.expect(shadow, CONNECT, "connect") as wallet_request:
+            await shadow.click("data-testid=rk-wallet-option-io.metamask")
+        await wallet_request.wait()
 
-        await shadow.get_by_role("button", name="Sign-in").click()
-        await asyncio.sleep(1)
-        # metamask confirmation
-        #await self.browser.pages[3].get_by_role("button", name="Confirm").click()
+        async with broker.expect(shadow, SIGN, "sign-in") as wallet_request:
+            await shadow.get_by_role("button", name="Sign-in").click()
+        await wallet_request.wait()
 
-        await shadow.get_by_role("button", name="Wrong Network").click()
-        await asyncio.sleep(1)
-        # metamask confirmation
-        #await self.browser.pages[3].get_by_role("button", name="Approve").click()
+        async with broker.expect(shadow, NETWORK, "switch network") as wallet_request:
+            await shadow.get_by_role("button", name="Wrong Network").click()
+        await wallet_request.wait()
+
+    async def add_pool_link(self, update, shadow, range_type_index, token_index, price, pool_link=None):
+        upper_range, lower_range = await self.fill_pool_form(shadow, range_type_index, token_index, price)
+        if not await self.submit_deposit(update, shadow):
+            return None, None
+        if pool_link:
+            record_deposit(pool_link, price, token_index, upper_range, lower_range)
+        return upper_range, lower_range
+
+    async def fill_pool_form(self, shadow, range_type_index, token_index, price):
+        """Select the range type, fill the deposit amount and read the resulting range bounds.
 
-    async def add_pool_link(self, update, shadow, range_type_index, token_index, price):
+        Touches only the page itself (no wallet interaction), so several pages can be filled in parallel.
+        """
         range_type_class = '[class="card flex-grow cursor-pointer overflow-hidden"]'
         await shadow.locator(range_type_class).nth(range_type_index).click()
 
@@ -65,148 +117,181 @@ class Shadow:
             upper_range = None
             lower_range = None
         print("=======upper_range ===> ", upper_range, "=======lower_range ===> ", lower_range);
+        return upper_range, lower_range
+
+    async def submit_deposit(self, update, shadow):
+        """Click Deposit (this opens the wallet confirmation). Returns False if the balance is insufficient."""
         btn = shadow.get_by_role("button", name="Deposit")
         if await btn.is_disabled():
-            await update.message.reply_text("Your Balance is insufficient")
-            return None, None
+            outbox.reply(update, "Your Balance is insufficient")
+            return False
         else:
-            await btn.click()
-            print("===========================================================");
-            # await shadow.get_by_role("button", name="Confirm Swap").click()
-            await update.message.reply_text("Liquidity added successfully!")
-            return upper_range, lower_range
-
-    async def current_price_monitor(self, shadow):
-        current_price_class = '[class="absolute left-0 top-1/2 flex -translate-y-1/2 touch-none items-center rounded-full px-3 py-1 text-xs max-md:rounded-l-none max-md:pl-1.5 md:-translate-x-1/2 md:text-base  bg-muted"]'
-        
-        try:
-            current_price_text = await shadow.locator(current_price_class).text_content()
-            current_price = float(current_price_text.replace('$', '').replace(',', '').strip())
+            async with broker.expect(shadow, TRANSACTION, "deposit") as wallet_request:
+                await btn.click()
+            if not await wallet_request.wait():
+                outbox.reply(update, f"Deposit was not confirmed in MetaMask: {wallet_request.error}")
+                return False
+            outbox.reply(update, "Liquidity added successfully!")
+            return True
+
+    async def current_price_monitor(self, shadow, pool_link=None, base_symbol=None):
+        current_price = await self.price_source.get_price(shadow, pool_link, base_symbol)
+        if current_price is not None:
             self.current_price = current_price  # Store the current price
-            return current_price
-        except (ValueError, AttributeError):
-            return None
-        except Exception:
-            return None
+            if pool_link:
+                record_price(pool_link, current_price)
+        return current_price
+
+    async def _wait_until(self, description, condition, fixed_sleep, deadline):
+        """Wait for a UI condition instead of sleeping a fixed time.
+
+        `condition(timeout_ms)` returns an awaitable that completes once the condition holds.
+        Each wait gets WITHDRAW_STEP_FACTOR times its former fixed sleep, capped by what is
+        left of the withdrawal `deadline` (time.monotonic() based), so one condition that
+        never holds cannot use up the whole budget. The time saved compared to the former
+        fixed sleep is recorded in the current timing entry.
+        """
+        started = time.monotonic()
+        remaining = max(0.0, min(deadline - started, fixed_sleep * WITHDRAW_STEP_FACTOR))
+        ok = True
+        try:
+            await asyncio.wait_for(condition(int(remaining * 1000)), timeout=remaining)
+        except Exception as e:
+            print(f"Gave up waiting for {description}: {e}")
+            ok = False
+        waited = time.monotonic() - started
+        if self._timing is not None:
+            self._timing["waited"] += waited
+            self._timing["fixed"] += fixed_sleep
+        return ok
 
     async def withdraw(self, update, withdraw_page, pool_link):
         """
         Perform 100% withdrawal from a Shadow.so liquidity pool.
         Uses multiple methods to ensure the slider is set to 100%.
+        Waits on UI conditions (modal open, slider applied, button enabled) instead of fixed
+        sleeps, each bounded by its own timeout and all by config.WITHDRAW_DEADLINE seconds.
         """
         print(f"Starting withdrawal process for pool: {pool_link}")
+        deadline = time.monotonic() + config.WITHDRAW_DEADLINE
+        self._timing = {"link": pool_link, "waited": 0.0, "fixed": 0.0}
         
-        # Step 1: Click "Decrease Liquidity"
+        # Step 1: Click "Decrease Liquidity" and wait for the withdraw modal
         try:
             decrease_btn = withdraw_page.get_by_role("button", name="Decrease Liquidity")
             await decrease_btn.click()
-            await asyncio.sleep(3)
             print("Clicked Decrease Liquidity button")
         except Exception as e:
             print(f"Error clicking Decrease Liquidity: {e}")
             raise
+        await self._wait_until(
+            "withdraw modal",
+            lambda timeout: withdraw_page.locator(WITHDRAW_MODAL_SELECTOR).first.wait_for(state="visible", timeout=timeout),
+            3, deadline,
+        )
         
         # Step 2: Set to 100% using multiple methods
-        await self._set_to_100_percent(withdraw_page)
+        await self._set_to_100_percent(withdraw_page, deadline)
         
         # Step 3: Wait for Withdraw button to become enabled, then click it
-        try:
-            withdraw_btn = withdraw_page.get_by_role("button", name="Withdraw")
-            
-            # Check if button is currently disabled
-            is_disabled = await withdraw_btn.is_disabled()
-            print(f"Withdraw button disabled status: {is_disabled}")
+        withdraw_btn = withdraw_page.get_by_role("button", name="Withdraw")
+        enabled = await self._wait_until(
+            "Withdraw button to enable",
+            lambda timeout: withdraw_page.wait_for_function(WITHDRAW_ENABLED_JS, timeout=timeout),
+            3, deadline,
+        )
+        if not enabled:
+            # Try to force-enable it or proceed anyway
+            try:
+                await withdraw_btn.evaluate("button => button.disabled = false")
+                print("Force-enabled the Withdraw button")
+            except:
+                print("Could not force-enable button, proceeding anyway...")
+
+        # Only the click holds the broker's wallet slot, so other flows are not kept waiting
+        async with broker.expect(withdraw_page, TRANSACTION, "withdraw") as wallet_request:
+            try:
+                await withdraw_btn.click()
+                print("Successfully clicked Withdraw button")
             
-            if is_disabled:
-                print("Withdraw button is disabled, waiting for it to become enabled...")
-                # Wait up to 60 seconds for the button to become enabled
+            except Exception as e:
+                print(f"Error clicking Withdraw: {e}")
+                # Try alternative approach - find withdraw button by different selectors
                 try:
-                    await withdraw_btn.wait_for(state="attached", timeout=60000)
-                    await withdraw_page.wait_for_function(
-                        "() => !document.querySelector('button:has-text(\"Withdraw\")').disabled",
-                        timeout=60000
-                    )
-                    print("Withdraw button is now enabled")
-                except Exception as wait_error:
-                    print(f"Timeout waiting for Withdraw button to enable: {wait_error}")
-                    # Try to force-enable it or proceed anyway
-                    try:
-                        await withdraw_btn.evaluate("button => button.disabled = false")
-                        print("Force-enabled the Withdraw button")
-                    except:
-                        print("Could not force-enable button, proceeding anyway...")
-            
-            # Now try to click the button
-            await withdraw_btn.click()
-            await asyncio.sleep(2)
-            print("Successfully clicked Withdraw button")
-            
-        except Exception as e:
-            print(f"Error clicking Withdraw: {e}")
-            # Try alternative approach - find withdraw button by different selectors
-            try:
-                print("Trying alternative withdraw button selectors...")
-                alt_selectors = [
-                    'button:has-text("Withdraw")',
-                    '[class*="btn"]:has-text("Withdraw")',
-                    'input[type="submit"][value*="Withdraw"]',
-                    'button[type="submit"]:has-text("Withdraw")'
-                ]
+                    print("Trying alternative withdraw button selectors...")
+                    alt_selectors = [
+                        'button:has-text("Withdraw")',
+                        '[class*="btn"]:has-text("Withdraw")',
+                        'input[type="submit"][value*="Withdraw"]',
+                        'button[type="submit"]:has-text("Withdraw")'
+                    ]
                 
-                for selector in alt_selectors:
-                    try:
-                        alt_btn = withdraw_page.locator(selector)
-                        if await alt_btn.count() > 0:
-                            await alt_btn.first.click()
-                            print(f"Successfully clicked withdraw using selector: {selector}")
-                            break
-                    except:
-                        continue
-                else:
-                    raise Exception("Could not click withdraw button with any method")
+                    for selector in alt_selectors:
+                        try:
+                            alt_btn = withdraw_page.locator(selector)
+                            if await alt_btn.count() > 0:
+                                await alt_btn.first.click()
+                                print(f"Successfully clicked withdraw using selector: {selector}")
+                                break
+                        except:
+                            continue
+                    else:
+                        raise Exception("Could not click withdraw button with any method")
                     
-            except Exception as final_error:
-                print(f"Final withdraw click attempt failed: {final_error}")
-                raise
-        
-        # Step 4: Handle MetaMask confirmation if needed
-        # This would be handled by the calling code
+                except Exception as final_error:
+                    print(f"Final withdraw click attempt failed: {final_error}")
+                    raise
+
+        # Wait for the modal to submit
+        await self._wait_until(
+            "withdrawal submission",
+            lambda timeout: withdraw_btn.wait_for(state="hidden", timeout=timeout),
+            2, deadline,
+        )
+
+        # Step 4: Wait until the confirmation broker confirmed the withdrawal in MetaMask
+        if not await wallet_request.wait():
+            raise Exception(f"Withdrawal was not confirmed in MetaMask: {wallet_request.error}")
+
+        self._record_withdraw_timing()
+        record_withdraw(pool_link)
         
         # Remove pool from JSON state after withdrawal
         try:
-            state = load_state()
-            pool_dicts = state.get("pools", [])
+            state = await load_state_async()
             settings = state.get("settings", {})
             
-            # Convert dictionaries to Pool objects and filter out the withdrawn pool
-            updated_pools = []
-            for p in pool_dicts:
-                if p.get("link") != pool_link:
-                    pool_obj = Pool(
-                        link=p["link"],
-                        range=p.get("range", ""),
-                        token=p.get("token", ""),
-                        amount=p.get("amount", 0),
-                        upper_range=p.get("upper_range"),
-                        lower_range=p.get("lower_range"),
-                        owner_chat_id=p.get("owner_chat_id"),
-                        last_status=p.get("last_status"),
-                        meta=p.get("meta", {}),
-                    )
-                    updated_pools.append(pool_obj)
-            
+            # Drop the withdrawn pool from the bot's table (or one loaded from the state without a bot)
+            updated_pools = registered_pool_table()
+            if updated_pools is None:
+                updated_pools = PoolTable.from_dicts(state.get("pools", []))
+            updated_pools.remove(pool_link)
+
             # Save updated state
             save_state(updated_pools, settings)
             print(f"Pool {pool_link} removed from state after withdrawal")
         except Exception as e:
             print(f"Error removing pool from state: {e}")
     
-    async def _set_to_100_percent(self, page):
+    def _record_withdraw_timing(self):
+        timing = self._timing
+        self._timing = None
+        if timing is None:
+            return
+        timing["saved"] = max(0.0, timing["fixed"] - timing["waited"])
+        self.withdraw_timings.append(timing)
+        print(f"Withdrawal waits: {timing['waited']:.1f}s (saved {timing['saved']:.1f}s vs fixed sleeps)")
+
+    async def _set_to_100_percent(self, page, deadline=None):
         """
         Set the liquidity removal slider to 100% using multiple methods.
         This ensures both the UI button and underlying slider are properly set.
+        Waits after each method end as soon as the slider reports its maximum value.
         """
         print("Setting liquidity removal to 100%...")
+        if deadline is None:
+            deadline = time.monotonic() + config.WITHDRAW_DEADLINE
+        slider_at_max = lambda timeout: page.wait_for_function(SLIDER_AT_MAX_JS, timeout=timeout)
         
         # Step 1: First try to click the 100% button (from the HTML structure provided)
         button_clicked = False
@@ -241,7 +326,7 @@ class Shadow:
                                 # Check if this contains "100" (since % might be separate)
                                 if text and ("100%" in text.strip() or ("100" in text and "%" in text)):
                                     await element.click()
-                                    await asyncio.sleep(2)
+                                    await self._wait_until("slider to reach 100%", slider_at_max, 2, deadline)
                                     print(f"Successfully clicked 100% button using selector: {selector}")
                                     button_clicked = True
                                     break
@@ -275,7 +360,7 @@ class Shadow:
                 
                 # Method A: Use fill() to set the value
                 await slider_element.fill(max_value)
-                await asyncio.sleep(1)
+                await self._wait_until("slider value (fill)", slider_at_max, 1, deadline)
                 
                 # Method B: Use JavaScript to set value and trigger events
                 await slider_element.evaluate(f"""
@@ -292,7 +377,7 @@ class Shadow:
                         element.dispatchEvent(new MouseEvent('click', {{ bubbles: true }}));
                     }}
                 """)
-                await asyncio.sleep(1)
+                await self._wait_until("slider value (events)", slider_at_max, 1, deadline)
                 
                 # Method C: Physical interaction - drag to the end
                 try:
@@ -302,7 +387,7 @@ class Shadow:
                         right_x = slider_box['x'] + slider_box['width'] - 5
                         center_y = slider_box['y'] + slider_box['height'] / 2
                         await page.mouse.click(right_x, center_y)
-                        await asyncio.sleep(1)
+                        await self._wait_until("slider value (click)", slider_at_max, 1, deadline)
                         print(f"Clicked slider at position ({right_x}, {center_y})")
                 except Exception as e:
                     print(f"Physical slider click failed: {e}")
@@ -333,7 +418,7 @@ class Shadow:
                             if await element.is_visible():
                                 print(f"Found 100% match at element {i}: '{text.strip()}'")
                                 await element.click()
-                                await asyncio.sleep(2)
+                                await self._wait_until("slider to reach 100%", slider_at_max, 2, deadline)
                                 print("Successfully clicked 100% element")
                                 button_clicked = True
                                 break
@@ -343,15 +428,12 @@ class Shadow:
             except Exception as e:
                 print(f"Error in final search: {e}")
         
-        # Final wait to ensure all UI updates are processed
-        await asyncio.sleep(3)
-        
         if button_clicked:
             print("✅ Successfully set withdrawal amount to 100%")
         else:
             print("⚠️ Could not click 100% button, but slider should be set to maximum")
 
-    async def rebalance(self, trade_page, tokens, amount):
+    async def rebalance(self, trade_page, tokens, amount, pool_link=None):
         await trade_page.goto("https://www.shadow.so/trade")
         t = trade_page.locator('[class="flex items-center text-3xl font-medium"]')
 
@@ -373,61 +455,133 @@ class Shadow:
         await asyncio.sleep(1)
         swap_btn = await trade_page.get_by_role("button", name="Swap")
         if swap_btn.is_visible():
-            await swap_btn.click()
+            async with broker.expect(trade_page, TRANSACTION, "swap") as wallet_request:
+                await swap_btn.click()
+            if not await wallet_request.wait():
+                raise Exception(f"Swap was not confirmed in MetaMask: {wallet_request.error}")
+            if pool_link:
+                record_swap(pool_link, tokens, amount)
 
         # if confirm...
 
     async def track(self, update, shadow_page, pool_link): 
-            # Get pool data from JSON state
-        pool_data = self.get_pool_data_by_link(pool_link)
+            # Get pool data from JSON state (or from an interrupted rebalance, which already withdrew it)
+        checkpoint = (await load_checkpoints_async()).get(pool_link)
+        pool_data = await self.get_pool_data_by_link(pool_link)
+        if not pool_data and checkpoint:
+            pool_data = checkpoint.get("pool")
         if not pool_data:
                 print(f"Pool data not found for link: {pool_link}")
                 return
-            
-            # Get settings data from JSON state
-        state = load_state()
-        settings = state.get("settings", {})
-        threshold = settings.get("threshold", 90)  # Default 90
-        balance_tolerance = settings.get("balance_tolerance", 2)  # Default 2
-        
+
         token = pool_data.get("token", "")
-        range_type = pool_data.get("range", "")
-        amount = pool_data.get("amount", 0)
         upper_range = pool_data.get("upper_range")
         lower_range = pool_data.get("lower_range")
 
-            # go to withdraw page
+        tracker_pages[shadow_page] = pool_link
+        t = await self._open_manage_page(shadow_page, pool_link, token)
+        if len(t) > 2:
+            record_pair(pool_link, t[0], t[2])
+
+        pipeline = RebalancePipeline(self, update, shadow_page, pool_link, pool_data, t)
+        if checkpoint:
+            print(f"Resuming rebalance for {pool_link} after stage '{checkpoint.get('stage')}'")
+            async with profiler.flow("rebalance"):
+                new_upper, new_lower = await pipeline.run(checkpoint)
+            if new_upper is not None and new_lower is not None:
+                upper_range, lower_range = new_upper, new_lower
+
+        # Positions on the same pool share one price reader (and its page)
+        subscription = price_feed.subscribe(pool_link, token, t[0], self, shadow_page)
+        if subscription is not None and subscription.page is not shadow_page:
+            tracker_pages.pop(shadow_page, None)
+            await shadow_page.close()
+
+        address = pool_address_from_link(pool_link)
+        if self.chain_trigger is not None and address:
+            self.chain_trigger.watch(address)
+        try:
+            while True:
+                if not self.browser.pages:
+                    break
+                if subscription is not None:
+                    current_price = await subscription.next(timeout=SHARED_PRICE_TIMEOUT)
+                else:
+                    if shadow_page in pages_to_reload:
+                        pages_to_reload.discard(shadow_page)
+                        print(f"Reloading tracker page for {pool_link} to release memory")
+                        await self._open_manage_page(shadow_page, pool_link, token)
+                    # Get current price
+                    current_price = await self.current_price_monitor(shadow_page, pool_link, t[0])
+                supervisor.tick(pool_link)
+
+                # Monitor current price and trigger withdraw when threshold or balance tolerance is reached
+                # (read on every check, so /set_threshold and .env edits apply to running trackers)
+                threshold, balance_tolerance = config.REBALANCE_THRESHOLD, config.BALANCE_TOLERANCE
+                if current_price and await self.monitor(shadow_page, pool_link, upper_range, lower_range, threshold, current_price, balance_tolerance):
+                    bus.publish(TriggerFired(pool_link, current_price, upper_range, lower_range))
+                    # withdraw -> swap -> deposit, checkpointed after every stage
+                    if subscription is not None:
+                        # The shared page keeps reading for the other positions; rebalance on a page of our own
+                        pipeline.page = await self.open_price_page(pool_link, token)
+                    try:
+                        async with profiler.flow("rebalance"):
+                            new_upper, new_lower = await pipeline.run()
+                    finally:
+                        if subscription is not None:
+                            await self.close_price_page(pipeline.page)
+                    if new_upper is not None and new_lower is not None:
+                        upper_range, lower_range = new_upper, new_lower
+
+                if subscription is None:
+                    await self._wait_for_next_check(pool_link)
+        finally:
+            # Also runs when the supervisor cancels or restarts the tracker
+            await price_feed.unsubscribe(subscription)
+            if not price_feed.owns(shadow_page):
+                tracker_pages.pop(shadow_page, None)
+            if self.chain_trigger is not None and address:
+                self.chain_trigger.unwatch(address)
+
+    async def open_price_page(self, pool_link, token):
+        """Open a new tracker page on the pool's manage page."""
+        page = await self.browser.new_page()
+        tracker_pages[page] = pool_link
+        await self._open_manage_page(page, pool_link, token)
+        return page
+
+    async def read_price(self, page, pool_link, token, base_symbol):
+        """Read the price from a shared feed page, reloading it first if the memory governor asked to."""
+        tracker_pages[page] = pool_link
+        if page in pages_to_reload:
+            pages_to_reload.discard(page)
+            print(f"Reloading price page for {pool_link} to release memory")
+            await self._open_manage_page(page, pool_link, token)
+        return await self.price_source.get_price(page, pool_link, base_symbol)
+
+    async def close_price_page(self, page):
+        tracker_pages.pop(page, None)
+        pages_to_reload.discard(page)
+        if not page.is_closed():
+            await page.close()
+
+    async def _open_manage_page(self, shadow_page, pool_link, token):
+        """Go to the pool's manage page with `token` first; returns the page's token pair."""
         link_split = pool_link.rsplit("/", 1)
         await shadow_page.goto(link_split[0] + "/manage/" + link_split[1])
 
         t = (await shadow_page.locator('[class="my-4 inline-flex cursor-pointer items-center rounded px-2 py-1 text-3xl font-bold text-dark hover:bg-dark"]').text_content()).split("\u2002")
         if t[0] != token:
                 await shadow_page.click('[class="my-4 inline-flex cursor-pointer items-center rounded px-2 py-1 text-3xl font-bold text-dark hover:bg-dark"]')
-            
-        while True:
-            if not self.browser.pages:
-                break
-            # Get current price
-            current_price = await self.current_price_monitor(shadow_page)
-
-            # Monitor current price and trigger withdraw when threshold or balance tolerance is reached
-            if current_price and await self.monitor(shadow_page, pool_link, upper_range, lower_range, threshold, current_price, balance_tolerance):
-                await self.withdraw(None, shadow_page, pool_link)
-
-                if t[0] != token:
-                    reb_order = [t[2], t[0]]
-                    token_index = 1
-                else:
-                    reb_order = [t[0], t[2]]
-                    token_index = 0
-
-                amt = (await shadow_page.locator('[class="flex items-center"]').nth(0).text_content()).split(":")[1]
-                await self.rebalance(shadow_page, reb_order, amt)
-
-                range_type_index = config.DEFAULT_RANGE_TYPES.index(range_type.lower())
-                await self.add_pool_link(update, shadow_page, range_type_index, token_index, amount)
+        return t
 
-            await asyncio.sleep(5)
+    async def _wait_for_next_check(self, pool_link):
+        """Wait for the next price check (POLL_INTERVAL): the pool's next trade when a chain event feed is configured."""
+        address = pool_address_from_link(pool_link)
+        if self.chain_trigger is None or not address:
+            await asyncio.sleep(config.POLL_INTERVAL)
+            return
+        await self.chain_trigger.wait(address, config.POLL_INTERVAL)
 
     async def monitor(self, shadow_page, pool_link, upper_range, lower_range, threshold, current_price, balance_tolerance):
         """Monitor current price and trigger withdraw when it reaches threshold percentage of range bounds or balance tolerance"""
@@ -1,8 +1,11 @@
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
+from config import config
 from models.pool import Pool
+from models.pool_table import PoolTable
+from utils.state_backend import DEFAULT_SETTINGS, SqliteStateBackend, StateBackend, migrate_json_state
 
 def get_base_dir():
     """Get the base directory for the application (handles both development and executable)"""
@@ -15,58 +18,219 @@ def get_base_dir():
 
 STATE_DIR = os.path.join(get_base_dir(), "data")
 STATE_FILE = os.path.join(STATE_DIR, "state.json")
+CHECKPOINT_FILE = os.path.join(STATE_DIR, "checkpoints.json")
+DASHBOARD_FILE = os.path.join(STATE_DIR, "dashboard_snapshots.json")
+ALERTS_FILE = os.path.join(STATE_DIR, "alerts.json")
 
 
 def _ensure_dir() -> None:
     os.makedirs(STATE_DIR, exist_ok=True)
 
 
-def save_state(pools: List[Pool], settings: Dict[str, Any]) -> None:
+def _write_json(path: str, data: Any) -> None:
     _ensure_dir()
-    data = {
-        "pools": [
-            {
-                "link": p.link,
-                "range": p.range,
-                "token": p.token,
-                "amount": p.amount,
-                "upper_range": p.upper_range,
-                "lower_range": p.lower_range,
-                "owner_chat_id": p.owner_chat_id,
-                "last_status": p.last_status,
-                "meta": p.meta,
-            }
-            for p in pools
-        ],
-        "settings": settings,
-    }
-    tmp = STATE_FILE + ".tmp"
+    tmp = path + ".tmp"
     with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
-    os.replace(tmp, STATE_FILE)
+    os.replace(tmp, path)
 
 
-def load_state() -> Dict[str, Any]:
-    if not os.path.exists(STATE_FILE):
-        # Create default state.json if it doesn't exist
-        default_state = {
-            "pools": [],
-            "settings": {
-                "threshold": 90,
-                "balance_tolerance": 2
-            }
-        }
-        save_state([], default_state["settings"])
-        return default_state
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        # Corrupt state; start fresh but do not delete file
-        return {
-            "pools": [],
-            "settings": {
-                "threshold": 90,
-                "balance_tolerance": 2
-            }
+def _pool_rows(pools: Union[List[Pool], PoolTable]) -> List[Dict[str, Any]]:
+    if isinstance(pools, PoolTable):
+        return pools.to_dicts()
+    return [
+        {
+            "link": p.link,
+            "range": p.range,
+            "token": p.token,
+            "amount": p.amount,
+            "upper_range": p.upper_range,
+            "lower_range": p.lower_range,
+            "owner_chat_id": p.owner_chat_id,
+            "last_status": p.last_status,
+            "meta": p.meta,
         }
+        for p in pools
+    ]
+
+
+class JsonStateBackend(StateBackend):
+    """The original JSON documents in data/: state.json, checkpoints.json, dashboard_snapshots.json, alerts.json."""
+
+    def load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(STATE_FILE):
+            # Create default state.json if it doesn't exist
+            default_state = {"pools": [], "settings": dict(DEFAULT_SETTINGS)}
+            self.save_state([], default_state["settings"])
+            return default_state
+        try:
+            with open(STATE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            # Corrupt state; start fresh but do not delete file
+            return {"pools": [], "settings": dict(DEFAULT_SETTINGS)}
+
+    def save_state(self, pools: List[Dict[str, Any]], settings: Dict[str, Any]) -> None:
+        _write_json(STATE_FILE, {"pools": pools, "settings": settings})
+
+    def load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(CHECKPOINT_FILE):
+            return {}
+        try:
+            with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        checkpoints = self.load_checkpoints()
+        checkpoints[checkpoint["link"]] = checkpoint
+        _write_json(CHECKPOINT_FILE, checkpoints)
+
+    def clear_checkpoint(self, link: str) -> None:
+        checkpoints = self.load_checkpoints()
+        if checkpoints.pop(link, None) is not None:
+            _write_json(CHECKPOINT_FILE, checkpoints)
+
+    def _load_snapshots(self) -> Dict[str, Any]:
+        if not os.path.exists(DASHBOARD_FILE):
+            return {}
+        try:
+            with open(DASHBOARD_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def load_dashboard_snapshot(self, view: str) -> Optional[Dict[str, Any]]:
+        return self._load_snapshots().get(view)
+
+    def save_dashboard_snapshot(self, view: str, snapshot: Dict[str, Any]) -> None:
+        snapshots = self._load_snapshots()
+        snapshots[view] = snapshot
+        _write_json(DASHBOARD_FILE, snapshots)
+
+    def _load_alerts(self) -> Dict[str, Any]:
+        if not os.path.exists(ALERTS_FILE):
+            return {}
+        try:
+            with open(ALERTS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        return sorted(self._load_alerts().values(), key=lambda a: a["id"])
+
+    def save_alert(self, alert: Dict[str, Any]) -> None:
+        alerts = self._load_alerts()
+        alerts[str(alert["id"])] = alert
+        _write_json(ALERTS_FILE, alerts)
+
+    def delete_alert(self, alert_id: int) -> None:
+        alerts = self._load_alerts()
+        if alerts.pop(str(alert_id), None) is not None:
+            _write_json(ALERTS_FILE, alerts)
+
+
+_json_backend = JsonStateBackend()
+_sqlite_backend: Optional[SqliteStateBackend] = None
+
+
+def get_backend() -> StateBackend:
+    """The configured backend (STATE_BACKEND): JSON files, or SQLite at STATE_DB_PATH.
+
+    The SQLite database is opened on first use and imports the existing JSON files once.
+    """
+    global _sqlite_backend
+    if config.STATE_BACKEND != "sqlite":
+        return _json_backend
+    if _sqlite_backend is None:
+        _sqlite_backend = SqliteStateBackend(config.STATE_DB_PATH or os.path.join(STATE_DIR, "state.db"))
+        migrate_json_state(_sqlite_backend, STATE_FILE, CHECKPOINT_FILE, DASHBOARD_FILE, ALERTS_FILE)
+    return _sqlite_backend
+
+
+# The running bot's pool table: pools are looked up through its indexes, not the saved state
+_pool_table: Optional[PoolTable] = None
+
+
+def set_pool_table(pools: Optional[PoolTable]) -> None:
+    global _pool_table
+    _pool_table = pools
+
+
+def registered_pool_table() -> Optional[PoolTable]:
+    """The bot's pool table, or None when no bot is running (e.g. a standalone Shadow)."""
+    return _pool_table
+
+
+def save_state(pools: Union[List[Pool], PoolTable], settings: Dict[str, Any]) -> None:
+    get_backend().save_state(_pool_rows(pools), settings)
+
+
+def load_state() -> Dict[str, Any]:
+    return get_backend().load_state()
+
+
+async def load_state_async() -> Dict[str, Any]:
+    """load_state for code on the event loop: never blocks it on the database."""
+    return await get_backend().load_state_async()
+
+
+def load_checkpoints() -> Dict[str, Dict[str, Any]]:
+    """Return in-flight rebalance checkpoints keyed by pool link."""
+    return get_backend().load_checkpoints()
+
+
+async def load_checkpoints_async() -> Dict[str, Dict[str, Any]]:
+    """load_checkpoints for code on the event loop: never blocks it on the database."""
+    return await get_backend().load_checkpoints_async()
+
+
+def save_checkpoint(checkpoint: Dict[str, Any]) -> None:
+    get_backend().save_checkpoint(checkpoint)
+
+
+def clear_checkpoint(link: str) -> None:
+    get_backend().clear_checkpoint(link)
+
+
+def load_dashboard_snapshot(view: str) -> Optional[Dict[str, Any]]:
+    """Last dashboard snapshot seen by `view` (a chat id, or "alerts"): {"taken_at", "positions"}."""
+    return get_backend().load_dashboard_snapshot(view)
+
+
+async def load_dashboard_snapshot_async(view: str) -> Optional[Dict[str, Any]]:
+    """load_dashboard_snapshot for code on the event loop: never blocks it on the database."""
+    return await get_backend().load_dashboard_snapshot_async(view)
+
+
+def save_dashboard_snapshot(view: str, snapshot: Dict[str, Any]) -> None:
+    get_backend().save_dashboard_snapshot(view, snapshot)
+
+
+def load_alerts() -> List[Dict[str, Any]]:
+    return get_backend().load_alerts()
+
+
+async def load_alerts_async() -> List[Dict[str, Any]]:
+    """load_alerts for code on the event loop: never blocks it on the database."""
+    return await get_backend().load_alerts_async()
+
+
+def save_alert(alert: Dict[str, Any]) -> None:
+    get_backend().save_alert(alert)
+
+
+def delete_alert(alert_id: int) -> None:
+    get_backend().delete_alert(alert_id)
+
+
+def record_price_tick(link: str, price: float) -> None:
+    """Keep a price in the history (SQLite backend only)."""
+    get_backend().record_price(link, price)
+
+
+def record_rebalance_event(link: str, stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """Keep a completed rebalance stage in the history (SQLite backend only)."""
+    get_backend().record_rebalance_event(link, stage, data)
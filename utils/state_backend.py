@@ -0,0 +1,381 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_SETTINGS = {"threshold": 90, "balance_tolerance": 2}
+
+
+class StateBackend(ABC):
+    """Where pools, settings, checkpoints and history are persisted (see utils.state)."""
+
+    @abstractmethod
+    def load_state(self) -> Dict[str, Any]:
+        """{"pools": [pool dicts], "settings": {...}}"""
+
+    @abstractmethod
+    def save_state(self, pools: List[Dict[str, Any]], settings: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def load_checkpoints(self) -> Dict[str, Dict[str, Any]]: ...
+
+    @abstractmethod
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def clear_checkpoint(self, link: str) -> None: ...
+
+    @abstractmethod
+    def load_dashboard_snapshot(self, view: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def save_dashboard_snapshot(self, view: str, snapshot: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        """Price alerts of all chats: [{"id", "chat_id", "link", "price", ...}]"""
+
+    @abstractmethod
+    def save_alert(self, alert: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def delete_alert(self, alert_id: int) -> None: ...
+
+    async def load_state_async(self) -> Dict[str, Any]:
+        """load_state for code on the event loop (backends whose reads block override it)."""
+        return self.load_state()
+
+    async def load_checkpoints_async(self) -> Dict[str, Dict[str, Any]]:
+        return self.load_checkpoints()
+
+    async def load_dashboard_snapshot_async(self, view: str) -> Optional[Dict[str, Any]]:
+        return self.load_dashboard_snapshot(view)
+
+    async def load_alerts_async(self) -> List[Dict[str, Any]]:
+        return self.load_alerts()
+
+    def record_price(self, link: str, price: float, ts: Optional[float] = None) -> None:
+        """Append a price tick (backends without history ignore it)."""
+
+    def record_rebalance_event(self, link: str, stage: str, data: Optional[Dict[str, Any]] = None,
+                               ts: Optional[float] = None) -> None:
+        """Append a rebalance stage event (backends without history ignore it)."""
+
+    def price_history(self, link: str, since: float = 0) -> List[Dict[str, Any]]:
+        return []
+
+    def rebalance_events(self, link: Optional[str] = None, since: float = 0) -> List[Dict[str, Any]]:
+        return []
+
+    async def price_history_async(self, link: str, since: float = 0) -> List[Dict[str, Any]]:
+        return self.price_history(link, since)
+
+    async def rebalance_events_async(self, link: Optional[str] = None, since: float = 0) -> List[Dict[str, Any]]:
+        return self.rebalance_events(link, since)
+
+    def close(self) -> None:
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pools (
+    link TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    range TEXT,
+    token TEXT,
+    amount REAL,
+    upper_range REAL,
+    lower_range REAL,
+    owner_chat_id INTEGER,
+    last_status TEXT,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS pools_owner ON pools(owner_chat_id);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS price_ticks (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS price_ticks_link_ts ON price_ticks(link, ts);
+CREATE TABLE IF NOT EXISTS rebalance_events (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL,
+    ts REAL NOT NULL,
+    stage TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS rebalance_events_link_ts ON rebalance_events(link, ts);
+CREATE TABLE IF NOT EXISTS checkpoints (link TEXT PRIMARY KEY, updated_at REAL NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS dashboard_snapshots (view TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS alerts (id INTEGER PRIMARY KEY, chat_id INTEGER NOT NULL, data TEXT NOT NULL);
+"""
+
+_POOL_COLUMNS = ("link", "range", "token", "amount", "upper_range", "lower_range",
+                 "owner_chat_id", "last_status", "meta")
+
+
+class SqliteStateBackend(StateBackend):
+    """SQLite (WAL) persistence with indexed tables and history.
+
+    Every statement runs on one dedicated executor thread that owns the connection. Writes
+    are queued without waiting, so callers on the event loop never block on disk; reads wait
+    for the queue, so they always see earlier writes. Async callers await the same queued reads
+    (`load_state_async`, `load_checkpoints_async`) instead of blocking the loop on them; `call()`
+    runs any other method from async code.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._submit(self._open).result()
+
+    # --- executor plumbing -------------------------------------------------------------
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    def _read(self, fn: Callable, *args) -> Any:
+        return self._submit(fn, *args).result()
+
+    def _read_async(self, fn: Callable, *args) -> "asyncio.Future":
+        """`_read` for the event loop: the same queued read, awaited instead of waited on."""
+        return asyncio.wrap_future(self._submit(fn, *args))
+
+    def _write(self, fn: Callable, *args) -> Future:
+        future = self._submit(self._transaction, fn, *args)
+        future.add_done_callback(_log_failure)
+        return future
+
+    def _transaction(self, fn: Callable, *args) -> None:
+        with self._conn:
+            fn(*args)
+
+    async def call(self, method: str, *args) -> Any:
+        """Await a backend method from the event loop without blocking it on the queue."""
+        return await asyncio.to_thread(getattr(self, method), *args)
+
+    def flush(self) -> None:
+        """Wait until every queued write has been committed."""
+        self._submit(lambda: None).result()
+
+    def close(self) -> None:
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._submit(_close).result()
+        self._executor.shutdown(wait=True)
+
+    # --- pools & settings --------------------------------------------------------------
+
+    def load_state(self) -> Dict[str, Any]:
+        return self._read(self._load_state)
+
+    async def load_state_async(self) -> Dict[str, Any]:
+        return await self._read_async(self._load_state)
+
+    def _load_state(self) -> Dict[str, Any]:
+        pools = []
+        for row in self._conn.execute("SELECT * FROM pools ORDER BY position"):
+            pool = {k: row[k] for k in _POOL_COLUMNS}
+            pool["meta"] = json.loads(row["meta"]) if row["meta"] else {}
+            pools.append(pool)
+        settings = {r["key"]: json.loads(r["value"]) for r in self._conn.execute("SELECT key, value FROM settings")}
+        return {"pools": pools, "settings": settings or dict(DEFAULT_SETTINGS)}
+
+    def save_state(self, pools: List[Dict[str, Any]], settings: Dict[str, Any]) -> None:
+        pools = [dict(p) for p in pools]
+        settings = dict(settings)
+        self._write(self._save_state, pools, settings)
+
+    def _save_state(self, pools: List[Dict[str, Any]], settings: Dict[str, Any]) -> None:
+        rows = [
+            (p["link"], i, p.get("range"), p.get("token"), p.get("amount"), p.get("upper_range"),
+             p.get("lower_range"), p.get("owner_chat_id"), p.get("last_status"), json.dumps(p.get("meta") or {}))
+            for i, p in enumerate(pools)
+        ]
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (link TEXT PRIMARY KEY)")
+        self._conn.execute("DELETE FROM keep")
+        self._conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)", [(r[0],) for r in rows])
+        self._conn.execute("DELETE FROM pools WHERE link NOT IN (SELECT link FROM keep)")
+        self._conn.executemany(
+            "INSERT INTO pools (link, position, range, token, amount, upper_range, lower_range, owner_chat_id, last_status, meta)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(link) DO UPDATE SET position=excluded.position, range=excluded.range, token=excluded.token,"
+            " amount=excluded.amount, upper_range=excluded.upper_range, lower_range=excluded.lower_range,"
+            " owner_chat_id=excluded.owner_chat_id, last_status=excluded.last_status, meta=excluded.meta",
+            rows,
+        )
+        self._conn.execute("DELETE FROM settings")
+        self._conn.executemany("INSERT INTO settings VALUES (?, ?)", [(k, json.dumps(v)) for k, v in settings.items()])
+
+    # --- checkpoints & snapshots -------------------------------------------------------
+
+    def load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        return self._read(self._load_checkpoints)
+
+    async def load_checkpoints_async(self) -> Dict[str, Dict[str, Any]]:
+        return await self._read_async(self._load_checkpoints)
+
+    def _load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        return {r["link"]: json.loads(r["data"]) for r in self._conn.execute("SELECT link, data FROM checkpoints")}
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        data = json.dumps(checkpoint)
+        self._write(lambda: self._conn.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)", (checkpoint["link"], time.time(), data)))
+
+    def clear_checkpoint(self, link: str) -> None:
+        self._write(lambda: self._conn.execute("DELETE FROM checkpoints WHERE link = ?", (link,)))
+
+    def load_dashboard_snapshot(self, view: str) -> Optional[Dict[str, Any]]:
+        return self._read(self._load_dashboard_snapshot, view)
+
+    async def load_dashboard_snapshot_async(self, view: str) -> Optional[Dict[str, Any]]:
+        return await self._read_async(self._load_dashboard_snapshot, view)
+
+    def _load_dashboard_snapshot(self, view: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM dashboard_snapshots WHERE view = ?", (view,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def save_dashboard_snapshot(self, view: str, snapshot: Dict[str, Any]) -> None:
+        data = json.dumps(snapshot)
+        self._write(lambda: self._conn.execute("INSERT OR REPLACE INTO dashboard_snapshots VALUES (?, ?)", (view, data)))
+
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        return self._read(self._load_alerts)
+
+    async def load_alerts_async(self) -> List[Dict[str, Any]]:
+        return await self._read_async(self._load_alerts)
+
+    def _load_alerts(self) -> List[Dict[str, Any]]:
+        return [json.loads(r["data"]) for r in self._conn.execute("SELECT data FROM alerts ORDER BY id")]
+
+    def save_alert(self, alert: Dict[str, Any]) -> None:
+        data = json.dumps(alert)
+        self._write(lambda: self._conn.execute(
+            "INSERT OR REPLACE INTO alerts VALUES (?, ?, ?)", (alert["id"], alert["chat_id"], data)))
+
+    def delete_alert(self, alert_id: int) -> None:
+        self._write(lambda: self._conn.execute("DELETE FROM alerts WHERE id = ?", (alert_id,)))
+
+    # --- history -----------------------------------------------------------------------
+
+    def record_price(self, link: str, price: float, ts: Optional[float] = None) -> None:
+        ts = ts or time.time()
+        self._write(lambda: self._conn.execute(
+            "INSERT INTO price_ticks (link, ts, price) VALUES (?, ?, ?)", (link, ts, float(price))))
+
+    def record_rebalance_event(self, link: str, stage: str, data: Optional[Dict[str, Any]] = None,
+                               ts: Optional[float] = None) -> None:
+        ts = ts or time.time()
+        payload = json.dumps(data or {})
+        self._write(lambda: self._conn.execute(
+            "INSERT INTO rebalance_events (link, ts, stage, data) VALUES (?, ?, ?, ?)", (link, ts, stage, payload)))
+
+    def price_history(self, link: str, since: float = 0) -> List[Dict[str, Any]]:
+        return self._read(self._price_history, link, since)
+
+    async def price_history_async(self, link: str, since: float = 0) -> List[Dict[str, Any]]:
+        return await self._read_async(self._price_history, link, since)
+
+    def _price_history(self, link: str, since: float) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT ts, price FROM price_ticks WHERE link = ? AND ts >= ? ORDER BY ts", (link, since))
+        return [dict(r) for r in rows]
+
+    def rebalance_events(self, link: Optional[str] = None, since: float = 0) -> List[Dict[str, Any]]:
+        return self._read(self._rebalance_events, link, since)
+
+    async def rebalance_events_async(self, link: Optional[str] = None, since: float = 0) -> List[Dict[str, Any]]:
+        return await self._read_async(self._rebalance_events, link, since)
+
+    def _rebalance_events(self, link: Optional[str], since: float) -> List[Dict[str, Any]]:
+        query = "SELECT link, ts, stage, data FROM rebalance_events WHERE ts >= ?"
+        params: List[Any] = [since]
+        if link is not None:
+            query += " AND link = ?"
+            params.append(link)
+        rows = self._conn.execute(query + " ORDER BY ts, id", params)
+        return [{**dict(r), "data": json.loads(r["data"]) if r["data"] else {}} for r in rows]
+
+    # --- migration ---------------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        return self._read(self._get_meta, key)
+
+    async def get_meta_async(self, key: str) -> Optional[str]:
+        return await self._read_async(self._get_meta, key)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._write(lambda: self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value)))
+
+
+def _log_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logging.error(f"State database write failed: {error}")
+
+
+def _read_json(path: str) -> Any:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logging.exception(f"Could not read {path} for migration")
+        return None
+
+
+def migrate_json_state(backend: StateBackend, state_file: str, checkpoint_file: str = "",
+                       dashboard_file: str = "", alerts_file: str = "", force: bool = False) -> Dict[str, int]:
+    """Import state.json (plus checkpoints, dashboard snapshots and price alerts) into `backend` once.
+
+    The JSON files are left untouched; the migration is recorded in the database so later
+    starts skip it unless `force` is given. Returns how many records were imported.
+    """
+    counts = {"pools": 0, "checkpoints": 0, "snapshots": 0, "alerts": 0}
+    if isinstance(backend, SqliteStateBackend) and backend.get_meta("json_migrated") and not force:
+        return counts
+    state = _read_json(state_file)
+    if isinstance(state, dict):
+        pools = [p for p in state.get("pools", []) if p.get("link")]
+        backend.save_state(pools, state.get("settings") or dict(DEFAULT_SETTINGS))
+        counts["pools"] = len(pools)
+    for checkpoint in (_read_json(checkpoint_file) or {}).values():
+        backend.save_checkpoint(checkpoint)
+        counts["checkpoints"] += 1
+    for view, snapshot in (_read_json(dashboard_file) or {}).items():
+        backend.save_dashboard_snapshot(view, snapshot)
+        counts["snapshots"] += 1
+    for alert in (_read_json(alerts_file) or {}).values():
+        backend.save_alert(alert)
+        counts["alerts"] += 1
+    if isinstance(backend, SqliteStateBackend):
+        backend.set_meta("json_migrated", str(time.time()))
+        backend.flush()
+    logging.info(f"Migrated JSON state into {type(backend).__name__}: {counts}")
+    return counts